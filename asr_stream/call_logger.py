@@ -1,9 +1,12 @@
 """通話ログ記録モジュール（console_bridge連携付き）"""
-import json
 import os
 import logging
+import sys
 from datetime import datetime, timezone
 
+sys.path.insert(0, '/opt/libertycall')
+from gateway.common.log_writer import get_log_writer
+
 logger = logging.getLogger(__name__)
 
 # console_bridge の安全なインポート
@@ -39,7 +42,8 @@ class CallLogger:
         os.makedirs(self.base_dir, exist_ok=True)
 
         self.jsonl_path = os.path.join(self.base_dir, f"{uuid}.jsonl")
-        self._file = open(self.jsonl_path, "a", encoding="utf-8")
+        # 書き込みは共有の LogWriter スレッドでまとめて行う（call_end で flush + fsync）
+        self._writer = get_log_writer()
 
         self._write({"type": "call_start", "uuid": uuid, "caller_number": caller_number,
                       "client_id": client_id})
@@ -62,8 +66,7 @@ class CallLogger:
     def _write(self, record: dict):
         record.setdefault("time", self._now())
         try:
-            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
-            self._file.flush()
+            self._writer.write(self.jsonl_path, record)
         except Exception as e:
             logger.error("[CALL_LOG] write error uuid=%s err=%s", self.uuid, e)
 
@@ -149,10 +152,8 @@ class CallLogger:
             "uuid": self.uuid,
             "duration": round(elapsed, 1),
         })
-        try:
-            self._file.close()
-        except Exception:
-            pass
+        if not self._writer.close(self.jsonl_path):
+            logger.warning("[CALL_LOG] flush on close timed out uuid=%s", self.uuid)
         logger.info("[CALL_LOG] closed uuid=%s duration=%.1fs", self.uuid, elapsed)
         # console_bridge: 通話終了
         if _bridge:
@@ -0,0 +1,148 @@
+"""通話メタデータ解決モジュール（uuid → destination_number / caller_number → client_id）"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PHONE_MAPPING_PATH = os.environ.get(
+    "LC_PHONE_MAPPING_PATH", "/opt/libertycall/config/phone_mapping.json")
+# 解決結果のキャッシュ保持時間（秒）。同一通話での再問い合わせをESLに流さない
+CALL_METADATA_TTL = float(os.environ.get("LC_CALL_METADATA_TTL", "300"))
+# phone_mapping.json の mtime を確認する最短間隔（秒）
+PHONE_MAPPING_CHECK_INTERVAL = float(os.environ.get("LC_PHONE_MAPPING_CHECK_INTERVAL", "2"))
+
+UNKNOWN_CALLER = "番号不明"
+_UNSET_VALUES = ("", "_undef_", "NONE")
+# eval の出力区切り（電話番号には含まれない文字）
+_SEP = "|"
+
+
+class CallMetadata(NamedTuple):
+    uuid: str
+    destination_number: str
+    caller_number: str
+    client_id: str
+
+
+class PhoneMapping:
+    """phone_mapping.json をメモリに保持し、mtime が変わったときだけ再読込する"""
+
+    def __init__(self, path: str = PHONE_MAPPING_PATH,
+                 check_interval: float = PHONE_MAPPING_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._mapping = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                if self._mtime is not None:
+                    logger.warning("[CALL_META] phone_mapping stat failed: %s", e)
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError) as e:
+                # 書き込み途中などで壊れている場合は前回の内容を使い続ける
+                logger.warning("[CALL_META] phone_mapping reload failed: %s", e)
+                return
+            self._mapping = mapping
+            self._mtime = mtime
+            logger.info("[CALL_META] phone_mapping loaded entries=%d", len(mapping))
+
+    def get(self, destination_number: str, default: Optional[str] = None) -> Optional[str]:
+        self._maybe_reload()
+        return self._mapping.get(destination_number, default)
+
+
+class CallMetadataResolver:
+    """
+    1回の ESL 往復（eval uuid:<uuid> ...）で destination_number と caller_id_number を
+    まとめて取得し、phone_mapping から client_id を解決する。結果は uuid ごとに TTL キャッシュ。
+    """
+
+    def __init__(self, esl, default_client_id: str = "000",
+                 mapping: Optional[PhoneMapping] = None, ttl: float = CALL_METADATA_TTL):
+        self.esl = esl
+        self.default_client_id = default_client_id
+        self.mapping = mapping or PhoneMapping()
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _command(uuid: str) -> str:
+        return f"eval uuid:{uuid} ${{destination_number}}{_SEP}${{caller_id_number}}"
+
+    def _build(self, uuid: str, result) -> CallMetadata:
+        body = (result.getBody() or "") if result is not None else ""
+        dest, _, caller = body.strip().partition(_SEP)
+        dest = dest.strip()
+        caller = caller.strip()
+        if dest in _UNSET_VALUES or dest.startswith("-ERR"):
+            dest = "unknown"
+        if caller in _UNSET_VALUES:
+            caller = UNKNOWN_CALLER
+        client_id = self.mapping.get(dest, self.default_client_id)
+        return CallMetadata(uuid, dest, caller, client_id)
+
+    def _cached(self, uuid: str) -> Optional[CallMetadata]:
+        entry = self._cache.get(uuid)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _store(self, meta: CallMetadata, result) -> None:
+        # ESL未接続で取れなかった結果はキャッシュしない
+        if result is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if len(self._cache) > 1024:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[meta.uuid] = (now + self.ttl, meta)
+
+    def resolve(self, uuid: str) -> CallMetadata:
+        """同期版（ワーカースレッドから呼ぶ）"""
+        meta = self._cached(uuid)
+        if meta is not None:
+            return meta
+        result = self.esl.api(self._command(uuid)) if self.esl else None
+        meta = self._build(uuid, result)
+        self._store(meta, result)
+        logger.info("[CALL_META] uuid=%s dest=%s caller=%s client_id=%s",
+                    uuid, meta.destination_number, meta.caller_number, meta.client_id)
+        return meta
+
+    async def resolve_async(self, uuid: str) -> CallMetadata:
+        """イベントループから await で呼ぶ版（共有ESLプールの api_async を使う）"""
+        meta = self._cached(uuid)
+        if meta is not None:
+            return meta
+        result = await self.esl.api_async(self._command(uuid)) if self.esl else None
+        meta = self._build(uuid, result)
+        self._store(meta, result)
+        logger.info("[CALL_META] uuid=%s dest=%s caller=%s client_id=%s",
+                    uuid, meta.destination_number, meta.caller_number, meta.client_id)
+        return meta
+
+    def invalidate(self, uuid: str) -> None:
+        with self._lock:
+            self._cache.pop(uuid, None)
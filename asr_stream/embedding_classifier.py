@@ -1,78 +1,219 @@
 """EmbeddingClassifier - Whisper embedding + MFCC features for audio classification."""
 
+import inspect
 import numpy as np
 import pickle
 import logging
-import librosa
-from faster_whisper.feature_extractor import FeatureExtractor
-import ctranslate2
+import threading
+from scipy.signal import get_window, savgol_filter
+
+from asr_stream.utterance_features import UtteranceFeatures
 
 logger = logging.getLogger(__name__)
 
 MODEL_DIR = "/opt/libertycall/training_data/embeddings"
 
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+_ACTIVATIONS = {
+    "identity": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "logistic": _sigmoid,
+}
+
+
+class FusedPipeline:
+    """
+    StandardScaler → PCA → MLPClassifier.predict_proba を行列演算だけで実行する
+
+    スケーラと PCA はどちらも線形変換なので、ロード時に MLP の1層目の重みと合成して
+    1つの (n_features, hidden) 行列 + バイアスにまとめる。推論は層の数だけの matmul になる。
+    """
+
+    def __init__(self, scaler, pca, mlp):
+        components = np.asarray(pca.components_, dtype=np.float64).T  # (n_features, k)
+        if getattr(pca, "whiten", False):
+            components = components / np.sqrt(pca.explained_variance_)
+        n_features = components.shape[0]
+        mean = getattr(scaler, "mean_", None)
+        scale = getattr(scaler, "scale_", None)
+        mean = np.zeros(n_features) if mean is None or not getattr(scaler, "with_mean", True) else mean
+        scale = np.ones(n_features) if scale is None or not getattr(scaler, "with_std", True) else scale
+        pca_mean = getattr(pca, "mean_", None)
+        pca_mean = np.zeros(n_features) if pca_mean is None else pca_mean
+
+        # ((x - mean) / scale - pca_mean) @ components = x @ W + b
+        w = components / np.asarray(scale, dtype=np.float64)[:, None]
+        b = -(np.asarray(mean, dtype=np.float64) / scale + pca_mean) @ components
+
+        coefs = [np.asarray(c, dtype=np.float64) for c in mlp.coefs_]
+        intercepts = [np.asarray(c, dtype=np.float64) for c in mlp.intercepts_]
+        self.weights = [w @ coefs[0]] + coefs[1:]
+        self.biases = [b @ coefs[0] + intercepts[0]] + intercepts[1:]
+        self.activation = _ACTIVATIONS[mlp.activation]
+        self.out_activation = mlp.out_activation_
+        self.classes_ = np.asarray(mlp.classes_)
+
+    def predict_proba(self, x):
+        h = np.atleast_2d(np.asarray(x, dtype=np.float64))
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            h = h @ w + b
+            if i < last:
+                h = self.activation(h)
+        if self.out_activation == "softmax":
+            h = np.exp(h - h.max(axis=1, keepdims=True))
+            return h / h.sum(axis=1, keepdims=True)
+        h = _ACTIVATIONS[self.out_activation](h)
+        if h.shape[1] == 1:
+            # 2クラス（sklearn の predict_proba と同じ [1-p, p]）
+            h = np.hstack([1.0 - h, h])
+        return h
+
+
+class MfccExtractor:
+    """
+    librosa.feature.mfcc(sr=16000, n_mfcc=20) + delta + delta2 の mean/std を NumPy で計算する
+
+    窓関数・メルフィルタバンク・DCT 行列はロード時に1回だけ作る。
+    mel_power() の結果（メルスペクトログラム）は UtteranceFeatures にキャッシュし、
+    MFCC はそこから DCT だけで求める。
+    """
+
+    def __init__(self, sr=16000, n_mfcc=20, n_fft=2048, hop_length=512, n_mels=128):
+        import librosa  # メルフィルタバンクの生成のみ（推論では使わない）
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.window = get_window("hann", n_fft, fftbins=True).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels).T.astype(np.float32)
+        self.dct = _dct_matrix(n_mels)[:n_mfcc]
+        # librosa.stft(center=True) と同じパディング（librosa のバージョンで既定値が異なる）
+        self.pad_mode = inspect.signature(librosa.stft).parameters["pad_mode"].default
+
+    def mel_power(self, audio_16k):
+        """パワーメルスペクトログラム (n_mels, frames)"""
+        y = np.pad(np.asarray(audio_16k, dtype=np.float32), self.n_fft // 2, mode=self.pad_mode)
+        frames = np.lib.stride_tricks.sliding_window_view(y, self.n_fft)[::self.hop_length]
+        spec = np.abs(np.fft.rfft(frames * self.window, axis=-1)) ** 2
+        return (spec @ self.mel_basis).T
+
+    def from_mel(self, mel_power):
+        log_mel = 10.0 * np.log10(np.maximum(mel_power, 1e-10))
+        log_mel = np.maximum(log_mel, log_mel.max() - 80.0)
+        mfcc = self.dct @ log_mel
+        delta = savgol_filter(mfcc, 9, polyorder=1, deriv=1, axis=-1, mode="interp")
+        delta2 = savgol_filter(mfcc, 9, polyorder=2, deriv=2, axis=-1, mode="interp")
+        feats = []
+        for f in [mfcc, delta, delta2]:
+            feats.extend([f.mean(axis=1), f.std(axis=1)])
+        return np.concatenate(feats)
+
+    def __call__(self, audio_16k):
+        return self.from_mel(self.mel_power(audio_16k))
+
+
+def _dct_matrix(n):
+    """scipy.fft.dct(type=2, norm='ortho') を行列にしたもの（D @ x == dct(x, axis=0)）"""
+    k = np.arange(n)[:, None]
+    m = np.arange(n)[None, :]
+    d = np.cos(np.pi * k * (2 * m + 1) / (2 * n)) * np.sqrt(2.0 / n)
+    d[0] /= np.sqrt(2.0)
+    return d
+
+
 class EmbeddingClassifier:
-    def __init__(self):
-        self._scaler = pickle.load(open(f"{MODEL_DIR}/scaler_v3.pkl", "rb"))
-        self._pca = pickle.load(open(f"{MODEL_DIR}/pca_v3.pkl", "rb"))
-        self._classifier = pickle.load(open(f"{MODEL_DIR}/classifier_mlp_v3.pkl", "rb"))
+    """
+    プロセス共有の分類器（get_embedding_classifier() で取得する）
+
+    モデルの読み込みと librosa のウォームアップは起動時に1回だけ。
+    推論は FusedPipeline（行列演算のみ）で、classify_batch() で複数発話をまとめて分類できる。
+    状態を持たないため複数の通話スレッドから同時に呼んでよい。
+    """
+
+    def __init__(self, model_dir=MODEL_DIR):
+        with open(f"{model_dir}/scaler_v3.pkl", "rb") as f:
+            scaler = pickle.load(f)
+        with open(f"{model_dir}/pca_v3.pkl", "rb") as f:
+            pca = pickle.load(f)
+        with open(f"{model_dir}/classifier_mlp_v3.pkl", "rb") as f:
+            classifier = pickle.load(f)
+        self._pipeline = FusedPipeline(scaler, pca, classifier)
+        self.classes_ = self._pipeline.classes_
+        from faster_whisper.feature_extractor import FeatureExtractor
         self._ext = FeatureExtractor()
         self._ct = None
-        
+
         # MFCC設定を読み込み
         try:
             import json
-            self._config = json.load(open(f"{MODEL_DIR}/config_v3.pkl", "r"))
+            self._config = json.load(open(f"{model_dir}/config_v3.pkl", "r"))
             self._use_mfcc = self._config.get("use_mfcc", False)
         except:
             self._use_mfcc = False
-        
-        n_classes = len(self._classifier.classes_)
+        self._mfcc = MfccExtractor() if self._use_mfcc else None
+
+        n_classes = len(self.classes_)
         logger.info("[EMB_CLF] loaded classifier: %d classes, PCA=%d dims, mfcc=%s",
-                     n_classes, self._pca.n_components_, self._use_mfcc)
+                     n_classes, pca.n_components_, self._use_mfcc)
 
-        # Warmup: preload librosa and run dummy inference
+        # Warmup: run dummy MFCC extraction
         try:
             dummy = np.zeros(16000, dtype=np.float32)  # 1s silence
-            self._get_mfcc_features(dummy)
-            logger.info("[EMB_CLF] warmup complete - librosa preloaded")
+            if self._mfcc:
+                self._mfcc(dummy)
+            logger.info("[EMB_CLF] warmup complete")
         except Exception as e:
             logger.warning("[EMB_CLF] warmup failed: %s", e)
-    
+
     def set_ct_model(self, ct_model):
         self._ct = ct_model
-    
-    def _get_embedding(self, audio_16k):
-        features = self._ext(audio_16k)
-        sv = ctranslate2.StorageView.from_array(np.expand_dims(features, 0))
-        out = np.array(self._ct.encode(sv))
-        return out[0].mean(axis=0)
-    
-    def _get_mfcc_features(self, audio_16k):
-        mfcc = librosa.feature.mfcc(y=audio_16k, sr=16000, n_mfcc=20)
-        delta = librosa.feature.delta(mfcc)
-        delta2 = librosa.feature.delta(mfcc, order=2)
-        feats = []
-        for f in [mfcc, delta, delta2]:
-            feats.extend([f.mean(axis=1), f.std(axis=1)])
-        return np.concatenate(feats)
-    
+
+    def features(self, audio_16k):
+        """発話の特徴量キャッシュを作る（Whisper デコードにもそのまま渡せる）"""
+        return UtteranceFeatures(audio_16k, self._ext, self._ct)
+
+    def _as_features(self, item):
+        return item if isinstance(item, UtteranceFeatures) else self.features(item)
+
+    def _feature_vector(self, feats):
+        emb = feats.embedding()
+        if not self._use_mfcc:
+            return emb
+        mel = feats.derived("mfcc_mel", self._mfcc.mel_power)
+        return np.concatenate([emb, self._mfcc.from_mel(mel)])
+
+    def classify_batch(self, items):
+        """
+        items: float32 音声または UtteranceFeatures のリスト
+        Returns: [(label, confidence), ...]（分類器は1回の行列演算でまとめて実行）
+        """
+        if not items:
+            return []
+        feats = [self._as_features(item) for item in items]
+        proba = self._pipeline.predict_proba(np.stack([self._feature_vector(f) for f in feats]))
+        best = proba.argmax(axis=1)
+        return [(self.classes_[i], float(proba[row, i])) for row, i in enumerate(best)]
+
     def classify(self, audio_16k):
-        emb = self._get_embedding(audio_16k)
-        
-        if self._use_mfcc:
-            mfcc_feat = self._get_mfcc_features(audio_16k)
-            feature_vec = np.concatenate([emb, mfcc_feat])
-        else:
-            feature_vec = emb
-        
-        feature_vec = feature_vec.reshape(1, -1)
-        scaled = self._scaler.transform(feature_vec)
-        reduced = self._pca.transform(scaled)
-        
-        proba = self._classifier.predict_proba(reduced)[0]
-        best_idx = np.argmax(proba)
-        label = self._classifier.classes_[best_idx]
-        confidence = proba[best_idx]
-        
-        return label, float(confidence)
+        """audio_16k は float32 の音声、または features() で作った UtteranceFeatures"""
+        return self.classify_batch([audio_16k])[0]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_embedding_classifier(ct_model=None):
+    """プロセス共有の EmbeddingClassifier（初回のみモデルを読み込む）"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = EmbeddingClassifier()
+    if ct_model is not None and _classifier._ct is None:
+        _classifier.set_ct_model(ct_model)
+    return _classifier
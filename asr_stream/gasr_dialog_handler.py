@@ -1,9 +1,12 @@
 """GoogleStreamingSession用 ダイアログ処理Mixin"""
 import logging
 import os
-import threading
+import sys
 import time
 
+sys.path.insert(0, '/opt/libertycall')
+from gateway.common.timer_wheel import get_timer_wheel
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,10 +14,9 @@ class GASRDialogHandlerMixin:
     """_start_silence_timer / _on_silence_timeout / _handle_dialog 等を提供するMixin"""
 
     def _start_silence_timer(self):
-        if self._silence_timer:
-            self._silence_timer.cancel()
-        self._silence_timer = threading.Timer(0.4, self._on_silence_timeout)
-        self._silence_timer.start()
+        # 共有タイマーホイール上の1本を発話ごとに延長する（threading.Timer を作り直さない）
+        self._silence_timer = get_timer_wheel().reset(self._silence_timer, 0.4,
+                                                      self._on_silence_timeout)
 
     def _on_silence_timeout(self):
         if self._stop_requested.is_set():
@@ -44,8 +46,8 @@ class GASRDialogHandlerMixin:
                     self.uuid, new_text, offset, full_text)
         if len(new_text) < 4 and not getattr(self, '_extended_once', False):
             self._extended_once = True
-            self._silence_timer = threading.Timer(0.4, self._on_silence_timeout)
-            self._silence_timer.start()
+            self._silence_timer = get_timer_wheel().reset(self._silence_timer, 0.4,
+                                                          self._on_silence_timeout)
             logger.info("[EXTEND_WAIT] uuid=%s text=%r len=%d", self.uuid, new_text, len(new_text))
             return
         self._extended_once = False
@@ -119,11 +121,8 @@ class GASRDialogHandlerMixin:
                                 audio_path = ram_audio_path
                             else:
                                 audio_path = f"/opt/libertycall/clients/{self.client_id}/audio/{template}.wav"
-                            try:
-                                file_size = os.path.getsize(audio_path)
-                                audio_duration = max((file_size - 44) / 16000, 0.5)
-                            except Exception:
-                                audio_duration = 2.0
+                            from gateway.common.audio_asset_store import get_audio_asset_store
+                            audio_duration = get_audio_asset_store().duration(audio_path, 2.0)
                             logger.info("[DIALOG_PLAYING] uuid=%s template=%s path=%s duration=%.2fs",
                                          self.uuid, template, audio_path, audio_duration)
                             broadcast_start = time.time()
@@ -146,7 +145,7 @@ class GASRDialogHandlerMixin:
                                 self.silence_handler.stop()
                                 logger.info("[SILENCE] pre-emptive stop for hangup uuid=%s",
                                              self.uuid)
-                        self._start_clear_playing_thread(audio_ids, action, config)
+                        self._start_clear_playing_timer(audio_ids, action, config)
                         logger.info("[DIALOG_PLAY_STARTED] uuid=%s end_time=%.3f",
                                      self.uuid, self._playback_end_time)
                     else:
@@ -196,12 +195,16 @@ class GASRDialogHandlerMixin:
             except Exception:
                 pass
 
-    def _start_clear_playing_thread(self, audio_ids, action, config):
+    def _start_clear_playing_timer(self, audio_ids, action, config):
+        """再生終了時刻にタイマーホイールで後処理する（バージインでは即時に発火させる）"""
+        handle = None
+
         def _clear_playing():
             wait_time = self._playback_end_time - time.time()
-            while wait_time > 0 and self._is_playing:
-                time.sleep(0.1)
-                wait_time = self._playback_end_time - time.time()
+            if wait_time > 0 and self._is_playing:
+                # 再生中に次の音声が追加されて終了時刻が延びた
+                handle.reset(wait_time)
+                return
             self._is_playing = False
             self._is_speaking = False
             logger.info("[PLAY_END] uuid=%s", self.uuid)
@@ -237,4 +240,7 @@ class GASRDialogHandlerMixin:
                     if hasattr(self, 'silence_handler') and self.silence_handler:
                         self.silence_handler.stop()
                     self._stop_requested.set()
-        threading.Thread(target=_clear_playing, daemon=True).start()
+
+        handle = get_timer_wheel().call_later(
+            max(0.0, self._playback_end_time - time.time()), _clear_playing)
+        self._play_end_timer = handle
@@ -0,0 +1,118 @@
+"""
+Google STT ストリームのキープアライブ
+
+実音声が途切れている間、バックエンドの無音タイムアウト（約10秒）に必要な頻度でだけ
+事前生成したコンフォートノイズのフレームを送る。フレームは起動時に1度だけ作る。
+音声タイムアウトでストリームが切れたら間隔を縮める（プロセス共有）。
+
+送信した音声の内訳（実音声・キープアライブ・張り替え時の再送）と課金対象の秒数は
+AudioMeter で通話ごとに数える。
+"""
+import math
+import os
+import threading
+
+import numpy as np
+
+# 実音声がこの秒数途切れたらキープアライブを1フレーム送る
+GASR_KEEPALIVE_INTERVAL = float(os.environ.get("GASR_KEEPALIVE_INTERVAL", "3.0"))
+GASR_KEEPALIVE_MIN_INTERVAL = float(os.environ.get("GASR_KEEPALIVE_MIN_INTERVAL", "0.5"))
+GASR_KEEPALIVE_FRAME_MS = int(os.environ.get("GASR_KEEPALIVE_FRAME_MS", "40"))
+# コンフォートノイズの標準偏差（PCM16）
+GASR_KEEPALIVE_NOISE_LEVEL = float(os.environ.get("GASR_KEEPALIVE_NOISE_LEVEL", "30"))
+# 課金の丸め単位（秒、ストリームごと）
+GASR_BILLING_INCREMENT_SEC = float(os.environ.get("GASR_BILLING_INCREMENT_SEC", "1.0"))
+
+_NOISE_VARIANTS = 8
+
+
+def build_comfort_noise(sample_rate, frame_ms=GASR_KEEPALIVE_FRAME_MS,
+                        level=GASR_KEEPALIVE_NOISE_LEVEL, variants=_NOISE_VARIANTS, seed=0):
+    """LINEAR16 のコンフォートノイズフレームを variants 個作る"""
+    samples = int(sample_rate * frame_ms / 1000)
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0.0, level, size=(variants, samples))
+    return [np.clip(row, -32768, 32767).astype("<i2").tobytes() for row in noise]
+
+
+def is_audio_timeout(exc):
+    """無音タイムアウトでストリームが切られたか（ストリーム時間の上限とは区別する）"""
+    text = str(exc)
+    return "Audio Timeout" in text or "without audio" in text
+
+
+class KeepAlivePolicy:
+    """キープアライブの送信間隔とフレーム（プロセス共有）"""
+
+    def __init__(self, interval=GASR_KEEPALIVE_INTERVAL, min_interval=GASR_KEEPALIVE_MIN_INTERVAL):
+        self.interval = interval
+        self.min_interval = min_interval
+        self._frames = {}
+        self._lock = threading.Lock()
+        self.timeouts = 0
+
+    def frames(self, sample_rate):
+        frames = self._frames.get(sample_rate)
+        if frames is None:
+            with self._lock:
+                frames = self._frames.setdefault(sample_rate, build_comfort_noise(sample_rate))
+        return frames
+
+    def wait_time(self, now, last_sent):
+        """次のキープアライブまでの秒数（0 以下なら送る）"""
+        return last_sent + self.interval - now
+
+    def on_audio_timeout(self):
+        """タイムアウトで切れた: 間隔を半分にする"""
+        with self._lock:
+            self.timeouts += 1
+            self.interval = max(self.min_interval, self.interval / 2.0)
+        return self.interval
+
+
+class AudioMeter:
+    """1通話分の送信音声の秒数（実音声 / キープアライブ / 再送）と課金対象の秒数"""
+
+    def __init__(self, bytes_per_second, billing_increment=GASR_BILLING_INCREMENT_SEC):
+        self.bytes_per_second = float(bytes_per_second)
+        self.billing_increment = billing_increment
+        self.real_bytes = 0
+        self.keepalive_bytes = 0
+        self.replay_bytes = 0
+        self.billed_sec = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, kind, nbytes):
+        with self._lock:
+            setattr(self, f"{kind}_bytes", getattr(self, f"{kind}_bytes") + nbytes)
+
+    def bill_stream(self, nbytes):
+        """1ストリームで送った音声を課金単位に切り上げて足す"""
+        if not nbytes:
+            return
+        sec = nbytes / self.bytes_per_second
+        inc = self.billing_increment
+        with self._lock:
+            self.billed_sec += math.ceil(sec / inc) * inc if inc > 0 else sec
+
+    def as_dict(self):
+        bps = self.bytes_per_second
+        return {
+            "real_sec": round(self.real_bytes / bps, 2),
+            "keepalive_sec": round(self.keepalive_bytes / bps, 2),
+            "replay_sec": round(self.replay_bytes / bps, 2),
+            "billed_sec": round(self.billed_sec, 2),
+        }
+
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_keepalive_policy():
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = KeepAlivePolicy()
+    return _policy
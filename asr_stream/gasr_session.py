@@ -10,7 +10,16 @@ import time
 
 from google.cloud import speech
 
-from speech_client_manager import SpeechClientManager
+from speech_client_manager import get_speech_client_pool
+from gasr_stream_rotation import (
+    GASR_STREAM_MAX_RECONNECTS,
+    GASR_STREAM_OVERLAP_SEC,
+    GASR_STREAM_ROTATE_HARD_SEC,
+    GASR_STREAM_ROTATE_SEC,
+    OverlapBuffer,
+    ResultStitcher,
+)
+from gasr_keepalive import AudioMeter, get_keepalive_policy, is_audio_timeout
 from call_logger import CallLogger
 from gasr_dialog_handler import GASRDialogHandlerMixin
 
@@ -21,13 +30,20 @@ ESL_PASSWORD = os.environ.get("AF_ESL_PASSWORD", "ClueCon")
 
 
 sys.path.insert(0, '/opt/libertycall')
-from libs.esl.ESL import ESLconnection
+from libs.esl.async_esl import get_shared_esl
+from gateway.common.client_config_registry import get_client_config
 
 logger = logging.getLogger(__name__)
 
 GASR_SAMPLE_RATE = int(os.environ.get("GASR_SAMPLE_RATE", "8000"))
 GASR_LANGUAGE = os.environ.get("GASR_LANGUAGE", "ja-JP")
 GASR_OUTPUT_DIR = os.environ.get("GASR_OUTPUT_DIR", "/tmp")
+# "1": mute 中（冒頭アナウンス再生中）はストリームを開かず、unmute で開く
+GASR_PAUSE_WHEN_MUTED = os.environ.get("GASR_PAUSE_WHEN_MUTED", "1") == "1"
+
+
+def _build_speech_contexts(client_config):
+    return [speech.SpeechContext(phrases=client_config.phrase_hints, boost=5.0)]
 
 
 class GoogleStreamingSession(GASRDialogHandlerMixin):
@@ -47,28 +63,38 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
         self._accumulated_text = ""
         self._silence_timer = None
         self._is_playing = False
+        self._play_end_timer = None
         self._is_speaking = False
         self._responded_offset = 0
         self._extended_once = False
         self._last_responded_text = ""
         self._interim_responded = False
-        self.client = speech.SpeechClient()
+        # gRPC チャネルはプロセス共有のプールから借りる（通話ごとに接続しない）
+        self._pool = get_speech_client_pool()
+        self._stream_seq = 0
+        self._stitcher = ResultStitcher()
+        self._overlap = OverlapBuffer(GASR_STREAM_OVERLAP_SEC * self.sample_rate * 2)
+        self._response_lock = threading.Lock()
+        self.stream_stats = {"streams": 0, "rotations": 0, "reconnects": 0, "open_latency_ms": []}
+        self._keepalive = get_keepalive_policy()
+        self._meter = AudioMeter(self.sample_rate * 2)
+        self._stream_lock = threading.Lock()
+        self._paused = False
     
-        # voice_mapを事前読み込み
+        # クライアント設定はプロセス共有のレジストリから取得（初回のみファイル読込）
+        self._client_config = get_client_config(self.client_id)
         self._voice_map = self._load_voice_list()
-    
-        # dialogue_configを事前読み込み
         self._dialogue_config = self._load_dialogue_config()
     
         # クライアント設定からphrase hintsを構築
         phrase_hints = self._load_phrase_hints()
-        self._instant_keywords = set(self._load_instant_keywords()) if self._load_instant_keywords() else set()
+        self._instant_keywords = set(self._load_instant_keywords())
         logger.info("[GASR] instant_keywords loaded count=%d uuid=%s",
                         len(self._instant_keywords), self.uuid)
         
         speech_contexts = []
         if phrase_hints:
-            speech_contexts = [speech.SpeechContext(phrases=phrase_hints, boost=5.0)]
+            speech_contexts = self._client_config.derived("gasr_speech_contexts", _build_speech_contexts)
             logger.info("[GASR] phrase_hints loaded count=%d boost=5.0 uuid=%s",
                         len(phrase_hints), self.uuid)
     
@@ -86,13 +112,16 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
         logger.info("[GASR] session_open uuid=%s config=LINEAR16/%s/%s",
                     self.uuid, self.sample_rate, self.language)
     
-        # アナウンス再生中にSTT接続を事前確立
         self._unmute_event = threading.Event()
         self._stream_started = True
-        self._thread = threading.Thread(
-            target=self._consume_responses, daemon=True)
-        self._thread.start()
-        logger.info("[GASR] pre-starting STT connection uuid=%s", self.uuid)
+        if GASR_PAUSE_WHEN_MUTED:
+            # アナウンス再生中は送らない（チャネルはプールで接続済みなので unmute 時にすぐ開ける）
+            self._paused = True
+            logger.info("[GASR] STT stream deferred until unmute uuid=%s", self.uuid)
+        else:
+            # アナウンス再生中にSTT接続を事前確立
+            self._start_stream()
+            logger.info("[GASR] pre-starting STT connection uuid=%s", self.uuid)
     
         # ESL接続を事前に作成
         self._esl = None
@@ -102,57 +131,27 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
     #  Config loaders
     # ------------------------------------------------------------------ #
     def _load_dialogue_config(self):
-        """Load and cache dialogue_config.json"""
-        config_path = f"/opt/libertycall/clients/{self.client_id}/config/dialogue_config.json"
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            logger.info("[GASR] dialogue_config loaded uuid=%s", self.uuid)
-            return config
-        except Exception as e:
-            logger.warning("[GASR] dialogue_config load failed uuid=%s err=%s",
-                            self.uuid, e)
-            return {}
+        """dialogue_config.json（レジストリでキャッシュ済み、読み取り専用）"""
+        if not self._client_config.loaded:
+            logger.warning("[GASR] dialogue_config load failed uuid=%s", self.uuid)
+        return self._client_config.dialogue_config
     
     def _load_phrase_hints(self):
-        """dialogue_config.jsonのkeywordsからphrase hintsを構築"""
-        config = self._dialogue_config
-        if not config:
+        """dialogue_config.jsonのkeywordsから構築済みのphrase hints"""
+        if not self._dialogue_config:
             logger.warning("[GASR] phrase_hints config not available uuid=%s",
                             self.uuid)
-            return []
-        hints = set()
-        for pattern in config.get("patterns", []):
-            for kw in pattern.get("keywords", []):
-                hints.add(kw)
-        return list(hints)
+        return self._client_config.phrase_hints
     
     
     def _load_instant_keywords(self):
         """dialogue_config.jsonのinstant_keywordsから即応答キーワードを構築"""
-        config = self._dialogue_config
-        if not config:
+        if not self._dialogue_config:
             logger.warning("[GASR] instant_keywords config not available uuid=%s", self.uuid)
-            return []
-        return config.get('instant_keywords', [])
+        return self._client_config.instant_keywords
     def _load_voice_list(self):
-        """voice_list_000.tsvを読み込んでID→文言のマッピングを返す"""
-        if hasattr(self, '_voice_map'):
-            return self._voice_map
-        self._voice_map = {}
-        try:
-            with open(f'/opt/libertycall/clients/{self.client_id}/voice_list_{self.client_id}.tsv',
-                        'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    parts = line.split('\t')
-                    if len(parts) >= 2:
-                        self._voice_map[parts[0]] = parts[1]
-        except Exception as e:
-            logger.warning("[VOICE] Failed to load voice_list: %s", e)
-        return self._voice_map
+        """voice_list_<client>.tsv のID→文言マッピング（レジストリでキャッシュ済み）"""
+        return self._client_config.voice_map
     
     # ------------------------------------------------------------------ #
     #  Audio input
@@ -190,6 +189,9 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
                         self._stop_current_playback()
                         self._is_playing = False
                         self._barge_in_count = 0
+                        timer = self._play_end_timer
+                        if timer is not None and timer.active:
+                            timer.reset(0)
                 else:
                     self._barge_in_count = 0
             except Exception:
@@ -217,61 +219,140 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
         if not self._stop_requested.is_set():
             self._stop_requested.set()
             self.queue.put(None)
+        with self._stream_lock:
+            if self._paused:
+                # ストリームを開いていない
+                self._closed.set()
         self._closed.wait(timeout=5)
-        if self._esl:
-            try:
-                self._esl.disconnect()
-                logger.info("[ESL] disconnected uuid=%s", self.uuid)
-            except Exception:
-                pass
-            self._esl = None
+        logger.info("[GASR] stream_stats uuid=%s %s audio=%s", self.uuid, self.stream_stats,
+                    self._meter.as_dict())
+        # 共有ESLクライアントは切断しない
+        self._esl = None
     
-    def _request_generator(self):
-        logger.info("[GASR] _request_generator started uuid=%s", self.uuid)
-        first_empty = True
-        while True:
-            try:
-                chunk = self.queue.get(timeout=0.1)  # 0.1秒タイムアウト
-                logger.debug("[GASR] _request_generator got chunk uuid=%s size=%d", self.uuid, len(chunk) if chunk else 0)
+    def _start_stream(self, replay=()):
+        """新しい streaming_recognize を開く。replay は先頭で再送する音声"""
+        self._stream_seq += 1
+        seq = self._stream_seq
+        self.stream_stats["streams"] += 1
+        self._stitcher.begin_stream(seq, bool(replay))
+        self._thread = threading.Thread(
+            target=self._consume_responses, args=(seq, list(replay)), daemon=True)
+        self._thread.start()
+    
+    def _should_rotate(self, opened):
+        elapsed = time.monotonic() - opened
+        if elapsed >= GASR_STREAM_ROTATE_HARD_SEC:
+            return True
+        return elapsed >= GASR_STREAM_ROTATE_SEC and not getattr(self, '_last_interim_text', '')
+    
+    def _request_generator(self, seq=1, replay=(), started=None, channel=None):
+        logger.info("[GASR] _request_generator started uuid=%s seq=%d", self.uuid, seq)
+        opened = time.monotonic()
+        if started is not None:
+            # gRPC がリクエストを読み始めた = ストリームが開いた
+            latency = opened - started
+            self._pool.record_open_latency(latency)
+            self.stream_stats["open_latency_ms"].append(round(latency * 1000.0, 1))
+            logger.info("[GASR] stream_open uuid=%s seq=%d channel=%s latency=%.3fs replay=%d",
+                        self.uuid, seq, channel, latency, len(replay))
+        keepalive = self._keepalive
+        noise_frames = keepalive.frames(self.sample_rate)
+        noise_index = 0
+        sent_bytes = 0
+        last_sent = time.monotonic()
+        try:
+            for chunk in replay:
+                self._meter.add("replay", len(chunk))
+                sent_bytes += len(chunk)
+                yield speech.StreamingRecognizeRequest(audio_content=chunk)
+            while True:
+                now = time.monotonic()
+                if self._should_rotate(opened) and not self._stop_requested.is_set():
+                    # 上限の手前で次のストリームを開き、このストリームは送信を終える
+                    self.stream_stats["rotations"] += 1
+                    logger.info("[GASR] stream_rotate uuid=%s seq=%d elapsed=%.1fs",
+                                self.uuid, seq, now - opened)
+                    self._start_stream(self._overlap.snapshot())
+                    return
+                # 実音声が来なければ、タイムアウトに必要な頻度でだけキープアライブを送る
+                wait = keepalive.wait_time(now, last_sent)
+                if wait <= 0:
+                    noise = noise_frames[noise_index % len(noise_frames)]
+                    noise_index += 1
+                    self._meter.add("keepalive", len(noise))
+                    sent_bytes += len(noise)
+                    last_sent = now
+                    yield speech.StreamingRecognizeRequest(audio_content=noise)
+                    continue
+                try:
+                    # 張り替え判定のため最長1秒で起きる
+                    chunk = self.queue.get(timeout=min(wait, 1.0))
+                except queue.Empty:
+                    continue
                 if chunk is None:
                     logger.info("[GASR] _request_generator received None, breaking uuid=%s", self.uuid)
                     break
                 if not chunk:
                     continue
+                self._overlap.add(chunk)
+                self._meter.add("real", len(chunk))
+                sent_bytes += len(chunk)
+                last_sent = time.monotonic()
                 yield speech.StreamingRecognizeRequest(audio_content=chunk)
-            except queue.Empty:
-                logger.debug("[GASR] _request_generator queue empty, continuing uuid=%s", self.uuid)
-                # unmute前はキープアライブとして微小ノイズを送信（Google STT 10秒タイムアウト対策）
-                import random
-                noise = bytes([random.randint(124, 132) for _ in range(640)])  # 8kHz 40ms low-noise (VAD active)
-                yield speech.StreamingRecognizeRequest(audio_content=noise)
-                if first_empty:
-                    logger.info("[GASR] _request_generator sending keepalive to establish STT connection uuid=%s", self.uuid)
-                    first_empty = False
-                continue
+        finally:
+            self._meter.bill_stream(sent_bytes)
     
-    def _consume_responses(self):
-        logger.info("[GASR] _consume_responses started uuid=%s", self.uuid)
+    def _consume_responses(self, seq=1, replay=()):
+        logger.info("[GASR] _consume_responses started uuid=%s seq=%d", self.uuid, seq)
         logger.info("[GASR] _consume_responses started, connecting STT immediately uuid=%s", self.uuid)
+        channel = self._pool.acquire()
+        failed = False
         try:
-            responses = self.client.streaming_recognize(
-                self.streaming_config, requests=self._request_generator())
+            responses = channel.client.streaming_recognize(
+                self.streaming_config,
+                requests=self._request_generator(seq, replay, time.monotonic(), channel.index))
             logger.info("[GASR] got responses iterator uuid=%s", self.uuid)
             for response in responses:
-                self._handle_response(response)
+                self._handle_response(response, seq)
         except Exception as exc:
-            logger.exception("[GASR] error uuid=%s detail=%s", self.uuid, exc)
+            failed = True
+            logger.exception("[GASR] error uuid=%s seq=%d detail=%s", self.uuid, seq, exc)
+            if is_audio_timeout(exc):
+                interval = self._keepalive.on_audio_timeout()
+                logger.warning("[GASR] audio timeout: keepalive interval -> %.2fs uuid=%s",
+                               interval, self.uuid)
         finally:
-            logger.info("[GASR] _consume_responses finished uuid=%s", self.uuid)
-            self._closed.set()
+            self._pool.release(channel)
+            logger.info("[GASR] _consume_responses finished uuid=%s seq=%d", self.uuid, seq)
+        if seq != self._stream_seq:
+            # 張り替え済み（後続のストリームが通話を引き継いでいる）
+            return
+        if (failed and not self._stop_requested.is_set()
+                and self.stream_stats["reconnects"] < GASR_STREAM_MAX_RECONNECTS):
+            self.stream_stats["reconnects"] += 1
+            logger.warning("[GASR] stream_reconnect uuid=%s seq=%d count=%d",
+                           self.uuid, seq, self.stream_stats["reconnects"])
+            self._start_stream(self._overlap.snapshot())
+            return
+        self._closed.set()
+    
+    def _handle_response(self, response, seq=None):
+        # 張り替え中は新旧2本のストリームの結果が別スレッドから届く
+        with self._response_lock:
+            self._handle_response_locked(response, seq)
     
-    def _handle_response(self, response):
+    def _handle_response_locked(self, response, seq):
         recv_time = time.time()
         for result in response.results:
             if not result.alternatives:
                 continue
             alt = result.alternatives[0]
             text = alt.transcript or ""
+            if seq is not None:
+                # 再送区間の重複を除く・古いストリームの interim は捨てる
+                text = self._stitcher.stitch(seq, text, result.is_final)
+                if text is None:
+                    continue
             tag = "final" if result.is_final else "interim"
     
             if not hasattr(self, '_utterance_start_time') or \
@@ -301,12 +382,10 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
     #  ESL connection
     # ------------------------------------------------------------------ #
     def _connect_esl(self):
-        """ESL接続を作成"""
+        """プロセス共有のESLクライアントを取得"""
         try:
-            self._esl = ESLconnection(ESL_HOST, ESL_PORT, ESL_PASSWORD)
+            self._esl = get_shared_esl()
             if self._esl.connected():
-                self._esl.send("noevents")
-                self._esl.recvEvent()  # consume reply
                 logger.info("[ESL] connected uuid=%s", self.uuid)
                 # caller_number再取得（初回ESL失敗時のフォールバック）
                 if hasattr(self, 'call_logger') and self.call_logger and self.call_logger.caller_number == "番号不明":
@@ -319,8 +398,8 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
                     except Exception as e:
                         logger.warning("[ESL] caller_number recovery failed uuid=%s err=%s", self.uuid, e)
             else:
+                # 共有プールが死活監視で再接続するため参照は保持する
                 logger.error("[ESL] connection failed uuid=%s", self.uuid)
-                self._esl = None
         except Exception as e:
             logger.error("[ESL] error uuid=%s err=%s", self.uuid, e)
             self._esl = None
@@ -330,11 +409,12 @@ class GoogleStreamingSession(GASRDialogHandlerMixin):
         self._unmute_time = time.time()
         self._flush_until = self._unmute_time + 0.5
         logger.info("[GASR] unmuted uuid=%s flush_until=%.3f", self.uuid, self._flush_until)
-        if not self._stream_started:
-            self._stream_started = True
-            self._thread = threading.Thread(target=self._consume_responses, daemon=True)
-            self._thread.start()
-            logger.info("[GASR] STT thread started on unmute uuid=%s", self.uuid)
+        with self._stream_lock:
+            if self._paused and not self._stop_requested.is_set():
+                # 再開: プールの接続済みチャネルで即座にストリームを開く
+                self._paused = False
+                self._start_stream()
+                logger.info("[GASR] STT stream started on unmute uuid=%s", self.uuid)
         self._unmute_event.set()
         logger.info("[GASR] unmute_event set uuid=%s", self.uuid)
     
@@ -0,0 +1,89 @@
+"""
+Google STT ストリームの張り替え（サービス側のストリーム時間上限の手前で新しいストリームへ移る）
+
+- OverlapBuffer: 直近の送信音声を保持し、新しいストリームの先頭で再送する
+- ResultStitcher: 再送した区間の認識結果が前のストリームの確定結果と重複しないよう、
+  新しいストリームの最初の確定結果までは重なり部分を取り除く。
+  張り替え後の古いストリームの interim は捨て、final だけ使う。
+"""
+import collections
+import os
+import threading
+
+# この秒数を過ぎたら、発話の切れ目（未確定の interim が無いとき）で張り替える
+GASR_STREAM_ROTATE_SEC = float(os.environ.get("GASR_STREAM_ROTATE_SEC", "270"))
+# 発話が続いていてもこの秒数で張り替える（サービス上限 約305秒の手前）
+GASR_STREAM_ROTATE_HARD_SEC = float(os.environ.get("GASR_STREAM_ROTATE_HARD_SEC", "290"))
+# 新しいストリームの先頭で再送する音声の長さ（秒）
+GASR_STREAM_OVERLAP_SEC = float(os.environ.get("GASR_STREAM_OVERLAP_SEC", "1.0"))
+# エラーで切れたストリームを張り直す上限回数（通話あたり）
+GASR_STREAM_MAX_RECONNECTS = int(os.environ.get("GASR_STREAM_MAX_RECONNECTS", "5"))
+
+
+def strip_overlap(committed, hypothesis, min_overlap=2):
+    """hypothesis の先頭が committed の末尾と重なっていれば重なり部分を除く"""
+    for k in range(min(len(committed), len(hypothesis)), min_overlap - 1, -1):
+        if committed.endswith(hypothesis[:k]):
+            return hypothesis[k:]
+    return hypothesis
+
+
+class OverlapBuffer:
+    """直近 max_bytes 分の音声チャンク"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max(0, int(max_bytes))
+        self._chunks = collections.deque()
+        self._size = 0
+
+    def add(self, chunk):
+        if not self.max_bytes:
+            return
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        while self._chunks and self._size - len(self._chunks[0]) >= self.max_bytes:
+            self._size -= len(self._chunks.popleft())
+
+    def snapshot(self):
+        return list(self._chunks)
+
+    def clear(self):
+        self._chunks.clear()
+        self._size = 0
+
+
+class ResultStitcher:
+    """複数ストリームの認識結果を1本の結果列にまとめる（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = 0
+        self._last_final = ""
+        self._overlapping = False
+
+    def begin_stream(self, seq, replayed):
+        """seq 番目のストリームを開いた。replayed=True なら先頭で音声を再送している"""
+        with self._lock:
+            self._current = seq
+            self._overlapping = replayed
+
+    def stitch(self, seq, text, is_final):
+        """
+        ストリーム seq の結果を返す。捨てる場合は None
+
+        古いストリームの final は前のストリームの確定結果として記録する。
+        """
+        with self._lock:
+            if seq != self._current:
+                if not is_final:
+                    return None
+                self._last_final = text
+                return text
+            if self._overlapping:
+                stripped = strip_overlap(self._last_final, text)
+                if is_final:
+                    self._overlapping = False
+                text = stripped
+            if is_final:
+                self._last_final = text
+            return text
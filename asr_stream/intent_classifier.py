@@ -12,12 +12,24 @@ DEFAULT_RESPONSE = "114"  # 聞き返し
 LLM_TIMEOUT = 10
 
 
+def _build_router(client_config):
+    return RuleRouter(config=client_config.dialogue_config)
+
+
 class IntentClassifier:
-    def __init__(self, config_path: str, use_llm: bool = True):
-        self.router = RuleRouter(config_path)
+    def __init__(self, config_path: str = None, use_llm: bool = True, client_config=None):
+        """
+        client_config（ClientConfigRegistry のスナップショット）を渡すと、
+        コンパイル済み RuleRouter と選択肢テキストをクライアント単位で共有する
+        """
         self.use_llm = use_llm
         self.config_path = config_path
-        self._choices_text = self._build_choices()
+        if client_config is not None:
+            self.router = client_config.derived("rule_router", _build_router)
+            self._choices_text = client_config.llm_choices(5, ", ")
+        else:
+            self.router = RuleRouter(config_path)
+            self._choices_text = self._build_choices()
         logger.info("[INTENT] initialized use_llm=%s", use_llm)
 
     def _build_choices(self) -> str:
@@ -1,10 +1,22 @@
 """IntentClassifierをStreamingLLMHandler互換インターフェースでラップ"""
 import logging
+import shutil
+import sys
+from functools import lru_cache
+
 from intent_classifier import IntentClassifier
 
+sys.path.insert(0, '/opt/libertycall')
+from gateway.common.client_config_registry import get_client_config
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _has_gpu() -> bool:
+    return shutil.which("nvidia-smi") is not None
+
+
 class IntentWrapper:
     """
     StreamingLLMHandlerと同じ add_fragment / finalize インターフェースを持つ。
@@ -12,11 +24,10 @@ class IntentWrapper:
     """
 
     def __init__(self, client_id: str):
-        config_path = f"/opt/libertycall/clients/{client_id}/config/dialogue_config.json"
         # GPU無しの場合はLLMスキップ（タイムアウトで遅いため）
-        import shutil
-        has_gpu = shutil.which("nvidia-smi") is not None
-        self.classifier = IntentClassifier(config_path, use_llm=has_gpu)
+        has_gpu = _has_gpu()
+        # RuleRouter はクライアント設定ごとに1回だけコンパイルしたものを共有
+        self.classifier = IntentClassifier(use_llm=has_gpu, client_config=get_client_config(client_id))
         self._fragments = []
         self._last_rid = None
         logger.info("[INTENT_WRAP] initialized client=%s use_llm=%s", client_id, has_gpu)
@@ -2,6 +2,7 @@
 import json
 import logging
 import unicodedata
+from functools import lru_cache
 
 try:
     import jaconv
@@ -43,24 +44,128 @@ YOMI_DICT = {
 }
 
 
+@lru_cache(maxsize=4096)
+def _normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    if jaconv:
+        text = jaconv.kata2hira(jaconv.z2h(text, kana=False, digit=True, ascii=True))
+    text = text.lower().strip()
+    text = text.replace("ー", "").replace("～", "").replace("〜", "").replace("−", "")
+    return text
+
+
+class KeywordMatcher:
+    """
+    全ルールのキーワードを1つの Aho–Corasick オートマトンにまとめたマッチャー
+
+    match() は旧実装（ルール × キーワードの部分文字列ループ + 全候補ソート）と同じ結果を返す:
+      1. 入力 == キーワード           → score 1.0
+      2. 入力 ⊂ キーワード（2文字以上）→ score 0.5（kw_len = 入力長なので 3 より優先）
+      3. キーワード ⊂ 入力             → 最長キーワード、score = max(len(kw)/len(入力), 0.55)
+    同順位は設定ファイル上の順序（ルール順 → キーワード順）で先勝ち。
+    1 は辞書、2 はキーワードの部分文字列の逆引き辞書、3 は入力を1回走査するだけで判定する。
+    """
+
+    def __init__(self, rules):
+        self._exact = {}      # kw -> response
+        self._partial = {}    # kw の部分文字列(2文字以上) -> response
+        # Aho–Corasick: 状態ごとの遷移・失敗リンク・その状態で終わる最良キーワード
+        self._goto = [{}]
+        self._best = [None]   # (kw_len, -order, response)
+        order = 0
+        first_order = {}
+        for rule in rules:
+            response = rule["response"]
+            for kw in rule["kw_list"]:
+                if not kw:
+                    continue
+                order += 1
+                if kw in first_order:
+                    continue
+                first_order[kw] = order
+                self._exact[kw] = response
+                n = len(kw)
+                for i in range(n):
+                    for j in range(i + 2, n + 1):
+                        self._partial.setdefault(kw[i:j], response)
+                self._insert(kw, (n, -order, response))
+        self._build_failure_links()
+
+    def _insert(self, kw, entry):
+        state = 0
+        for ch in kw:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._best.append(None)
+            state = nxt
+        self._best[state] = entry
+
+    def _build_failure_links(self):
+        fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            # 失敗リンク先で終わるキーワードも、この状態で一致している
+            inherited = self._best[fail[state]]
+            if inherited is not None and (self._best[state] is None or inherited > self._best[state]):
+                self._best[state] = inherited
+            for ch, nxt in self._goto[state].items():
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(ch, 0)
+                queue.append(nxt)
+        self._fail = fail
+
+    def match(self, norm: str):
+        """(response, kw_len, score) を返す。マッチなしは None"""
+        response = self._exact.get(norm)
+        if response is not None:
+            return response, len(norm), 1.0
+        if len(norm) >= 2:
+            response = self._partial.get(norm)
+            if response is not None:
+                return response, len(norm), 0.5
+        goto, fail, best_at = self._goto, self._fail, self._best
+        state = 0
+        best = None
+        for ch in norm:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            entry = best_at[state]
+            if entry is not None and (best is None or entry > best):
+                best = entry
+        if best is None:
+            return None
+        kw_len = best[0]
+        return best[2], kw_len, max(kw_len / max(len(norm), 1), 0.55)
+
+
 class RuleRouter:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str = None, config: dict = None):
         self.rules = []
-        self._load_config(config_path)
+        if config is None:
+            config = self._load_config(config_path)
+        self._load_patterns(config)
+        # キーワードは設定読み込み時に1回だけコンパイル
+        self._matcher = KeywordMatcher(self.rules)
         logger.info("[RULE_ROUTER] loaded %d rules (%d keywords)", len(self.rules),
                      sum(len(r["kw_list"]) for r in self.rules))
 
     def _normalize(self, text: str) -> str:
-        text = unicodedata.normalize("NFKC", text)
-        if jaconv:
-            text = jaconv.kata2hira(jaconv.z2h(text, kana=False, digit=True, ascii=True))
-        text = text.lower().strip()
-        text = text.replace("ー", "").replace("～", "").replace("〜", "").replace("−", "")
-        return text
-
-    def _load_config(self, path: str):
+        return _normalize_text(text)
+
+    def _load_config(self, path: str) -> dict:
         with open(path, encoding="utf-8") as f:
-            config = json.load(f)
+            return json.load(f)
+
+    def _load_patterns(self, config: dict):
         for p in config.get("patterns", []):
             response = p.get("response", "")
             if isinstance(response, list):
@@ -82,28 +187,13 @@ class RuleRouter:
 
         norm = self._normalize(text)
 
-        # 全マッチを収集し、最長キーワードマッチを優先
-        candidates = []
-        for rule in self.rules:
-            for kw in rule["kw_list"]:
-                if not kw:
-                    continue
-                if norm == kw:
-                    candidates.append((rule["response"], len(kw), 1.0))
-                elif kw in norm:
-                    score = max(len(kw) / max(len(norm), 1), 0.55)
-                    candidates.append((rule["response"], len(kw), score))
-                elif norm in kw and len(norm) >= 2:
-                    candidates.append((rule["response"], len(norm), 0.5))
-
-        if not candidates:
+        # 最長キーワードマッチを優先、同じ長さならスコア優先（1回の走査で判定）
+        best = self._matcher.match(norm)
+
+        if best is None:
             logger.info("[RULE_ROUTER] no match: '%s' -> LLM fallback", text)
             return None, 0.0
 
-        # 最長キーワードマッチを優先、同じ長さならスコア優先
-        candidates.sort(key=lambda x: (x[1], x[2]), reverse=True)
-        best = candidates[0]
-
         if best[2] >= 0.5:
             logger.info("[RULE_ROUTER] matched: '%s' -> %s (kw_len=%d, score=%.2f)", text, best[0], best[1], best[2])
             return best[0], best[2]
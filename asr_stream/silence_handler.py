@@ -1,17 +1,20 @@
 import json
 import logging
 import os
+import queue
 import struct
 import sys
-import threading
 import time
 
+sys.path.insert(0, '/opt/libertycall')
+from gateway.common.control_channel import ASR_RESPONSE_VAR, notify_asr_response
+from gateway.common.timer_wheel import get_timer_wheel
+
 # ESL接続設定（環境変数から取得）
 ESL_HOST = os.environ.get("AF_ESL_HOST", "127.0.0.1")
 ESL_PORT = os.environ.get("AF_ESL_PORT", "8021")
 ESL_PASSWORD = os.environ.get("AF_ESL_PASSWORD", "ClueCon")
 
-
 logger = logging.getLogger(__name__)
 
 
@@ -24,16 +27,18 @@ class SilenceHandler:
         self.is_running = True
         self.esl = None
         self._connect_esl()
-        self._timer_thread = None
+        self._timer_handle = None
         self._dialogue_config = None
         self._load_dialogue_config()
 
     def _load_dialogue_config(self):
-        config_path = f"/opt/libertycall/clients/{self.client_id}/config/dialogue_config.json"
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self._dialogue_config = json.load(f)
-            logger.info("[SILENCE] dialogue_config loaded uuid=%s", self.uuid)
+            sys.path.insert(0, '/opt/libertycall')
+            from gateway.common.client_config_registry import get_client_config
+            config = get_client_config(self.client_id)
+            if not config.loaded:
+                raise FileNotFoundError("dialogue_config.json not loaded")
+            self._dialogue_config = config.dialogue_config
         except Exception as e:
             logger.error("[SILENCE] config load error: %s", e)
             self._dialogue_config = {
@@ -46,20 +51,28 @@ class SilenceHandler:
             }
 
     def _connect_esl(self):
+        """プロセス共有のESLクライアントを使う（通話ごとに接続は張らない）"""
         try:
             sys.path.insert(0, '/opt/libertycall')
-            from libs.esl.ESL import ESLconnection
-            self.esl = ESLconnection(ESL_HOST, ESL_PORT, ESL_PASSWORD)
-            if self.esl.connected():
-                self.esl.send("noevents")
-                self.esl.recvEvent()  # consume reply
-            else:
+            from libs.esl.async_esl import get_shared_esl
+            self.esl = get_shared_esl()
+            if not self.esl.connected():
                 logger.error("[SILENCE] ESL connection failed uuid=%s", self.uuid)
-                self.esl = None
         except Exception as e:
             logger.error("[SILENCE] ESL error uuid=%s err=%s", self.uuid, e)
             self.esl = None
 
+    def _audio_duration(self, filename):
+        """クライアント音声の再生時間（AudioAssetStore のメタデータ）。読めなければ None"""
+        try:
+            sys.path.insert(0, '/opt/libertycall')
+            from gateway.common.audio_asset_store import get_audio_asset_store
+            return get_audio_asset_store().duration(
+                f"/opt/libertycall/clients/{self.client_id}/audio/{filename}")
+        except Exception as e:
+            logger.warning("[SILENCE] duration lookup failed file=%s err=%s", filename, e)
+            return None
+
     def _play_audio(self, filename):
         logger.info("[SILENCE] _play_audio called uuid=%s file=%s", self.uuid, filename)
         if not self.esl or not self.esl.connected():
@@ -81,13 +94,9 @@ class SilenceHandler:
             logger.info("[SILENCE] play uuid=%s file=%s result=%s",
                          self.uuid, filename, result.getBody() if result else "None")
             if result and result.getBody().startswith('+OK'):
-                try:
-                    flag_path = f"/tmp/asr_response_{self.uuid}.flag"
-                    with open(flag_path, 'w') as f:
-                        f.write(str(time.time()))
-                    logger.info("[ASR_FLAG] Created: %s", flag_path)
-                except Exception as e:
-                    logger.warning("[ASR_FLAG] Failed to create: %s", e)
+                # Lua 側の催促ループへ通知（フラグファイルではなくチャネル変数）
+                if notify_asr_response(self.uuid, self.esl):
+                    logger.info("[ASR_FLAG] Set %s uuid=%s", ASR_RESPONSE_VAR, self.uuid)
             return True
         except Exception as e:
             logger.error("[SILENCE] play error uuid=%s err=%s", self.uuid, e)
@@ -103,66 +112,77 @@ class SilenceHandler:
         except Exception as e:
             logger.error("[SILENCE] hangup error uuid=%s err=%s", self.uuid, e)
 
-    def _timer_loop(self):
-        timeout_seq = self._dialogue_config.get('timeout_sequence', [
+    def _timeout_sequence(self):
+        return self._dialogue_config.get('timeout_sequence', [
             {"audio": "003", "delay": 10},
             {"audio": "003", "delay": 10},
             {"audio": "003", "delay": 10}
         ])
-        while self.is_running:
-            time.sleep(1)
-            if getattr(self, '_timer_paused', False):
-                continue
-            if self.last_speech_time is None:
-                continue
-            elapsed = time.time() - self.last_speech_time
-            if self.prompt_count < len(timeout_seq):
-                item = timeout_seq[self.prompt_count]
-                if elapsed >= item.get('delay', 10):
-                    logger.info("[SILENCE] prompt%d uuid=%s elapsed=%.1f",
-                                 self.prompt_count + 1, self.uuid, elapsed)
-                    self._play_audio(f"{item['audio']}.wav")
-                    self.prompt_count += 1
-                    self.last_speech_time = time.time()
-            elif self.prompt_count >= len(timeout_seq):
-                if self.prompt_count == len(timeout_seq):
-                    try:
-                        audio_path = f"/opt/libertycall/clients/{self.client_id}/audio/prompt_003_8k.wav"
-                        if os.path.exists(audio_path):
-                            file_size = os.path.getsize(audio_path)
-                            audio_duration = max((file_size - 44) / 16000, 0.5)
-                            timeout_delay = 10 + audio_duration
-                        else:
-                            timeout_delay = 35
-                    except Exception:
-                        timeout_delay = 35
-                    if elapsed >= timeout_delay:
-                        logger.info("[SILENCE] timeout uuid=%s elapsed=%.1f", self.uuid, elapsed)
-                        self._hangup()
-                        self.is_running = False
-                        self.prompt_count += 1
-                        break
-                else:
-                    if elapsed >= 10:
-                        logger.info("[SILENCE] timeout uuid=%s elapsed=%.1f", self.uuid, elapsed)
-                        self._hangup()
-                        self.is_running = False
-                        break
+
+    def _next_delay(self, timeout_seq):
+        """現在の段階で、最後の発話から何秒後に次の処理（催促 or 切断）をするか"""
+        if self.prompt_count < len(timeout_seq):
+            return timeout_seq[self.prompt_count].get('delay', 10)
+        if self.prompt_count == len(timeout_seq):
+            audio_duration = self._audio_duration("prompt_003_8k.wav")
+            return 10 + audio_duration if audio_duration is not None else 35
+        return 10
+
+    def _arm_timer(self):
+        """次の期限を共有タイマーホイールに登録する（通話ごとのスレッドは作らない）"""
+        if not self.is_running or getattr(self, '_timer_paused', False) or self.last_speech_time is None:
+            if self._timer_handle is not None:
+                self._timer_handle.cancel()
+            return
+        delay = self.last_speech_time + self._next_delay(self._timeout_sequence()) - time.time()
+        self._timer_handle = get_timer_wheel().reset(self._timer_handle, max(0.0, delay),
+                                                     self._on_timer)
+
+    def _on_timer(self):
+        if not self.is_running or getattr(self, '_timer_paused', False):
+            return
+        if self.last_speech_time is None:
+            return
+        timeout_seq = self._timeout_sequence()
+        elapsed = time.time() - self.last_speech_time
+        if elapsed < self._next_delay(timeout_seq):
+            # 発話や一時停止で期限が後ろへずれた
+            self._arm_timer()
+            return
+        if self.prompt_count < len(timeout_seq):
+            item = timeout_seq[self.prompt_count]
+            logger.info("[SILENCE] prompt%d uuid=%s elapsed=%.1f",
+                         self.prompt_count + 1, self.uuid, elapsed)
+            self._play_audio(f"{item['audio']}.wav")
+            self.prompt_count += 1
+            self.last_speech_time = time.time()
+            self._arm_timer()
+            return
+        logger.info("[SILENCE] timeout uuid=%s elapsed=%.1f", self.uuid, elapsed)
+        self._hangup()
+        self.is_running = False
+        self.prompt_count += 1
 
     def reset_timer(self):
         self.last_speech_time = time.time()
         self.prompt_count = 0
         self._timer_paused = False
+        if self._timer_handle is not None:
+            self._arm_timer()
         logger.info("[SILENCE] timer_reset uuid=%s", self.uuid)
 
     def stop_timer(self):
         self.is_running = False
         self._timer_paused = True
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
         logger.info("[SILENCE] timer_stopped permanently uuid=%s", self.uuid)
 
     def pause_timer(self):
         self._timer_paused = True
         self._paused_time = time.time()
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
         logger.info("[SILENCE] timer_paused uuid=%s", self.uuid)
 
     def resume_timer(self):
@@ -173,6 +193,8 @@ class SilenceHandler:
             logger.info("[SILENCE] timer_resumed uuid=%s pause_duration=%.1fs",
                          self.uuid, pause_duration)
         self._paused_time = None
+        if self._timer_handle is not None:
+            self._arm_timer()
 
 
     def _play_greeting_sequence(self):
@@ -180,15 +202,21 @@ class SilenceHandler:
         greeting_seq = self._dialogue_config.get('greeting_sequence',
                                                   [{"audio": "000", "delay": 2}])
         logger.info("[GREETING] line ready uuid=%s", self.uuid)
-        if self.esl and self.esl.connected():
-            self.esl.events("plain", "CHANNEL_EXECUTE_COMPLETE")
+        # 共有イベント接続から、この通話の CHANNEL_EXECUTE_COMPLETE だけを受け取る
+        events = self.esl.subscribe(self.uuid) if self.esl else None
+        try:
+            self._play_greeting_items(greeting_seq, events)
+        finally:
+            if events is not None:
+                self.esl.unsubscribe(self.uuid, events)
+        logger.info("[GREETING] all playback complete uuid=%s", self.uuid)
+
+    def _play_greeting_items(self, greeting_seq, events):
         for item in greeting_seq:
             audio_file = f"{item['audio']}.wav"
             audio_path = f"/opt/libertycall/clients/{self.client_id}/audio/{audio_file}"
-            try:
-                file_size = os.path.getsize(audio_path)
-                fallback_duration = max((file_size - 44) / 16000, 0.5)
-            except Exception:
+            fallback_duration = self._audio_duration(audio_file)
+            if fallback_duration is None:
                 fallback_duration = 2.0
             self._play_audio(audio_file)
             logger.info("[GREETING] playing %s uuid=%s", audio_file, self.uuid)
@@ -196,9 +224,12 @@ class SilenceHandler:
             wait_start = time.time()
             timeout = fallback_duration + 5.0
             while time.time() - wait_start < timeout:
-                if not self.esl or not self.esl.connected():
+                if events is None:
                     break
-                event = self.esl.recvEventTimed(500)
+                try:
+                    event = events.get(timeout=0.5)
+                except queue.Empty:
+                    event = None
                 if event:
                     event_name = event.getHeader("Event-Name") or ""
                     event_uuid = event.getHeader("Unique-ID") or ""
@@ -216,8 +247,6 @@ class SilenceHandler:
                     logger.warning("[GREETING] event timeout, sleeping %.1fs uuid=%s",
                                    remaining, self.uuid)
                     time.sleep(remaining)
-        logger.info("[GREETING] all playback complete uuid=%s", self.uuid)
-        self._connect_esl()
 
     def play_greeting_only(self):
         """アナウンス再生のみ（unmute/timerは後から呼ぶ）"""
@@ -233,20 +262,16 @@ class SilenceHandler:
     def start_timer(self):
         self.last_speech_time = time.time()
         self.prompt_count = 0
-        self._timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
-        self._timer_thread.start()
+        self._arm_timer()
         logger.info("[SILENCE] timer_started uuid=%s", self.uuid)
 
     def stop(self):
         logger.info("[SILENCE] stop called uuid=%s", self.uuid)
         self.is_running = False
-        if self.esl:
-            try:
-                self.esl.disconnect()
-                logger.info("[SILENCE] ESL disconnected uuid=%s", self.uuid)
-            except Exception:
-                pass
-            self.esl = None
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
+        # 共有ESLクライアントは切断しない
+        self.esl = None
 
     def detect_silence(self, chunk):
         """音声チャンクの振幅を見て無音を検知"""
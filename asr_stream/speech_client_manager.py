@@ -2,9 +2,14 @@
 """
 SpeechClientManager - Google Speech Clientのシングルトン管理
 ウォームアップ機能付き
+
+SpeechClientPool - 通話セッションが共有する SpeechClient（gRPC チャネル）のプール
+起動時に全チャネルをウォームアップし、セッションは同時ストリーム数が最も少ない
+チャネルを借りる。ストリームを開いてから最初の応答までの時間を集計する。
 """
 
 import logging
+import os
 import threading
 import time
 from google.cloud import speech_v1 as speech
@@ -12,6 +17,41 @@ from google.api_core.client_options import ClientOptions
 
 logger = logging.getLogger(__name__)
 
+# プールするチャネル数
+GASR_CLIENT_POOL_SIZE = int(os.environ.get("GASR_CLIENT_POOL_SIZE", "2"))
+# これ以上使われていないチャネルは定期ウォームアップで再接続する（秒）
+GASR_POOL_REWARM_SEC = float(os.environ.get("GASR_POOL_REWARM_SEC", "240"))
+SPEECH_API_ENDPOINT = "speech.googleapis.com:443"
+
+
+def _create_client():
+    return speech.SpeechClient(
+        client_options=ClientOptions(api_endpoint=SPEECH_API_ENDPOINT)
+    )
+
+
+def _warmup_client(client):
+    """streaming_recognize で実際にAPIを叩いて接続を確立する"""
+    test_audio = b'\x00' * 3200  # 0.2秒の無音
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=8000,
+        language_code="ja-JP",
+    )
+    streaming_config = speech.StreamingRecognitionConfig(
+        config=config,
+        interim_results=True,
+    )
+    requests = [
+        speech.StreamingRecognizeRequest(streaming_config=streaming_config),
+        speech.StreamingRecognizeRequest(audio_content=test_audio),
+    ]
+    try:
+        for _ in client.streaming_recognize(requests=requests):
+            break
+    except Exception as e:
+        logger.debug("ウォームアップ: %s（接続は確立済み）", type(e).__name__)
+
 class SpeechClientManager:
     """Google Speech Clientのシングルトン管理クラス"""
     _instance = None
@@ -90,7 +130,101 @@ class SpeechClientManager:
         elapsed = time.time() - start
         logger.info(f"=== gRPC接続ウォームアップ完了: {elapsed:.3f}秒 ===")
 
+class _PooledClient:
+    __slots__ = ("index", "client", "active", "opened", "last_used")
+
+    def __init__(self, index, client):
+        self.index = index
+        self.client = client
+        self.active = 0
+        self.opened = 0
+        self.last_used = 0.0
+
+
+class SpeechClientPool:
+    """SpeechClient（gRPC チャネル）のプール（スレッドセーフ）"""
+
+    def __init__(self, size=GASR_CLIENT_POOL_SIZE, client_factory=_create_client):
+        self.size = max(1, size)
+        self._factory = client_factory
+        self._clients = []
+        self._lock = threading.Lock()
+        self._open_latency_total = 0.0
+        self._open_latency_count = 0
+        self._open_latency_max = 0.0
+
+    def _ensure(self):
+        if len(self._clients) < self.size:
+            with self._lock:
+                while len(self._clients) < self.size:
+                    start = time.time()
+                    entry = _PooledClient(len(self._clients), self._factory())
+                    self._clients.append(entry)
+                    logger.info("[GASR_POOL] channel=%d created in %.3fs",
+                                entry.index, time.time() - start)
+        return self._clients
+
+    def acquire(self):
+        """同時ストリーム数が最も少ないチャネルを借りる。release() で返すこと"""
+        clients = self._ensure()
+        with self._lock:
+            entry = min(clients, key=lambda c: (c.active, c.last_used))
+            entry.active += 1
+            entry.opened += 1
+            entry.last_used = time.time()
+        return entry
+
+    def release(self, entry):
+        with self._lock:
+            entry.active = max(0, entry.active - 1)
+            entry.last_used = time.time()
+
+    def record_open_latency(self, seconds):
+        with self._lock:
+            self._open_latency_total += seconds
+            self._open_latency_count += 1
+            self._open_latency_max = max(self._open_latency_max, seconds)
+
+    def warmup(self, force=False):
+        """全チャネル（force=False なら一定時間使われていないもの）に接続を張る"""
+        now = time.time()
+        for entry in self._ensure():
+            if not force and (entry.active or now - entry.last_used < GASR_POOL_REWARM_SEC):
+                continue
+            start = time.time()
+            _warmup_client(entry.client)
+            entry.last_used = time.time()
+            logger.info("[GASR_POOL] channel=%d warmed in %.3fs", entry.index, time.time() - start)
+
+    def get_stats(self):
+        with self._lock:
+            count = self._open_latency_count
+            return {
+                "channels": [{"index": c.index, "active": c.active, "opened": c.opened}
+                             for c in self._clients],
+                "open_latency_mean_ms": round(self._open_latency_total / count * 1000, 1) if count else 0.0,
+                "open_latency_max_ms": round(self._open_latency_max * 1000, 1),
+                "streams_opened": count,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_speech_client_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SpeechClientPool()
+    return _pool
+
+
 # ウォームアップ実行関数
 async def warmup_speech_client():
-    """SpeechClientのウォームアップを実行"""
-    await SpeechClientManager.warmup()
+    """通話セッションが使うプールのチャネルをウォームアップする"""
+    import asyncio
+
+    pool = get_speech_client_pool()
+    await asyncio.get_running_loop().run_in_executor(None, pool.warmup)
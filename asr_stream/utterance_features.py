@@ -0,0 +1,103 @@
+"""UtteranceFeatures - 1発話分の音声特徴量（log-mel / Whisper エンコーダ出力 / MFCC）のキャッシュ"""
+import logging
+import threading
+import time
+from typing import Callable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _storage_view(array: np.ndarray):
+    import ctranslate2
+    return ctranslate2.StorageView.from_array(np.ascontiguousarray(array, dtype=np.float32))
+
+
+class UtteranceFeatures:
+    """
+    同じ音声に対する特徴量を1回だけ計算し、EmbeddingClassifier と Whisper デコードで共有する
+
+    - mel(): FeatureExtractor の log-mel（STFT は1回だけ）
+    - encoded(): Whisper 標準窓（nb_max_frames = 30秒）にパディングした log-mel の
+      エンコーダ出力。CTranslate2 の generate にそのまま渡す（デコード用）
+    - embedding(): パディングしない log-mel のエンコーダ出力のフレーム平均（分類器の入力）。
+      分類器（scaler_v3 / pca_v3 / classifier_mlp_v3）の学習時と同じ入力にするため、
+      encoded() とは別にエンコードする（共有するのは log-mel だけ）
+    - derived(): MFCC など任意の派生特徴量を1回だけ計算
+
+    スケジューラのスレッドと通話スレッドの両方から使われるためロックで保護する。
+    """
+
+    def __init__(self, audio_16k: np.ndarray, feature_extractor, ct_model=None):
+        self.audio = audio_16k
+        self.feature_extractor = feature_extractor
+        self.ct_model = ct_model
+        self.timings = {}  # 段階ごとの計算時間（秒）
+        self._mel = None
+        self._encoded = None
+        self._embedding = None
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    @property
+    def nb_max_frames(self) -> int:
+        return getattr(self.feature_extractor, "nb_max_frames", 3000)
+
+    def mel(self) -> np.ndarray:
+        with self._lock:
+            if self._mel is None:
+                start = time.perf_counter()
+                self._mel = self.feature_extractor(self.audio)
+                self.timings["mel"] = time.perf_counter() - start
+            return self._mel
+
+    def encoder_input(self) -> np.ndarray:
+        """log-mel を nb_max_frames にパディング（長い場合は切り詰め）"""
+        mel = self.mel()
+        n = mel.shape[-1]
+        if n >= self.nb_max_frames:
+            return mel[:, :self.nb_max_frames]
+        return np.pad(mel, ((0, 0), (0, self.nb_max_frames - n)))
+
+    def has_encoded(self) -> bool:
+        return self._encoded is not None
+
+    def encoded(self) -> np.ndarray:
+        """エンコーダ出力 (frames, d_model)"""
+        with self._lock:
+            if self._encoded is None:
+                encode_batch([self])
+            return self._encoded
+
+    def embedding(self) -> np.ndarray:
+        with self._lock:
+            if self._embedding is None:
+                start = time.perf_counter()
+                out = np.array(self.ct_model.encode(_storage_view(self.mel()[None]), to_cpu=True))
+                self._embedding = out[0].mean(axis=0)
+                self.timings["embed"] = time.perf_counter() - start
+            return self._embedding
+
+    def derived(self, name: str, fn: Callable[[np.ndarray], object]):
+        with self._lock:
+            if name not in self._derived:
+                start = time.perf_counter()
+                self._derived[name] = fn(self.audio)
+                self.timings[name] = time.perf_counter() - start
+            return self._derived[name]
+
+
+def encode_batch(items: List[UtteranceFeatures]) -> None:
+    """未計算のエンコーダ出力を1回の encode でまとめて計算する（同じ ct_model 前提）"""
+    pending = [f for f in items if f._encoded is None]
+    if not pending:
+        return
+    start = time.perf_counter()
+    batch = np.stack([f.encoder_input() for f in pending])
+    out = np.array(pending[0].ct_model.encode(_storage_view(batch), to_cpu=True))
+    elapsed = time.perf_counter() - start
+    for f, enc in zip(pending, out):
+        f._encoded = enc
+        f.timings["encode"] = elapsed
+    logger.debug("[UTT_FEATURES] encoded batch=%d in %.3fs", len(pending), elapsed)
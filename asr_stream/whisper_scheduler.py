@@ -0,0 +1,286 @@
+"""WhisperInferenceScheduler - 全通話の Whisper 推論を1スレッドに集約してマイクロバッチ化する"""
+import collections
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 最初の要求が来てから他の通話の要求を待つ時間（ミリ秒）
+WHISPER_BATCH_WINDOW_MS = float(os.environ.get("WHISPER_BATCH_WINDOW_MS", "5"))
+WHISPER_MAX_BATCH = int(os.environ.get("WHISPER_MAX_BATCH", "8"))
+# interim 要求はこれ以上待たされたら結果を捨てる（次の tick で新しい音声が来るため）
+WHISPER_INTERIM_DEADLINE_MS = float(os.environ.get("WHISPER_INTERIM_DEADLINE_MS", "1000"))
+# initial_prompt ごとのプロンプトトークンを保持する件数
+WHISPER_PROMPT_CACHE_SIZE = int(os.environ.get("WHISPER_PROMPT_CACHE_SIZE", "32"))
+
+PRIORITY_FINAL = 0
+PRIORITY_INTERIM = 1
+
+# Whisper の入力窓（30秒 / 3000フレーム）
+_SAMPLE_RATE = 16000
+_CHUNK_SECONDS = 30
+
+
+class InferenceRequest:
+    __slots__ = ("uuid", "audio", "features", "priority", "beam_size", "initial_prompt",
+                 "submitted_at", "deadline", "future")
+
+    def __init__(self, uuid, audio, priority, beam_size, initial_prompt, deadline, features=None):
+        self.uuid = uuid
+        self.audio = audio
+        self.features = features
+        self.priority = priority
+        self.beam_size = beam_size
+        self.initial_prompt = initial_prompt
+        self.submitted_at = time.monotonic()
+        self.deadline = deadline
+        self.future = Future()
+
+
+class CT2BatchRunner:
+    """
+    faster-whisper の WhisperModel を使い、複数通話の音声を1回の generate でまとめて推論する
+
+    各音声のエンコーダ出力（UtteranceFeatures）を用意し、未計算の分だけ1回の encode で
+    まとめて計算してから、バッチ次元で積んで CTranslate2 の generate（ビームサーチ）を1回だけ呼ぶ。
+    埋め込み分類で計算済みの log-mel はそのまま再利用される。
+    30秒を超える音声は WhisperModel.transcribe で推論する。
+    バッチ推論が失敗した場合は1件ずつ generate し直し、それでも失敗した要求だけをエラーにする。
+    """
+
+    def __init__(self, model, prompt_cache_size: int = WHISPER_PROMPT_CACHE_SIZE):
+        self.model = model
+        from faster_whisper.tokenizer import Tokenizer
+        from utterance_features import UtteranceFeatures, _storage_view, encode_batch
+        self._tokenizer = Tokenizer(
+            model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language="ja")
+        self._features_cls = UtteranceFeatures
+        self._encode_batch = encode_batch
+        self._storage_view = _storage_view
+        # initial_prompt ごとのプロンプトトークン（LRU）
+        self._prompt_cache = collections.OrderedDict()
+        self._prompt_cache_size = max(1, prompt_cache_size)
+
+    def _prompt(self, initial_prompt):
+        prompt = self._prompt_cache.get(initial_prompt)
+        if prompt is not None:
+            self._prompt_cache.move_to_end(initial_prompt)
+            return prompt
+        previous = self._tokenizer.encode(" " + initial_prompt.strip()) if initial_prompt else []
+        prompt = self.model.get_prompt(self._tokenizer, previous, without_timestamps=True)
+        self._prompt_cache[initial_prompt] = prompt
+        if len(self._prompt_cache) > self._prompt_cache_size:
+            self._prompt_cache.popitem(last=False)
+        return prompt
+
+    def _features(self, req):
+        if req.features is None:
+            req.features = self._features_cls(req.audio, self.model.feature_extractor, self.model.model)
+        return req.features
+
+    def _transcribe_one(self, req):
+        segments, _ = self.model.transcribe(
+            req.audio,
+            language="ja",
+            initial_prompt=req.initial_prompt,
+            beam_size=req.beam_size,
+            best_of=1,
+            vad_filter=False,
+            without_timestamps=True,
+            no_speech_threshold=None,
+        )
+        return "".join(seg.text.strip() for seg in segments).strip()
+
+    def _generate(self, items: List[InferenceRequest]) -> List[str]:
+        features = [self._features(r) for r in items]
+        self._encode_batch(features)
+        encoded = np.stack([f.encoded() for f in features])
+        outputs = self.model.model.generate(
+            self._storage_view(encoded),
+            [self._prompt(r.initial_prompt) for r in items],
+            beam_size=items[0].beam_size,
+            max_length=448,
+        )
+        return [self._tokenizer.decode(out.sequences_ids[0]).strip() for out in outputs]
+
+    def __call__(self, batch: List[InferenceRequest]) -> list:
+        """要求ごとのテキストを返す。失敗した要求の位置には例外オブジェクトが入る"""
+        long_items = [r for r in batch if len(r.audio) > _SAMPLE_RATE * _CHUNK_SECONDS]
+        short_items = [r for r in batch if len(r.audio) <= _SAMPLE_RATE * _CHUNK_SECONDS]
+        results = {}
+        if short_items:
+            try:
+                for req, text in zip(short_items, self._generate(short_items)):
+                    results[id(req)] = text
+            except Exception as e:
+                if len(short_items) == 1:
+                    logger.error("[WHISPER_SCHED] generate failed uuid=%s: %s", short_items[0].uuid, e)
+                    results[id(short_items[0])] = e
+                else:
+                    logger.warning("[WHISPER_SCHED] batched generate failed batch=%d, retrying one by one: %s",
+                                   len(short_items), e)
+                    # エンコーダ出力は計算済みの分を再利用するので、やり直すのはほぼデコードだけ
+                    for req in short_items:
+                        try:
+                            results[id(req)] = self._generate([req])[0]
+                        except Exception as item_error:
+                            logger.error("[WHISPER_SCHED] generate failed uuid=%s: %s", req.uuid, item_error)
+                            results[id(req)] = item_error
+        for req in long_items:
+            try:
+                results[id(req)] = self._transcribe_one(req)
+            except Exception as e:
+                logger.error("[WHISPER_SCHED] transcribe failed uuid=%s: %s", req.uuid, e)
+                results[id(req)] = e
+        return [results[id(r)] for r in batch]
+
+
+class WhisperInferenceScheduler:
+    """
+    全セッションの Whisper 推論要求を集めてバッチ実行するスケジューラ
+
+    - submit() は Future を返し、結果（テキスト）または None（期限切れで破棄）が入る
+    - 最初の要求から batch_window_ms だけ他の要求を待ち、最大 max_batch 件をまとめる
+    - final 要求を interim より優先し、同じ通話の古い interim は新しい要求で置き換える
+    - 期限を過ぎた interim は推論せずに破棄する
+    """
+
+    def __init__(self, runner: Callable[[List[InferenceRequest]], List[str]],
+                 batch_window_ms: float = WHISPER_BATCH_WINDOW_MS,
+                 max_batch: int = WHISPER_MAX_BATCH,
+                 interim_deadline_ms: float = WHISPER_INTERIM_DEADLINE_MS):
+        self.runner = runner
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.interim_deadline = interim_deadline_ms / 1000.0
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending_interim = {}  # uuid -> InferenceRequest
+        self._cond = threading.Condition()
+        self._latencies = collections.deque(maxlen=500)
+        self.stats = {"submitted": 0, "completed": 0, "batches": 0, "batched_items": 0,
+                      "dropped_stale": 0, "superseded": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name="whisper_scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio: np.ndarray, final: bool = True, uuid: Optional[str] = None,
+               beam_size: int = 3, initial_prompt: Optional[str] = None, features=None) -> Future:
+        """features に UtteranceFeatures を渡すと計算済みの log-mel / エンコーダ出力を再利用する"""
+        priority = PRIORITY_FINAL if final else PRIORITY_INTERIM
+        deadline = None if final else time.monotonic() + self.interim_deadline
+        req = InferenceRequest(uuid, audio, priority, beam_size, initial_prompt, deadline, features)
+        with self._cond:
+            self.stats["submitted"] += 1
+            if uuid is not None:
+                # 同じ通話の未処理 interim は古い音声なので不要
+                old = self._pending_interim.pop(uuid, None)
+                if old is not None and not old.future.done():
+                    old.future.set_result(None)
+                    self.stats["superseded"] += 1
+                if not final:
+                    self._pending_interim[uuid] = req
+            heapq.heappush(self._heap, (priority, next(self._seq), req))
+            self._cond.notify()
+        return req.future
+
+    def _take_batch(self) -> List[InferenceRequest]:
+        """ロック保持中に呼ぶ。優先度順に同じ beam_size の要求を最大 max_batch 件取り出す"""
+        now = time.monotonic()
+        batch, keep = [], []
+        while self._heap and len(batch) < self.max_batch:
+            item = heapq.heappop(self._heap)
+            req = item[2]
+            if req.future.done():
+                continue
+            if req.deadline is not None and now > req.deadline:
+                req.future.set_result(None)
+                self.stats["dropped_stale"] += 1
+                continue
+            if batch and req.beam_size != batch[0].beam_size:
+                keep.append(item)
+                continue
+            batch.append(req)
+        for item in keep:
+            heapq.heappush(self._heap, item)
+        for req in batch:
+            if req.uuid is not None and self._pending_interim.get(req.uuid) is req:
+                del self._pending_interim[req.uuid]
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+            # 他の通話の要求が揃うのを少しだけ待つ
+            if self.batch_window > 0:
+                time.sleep(self.batch_window)
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                continue
+            start = time.monotonic()
+            try:
+                texts = self.runner(batch)
+            except Exception as e:
+                logger.error("[WHISPER_SCHED] inference error batch=%d err=%s", len(batch), e)
+                self.stats["errors"] += 1
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(e)
+                continue
+            done = time.monotonic()
+            self.stats["batches"] += 1
+            self.stats["batched_items"] += len(batch)
+            for req, text in zip(batch, texts):
+                if isinstance(text, Exception):
+                    # runner はバッチ内で失敗した要求だけを例外で返す
+                    self.stats["errors"] += 1
+                    if not req.future.done():
+                        req.future.set_exception(text)
+                    continue
+                self._latencies.append((start - req.submitted_at, done - start))
+                self.stats["completed"] += 1
+                if not req.future.done():
+                    req.future.set_result(text)
+            logger.debug("[WHISPER_SCHED] batch=%d infer=%.3fs queue=%d",
+                         len(batch), done - start, len(self._heap))
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            stats = dict(self.stats)
+            stats["queue_depth"] = len(self._heap)
+        lat = list(self._latencies)
+        if lat:
+            waits = sorted(w for w, _ in lat)
+            infers = sorted(i for _, i in lat)
+            stats["queue_wait_p50_ms"] = round(waits[len(waits) // 2] * 1000, 1)
+            stats["queue_wait_p95_ms"] = round(waits[int(len(waits) * 0.95)] * 1000, 1)
+            stats["infer_p50_ms"] = round(infers[len(infers) // 2] * 1000, 1)
+        if stats["batches"]:
+            stats["avg_batch_size"] = round(stats["batched_items"] / stats["batches"], 2)
+        return stats
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_whisper_scheduler(model_factory: Callable) -> WhisperInferenceScheduler:
+    """プロセス共有のスケジューラ（初回呼び出し時に model_factory() のモデルで作成）"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = WhisperInferenceScheduler(CT2BatchRunner(model_factory()))
+                logger.info("[WHISPER_SCHED] started window=%.0fms max_batch=%d",
+                            WHISPER_BATCH_WINDOW_MS, WHISPER_MAX_BATCH)
+    return _scheduler
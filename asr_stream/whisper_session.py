@@ -1,5 +1,5 @@
 """WhisperStreamingSession - faster-whisper based ASR session."""
-from asr_stream.embedding_classifier import EmbeddingClassifier
+from asr_stream.embedding_classifier import get_embedding_classifier
 import io
 import json
 import logging
@@ -10,12 +10,15 @@ import sys
 import threading
 import time
 import wave
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 from faster_whisper import WhisperModel
 
 from call_logger import CallLogger
 from gasr_dialog_handler import GASRDialogHandlerMixin
+from whisper_scheduler import get_whisper_scheduler
+from utterance_features import UtteranceFeatures
 
 # ESL接続設定（環境変数から取得）
 ESL_HOST = os.environ.get("AF_ESL_HOST", "127.0.0.1")
@@ -24,7 +27,11 @@ ESL_PASSWORD = os.environ.get("AF_ESL_PASSWORD", "ClueCon")
 
 
 sys.path.insert(0, '/opt/libertycall')
-from libs.esl.ESL import ESLconnection
+from libs.esl.async_esl import get_shared_esl
+from gateway.common.streaming_resampler import StreamingResampler
+from gateway.common.client_config_registry import get_client_config
+from gateway.common.audio_asset_store import get_audio_asset_store
+from gateway.common.timer_wheel import get_timer_wheel
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +39,16 @@ GASR_SAMPLE_RATE = int(os.environ.get("GASR_SAMPLE_RATE", "16000"))
 GASR_LANGUAGE = os.environ.get("GASR_LANGUAGE", "ja-JP")
 GASR_OUTPUT_DIR = os.environ.get("GASR_OUTPUT_DIR", "/tmp")
 
+WHISPER_INITIAL_PROMPT = "もしもし、こんにちは。料金について教えてください。導入を検討しています。担当者をお願いします。セキュリティは大丈夫ですか。24時間対応ですか。ホームページを見ました。"
+# 埋め込み分類の確信度が低いとき、転送（081）の前に同じ log-mel で文字起こし→意図分類する
+WHISPER_LOW_CONF_FALLBACK = os.environ.get("WHISPER_LOW_CONF_FALLBACK", "0") == "1"
+# システム音声の誤認識（Whisper のハルシネーション）
+WHISPER_SYSTEM_NOISE = ["ご視聴", "チャンネル登録", "お客様に", "お客様の"]
+# 逐次分類・低確信度デコードを実行するスレッド数（タイマーの共有ワーカーを推論で塞がない）
+WHISPER_STREAM_WORKERS = int(os.environ.get("WHISPER_STREAM_WORKERS", "4"))
+# 逐次分類で見る直近の音声（秒）。発話が長くても tick あたりの処理量は一定
+WHISPER_STREAM_CLF_WINDOW = float(os.environ.get("WHISPER_STREAM_CLF_WINDOW", "6.0"))
+
 # Whisper model singleton (shared across sessions)
 _whisper_model = None
 _whisper_lock = threading.Lock()
@@ -53,6 +70,20 @@ def get_whisper_model():
     return _whisper_model
 
 
+# 逐次分類・低確信度デコード用の executor (shared across sessions)
+_stream_executor = None
+_stream_executor_lock = threading.Lock()
+
+def get_stream_executor():
+    global _stream_executor
+    if _stream_executor is None:
+        with _stream_executor_lock:
+            if _stream_executor is None:
+                _stream_executor = ThreadPoolExecutor(
+                    max_workers=max(1, WHISPER_STREAM_WORKERS), thread_name_prefix="whisper_stream")
+    return _stream_executor
+
+
 class WhisperStreamingSession(GASRDialogHandlerMixin):
     def __init__(self, uuid, client_id="whisper_test"):
         self.uuid = uuid or "unknown"
@@ -78,9 +109,12 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
 
         # Whisper model (shared singleton)
         self._model = get_whisper_model()
+        # 推論は全通話共通のスケジューラでマイクロバッチ実行
+        self._scheduler = get_whisper_scheduler(get_whisper_model)
 
         # Audio buffer for Whisper (collect chunks, transcribe on silence)
         self._audio_buffer = bytearray()
+        self._resampler = None  # created on first use when sample_rate != 16000
         self._last_voice_time = None
         self._vad_threshold = 500  # Raised to avoid echo/noise floor
         logger.info("[WHISPER] VAD threshold set to %d", self._vad_threshold)
@@ -90,11 +124,15 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
         self._periodic_timer = None
         self._periodic_interval = float(os.environ.get("WHISPER_PERIODIC_INTERVAL", "0.5"))  # streaming classify every 0.5s
         self._streaming_candidate = None
+        self._clf_voice_mark = None  # 逐次分類した時点の _last_voice_time
         self._last_activity_time = time.time()
-        self._idle_monitor_thread = threading.Thread(target=self._idle_monitor, daemon=True)
-        self._idle_monitor_thread.start()  # (label, conf) updated by interim classify
+        # 最初の発話以降の5分無音タイマー（共有タイマーホイール上。通話ごとのスレッドは作らない）
+        self._idle_timer = None
         self._last_transcribe_time = 0
 
+        # クライアント設定はプロセス共有のレジストリから取得（初回のみファイル読込）
+        self._client_config = get_client_config(self.client_id)
+
         # voice_map
         self._voice_map = self._load_voice_list()
 
@@ -106,9 +144,9 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
 
         # Embedding classifier
         try:
-            self._emb_clf = EmbeddingClassifier()
+            # プロセス共有（モデルの読み込みは初回のみ）
+            self._emb_clf = get_embedding_classifier(self._model.model)
             self._responding = False
-            self._emb_clf.set_ct_model(self._model.model)
             logger.info("[EMB_CLF] classifier ready for uuid=%s", self.uuid)
         except Exception as e:
             self._emb_clf = None
@@ -131,72 +169,50 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
     #  Config loaders (same as gasr_session.py)
     # ------------------------------------------------------------------ #
     def _load_dialogue_config(self):
-        config_path = f"/opt/libertycall/clients/{self.client_id}/config/dialogue_config.json"
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            logger.info("[WHISPER] dialogue_config loaded uuid=%s", self.uuid)
-            return config
-        except Exception as e:
-            logger.warning("[WHISPER] dialogue_config load failed uuid=%s err=%s", self.uuid, e)
-            return {}
+        if not self._client_config.loaded:
+            logger.warning("[WHISPER] dialogue_config load failed uuid=%s", self.uuid)
+        return self._client_config.dialogue_config
 
     def _load_phrase_hints(self):
-        config = self._dialogue_config
-        if not config:
-            return []
-        hints = set()
-        for pattern in config.get("patterns", []):
-            for kw in pattern.get("keywords", []):
-                hints.add(kw)
-        return list(hints)
+        return self._client_config.phrase_hints
 
     def _load_voice_list(self):
-        self._voice_map = {}
-        try:
-            with open(f'/opt/libertycall/clients/{self.client_id}/voice_list_{self.client_id}.tsv',
-                      'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    parts = line.split('\t')
-                    if len(parts) >= 2:
-                        self._voice_map[parts[0]] = parts[1]
-        except Exception as e:
-            logger.warning("[VOICE] Failed to load voice_list: %s", e)
-        return self._voice_map
+        return self._client_config.voice_map
 
     # ------------------------------------------------------------------ #
     #  Audio input
     # ------------------------------------------------------------------ #
     def _schedule_periodic_transcribe(self):
         """Schedule periodic transcription for real-time processing"""
-        if self._periodic_timer and self._periodic_timer.is_alive():
+        if self._periodic_timer and self._periodic_timer.active:
             return
         
         logger.info("[PERIODIC] starting timer uuid=%s interval=%.1fs", self.uuid, self._periodic_interval)
-        self._periodic_timer = threading.Timer(self._periodic_interval, self._periodic_transcribe)
-        self._periodic_timer.daemon = True
-        self._periodic_timer.start()
+        # 分類は数十〜数百ms かかるので、タイマーの共有ワーカーではなく専用 executor で実行する
+        self._periodic_timer = get_timer_wheel().reset(self._periodic_timer, self._periodic_interval,
+                                                       self._periodic_transcribe,
+                                                       executor=get_stream_executor())
     
     def _periodic_transcribe(self):
-        """Streaming classify: run embedding classifier on current buffer every 0.5s"""
+        """Streaming classify: run embedding classifier on current buffer every 0.5s (on the stream executor)"""
         if not self._audio_buffer or getattr(self, '_responding', False) or getattr(self, '_muted', False):
             if self._is_speaking:
                 self._schedule_periodic_transcribe()
             return
 
         try:
-            audio_data = bytes(self._audio_buffer)
-            buf_dur = len(audio_data) / (self.sample_rate * 2)
+            buf_dur = len(self._audio_buffer) / (self.sample_rate * 2)
             
-            if buf_dur < 0.3:
+            # 前回の tick 以降に有声音声が増えていなければ、前回の候補をそのまま使う
+            if buf_dur < 0.3 or self._last_voice_time == self._clf_voice_mark:
                 if self._is_speaking:
                     self._schedule_periodic_transcribe()
                 return
+            self._clf_voice_mark = self._last_voice_time
 
-            audio_16k = self._resample_8k_to_16k(audio_data)
+            # バッファ全体ではなく直近の窓だけをコピー・変換する
+            window_bytes = int(WHISPER_STREAM_CLF_WINDOW * self.sample_rate) * 2
+            audio_16k = self._resample_8k_to_16k(bytes(self._audio_buffer[-window_bytes:]))
             
             if self._emb_clf and getattr(self, "client_id", "") != "whisper_test":
                 label, conf = self._emb_clf.classify(audio_16k)
@@ -209,21 +225,25 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
         if self._is_speaking:
             self._schedule_periodic_transcribe()
 
-    def _idle_monitor(self):
-        """5分間無音で最終催促→切断"""
-        IDLE_TIMEOUT = 300  # 5 minutes
-        while not self._stop_requested.is_set():
-            time.sleep(5)
-            if not hasattr(self, '_speech_detected'):
-                continue  # まだ最初の発話前（通常の催促タイマーが動いてる）
-            elapsed = time.time() - self._last_activity_time
-            if elapsed >= IDLE_TIMEOUT:
-                logger.info("[IDLE] 5min timeout uuid=%s", self.uuid)
-                if hasattr(self, 'silence_handler') and self.silence_handler:
-                    self.silence_handler._play_audio("prompt_003_8k.wav")
-                    time.sleep(10)
-                    self.silence_handler._hangup()
-                break
+    IDLE_TIMEOUT = 300  # 5 minutes
+
+    def _start_idle_timer(self):
+        """最初の発話以降、最後の活動から5分でタイムアウトする（活動のたびに延長はせず、発火時に再確認する）"""
+        remaining = self._last_activity_time + self.IDLE_TIMEOUT - time.time()
+        self._idle_timer = get_timer_wheel().reset(self._idle_timer, max(0.0, remaining),
+                                                   self._on_idle_timeout)
+
+    def _on_idle_timeout(self):
+        """5分間無音で最終催促→10秒後に切断"""
+        if self._stop_requested.is_set():
+            return
+        if time.time() - self._last_activity_time < self.IDLE_TIMEOUT:
+            self._start_idle_timer()
+            return
+        logger.info("[IDLE] 5min timeout uuid=%s", self.uuid)
+        if hasattr(self, 'silence_handler') and self.silence_handler:
+            self.silence_handler._play_audio("prompt_003_8k.wav")
+            self._idle_timer = get_timer_wheel().call_later(10, self.silence_handler._hangup)
 
     def send_audio(self, chunk):
         if self._stop_requested.is_set() or not chunk:
@@ -289,6 +309,7 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                 if hasattr(self, 'silence_handler') and self.silence_handler and not hasattr(self, '_speech_detected'):
                     self._speech_detected = True
                     self.silence_handler.stop_timer()
+                    self._start_idle_timer()
                     logger.info("[VAD] silence timer stopped, starting idle monitor uuid=%s", self.uuid)
                 # Update last activity time
                 self._last_activity_time = time.time()
@@ -306,7 +327,8 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                             audio_data = bytes(self._audio_buffer)
                             buf_dur = len(audio_data) / (self.sample_rate * 2)
                             audio_16k = self._resample_8k_to_16k(audio_data)
-                            label, conf = self._emb_clf.classify(audio_16k)
+                            feats = self._utterance_features(audio_16k)
+                            label, conf = self._emb_clf.classify(feats)
                             logger.info("[STREAM_CLF] final uuid=%s label=%s conf=%.3f buf=%.1fs candidate=%s",
                                        self.uuid, label, conf, buf_dur, self._streaming_candidate)
                             
@@ -334,8 +356,7 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                                 self._last_activity_time = time.time()
                             else:
                                 logger.info("[STREAM_CLF] low conf %.3f, fallback 081", conf)
-                                self._responding = True
-                                self._trigger_immediate_response("081_transfer")
+                                self._respond_low_confidence(feats)
                         except Exception as e:
                             logger.warning("[STREAM_CLF] final error: %s", e)
                             self._responding = True
@@ -347,6 +368,7 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                     
                     self._audio_buffer = bytearray()
                     self._streaming_candidate = None
+                    self._clf_voice_mark = None
                     self._is_speaking = False
                     if self._periodic_timer:
                         self._periodic_timer.cancel()
@@ -389,6 +411,8 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
 
             # Convert 8kHz 16-bit PCM to 16kHz float32 for Whisper
             audio_16k = self._resample_8k_to_16k(audio_data)
+            # log-mel は分類と文字起こしで共有
+            feats = self._utterance_features(audio_16k)
 
             # --- Embedding classifier (primary) ---
             if self._emb_clf and getattr(self, "client_id", "") != "whisper_test":
@@ -403,7 +427,7 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                     if audio_duration < 1.5:
                         logger.info("[EMB_CLF] skipping short buffer %.1fs", audio_duration)
                         return
-                    emb_label, emb_conf = self._emb_clf.classify(audio_16k)
+                    emb_label, emb_conf = self._emb_clf.classify(feats)
                     # Re-check if another buffer already triggered response
                     if getattr(self, '_muted', False) or getattr(self, 'muted', False):
                         logger.info("[EMB_CLF] skipping - muted after classify")
@@ -420,8 +444,7 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                         return
                     else:
                         logger.info("[EMB_CLF] low confidence %.3f, fallback to transfer (081)", emb_conf)
-                        self._responding = True
-                        self._trigger_immediate_response("081_transfer")
+                        self._respond_low_confidence(feats)
                         return
                 except Exception as e:
                     logger.warning("[EMB_CLF] error: %s, fallback to transfer (081)", e)
@@ -430,29 +453,23 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                     return
 
             # --- Whisper text fallback ---
-            # Run Whisper inference
-            segments, info = self._model.transcribe(
+            # Run Whisper inference (batched with other calls; final > interim)
+            future = self._scheduler.submit(
                 audio_16k,
-                language="ja",
-                initial_prompt="もしもし、こんにちは。料金について教えてください。導入を検討しています。担当者をお願いします。セキュリティは大丈夫ですか。24時間対応ですか。ホームページを見ました。",
+                final=not interim,
+                uuid=self.uuid,
                 beam_size=3,
-                best_of=1,
-                vad_filter=False,
-                without_timestamps=True,
-                no_speech_threshold=None,
+                initial_prompt=WHISPER_INITIAL_PROMPT,
+                features=feats,
             )
-
-            # Collect results
-            text_parts = []
-            for segment in segments:
-                text_parts.append(segment.text.strip())
-
-            full_text = "".join(text_parts).strip()
+            full_text = future.result()
+            if full_text is None:
+                logger.info("[WHISPER] interim dropped (stale or superseded) uuid=%s", self.uuid)
+                return
             elapsed = time.time() - start_time
             
             # システム音声の誤認識をフィルタリング
-            SYSTEM_NOISE = ["ご視聴", "チャンネル登録", "お客様に", "お客様の"]
-            if any(noise in full_text for noise in SYSTEM_NOISE):
+            if any(noise in full_text for noise in WHISPER_SYSTEM_NOISE):
                 logger.info("[WHISPER] filtered system noise: '%s'", full_text)
                 return
 
@@ -512,6 +529,47 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
         except Exception as e:
             logger.error("[WHISPER] transcription error uuid=%s err=%s", self.uuid, e)
 
+    def _utterance_features(self, audio_16k):
+        """発話ごとの特徴量キャッシュ（埋め込み分類・MFCC・Whisper デコードで共有）"""
+        if self._emb_clf:
+            return self._emb_clf.features(audio_16k)
+        return UtteranceFeatures(audio_16k, self._model.feature_extractor, self._model.model)
+
+    def _respond_low_confidence(self, feats):
+        """埋め込み分類の確信度が低いときの応答（既定は転送、有効なら Whisper で文字起こしして判定）"""
+        self._responding = True
+        if not WHISPER_LOW_CONF_FALLBACK or not self._streaming_llm:
+            self._trigger_immediate_response("081_transfer")
+            return
+        # デコードは数百ms かかるため音声受信スレッドを止めない（判定ごとにスレッドは作らない）
+        get_stream_executor().submit(self._decode_low_confidence, feats)
+
+    def _decode_low_confidence(self, feats):
+        start_time = time.time()
+        response_id = None
+        try:
+            text = self._scheduler.submit(
+                feats.audio,
+                final=True,
+                uuid=self.uuid,
+                beam_size=3,
+                initial_prompt=WHISPER_INITIAL_PROMPT,
+                features=feats,
+            ).result()
+            if text and not any(noise in text for noise in WHISPER_SYSTEM_NOISE):
+                self._streaming_llm.add_fragment(text)
+                response_id = self._streaming_llm.finalize()
+                if hasattr(self, 'call_logger') and self.call_logger:
+                    self.call_logger.log_asr(text, True, 0.0)
+            logger.info('[WHISPER] low-conf fallback uuid=%s elapsed=%.3fs text="%s" response=%s timings=%s',
+                       self.uuid, time.time() - start_time, text, response_id, feats.timings)
+        except Exception as e:
+            logger.warning("[WHISPER] low-conf fallback error uuid=%s err=%s", self.uuid, e)
+        # 意図が取れなければ（聞き返し 114 を含む）従来どおり転送
+        if not response_id or response_id == "114":
+            response_id = "081_transfer"
+        self._trigger_immediate_response(response_id)
+
     def _resample_8k_to_16k(self, pcm_data):
         """PCM -> 16kHz float32 numpy array for Whisper"""
         samples = np.frombuffer(pcm_data, dtype=np.int16).astype(np.float32)
@@ -534,10 +592,11 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
         if self.sample_rate == 16000:
             samples_16k = samples_8k_normalized
         else:
-            n = len(samples_8k_normalized)
-            indices_16k = np.arange(0, n, 0.5)
-            indices_16k = indices_16k[indices_16k < n]
-            samples_16k = np.interp(indices_16k, np.arange(n), samples_8k_normalized)
+            # Whole-buffer conversion with the shared precomputed polyphase filter
+            # (same output as resample_poly: filter delay trimmed, tail flushed)
+            if self._resampler is None:
+                self._resampler = StreamingResampler(16000, self.sample_rate)
+            samples_16k = self._resampler.resample_block(samples_8k_normalized)
 
 
         # DEBUG: save resampled audio for inspection
@@ -574,13 +633,11 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
             logger.info("[IMMEDIATE_RESP] muted for playback response_id=%s", response_id)
             
             # 再生完了後にunmuteするタイマー（音声長さに応じて調整）
-            import wave as _wave
             audio_path_check = f"/opt/libertycall/clients/{self.client_id}/audio/{response_id}.wav"
-            try:
-                with _wave.open(audio_path_check) as wf:
-                    duration = wf.getnframes() / wf.getframerate()
+            duration = get_audio_asset_store().duration(audio_path_check)
+            if duration is not None:
                 unmute_delay = duration + 0.5  # 音声長 + 0.5秒マージン
-            except:
+            else:
                 unmute_delay = 5.0  # デフォルト5秒
             
             def _unmute():
@@ -591,7 +648,7 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
                 self._audio_buffer = bytearray()
                 logger.info("[IMMEDIATE_RESP] unmuted after %.1fs", unmute_delay)
             
-            threading.Timer(unmute_delay, _unmute).start()
+            get_timer_wheel().call_later(unmute_delay, _unmute)
             # 音声ファイルパスを構築
             audio_path = f"/opt/libertycall/clients/{self.client_id}/audio/{response_id}.wav"
             
@@ -653,9 +710,13 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
     def close(self):
         if not self._stop_requested.is_set():
             self._stop_requested.set()
+            for timer in (self._idle_timer, self._periodic_timer, self._silence_timer):
+                if timer is not None:
+                    timer.cancel()
             # Transcribe remaining buffer
             if self._audio_buffer:
                 self._transcribe_buffer()
+            logger.info("[WHISPER_SCHED] stats uuid=%s %s", self.uuid, self._scheduler.get_stats())
         self._closed.set()
 
     def unmute(self):
@@ -669,12 +730,12 @@ class WhisperStreamingSession(GASRDialogHandlerMixin):
     # ------------------------------------------------------------------ #
     def _connect_esl(self):
         try:
-            self._esl = ESLconnection(ESL_HOST, ESL_PORT, ESL_PASSWORD)
+            self._esl = get_shared_esl()
             if self._esl.connected():
                 logger.info("[ESL] connected uuid=%s", self.uuid)
             else:
+                # 共有プールが死活監視で再接続するため参照は保持する
                 logger.error("[ESL] connection failed uuid=%s", self.uuid)
-                self._esl = None
         except Exception as e:
             logger.error("[ESL] error uuid=%s err=%s", self.uuid, e)
             self._esl = None
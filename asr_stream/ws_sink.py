@@ -10,7 +10,9 @@ import struct
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 
 import websockets
 from google.cloud import speech
@@ -27,7 +29,7 @@ ESL_PASSWORD = os.environ.get("AF_ESL_PASSWORD", "ClueCon")
 # importをファイル先頭で一度だけ実行
 sys.path.insert(0, '/opt/libertycall')
 from gateway.dialogue.dialogue_flow import get_response, get_action
-from libs.esl.ESL import ESLconnection
+from libs.esl.async_esl import get_shared_esl
 
 from logging.handlers import RotatingFileHandler
 
@@ -46,11 +48,19 @@ logger_ws.addHandler(logging.StreamHandler(sys.stdout))
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 from call_logger import CallLogger
+from call_metadata import CallMetadataResolver
 
 GASR_SAMPLE_RATE = int(os.environ.get("GASR_SAMPLE_RATE", "8000"))
 GASR_LANGUAGE = os.environ.get("GASR_LANGUAGE", "ja-JP")
 GASR_OUTPUT_DIR = os.environ.get("GASR_OUTPUT_DIR", "/tmp")
 
+# 通話ごとの初期化/終了処理（ESL問い合わせ・録音開始・セッション生成）を流す有界ワーカー数
+WS_SINK_CALL_WORKERS = int(os.environ.get("WS_SINK_CALL_WORKERS", "16"))
+# ASRセッションキューの上限（20msフレーム数）。超えた分は破棄してバックプレッシャーとして計上
+WS_SINK_MAX_QUEUE_FRAMES = int(os.environ.get("WS_SINK_MAX_QUEUE_FRAMES", "250"))
+# メトリクスのログ出力間隔（秒）
+WS_SINK_METRICS_INTERVAL = float(os.environ.get("WS_SINK_METRICS_INTERVAL", "30"))
+
 def _extract_uuid_from_path(path):
     if not path:
         return "unknown"
@@ -69,71 +79,162 @@ def _extract_uuid_from_path(path):
 
 from silence_handler import SilenceHandler
 from gasr_session import GoogleStreamingSession
+
+
+class _ConnectionStats:
+    """接続ごとのフレーム流量・キュー深さ・バックプレッシャー計測"""
+
+    __slots__ = ("uuid", "opened_at", "setup_ms", "frames", "bytes",
+                 "dropped", "queue_depth", "max_queue_depth")
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+        self.opened_at = time.monotonic()
+        self.setup_ms = 0.0
+        self.frames = 0
+        self.bytes = 0
+        self.dropped = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def as_dict(self):
+        return {
+            "uuid": self.uuid,
+            "age_sec": round(time.monotonic() - self.opened_at, 1),
+            "setup_ms": round(self.setup_ms, 1),
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "dropped": self.dropped,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
 class WSSinkServer:
     def __init__(self):
         self.connections = {}
         self.esl = None
         self._connect_esl()
+        # uuid → (destination_number, caller_number, client_id) を1往復で解決しキャッシュ
+        self._metadata = CallMetadataResolver(self.esl, default_client_id="000")
         self._active_sessions = set()  # Track active sessions for warmup control
+        # 通話ごとのブロッキング処理はイベントループ外の有界プールで実行する
+        self._executor = ThreadPoolExecutor(
+            max_workers=WS_SINK_CALL_WORKERS, thread_name_prefix="ws_sink_call")
+        self._executor_pending = 0
+        self._conn_stats = {}
+        self._loop_lag_max_ms = 0.0
+        self._dropped_total = 0
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """ブロッキング処理を有界ワーカープールで実行し、完了を待つ"""
+        loop = asyncio.get_running_loop()
+        self._executor_pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        finally:
+            self._executor_pending -= 1
+
+    def _esl_api(self, cmd):
+        """共有ESLプールで api を実行（切断時の再接続はプール側が行う）"""
+        if not self.esl:
+            return None
+        return self.esl.api(cmd)
+
+    def get_metrics(self):
+        """接続数・ワーカー待ち・接続ごとのキュー深さ等を返す"""
+        return {
+            "connections": len(self._conn_stats),
+            "executor_workers": WS_SINK_CALL_WORKERS,
+            "executor_pending": self._executor_pending,
+            "loop_lag_max_ms": round(self._loop_lag_max_ms, 1),
+            "dropped_total": self._dropped_total,
+            "per_connection": [st.as_dict() for st in self._conn_stats.values()],
+        }
+
+    async def monitor_event_loop(self, interval=0.5):
+        """イベントループの遅延を計測し、定期的にメトリクスをログ出力"""
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag_ms = (loop.time() - start - interval) * 1000
+            if lag_ms > self._loop_lag_max_ms:
+                self._loop_lag_max_ms = lag_ms
+            if lag_ms > 100:
+                logger.warning("[WS_METRICS] event loop stalled %.0fms", lag_ms)
+            if loop.time() - last_report >= WS_SINK_METRICS_INTERVAL:
+                last_report = loop.time()
+                metrics = self.get_metrics()
+                if metrics["connections"]:
+                    logger.info("[WS_METRICS] %s", json.dumps(metrics, ensure_ascii=False))
+                self._loop_lag_max_ms = 0.0
 
     def _connect_esl(self):
+        """プロセス共有のESLプールを取得（通話ごとに接続は張らない）"""
         try:
-            sys.path.insert(0, '/opt/libertycall')
-            from libs.esl.ESL import ESLconnection
-            for attempt in range(10):
-                self.esl = ESLconnection(ESL_HOST, ESL_PORT, ESL_PASSWORD)
-                if self.esl.connected():
-                    break
-                logger.warning("[WS_SERVER] ESL connect attempt %d/10 failed, retrying in 3s...", attempt+1)
-                import time; time.sleep(3)
-            if self.esl.connected():
-                self.esl.send("noevents")
-                self.esl.recvEvent()  # consume reply
-            else:
-                logger.error("[WS_SERVER] ESL connection failed")
-                self.esl = None
+            self.esl = get_shared_esl()
+            if not self.esl.connected():
+                logger.error("[WS_SERVER] ESL connection failed (pool will retry)")
         except Exception as e:
             logger.error("[WS_SERVER] ESL error err=%s", e)
             self.esl = None
 
-
-    def _ensure_esl(self):
-        """ESL接続の生存確認。stale接続を検出して再接続する"""
-        if not self.esl or not self.esl.connected():
-            self._connect_esl()
-            return
-        try:
-            # 軽量コマンドで実際の接続を確認
-            result = self.esl.api("status")
-            if not result or not result.getBody():
-                raise Exception("empty response")
-        except Exception:
-            logger.warning("[WS_SERVER] ESL stale connection detected, reconnecting...")
-            self.esl = None
-            self._connect_esl()
     def _get_client_id_from_uuid(self, uuid):
+        return self._metadata.resolve(uuid).client_id
+
+    def _start_recording(self, call_uuid, rec_path):
+        rec_result = None
         try:
-            logger.info(f"[WS_SERVER] Getting client_id for uuid={uuid}")
-            self._ensure_esl()
-            if not self.esl or not self.esl.connected():
-                logger.warning(f"[WS_SERVER] ESL not connected for uuid={uuid}, reconnecting...")
-                self._connect_esl()
-                if not self.esl or not self.esl.connected():
-                    logger.error(f"[WS_SERVER] ESL reconnect failed for uuid={uuid}")
-                    return "000"
-            result = self.esl.api(f"uuid_getvar {uuid} destination_number")
-            dest_number = result.getBody() if result else "unknown"
-            logger.info(f"[WS_SERVER] Got destination_number={dest_number} for uuid={uuid}")
-            
-            with open('/opt/libertycall/config/phone_mapping.json') as f:
-                mapping = json.load(f)
-            
-            client_id = mapping.get(dest_number, "000")
-            logger.info(f"[WS_SERVER] Mapped {dest_number} -> client_id={client_id}")
-            return client_id
-        except Exception as e:
-            logger.error(f"[WS_SERVER] Error getting client_id for uuid={uuid}: {e}")
-            return "000"
+            self._esl_api(f"uuid_setvar {call_uuid} RECORD_STEREO true")
+            rec_result = self._esl_api(f"uuid_record {call_uuid} start {rec_path}")
+        except Exception as esl_err:
+            logger.warning("[WS_SERVER] ESL call failed uuid=%s err=%s", call_uuid, esl_err)
+        if self.esl and self.esl.connected():
+            rec_body = rec_result.getBody() if rec_result else "NO_RESULT"
+            if rec_result and "+OK" in str(rec_body):
+                logger.info("[RECORDING] started uuid=%s path=%s", call_uuid, rec_path)
+                return True
+            logger.error("[RECORDING] failed uuid=%s result=%s", call_uuid, rec_body)
+        else:
+            logger.error("[RECORDING] ESL not connected, skipping recording uuid=%s", call_uuid)
+        return False
+
+    def _setup_call(self, call_uuid, client_id, caller_number, silence_handler):
+        """録音開始 + gasr_session初期化（ワーカースレッドで実行）"""
+        call_logger = CallLogger(call_uuid, client_id, caller_number=caller_number)
+        recording_started = self._start_recording(call_uuid, call_logger.get_recording_path())
+
+        gasr_session = GoogleStreamingSession(call_uuid, client_id=client_id)
+        silence_handler.gasr_session = gasr_session
+        gasr_session.silence_handler = silence_handler
+        gasr_session.call_logger = call_logger
+        return call_logger, gasr_session, recording_started
+
+    def _teardown_call(self, call_uuid, silence_handler, gasr_session, call_logger, recording_started):
+        """録音停止・セッション終了（ワーカースレッドで実行）"""
+        if recording_started:
+            try:
+                self._esl_api(f"uuid_record {call_uuid} stop all")
+                logger.info("[RECORDING] stopped uuid=%s", call_uuid)
+            except Exception as e:
+                logger.warning("[RECORDING] stop failed uuid=%s err=%s", call_uuid, e)
+        if recording_started and call_logger:
+            try:
+                rec_file = call_logger.get_recording_path()
+                if os.path.exists(rec_file):
+                    import subprocess
+                    subprocess.run(["sudo", "chown", "deploy:deploy", rec_file], timeout=5, capture_output=True)
+                    logger.info("[RECORDING] chown done uuid=%s", call_uuid)
+            except Exception as e:
+                logger.warning("[RECORDING] chown failed uuid=%s err=%s", call_uuid, e)
+        if silence_handler:
+            silence_handler.stop()
+        if gasr_session:
+            gasr_session.close()
+        if call_logger:
+            call_logger.close()
 
     async def handle_client(self, websocket):
         path = getattr(websocket, "path", None) or getattr(getattr(websocket, "request", None), "path", None)
@@ -148,78 +249,34 @@ class WSSinkServer:
             return
         self.connections[call_uuid] = conn_id
         self._active_sessions.add(call_uuid)  # Add to active sessions
+        stats = _ConnectionStats(call_uuid)
+        self._conn_stats[call_uuid] = stats
         
         gasr_session = None
         silence_handler = None
         call_logger = None
         recording_started = False
         try:
-            client_id = self._get_client_id_from_uuid(call_uuid)
-            logger.info(f"[WS_SERVER] uuid={call_uuid} dest_number mapped to client_id={client_id}")
+            meta = await self._metadata.resolve_async(call_uuid)
+            client_id = meta.client_id
+            logger.info(f"[WS_SERVER] uuid={call_uuid} dest_number={meta.destination_number} "
+                        f"mapped to client_id={client_id} caller_number={meta.caller_number}")
 
             # === 即座にアナウンス再生開始 ===
-            silence_handler = SilenceHandler(call_uuid, client_id=client_id)
-            loop = asyncio.get_event_loop()
+            silence_handler = await self._run_blocking(SilenceHandler, call_uuid, client_id=client_id)
+            loop = asyncio.get_running_loop()
+            # 再生完了待ちは長時間ブロックするため、初期化用の有界プールとは分ける
             greeting_future = loop.run_in_executor(None, silence_handler.play_greeting_only)
             logger.info(f"[WS_SERVER] greeting dispatch started uuid={call_uuid}")
 
-            # === 並行処理: caller_number取得 + 録音 + gasr_session初期化 ===
-            caller_number = "番号不明"
-            try:
-                self._ensure_esl()
-                if self.esl and self.esl.connected():
-                    cn_result = self.esl.api(f"uuid_getvar {call_uuid} caller_id_number")
-                    cn_body = cn_result.getBody().strip() if cn_result else ""
-                    if cn_body and cn_body != "_undef_" and cn_body != "NONE":
-                        caller_number = cn_body
-                    logger.info(f"[WS_SERVER] caller_number={caller_number} for uuid={call_uuid}")
-            except Exception as e:
-                logger.warning(f"[WS_SERVER] caller_number fetch failed: {e}")
-                self._connect_esl()
-                try:
-                    if self.esl and self.esl.connected():
-                        cn_result = self.esl.api(f"uuid_getvar {call_uuid} caller_id_number")
-                        cn_body = cn_result.getBody().strip() if cn_result else ""
-                        if cn_body and cn_body != "_undef_" and cn_body != "NONE":
-                            caller_number = cn_body
-                        logger.info(f"[WS_SERVER] caller_number={caller_number} (retry) uuid={call_uuid}")
-                except Exception as e2:
-                    logger.warning(f"[WS_SERVER] caller_number retry also failed: {e2}")
-            call_logger = CallLogger(call_uuid, client_id, caller_number=caller_number)
-
-            # === 両方向録音開始（ESL経由 uuid_record） ===
-            rec_path = call_logger.get_recording_path()
-            for _esl_attempt in range(2):
-                try:
-                    self._ensure_esl()
-                    if not self.esl or not self.esl.connected():
-                        logger.warning("[WS_SERVER] ESL not connected after ensure, reconnecting uuid=%s", call_uuid)
-                        self._connect_esl()
-                    self.esl.api(f"uuid_setvar {call_uuid} RECORD_STEREO true")
-                    rec_result = self.esl.api(f"uuid_record {call_uuid} start {rec_path}")
-                    break
-                except Exception as esl_err:
-                    logger.warning("[WS_SERVER] ESL call failed attempt=%d uuid=%s err=%s", _esl_attempt+1, call_uuid, esl_err)
-                    self._connect_esl()
-                    rec_result = None
-            if self.esl and self.esl.connected():
-                rec_body = rec_result.getBody() if rec_result else "NO_RESULT"
-                if rec_result and "+OK" in str(rec_body):
-                    recording_started = True
-                    logger.info("[RECORDING] started uuid=%s path=%s", call_uuid, rec_path)
-                else:
-                    logger.error("[RECORDING] failed uuid=%s result=%s", call_uuid, rec_body)
-            else:
-                logger.error("[RECORDING] ESL not connected, skipping recording uuid=%s", call_uuid)
-
-            gasr_session = GoogleStreamingSession(call_uuid, client_id=client_id)
-            silence_handler.gasr_session = gasr_session
-            gasr_session.silence_handler = silence_handler
-            gasr_session.call_logger = call_logger
+            # === 並行処理: 録音 + gasr_session初期化 ===
+            call_logger, gasr_session, recording_started = await self._run_blocking(
+                self._setup_call, call_uuid, client_id, meta.caller_number, silence_handler)
+            stats.setup_ms = (time.monotonic() - stats.opened_at) * 1000
 
             # greetingの完了を待つ
             await greeting_future
-            logger.info(f"[WS_SERVER] greeting done, session ready uuid={call_uuid}")
+            logger.info(f"[WS_SERVER] greeting done, session ready uuid={call_uuid} setup_ms={stats.setup_ms:.0f}")
             # unmute + timer開始（greeting完了後）
             if gasr_session:
                 gasr_session.unmute()
@@ -228,8 +285,12 @@ class WSSinkServer:
         except Exception as exc:
             logger.exception("[GASR] session_init_failed uuid=%s err=%s", call_uuid, exc)
             self.connections.pop(call_uuid, None)
+            self._active_sessions.discard(call_uuid)
+            self._conn_stats.pop(call_uuid, None)
+            self._metadata.invalidate(call_uuid)
             return
         total = 0
+        session_queue = gasr_session.queue if gasr_session else None
         try:
             async for message in websocket:
                 if isinstance(message, str) and message.strip() == "{}":
@@ -238,37 +299,46 @@ class WSSinkServer:
                 if not isinstance(message, (bytes, bytearray)):
                     continue
                 total += len(message)
+                stats.frames += 1
+                stats.bytes += len(message)
+                if session_queue is not None:
+                    depth = session_queue.qsize()
+                    stats.queue_depth = depth
+                    if depth > stats.max_queue_depth:
+                        stats.max_queue_depth = depth
+                    if depth >= WS_SINK_MAX_QUEUE_FRAMES:
+                        # 下流（STTストリーム）が詰まっている: フレームを捨ててループを止めない
+                        stats.dropped += 1
+                        self._dropped_total += 1
+                        if stats.dropped % 50 == 1:
+                            logger.warning("[WS_BACKPRESSURE] uuid=%s queue_depth=%d dropped=%d",
+                                           call_uuid, depth, stats.dropped)
+                        continue
                 if gasr_session:
                     gasr_session.send_audio(bytes(message))
         except Exception as e:
             logger.info(f"[AF_WS] conn={conn_id} closed {type(e).__name__}")
         finally:
-            logger.info(f"[AF_WS] disconnected conn={conn_id} total={total}")
+            logger.info(f"[AF_WS] disconnected conn={conn_id} total={total} stats={stats.as_dict()}")
             self.connections.pop(call_uuid, None)
             self._active_sessions.discard(call_uuid)  # Remove from active sessions
-            if recording_started and self.esl and self.esl.connected():
-                self.esl.api(f"uuid_record {call_uuid} stop all")
-                logger.info("[RECORDING] stopped uuid=%s", call_uuid)
-            if recording_started and call_logger:
-                try:
-                    rec_file = call_logger.get_recording_path()
-                    if os.path.exists(rec_file):
-                        import subprocess
-                        subprocess.run(["sudo", "chown", "deploy:deploy", rec_file], timeout=5, capture_output=True)
-                        logger.info("[RECORDING] chown done uuid=%s", call_uuid)
-                except Exception as e:
-                    logger.warning("[RECORDING] chown failed uuid=%s err=%s", call_uuid, e)
-            if silence_handler:
-                silence_handler.stop()
-            if gasr_session:
-                gasr_session.close()
-            if call_logger:
-                call_logger.close()
+            self._conn_stats.pop(call_uuid, None)
+            self._metadata.invalidate(call_uuid)
+            await self._run_blocking(
+                self._teardown_call, call_uuid, silence_handler, gasr_session,
+                call_logger, recording_started)
 
 async def main():
     logger.info("Starting WSSink server on ws://0.0.0.0:9000/")
     from speech_client_manager import warmup_speech_client
     await warmup_speech_client()
+
+    # クライアント音声を事前変換（再生時間・送出フレーム）し、変更を監視
+    try:
+        from gateway.common.audio_asset_store import preload_audio_assets
+        preload_audio_assets()
+    except Exception as e:
+        logger.warning("[STARTUP] audio asset preload failed: %s", e)
     
     server = WSSinkServer()
     
@@ -283,6 +353,7 @@ async def main():
                 logger.info(f"[WARMUP] Skipping warmup - {len(server._active_sessions)} active sessions")
     
     asyncio.create_task(periodic_warmup())
+    asyncio.create_task(server.monitor_event_loop())
     global _server_instance
     server_instance = await websockets.serve(server.handle_client, host="0.0.0.0", port=9000, ping_interval=None, max_size=None)
     _server_instance = server_instance
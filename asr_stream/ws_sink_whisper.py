@@ -12,7 +12,7 @@ from websockets import exceptions as ws_exceptions
 from call_logger import CallLogger
 
 sys.path.insert(0, '/opt/libertycall')
-from libs.esl.ESL import ESLconnection
+from libs.esl.async_esl import get_shared_esl
 
 from logging.handlers import RotatingFileHandler
 
@@ -49,6 +49,7 @@ def _extract_uuid_from_path(path):
     return "".join(ch if (ch.isalnum() or ch in "-_") else "_" for ch in candidate) or "unknown"
 
 
+from call_metadata import CallMetadataResolver
 from silence_handler import SilenceHandler
 from whisper_session import WhisperStreamingSession
 
@@ -58,52 +59,27 @@ class WhisperWSSinkServer:
         self.connections = {}
         self.esl = None
         self._connect_esl()
+        self._metadata = CallMetadataResolver(self.esl, default_client_id="whisper_test")
 
     def _esl_api(self, cmd):
-        """ESL API call with auto-reconnect on Broken pipe"""
-        for attempt in range(2):
-            try:
-                if not self.esl or not self.esl.connected():
-                    self._connect_esl()
-                if self.esl and self.esl.connected():
-                    result = self.esl.api(cmd)
-                    return result
-            except BrokenPipeError:
-                logger.warning("[ESL] Broken pipe, reconnecting (attempt %d)", attempt + 1)
-                self.esl = None
-                self._connect_esl()
-            except Exception as e:
-                logger.error("[ESL] api error: %s", e)
-                return None
-        return None
+        """共有ESLプールで api を実行（切断時の再接続はプール側が行う）"""
+        if not self.esl:
+            self._connect_esl()
+        if not self.esl:
+            return None
+        return self.esl.api(cmd)
 
     def _connect_esl(self):
         try:
-            self.esl = ESLconnection("127.0.0.1", "8021", "ClueCon")
+            self.esl = get_shared_esl()
             if not self.esl.connected():
-                logger.error("[WS_SERVER] ESL connection failed")
-                self.esl = None
+                logger.error("[WS_SERVER] ESL connection failed (pool will retry)")
         except Exception as e:
             logger.error("[WS_SERVER] ESL error err=%s", e)
             self.esl = None
 
     def _get_client_id_from_uuid(self, uuid):
-        try:
-            if not self.esl or not self.esl.connected():
-                return "whisper_test"
-            result = self._esl_api(f"uuid_getvar {uuid} destination_number")
-            dest_number = result.getBody() if result else "unknown"
-            logger.info("[WS_SERVER] destination_number=%s uuid=%s", dest_number, uuid)
-
-            with open('/opt/libertycall/config/phone_mapping.json') as f:
-                mapping = json.load(f)
-
-            client_id = mapping.get(dest_number, "whisper_test")
-            logger.info("[WS_SERVER] mapped -> client_id=%s", client_id)
-            return client_id
-        except Exception as e:
-            logger.error("[WS_SERVER] Error getting client_id: %s", e)
-            return "whisper_test"
+        return self._metadata.resolve(uuid).client_id
 
     async def handle_client(self, websocket):
         path = getattr(websocket, "path", None) or getattr(getattr(websocket, "request", None), "path", None)
@@ -122,16 +98,10 @@ class WhisperWSSinkServer:
         call_logger = None
         recording_started = False
         try:
-            client_id = self._get_client_id_from_uuid(call_uuid)
-            # Get caller number for call log
-            caller_number = ""
-            try:
-                cn_result = self._esl_api(f"uuid_getvar {call_uuid} caller_id_number")
-                if cn_result:
-                    caller_number = cn_result.getBody().strip() if cn_result.getBody() else ""
-                logger.info("[WS_SERVER] caller_number=%s uuid=%s", caller_number, call_uuid)
-            except Exception as e:
-                logger.warning("[WS_SERVER] failed to get caller_number: %s", e)
+            # client_id / caller_number を1回のESL往復で取得
+            meta = await self._metadata.resolve_async(call_uuid)
+            client_id = meta.client_id
+            caller_number = meta.caller_number
             call_logger = CallLogger(call_uuid, client_id, caller_number=caller_number)
 
             # Recording
@@ -172,6 +142,7 @@ class WhisperWSSinkServer:
         finally:
             logger.error("[AF_WS] disconnected conn=%s total=%d", conn_id, total)
             self.connections.pop(call_uuid, None)
+            self._metadata.invalidate(call_uuid)
             if recording_started and self.esl and self.esl.connected():
                 self._esl_api(f"uuid_record {call_uuid} stop all")
             if recording_started and call_logger:
@@ -197,9 +168,24 @@ async def main():
     # Pre-load Whisper model
     from whisper_session import get_whisper_model
     logger.info("[STARTUP] Pre-loading Whisper model...")
-    get_whisper_model()
+    model = get_whisper_model()
     logger.info("[STARTUP] Whisper model ready")
 
+    # Pre-render client audio assets (durations / frames) and watch for changes
+    try:
+        from gateway.common.audio_asset_store import preload_audio_assets
+        preload_audio_assets()
+    except Exception as e:
+        logger.warning("[STARTUP] Audio asset preload failed: %s", e)
+
+    # Pre-load embedding classifier (shared by all sessions)
+    try:
+        from asr_stream.embedding_classifier import get_embedding_classifier
+        get_embedding_classifier(model.model)
+        logger.info("[STARTUP] Embedding classifier ready")
+    except Exception as e:
+        logger.warning("[STARTUP] Embedding classifier preload failed: %s", e)
+
     # Pre-load LLM model for whisper_test client
     try:
         from gateway.dialogue.llm_handler import LLMDialogueHandler
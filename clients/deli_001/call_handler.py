@@ -12,6 +12,8 @@ import os
 from typing import Optional, Dict
 from datetime import datetime, timedelta, timezone
 
+from gateway.common.tts_cache import get_tts_cache, tts_cache_key
+
 from .models import Session, State, JST
 from .engine_core import ConversationEngine
 from .engine_handlers import register_handlers
@@ -127,7 +129,49 @@ class DeliCallManager:
     async def _tts_to_file(
         self, call_uuid: str, text: str
     ) -> Optional[str]:
-        """Google TTS でwavファイル生成"""
+        """Google TTS でwavファイル生成（同じ文言はTTSキャッシュのwavを再利用）"""
+        cache = get_tts_cache()
+        key = tts_cache_key(
+            text, f"google:{TTS_VOICE}", 1.0, 0.0,
+            TTS_SAMPLE_RATE, fmt="wav",
+        )
+        wav_path = cache.path(key)
+        if wav_path:
+            logger.debug(f"TTS wav (cached): {wav_path}")
+            return wav_path
+
+        # 合成はブロッキングなのでスレッドで実行（同じ文言の同時要求は1回にまとめる）
+        audio = await asyncio.to_thread(
+            cache.get_or_create, key,
+            lambda: self._synthesize(text),
+        )
+        if not audio:
+            return None
+
+        wav_path = cache.path(key)
+        if wav_path:
+            logger.debug(
+                f"TTS wav: {wav_path} ({len(audio)} bytes)"
+            )
+            return wav_path
+
+        # ディスクキャッシュが使えない場合は従来通り通話ごとのファイル
+        try:
+            os.makedirs(AUDIO_DIR, exist_ok=True)
+            ts = datetime.now(JST).strftime("%H%M%S%f")
+            filename = f"{call_uuid}_{ts}.wav"
+            wav_path = os.path.join(AUDIO_DIR, filename)
+
+            with open(wav_path, "wb") as f:
+                f.write(audio)
+            return wav_path
+
+        except Exception as e:
+            logger.error(f"TTS error: {e}")
+            return None
+
+    def _synthesize(self, text: str) -> Optional[bytes]:
+        """Google TTS で LINEAR16 wav を合成する"""
         client = self._get_tts_client()
         if not client:
             logger.warning("TTS client not available")
@@ -147,20 +191,7 @@ class DeliCallManager:
                     sample_rate_hertz=TTS_SAMPLE_RATE,
                 ),
             )
-
-            os.makedirs(AUDIO_DIR, exist_ok=True)
-            ts = datetime.now(JST).strftime("%H%M%S%f")
-            filename = f"{call_uuid}_{ts}.wav"
-            wav_path = os.path.join(AUDIO_DIR, filename)
-
-            with open(wav_path, "wb") as f:
-                f.write(response.audio_content)
-
-            logger.debug(
-                f"TTS wav: {wav_path} "
-                f"({len(response.audio_content)} bytes)"
-            )
-            return wav_path
+            return response.audio_content
 
         except Exception as e:
             logger.error(f"TTS error: {e}")
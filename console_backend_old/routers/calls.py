@@ -5,14 +5,20 @@ import asyncio
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, Set
+from typing import Optional, Dict, Any, List, Set
 from fastapi import APIRouter, HTTPException, Query, Depends, Request, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..services.call_service import list_calls
+from ..services.call_service import (
+    append_logs,
+    append_logs_bulk,
+    apply_bridge_events,
+    list_calls,
+)
 from ..models import Call, User
+from ..schemas import AppendLogBatchRequest, BridgeEventBatchRequest, MultiCallLogBatchRequest
 from ..auth import get_current_user as auth_get_current_user
 
 # MongoDBはオプショナル（インストールされていない場合もある）
@@ -180,6 +186,34 @@ def get_calls_history(
     }
 
 
+def store_call_events(records: List[Dict[str, Any]]) -> None:
+    """通話イベントを MongoDB（使えなければファイル）に保存.
+    
+    保存に失敗したら例外をそのまま投げる（呼び出し側で再送させる）。
+    """
+    if not records:
+        return
+    try:
+        mongo_client = get_mongo_client()
+        if mongo_client:
+            db_mongo = mongo_client.get_database("libertycall")
+            events_collection = db_mongo.get_collection("call_events")
+            events_collection.insert_many(records)
+            mongo_client.close()
+        else:
+            # MongoDBが利用できない場合はファイルに保存
+            log_path = Path("/opt/libertycall/logs/call_events.log")
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            with log_path.open("a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except Exception as db_err:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"[record_event] DB write failed: {db_err}", exc_info=True)
+        raise
+
+
 @router.post("/record_event")
 async def record_event(request: Request):
     """
@@ -195,23 +229,7 @@ async def record_event(request: Request):
         }
         
         # MongoDBまたはファイルに保存
-        try:
-            mongo_client = get_mongo_client()
-            if mongo_client:
-                db_mongo = mongo_client.get_database("libertycall")
-                events_collection = db_mongo.get_collection("call_events")
-                events_collection.insert_one(record)
-                mongo_client.close()
-            else:
-                # MongoDBが利用できない場合はファイルに保存
-                log_path = Path("/opt/libertycall/logs/call_events.log")
-                log_path.parent.mkdir(parents=True, exist_ok=True)
-                with log_path.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
-        except Exception as db_err:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"[record_event] DB write failed: {db_err}", exc_info=True)
+        store_call_events([record])
         
         return {"status": "ok", "record": record}
     except Exception as e:
@@ -221,6 +239,86 @@ async def record_event(request: Request):
         return {"status": "error", "error": str(e)}
 
 
+@router.post("/events:batch")
+def ingest_bridge_events(
+    body: BridgeEventBatchRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Gateway の ConsoleBridge 送信キューからまとめて届くイベントを適用.
+    
+    start_call / append_log / mark_transfer / complete_call は DB へ、
+    record_event は MongoDB（またはファイル）へ保存する。
+    
+    内容が不正なイベントだけは捨てて 200 を返す。保存先の障害で適用できなかった
+    イベントがあれば 503 を返し、detail.retry にその位置（body.events の添字）を入れる。
+    送信側はそのイベントだけを再送する。
+    """
+    received_at = datetime.utcnow().isoformat()
+    records = [
+        {
+            "call_id": event.get("call_id"),
+            "event_type": event.get("event_type"),
+            "payload": event.get("payload"),
+            "received_at": received_at,
+        }
+        for event in body.events
+        if event.get("kind") == "record_event"
+    ]
+    try:
+        store_call_events(records)
+    except Exception as e:
+        # まだ何も適用していないのでバッチ全体を再送させる
+        raise HTTPException(status_code=503, detail={
+            "message": f"call_events の保存に失敗しました: {e}",
+            "retry": list(range(len(body.events))),
+        })
+    positions = [i for i, event in enumerate(body.events) if event.get("kind") != "record_event"]
+    result = apply_bridge_events(db, [body.events[i] for i in positions])
+    retry = [positions[i] for i in result.pop("retry")]
+    if retry:
+        raise HTTPException(status_code=503, detail={
+            "message": "DB に接続できないため一部のイベントを適用できませんでした",
+            "retry": retry,
+            **result,
+        })
+    return {"status": "ok", "events": len(body.events), **result}
+
+
+@router.post("/logs:batch")
+def append_call_logs_multi(
+    body: MultiCallLogBatchRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    複数通話のログを一括追加.
+    
+    全通話分を1回の INSERT・1回の commit で保存し、SSE 通知は通話ごとに1回だけ送る。
+    """
+    result = append_logs_bulk(
+        db, [(batch.call_id, batch.client_id, batch.logs) for batch in body.calls]
+    )
+    return {
+        "status": "ok",
+        "calls": {call_id: [log.id for log in logs] for call_id, logs in result.items()},
+    }
+
+
+@router.post("/{call_id}/logs:batch")
+def append_call_logs(
+    call_id: str,
+    body: AppendLogBatchRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    1通話分のログを一括追加.
+    
+    Call の確保は1回、CallLog は1回の INSERT・1回の commit で保存する。
+    """
+    logs = append_logs(db, call_id=call_id, requests=body.logs, client_id=body.client_id)
+    return {"status": "ok", "ids": [log.id for log in logs]}
+
+
 @router.post("/push_event")
 async def push_event(request: Request):
     """
@@ -1,7 +1,7 @@
 """Pydanticスキーマ定義."""
 
 from datetime import datetime
-from typing import Optional, Literal, List
+from typing import Any, Dict, Optional, Literal, List
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -54,6 +54,31 @@ class AppendLogRequest(BaseModel):
     template_id: Optional[str] = None  # テンプレートID（AIログ用）
 
 
+class AppendLogBatchRequest(BaseModel):
+    """1通話分のログ一括追加リクエスト."""
+    
+    client_id: Optional[str] = None
+    logs: List[AppendLogRequest] = Field(default_factory=list)
+
+
+class CallLogBatch(AppendLogBatchRequest):
+    """複数通話のログ一括追加での1通話分."""
+    
+    call_id: str = Field(..., max_length=64)
+
+
+class MultiCallLogBatchRequest(BaseModel):
+    """複数通話のログ一括追加リクエスト."""
+    
+    calls: List[CallLogBatch] = Field(default_factory=list)
+
+
+class BridgeEventBatchRequest(BaseModel):
+    """Gateway（ConsoleBridge の送信キュー）からまとめて届くイベント."""
+    
+    events: List[Dict[str, Any]] = Field(default_factory=list)
+
+
 # ログファイル読み取り用スキーマ
 class CallLogEntry(BaseModel):
     """ログエントリ（ファイルから読み取った生ログ）."""
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime, date, UTC
 from typing import Iterable, Optional, Literal
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, insert
 from sqlalchemy.orm import Session
 
 from ..schemas import CallListResponse, CallDetailResponse, AppendLogRequest
@@ -25,7 +25,7 @@ def _push_event_http(call_id: str, event_type: str, data: dict) -> None:
     except Exception:
         pass  # 配信失敗は握りつぶす
 from ..config import get_settings
-from .file_log_service import append_log as append_file_log
+from .file_log_service import append_log as append_file_log, append_logs as append_file_logs
 
 
 def ensure_call(
@@ -36,8 +36,12 @@ def ensure_call(
     started_at: Optional[datetime] = None,
     state: str = "init",
     caller_number: Optional[str] = None,
+    commit: bool = True,
 ) -> Call:
-    """通話を確保（存在しない場合は作成）."""
+    """通話を確保（存在しない場合は作成）.
+    
+    commit=False のときは flush だけ行い、commit は呼び出し側に任せる（バッチ追加用）。
+    """
     import logging
     logger = logging.getLogger(__name__)
     
@@ -55,8 +59,11 @@ def ensure_call(
             caller_number=caller_number if caller_number and caller_number.strip() and caller_number != "-" else None,
         )
         db.add(call)
-        db.commit()
-        db.refresh(call)
+        if commit:
+            db.commit()
+            db.refresh(call)
+        else:
+            db.flush()
         logger.info(f"[ensure_call] Created new call: call_id={call_id}, caller_number={call.caller_number}")
     else:
         if state:
@@ -67,7 +74,8 @@ def ensure_call(
             if not call.caller_number or call.caller_number == "-":
                 call.caller_number = caller_number
                 logger.info(f"[ensure_call] Updated caller_number: call_id={call_id}, caller_number={call.caller_number}")
-        db.commit()
+        if commit:
+            db.commit()
     return call
 
 
@@ -120,6 +128,117 @@ def append_log(
     return log
 
 
+def _naive_utc(value: datetime) -> datetime:
+    """DB から読み戻した値と同じ naive UTC に揃える（isoformat() + "Z" で送るため）."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def _log_event_data(log: CallLog) -> dict:
+    return {
+        "id": log.id,
+        "role": log.role,
+        "text": log.text,
+        "state": log.state,
+        "timestamp": log.timestamp.isoformat() + "Z" if log.timestamp else None,
+    }
+
+
+def append_logs_bulk(
+    db: Session,
+    batches: Iterable[tuple[str, Optional[str], list[AppendLogRequest]]],
+) -> dict[str, list[CallLog]]:
+    """複数のログをまとめて追加.
+    
+    通話ごとに Call を1回だけ確保し、全通話分の CallLog を1回の executemany
+    （INSERT ... RETURNING）で入れて1回だけ commit する。
+    SSE 通知（new_logs）とファイルログへの追記は通話ごとに1回。
+    
+    Args:
+        batches: (call_id, client_id, ログのリスト) の並び
+    
+    Returns:
+        call_id -> 追加した CallLog（追加順）
+    """
+    calls: dict[str, Call] = {}
+    template_ids: list[Optional[str]] = []
+    logs: list[CallLog] = []
+    # 行は DB から読み戻さないので、タイムスタンプは読み戻した場合と同じ naive UTC で持つ
+    now = _naive_utc(datetime.now(UTC))
+    for call_id, client_id, requests in batches:
+        if not requests:
+            continue
+        caller_number = next((r.caller_number for r in requests if r.caller_number), None)
+        calls[call_id] = ensure_call(
+            db,
+            call_id=call_id,
+            client_id=client_id or "",
+            state=requests[-1].state,
+            caller_number=caller_number,
+            commit=False,
+        )
+        for request in requests:
+            logs.append(CallLog(
+                call_id=call_id,
+                role=request.role,
+                text=request.text,
+                state=request.state,
+                timestamp=_naive_utc(request.timestamp) if request.timestamp else now,
+            ))
+            template_ids.append(request.template_id)
+    if not logs:
+        return {}
+    
+    rows = [
+        {
+            "call_id": log.call_id,
+            "role": log.role,
+            "text": log.text,
+            "state": log.state,
+            "timestamp": log.timestamp,
+        }
+        for log in logs
+    ]
+    ids = db.scalars(
+        insert(CallLog).returning(CallLog.id, sort_by_parameter_order=True),
+        rows,
+    ).all()
+    db.commit()
+    
+    result: dict[str, list[CallLog]] = {call_id: [] for call_id in calls}
+    entries: dict[str, list[tuple[CallLog, Optional[str]]]] = {call_id: [] for call_id in calls}
+    for log, log_id, template_id in zip(logs, ids, template_ids):
+        log.id = log_id
+        result[log.call_id].append(log)
+        entries[log.call_id].append((log, template_id))
+    
+    settings = get_settings()
+    for call_id, call_logs in result.items():
+        # WebSocket / SSE イベントはバッチごとに1回
+        call_event_dispatcher.send_logs(call_id, call_logs)
+        _push_event_http(call_id, "new_logs", {
+            "logs": [_log_event_data(log) for log in call_logs],
+        })
+        # ファイルログに追記（例外は握りつぶす）
+        try:
+            append_file_logs(calls[call_id], entries[call_id], settings)
+        except Exception:
+            pass
+    
+    return result
+
+
+def append_logs(
+    db: Session,
+    call_id: str,
+    requests: list[AppendLogRequest],
+    client_id: Optional[str] = None,
+) -> list[CallLog]:
+    """1通話分のログをまとめて追加（append_logs_bulk の1通話版）."""
+    return append_logs_bulk(db, [(call_id, client_id, requests)]).get(call_id, [])
+
+
 def mark_transfer(db: Session, call_id: str, summary: str) -> Call:
     """転送をマーク."""
     call = db.scalar(select(Call).where(Call.call_id == call_id))
@@ -146,6 +265,142 @@ def complete_call(
     return call
 
 
+def _parse_datetime(value) -> Optional[datetime]:
+    if not value or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _is_retryable_db_error(exc: Exception) -> bool:
+    """接続断・タイムアウトなど、時間をおいて再送すれば通る DB エラーか."""
+    from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    
+    if isinstance(exc, (OperationalError, InterfaceError, PoolTimeoutError)):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+def apply_bridge_events(db: Session, events: Iterable[dict]) -> dict:
+    """ConsoleBridge の送信キューから届いたイベントを届いた順に適用.
+    
+    内容が不正なイベントはログに残して捨て、次へ進む（再送しても通らないため）。
+    DB に接続できないなどの一時的なエラーが起きたら、そこで適用を止め、
+    未適用のイベントの位置を retry に入れて返す（呼び出し側が再送させる）。
+    record_event はルーター側で扱う。
+    
+    Returns:
+        {"applied": 適用件数, "failed": 捨てた件数, "retry": 未適用イベントの位置}
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    events = list(events)
+    applied = 0
+    failed = 0
+    retry: list[int] = []
+    # (call_id, client_id) -> [(イベントの位置, ログ)]
+    pending_logs: dict[tuple[str, Optional[str]], list[tuple[int, AppendLogRequest]]] = {}
+    
+    def insert_logs(groups: list) -> bool:
+        """groups をまとめて入れる。一時的な DB エラーなら未適用分を retry に積んで False."""
+        nonlocal applied, failed
+        count = sum(len(items) for _, items in groups)
+        try:
+            append_logs_bulk(
+                db,
+                [(call_id, client_id, [request for _, request in items])
+                 for (call_id, client_id), items in groups],
+            )
+            applied += count
+            return True
+        except Exception as e:
+            db.rollback()
+            if _is_retryable_db_error(e):
+                retry.extend(index for _, items in groups for index, _ in items)
+                logger.warning(f"[bridge_events] append_log batch deferred ({count} logs): {e}")
+                return False
+            if count == 1:
+                failed += 1
+                logger.warning(f"[bridge_events] append_log rejected call_id={groups[0][0][0]}: {e}")
+                return True
+            logger.warning(f"[bridge_events] append_log batch failed ({count} logs), splitting: {e}")
+        # 1行の不正データで他の行まで失わないよう、通話ごと → 1件ずつに分けて入れ直す
+        if len(groups) > 1:
+            parts = [[group] for group in groups]
+        else:
+            key, items = groups[0]
+            parts = [[(key, [item])] for item in items]
+        for n, part in enumerate(parts):
+            if not insert_logs(part):
+                retry.extend(index for rest in parts[n + 1:] for _, items in rest for index, _ in items)
+                return False
+        return True
+    
+    def flush_logs() -> bool:
+        # 連続した append_log は通話をまたいでも1回の INSERT / commit にまとめる
+        if not pending_logs:
+            return True
+        groups = list(pending_logs.items())
+        pending_logs.clear()
+        return insert_logs(groups)
+    
+    for index, event in enumerate(events):
+        kind = event.get("kind")
+        call_id = event.get("call_id")
+        if kind == "append_log":
+            try:
+                request = AppendLogRequest(
+                    role=event.get("role"),
+                    text=event.get("text") or "",
+                    state=event.get("state") or "",
+                    timestamp=event.get("timestamp"),
+                    caller_number=event.get("caller_number"),
+                    template_id=event.get("template_id"),
+                )
+            except Exception as e:
+                failed += 1
+                logger.warning(f"[bridge_events] invalid append_log call_id={call_id}: {e}")
+                continue
+            pending_logs.setdefault((call_id, event.get("client_id")), []).append((index, request))
+            continue
+        if not flush_logs():
+            retry.extend(range(index, len(events)))
+            break
+        try:
+            if kind == "start_call":
+                ensure_call(
+                    db,
+                    call_id=call_id,
+                    client_id=event.get("client_id") or "",
+                    started_at=_parse_datetime(event.get("started_at")),
+                    state=event.get("state") or "init",
+                    caller_number=event.get("caller_number"),
+                )
+            elif kind == "mark_transfer":
+                mark_transfer(db, call_id=call_id, summary=event.get("summary") or "")
+            elif kind == "complete_call":
+                complete_call(db, call_id=call_id, ended_at=_parse_datetime(event.get("ended_at")))
+            else:
+                logger.warning(f"[bridge_events] unknown kind={kind} call_id={call_id}")
+                failed += 1
+                continue
+            applied += 1
+        except Exception as e:
+            db.rollback()
+            if _is_retryable_db_error(e):
+                # 後続のイベント（complete_call など）は順序を守るため一緒に再送させる
+                retry.extend(range(index, len(events)))
+                logger.warning(f"[bridge_events] {kind} deferred call_id={call_id}: {e}")
+                break
+            failed += 1
+            logger.warning(f"[bridge_events] {kind} failed call_id={call_id}: {e}")
+    else:
+        flush_logs()
+    retry.sort()
+    return {"applied": applied, "failed": failed, "retry": retry}
+
+
 def list_calls(
     db: Session,
     *,
@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 import logging
 
 from ..models import Call, CallLog
@@ -13,6 +13,53 @@ from ..config import Settings
 logger = logging.getLogger(__name__)
 
 
+def _log_file(call: Call, settings: Settings) -> Path:
+    """通話ごとのログファイルパス（クライアントディレクトリは作成する）."""
+    # ログベースディレクトリを取得
+    logs_base_dir = settings.logs_base_dir
+    
+    # クライアントディレクトリを作成
+    client_dir = logs_base_dir / call.client_id
+    client_dir.mkdir(parents=True, exist_ok=True)
+    
+    # ファイルパスを構築
+    return client_dir / f"{call.call_id}.log"
+
+
+def _format_line(call: Call, log: CallLog, template_id: Optional[str] = None) -> str:
+    """ログ1件分の行を組み立てる."""
+    # タイムスタンプをJSTに変換（UTCから+9時間）
+    timestamp = log.timestamp
+    if timestamp.tzinfo is None:
+        # タイムゾーン情報がない場合はUTCとして扱う
+        from datetime import UTC
+        timestamp = timestamp.replace(tzinfo=UTC)
+    
+    # JSTに変換（UTC+9）
+    jst_timestamp = timestamp.astimezone()
+    timestamp_str = jst_timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    
+    # caller_numberを取得（callから取得、なければ"-"）
+    caller_number = call.caller_number or "-"
+    
+    # ログ行を構築
+    role_upper = log.role.upper()
+    
+    # 特別なstate（handoff_fail等）の処理
+    if log.state == "handoff_fail":
+        # handoff_failの場合は特別なフォーマット
+        return f"[{timestamp_str}] [{caller_number}] AI ({log.state}) {log.text}\n"
+    elif role_upper == "AI" and template_id:
+        # AIログでテンプレートIDがある場合
+        return f"[{timestamp_str}] [{caller_number}] AI (tpl={template_id}) {log.text}\n"
+    elif role_upper == "AI" and log.state and log.state != "normal":
+        # AIログでstateが特殊な場合（例: handoff_fail以外の特殊state）
+        return f"[{timestamp_str}] [{caller_number}] AI ({log.state}) {log.text}\n"
+    else:
+        # 通常のログ（USERまたは通常のAI）
+        return f"[{timestamp_str}] [{caller_number}] {role_upper} {log.text}\n"
+
+
 def append_log(
     call: Call,
     log: CallLog,
@@ -29,46 +76,8 @@ def append_log(
         template_id: テンプレートID（AIログの場合）
     """
     try:
-        # ログベースディレクトリを取得
-        logs_base_dir = settings.logs_base_dir
-        
-        # クライアントディレクトリを作成
-        client_dir = logs_base_dir / call.client_id
-        client_dir.mkdir(parents=True, exist_ok=True)
-        
-        # ファイルパスを構築
-        log_file = client_dir / f"{call.call_id}.log"
-        
-        # タイムスタンプをJSTに変換（UTCから+9時間）
-        timestamp = log.timestamp
-        if timestamp.tzinfo is None:
-            # タイムゾーン情報がない場合はUTCとして扱う
-            from datetime import UTC
-            timestamp = timestamp.replace(tzinfo=UTC)
-        
-        # JSTに変換（UTC+9）
-        jst_timestamp = timestamp.astimezone()
-        timestamp_str = jst_timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        
-        # caller_numberを取得（callから取得、なければ"-"）
-        caller_number = call.caller_number or "-"
-        
-        # ログ行を構築
-        role_upper = log.role.upper()
-        
-        # 特別なstate（handoff_fail等）の処理
-        if log.state == "handoff_fail":
-            # handoff_failの場合は特別なフォーマット
-            line = f"[{timestamp_str}] [{caller_number}] AI ({log.state}) {log.text}\n"
-        elif role_upper == "AI" and template_id:
-            # AIログでテンプレートIDがある場合
-            line = f"[{timestamp_str}] [{caller_number}] AI (tpl={template_id}) {log.text}\n"
-        elif role_upper == "AI" and log.state and log.state != "normal":
-            # AIログでstateが特殊な場合（例: handoff_fail以外の特殊state）
-            line = f"[{timestamp_str}] [{caller_number}] AI ({log.state}) {log.text}\n"
-        else:
-            # 通常のログ（USERまたは通常のAI）
-            line = f"[{timestamp_str}] [{caller_number}] {role_upper} {log.text}\n"
+        log_file = _log_file(call, settings)
+        line = _format_line(call, log, template_id)
         
         # ファイルに追記
         with open(log_file, "a", encoding="utf-8") as f:
@@ -80,3 +89,30 @@ def append_log(
         # ファイル書き込みエラーは通話処理を止めない
         logger.exception(f"Failed to write file log (call_id={call.call_id}): {e}")
 
+
+def append_logs(
+    call: Call,
+    entries: List[Tuple[CallLog, Optional[str]]],
+    settings: Settings,
+) -> None:
+    """
+    1通話分の複数ログをまとめてファイルに追記（ファイルを開くのは1回）.
+    
+    Args:
+        call: 通話情報
+        entries: (ログエントリ, テンプレートID) のリスト
+        settings: アプリケーション設定
+    """
+    if not entries:
+        return
+    try:
+        log_file = _log_file(call, settings)
+        lines = "".join(_format_line(call, log, template_id) for log, template_id in entries)
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(lines)
+        
+        logger.debug(f"File log written: {log_file} (call_id={call.call_id}, lines={len(entries)})")
+        
+    except Exception as e:
+        # ファイル書き込みエラーは通話処理を止めない
+        logger.exception(f"Failed to write file log (call_id={call.call_id}): {e}")
@@ -1,7 +1,7 @@
 """WebSocket/SSEイベントディスパッチャー."""
 
 import logging
-from typing import Optional
+from typing import List, Optional
 from ..models import CallLog
 
 logger = logging.getLogger(__name__)
@@ -24,6 +24,29 @@ class CallEventDispatcher:
         except Exception as e:
             logger.debug("SSE publish failed: %s", e)
 
+    def send_logs(self, call_id: str, logs: List[CallLog]) -> None:
+        """バッチで追加したログを1イベント（new_logs）でまとめて送信."""
+        if not logs:
+            return
+        try:
+            from ..routers.live import publish_event
+            publish_event(call_id, "new_logs", {
+                "call_id": call_id,
+                "logs": [
+                    {
+                        "id": log.id,
+                        "call_id": call_id,
+                        "role": log.role,
+                        "text": log.text,
+                        "state": log.state,
+                        "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+                    }
+                    for log in logs
+                ],
+            })
+        except Exception as e:
+            logger.debug("SSE publish failed: %s", e)
+
     def send_call_update(self, call_id: str, data: dict) -> None:
         try:
             from ..routers.live import publish_event
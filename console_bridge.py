@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 from uuid import uuid4
 
+from gateway.common.console_outbox import ConsoleOutbox
+
 # requestsはオプショナル（インストールされていない場合もある）
 try:
     import requests
@@ -20,11 +20,8 @@ except ImportError:
 
 try:
     from console_backend import service_client as _service_client
-except Exception as exc:  # pragma: no cover - 例外時のみ
+except Exception:  # pragma: no cover - 例外時のみ
     _service_client = None
-    _IMPORT_ERROR = exc
-else:
-    _IMPORT_ERROR = None
 
 
 def _env_bool(key: str, default: bool = False) -> bool:
@@ -44,11 +41,11 @@ class ConsoleBridge:
         if not enabled_flag:
             self.enabled = False
             self.logger.info("LibertyCall console bridge is disabled via env flag.")
-        elif _service_client is None:
+        elif not REQUESTS_AVAILABLE:
+            # 通話イベント・ログは HTTP（/api/calls/events:batch）で送る
             self.enabled = False
             self.logger.warning(
-                "LibertyCall console bridge requested but console_backend import failed: %s",
-                _IMPORT_ERROR,
+                "LibertyCall console bridge requested but requests is not installed.",
             )
         else:
             self.enabled = True
@@ -56,6 +53,11 @@ class ConsoleBridge:
                 "LibertyCall console bridge enabled (API base: %s)",
                 self.api_base_url,
             )
+        # 通話イベント・ログは送信キューに積み、専用スレッドがまとめて送る
+        # （record_event は enabled に関係なく送るため常に用意する）
+        self.outbox = ConsoleOutbox(
+            os.getenv("LIBERTYCALL_CONSOLE_API_BASE_URL", "http://localhost:8001")
+        )
 
     # ------------------------------------------------------------------ helpers
     def issue_call_id(self, client_id: Optional[str]) -> str:
@@ -67,6 +69,12 @@ class ConsoleBridge:
         microsecond_suffix = str(now.microsecond)[-2:]
         return f"in-{timestamp}{microsecond_suffix}"
 
+    def _enqueue(self, kind: str, call_id: str, **fields) -> None:
+        """通話処理スレッドを止めないよう、送信キューに積むだけにする"""
+        if not self.enabled:
+            return
+        self.outbox.submit(kind, call_id, **fields)
+
     def _safe_call(self, func_name: str, *args, **kwargs) -> None:
         if not self.enabled or _service_client is None:
             return
@@ -86,9 +94,9 @@ class ConsoleBridge:
         started_at: Optional[datetime] = None,
         caller_number: Optional[str] = None,
     ) -> None:
-        self._safe_call(
+        self._enqueue(
             "start_call",
-            call_id=call_id,
+            call_id,
             client_id=client_id,
             started_at=started_at,
             state=state,
@@ -107,9 +115,9 @@ class ConsoleBridge:
         caller_number: Optional[str] = None,
         template_id: Optional[str] = None,
     ) -> None:
-        self._safe_call(
-            "append_call_log",
-            call_id=call_id,
+        self._enqueue(
+            "append_log",
+            call_id,
             role=role,
             text=text,
             state=state,
@@ -120,64 +128,28 @@ class ConsoleBridge:
         )
 
     def mark_transfer(self, call_id: str, summary: str) -> None:
-        self._safe_call("mark_transfer", call_id, summary)
+        self._enqueue("mark_transfer", call_id, summary=summary)
 
     def complete_call(self, call_id: str, *, ended_at: Optional[datetime] = None) -> None:
-        self._safe_call("complete_call", call_id, ended_at=ended_at)
+        self._enqueue("complete_call", call_id, ended_at=ended_at or datetime.utcnow())
 
     def record_event(self, call_id: str, event_type: str, payload: dict) -> None:
         """
         Gatewayで発生したイベントを本番サーバーへ送信
         
         注意: enabled チェックは行わない（常に送信を試みる）
+        送れない間は送信キューのスプールファイルに残り、後で再送される。
         """
-        record = {
-            "call_id": call_id,
-            "event_type": event_type,
-            "payload": payload,
-            "sent_at": datetime.utcnow().isoformat(),
-        }
-        
-        # 本番APIに送信を試みる
-        if REQUESTS_AVAILABLE:
-            try:
-                # 本番API URL（環境変数から取得、デフォルトはlocalhost）
-                # 本番環境では環境変数で https://console.com を指定
-                api_url = os.getenv(
-                    "LIBERTYCALL_CONSOLE_API_BASE_URL",
-                    "http://localhost:8001"  # 開発環境用デフォルト
-                )
-                url = f"{api_url}/api/calls/record_event"
-                
-                response = requests.post(url, json=record, timeout=5)
-                if response.status_code == 200:
-                    self.logger.info(
-                        f"[CALL_EVENT_REMOTE] {event_type} sent successfully to {url} for {call_id}"
-                    )
-                    return  # 成功したら終了
-                else:
-                    self.logger.warning(
-                        f"[CALL_EVENT_REMOTE] Failed to send event: {response.status_code} - {response.text[:100]}"
-                    )
-            except Exception as e:
-                self.logger.warning(
-                    f"[CALL_EVENT_REMOTE] Failed to send event to remote API: {e}"
-                )
-        
-        # フォールバック: ローカルファイルに記録
-        try:
-            fallback = Path("/opt/libertycall/logs/call_events_fallback.log")
-            fallback.parent.mkdir(parents=True, exist_ok=True)
-            with fallback.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
-            self.logger.info(
-                f"[CALL_EVENT_FALLBACK] {event_type} recorded to fallback log for {call_id}"
-            )
-        except Exception as e:
-            self.logger.error(
-                f"[CALL_EVENT_ERROR] failed to record {event_type} for {call_id}: {e}",
-                exc_info=True,
-            )
+        if self.outbox.submit(
+            "record_event",
+            call_id,
+            event_type=event_type,
+            payload=payload,
+            sent_at=datetime.utcnow().isoformat(),
+        ):
+            self.logger.info(f"[CALL_EVENT_QUEUED] {event_type} queued for {call_id}")
+        else:
+            self.logger.error(f"[CALL_EVENT_ERROR] outbox full, dropped {event_type} for {call_id}")
 
     def send_audio_level(
         self,
@@ -102,6 +102,13 @@ if rtp_info_file then
     freeswitch.consoleLog("INFO", "[RTP_INFO] Saved to /tmp/rtp_info_" .. uuid .. ".txt\n")
 end
 
+-- Gatewayへ直接通知（gateway_event_listener がイベントソケット経由で転送する）
+local rtp_event = freeswitch.Event("CUSTOM", "libertycall::rtp_info")
+rtp_event:addHeader("Unique-ID", uuid)
+rtp_event:addHeader("RTP-Local", local_rtp)
+rtp_event:addHeader("RTP-Remote", remote_rtp)
+rtp_event:fire()
+
 freeswitch.consoleLog("ERR", "[RTP_STREAM] BEFORE answer answered=" .. tostring(session:answered()) .. "\n")
 if not session:answered() then
     session:answer()
@@ -133,8 +140,8 @@ session:sleep(2000)
 -- 無音監視と催促制御（Lua側で完結）
 -- ========================================
 
--- ASR反応フラグファイルパス
-local asr_response_flag_file = string.format("/tmp/asr_response_%s.flag", uuid)
+-- ASR反応はGatewayがチャネル変数で通知する（uuid_setvar）
+local asr_response_var = "lc_asr_response"
 
 -- 催促音声ファイル
 local reminders = {
@@ -171,11 +178,10 @@ while session:ready() and not asr_response_detected and prompt_count < 3 do
     --     tostring(session:ready()), tostring(asr_response_detected), prompt_count, elapsed
     -- ))
     
-    -- ASR反応フラグファイルをチェック
-    local flag_file = io.open(asr_response_flag_file, "r")
-    if flag_file then
-        io.close(flag_file)
-        freeswitch.consoleLog("INFO", string.format("[CALLFLOW] ASR response detected! Flag file exists: %s\n", asr_response_flag_file))
+    -- ASR反応をチェック（チャネル変数。ファイルは開かない）
+    local asr_response = session:getVariable(asr_response_var)
+    if asr_response and asr_response ~= "" then
+        freeswitch.consoleLog("INFO", string.format("[CALLFLOW] ASR response detected! %s=%s\n", asr_response_var, asr_response))
         asr_response_detected = true
         break
     end
@@ -50,6 +50,12 @@ function LiveCallDetail() {
             if (exists) return prev
             return [...prev, parsed.data]
           })
+        } else if (parsed.event === 'new_logs') {
+          setLogs(prev => {
+            const seen = new Set(prev.map(l => l.id))
+            const added = (parsed.data.logs || []).filter(l => !seen.has(l.id))
+            return added.length ? [...prev, ...added] : prev
+          })
         } else if (parsed.event === 'call_update') {
           setCall(prev => prev ? { ...prev, ...parsed.data } : prev)
         }
@@ -7,168 +7,201 @@ import numpy as np
 import os
 import time
 import audioop
-from typing import Optional, Tuple, Union
-from scipy.signal import resample_poly
+from typing import Dict, Optional, Tuple, Union
+
+from .rtp_parser import RTPPacketView
+from ..audio.audio_conditioner import AudioConditioner
+from ..common.streaming_resampler import StreamingResampler
+
+try:
+    from asr_handler import get_or_create_handler
+except ImportError:
+    get_or_create_handler = None
+try:
+    from .google_stream_asr import GoogleStreamingASR
+except ImportError:
+    GoogleStreamingASR = None
+
+# 静的ペイロードタイプ（RFC 3551）→ デコード方法
+_STATIC_PAYLOAD_METHODS: Dict[int, str] = {0: "ulaw", 8: "alaw", 10: "l16", 11: "l16"}
+# SDP (variable_read_codec_name) → デコード方法
+_SDP_CODEC_METHODS: Dict[str, str] = {"PCMU": "ulaw", "PCMA": "alaw", "L16": "l16"}
+_PROBE_METHODS = ("ulaw", "alaw", "l16")
+_PROBE_MAX_OFFSET = 4
+_PROBE_SCORE_BYTES = 1000
+# 動的ペイロードタイプ時に総当たり判定するパケット数（通話開始直後のみ）
+_DEFAULT_PROBE_WINDOW_PACKETS = int(os.getenv("LC_RTP_CODEC_PROBE_PACKETS", "5"))
+# ASR投入前の音声整形（デコード後の PCM16 にゲイン / DC除去 / クリップ）
+_ASR_INPUT_GAIN = float(os.getenv("LC_ASR_INPUT_GAIN", "1.0"))
+_ASR_REMOVE_DC = os.getenv("LC_ASR_REMOVE_DC", "1") == "1"
 
 
 class ASRAudioProcessor:
     def __init__(self, manager: "GatewayASRManager") -> None:
         self.manager = manager
         self.logger = manager.logger
+        # SSRC -> (payload_type, method, offset)
+        self._codec_cache: Dict[int, Tuple[int, str, int]] = {}
+        # SSRC -> (payload_type, {(method, offset): votes})
+        self._probe_windows: Dict[int, Tuple[int, Dict[Tuple[str, int], int]]] = {}
+        # SSRC -> SDPで確定したデコード方法
+        self._negotiated_codecs: Dict[int, str] = {}
+        self.probe_window_packets = max(1, _DEFAULT_PROBE_WINDOW_PACKETS)
+        self.codec_stats: Dict[str, int] = {
+            "fast_path_packets": 0,
+            "probe_packets": 0,
+            "decisions": 0,
+            "reprobes": 0,
+        }
+        # call_id -> 通話ごとの音声整形ステージ（初回のみ生成）
+        self._conditioners: Dict[str, AudioConditioner] = {}
+        # call_id -> 通話ごとの 8k→16k リサンプラー（フィルタ状態を保持）
+        self._resamplers: Dict[str, StreamingResampler] = {}
+
+    def set_negotiated_codec(self, ssrc: int, codec_name: Optional[str]) -> bool:
+        """SDPで確定したコーデック（read_codec_name）をSSRCに事前登録する"""
+        method = _SDP_CODEC_METHODS.get((codec_name or "").upper())
+        if method is None:
+            return False
+        self._negotiated_codecs[ssrc] = method
+        # 既存の判定は次パケットでSDP情報に従って再確定させる
+        self._codec_cache.pop(ssrc, None)
+        self._probe_windows.pop(ssrc, None)
+        self.logger.info(f"[CODEC_CACHE] ssrc={ssrc:#010x} negotiated codec={codec_name} method={method}")
+        return True
+
+    def forget_ssrc(self, ssrc: int) -> None:
+        """通話終了時にSSRCごとの判定キャッシュを破棄する"""
+        self._codec_cache.pop(ssrc, None)
+        self._probe_windows.pop(ssrc, None)
+        self._negotiated_codecs.pop(ssrc, None)
+
+    def get_conditioner(self, call_id: str) -> AudioConditioner:
+        """通話ごとの音声整形ステージ（初回のみ生成。DC除去のフィルタ状態をフレーム間で引き継ぐ）"""
+        conditioner = self._conditioners.get(call_id)
+        if conditioner is None:
+            # L16 はデコード時にネイティブバイトオーダーへ変換済みなのでスワップしない
+            conditioner = AudioConditioner(
+                gain=_ASR_INPUT_GAIN,
+                remove_dc=_ASR_REMOVE_DC,
+            )
+            self._conditioners[call_id] = conditioner
+        return conditioner
+
+    def get_resampler(self, call_id: str) -> StreamingResampler:
+        """通話ごとの 8k→16k リサンプラー（初回のみ生成。フィルタ状態をチャンク間で引き継ぐ）"""
+        resampler = self._resamplers.get(call_id)
+        if resampler is None:
+            resampler = StreamingResampler(2, 1)
+            self._resamplers[call_id] = resampler
+        return resampler
+
+    def release_call(self, call_id: str) -> None:
+        """通話終了時に通話ごとの整形バッファ・リサンプラー状態を破棄する"""
+        self._conditioners.pop(call_id, None)
+        self._resamplers.pop(call_id, None)
+
+    def get_codec_stats(self) -> Dict[str, int]:
+        """プロービング回数などのカウンタを返す（監視用）"""
+        stats = dict(self.codec_stats)
+        stats["cached_ssrcs"] = len(self._codec_cache)
+        stats["probing_ssrcs"] = len(self._probe_windows)
+        return stats
 
     def extract_rtp_payload(self, data: bytes) -> bytes:
-        # 【RTPペイロードの完全な生データを100バイトだけ16進数で出力】
-        if len(data) >= 12:
-            payload_raw = data[12:]
-            self.logger.warning(f"[RTP_RAW_PAYLOAD_100BYTES] Raw payload (first 100 bytes): {payload_raw[:100].hex()}")
-            
-            # 【バイト・アライメント（ズレ）の確認】
-            # パケットの先頭に0x80や0x00のような規則的なヘッダーが残っていないか？
-            head_bytes = payload_raw[:10]
-            head_hex = head_bytes.hex()
-            self.logger.warning(f"[RTP_HEADER_CHECK] First 10 bytes: {head_hex}")
-            
-            # オフセットをずらしたデコードも試す（1-4バイトずらしてテスト）
-            best_offset_payload = None
-            best_offset_unique = 0
-            best_offset_method = "unknown"
-            
-            for offset in range(0, 5):  # 0-4バイトオフセットを試す
-                if len(payload_raw) > offset:
-                    offset_payload = payload_raw[offset:]
-                    self.logger.info(f"[OFFSET_TEST] Testing offset={offset}, remaining_bytes={len(offset_payload)}")
-                    
-                    # 各オフセットで3パターンのデコードを試す
-                    offset_best_unique = 0
-                    offset_best_payload = None
-                    offset_best_method = "unknown"
-                    
-                    # 方法1: μ-lawデコード
-                    try:
-                        ulaw_decoded = audioop.ulaw2lin(offset_payload, 2)
-                        ulaw_samples = np.frombuffer(ulaw_decoded[:1000], dtype=np.int16) if len(ulaw_decoded) >= 1000 else np.frombuffer(ulaw_decoded, dtype=np.int16)
-                        ulaw_unique = len(np.unique(ulaw_samples))
-                        self.logger.info(f"[OFFSET_{offset}_ULAW] unique values: {ulaw_unique}")
-                        
-                        if ulaw_unique > offset_best_unique:
-                            offset_best_unique = ulaw_unique
-                            offset_best_payload = ulaw_decoded
-                            offset_best_method = "ulaw"
-                    except Exception as e:
-                        self.logger.debug(f"[OFFSET_{offset}_ULAW] decode failed: {e}")
-                    
-                    # 方法2: A-lawデコード
-                    try:
-                        alaw_decoded = audioop.alaw2lin(offset_payload, 2)
-                        alaw_samples = np.frombuffer(alaw_decoded[:1000], dtype=np.int16) if len(alaw_decoded) >= 1000 else np.frombuffer(alaw_decoded, dtype=np.int16)
-                        alaw_unique = len(np.unique(alaw_samples))
-                        self.logger.info(f"[OFFSET_{offset}_ALAW] unique values: {alaw_unique}")
-                        
-                        if alaw_unique > offset_best_unique:
-                            offset_best_unique = alaw_unique
-                            offset_best_payload = alaw_decoded
-                            offset_best_method = "alaw"
-                    except Exception as e:
-                        self.logger.debug(f"[OFFSET_{offset}_ALAW] decode failed: {e}")
-                    
-                    # 方法3: そのまま（L16）
-                    try:
-                        l16_samples = np.frombuffer(offset_payload[:1000], dtype=np.int16) if len(offset_payload) >= 1000 else np.frombuffer(offset_payload, dtype=np.int16)
-                        l16_unique = len(np.unique(l16_samples))
-                        self.logger.info(f"[OFFSET_{offset}_L16] unique values: {l16_unique}")
-                        
-                        if l16_unique > offset_best_unique:
-                            offset_best_unique = l16_unique
-                            offset_best_payload = offset_payload
-                            offset_best_method = "l16"
-                    except Exception as e:
-                        self.logger.debug(f"[OFFSET_{offset}_L16] analysis failed: {e}")
-                    
-                    self.logger.info(f"[OFFSET_{offset}_BEST] method={offset_best_method}, unique={offset_best_unique}")
-                    
-                    # 全オフセットの中で最も良いものを記録
-                    if offset_best_unique > best_offset_unique:
-                        best_offset_unique = offset_best_unique
-                        best_offset_payload = offset_best_payload
-                        best_offset_method = f"offset_{offset}_{offset_best_method}"
-            
-            self.logger.warning(f"[GLOBAL_BEST] method={best_offset_method}, unique values={best_offset_unique}")
-            
-            # 【無音（DCオフセット）の除去】
-            if best_offset_payload is not None:
-                try:
-                    samples = np.frombuffer(best_offset_payload, dtype=np.int16)
-                    dc_offset = np.mean(samples)
-                    self.logger.info(f"[DC_OFFSET] before removal: {dc_offset:.2f}")
-                    
-                    # DCオフセットを除去（閾値を下げてより積極的に対応）
-                    if abs(dc_offset) > 50:  # 閾値を100から50に下げ
-                        dc_corrected_samples = samples - dc_offset
-                        dc_corrected_samples = np.clip(dc_corrected_samples, -32768, 32767)
-                        dc_corrected_payload = dc_corrected_samples.astype(np.int16).tobytes()
-                        
-                        # 除去後の分析
-                        dc_corrected_unique = len(np.unique(dc_corrected_samples[:1000]))
-                        self.logger.info(f"[DC_OFFSET] removed, unique values: {dc_corrected_unique}")
-                        
-                        if dc_corrected_unique > best_offset_unique:
-                            best_offset_payload = dc_corrected_payload
-                            best_offset_unique = dc_corrected_unique
-                            self.logger.info(f"[DC_OFFSET] Using DC corrected payload")
-                    else:
-                        self.logger.info(f"[DC_OFFSET] minimal, keeping original")
-                        
-                except Exception as e:
-                    self.logger.error(f"[DC_OFFSET] correction failed: {e}")
-            
-            # 【自動音量調整】RMSを計算して適切なレベルに増幅
-            if best_offset_payload is not None:
+        packet = RTPPacketView(data)
+        if not packet.valid:
+            self.logger.warning(f"[FALLBACK] Malformed RTP packet: {len(data)} bytes")
+            return data
+        return self.decode_payload(packet.ssrc, packet.payload_type, packet.payload_bytes())
+
+    def decode_payload(self, ssrc: int, payload_type: int, payload_raw: bytes) -> bytes:
+        """ヘッダー除去済みのペイロードを、SSRCごとに確定したコーデックで PCM16 にデコードする"""
+        if not payload_raw:
+            return payload_raw
+
+        # 【高速パス】SSRCごとに確定済みのコーデック/オフセットで1回だけデコード
+        decision = self._codec_cache.get(ssrc)
+        if decision is not None:
+            if decision[0] == payload_type:
+                self.codec_stats["fast_path_packets"] += 1
+                return self._decode_payload(payload_raw, decision[1], decision[2])
+            # ペイロードタイプが変わった場合のみ再判定
+            self.logger.info(
+                f"[CODEC_CACHE] ssrc={ssrc:#010x} payload_type changed {decision[0]} -> {payload_type}, re-probing"
+            )
+            self.codec_stats["reprobes"] += 1
+            del self._codec_cache[ssrc]
+
+        # SDP or 静的ペイロードタイプで確定できる場合はプローブ不要
+        method = self._negotiated_codecs.get(ssrc) or _STATIC_PAYLOAD_METHODS.get(payload_type)
+        if method is not None:
+            self._settle_codec(ssrc, payload_type, method, 0, reason="payload_type")
+            return self._decode_payload(payload_raw, method, 0)
+
+        # 動的ペイロードタイプ等：通話開始直後の数パケットだけ総当たりで判定
+        return self._probe_payload(ssrc, payload_type, payload_raw)
+
+    def _settle_codec(self, ssrc: int, payload_type: int, method: str, offset: int, reason: str) -> None:
+        self._codec_cache[ssrc] = (payload_type, method, offset)
+        self._probe_windows.pop(ssrc, None)
+        self.codec_stats["decisions"] += 1
+        self.logger.info(
+            f"[CODEC_CACHE] ssrc={ssrc:#010x} settled payload_type={payload_type} method={method} offset={offset} reason={reason}"
+        )
+
+    @staticmethod
+    def _decode_payload(payload: bytes, method: str, offset: int) -> bytes:
+        if offset:
+            payload = payload[offset:]
+        if method == "ulaw":
+            return audioop.ulaw2lin(payload, 2)
+        if method == "alaw":
+            return audioop.alaw2lin(payload, 2)
+        # L16 はネットワークバイトオーダー（ビッグエンディアン）
+        return np.frombuffer(payload, dtype=">i2", count=len(payload) // 2).astype(np.int16).tobytes()
+
+    def _probe_payload(self, ssrc: int, payload_type: int, payload_raw: bytes) -> bytes:
+        self.codec_stats["probe_packets"] += 1
+
+        # オフセット0-4 × 3コーデック（μ-law / A-law / L16）でユニーク値数が最大のものを選ぶ
+        best_payload = payload_raw
+        best_unique = 0
+        best_choice = ("l16", 0)
+        for offset in range(0, _PROBE_MAX_OFFSET + 1):
+            if len(payload_raw) <= offset:
+                break
+            offset_payload = payload_raw[offset:]
+            for method in _PROBE_METHODS:
                 try:
-                    samples = np.frombuffer(best_offset_payload, dtype=np.int16)
-                    rms = np.sqrt(np.mean(samples.astype(np.float32) ** 2))
-                    self.logger.info(f"[VOLUME_CHECK] {best_offset_method} RMS: {rms:.2f}")
-                    
-                    # 🔥 水増しを全廃。生の声の鮮度だけを追求。
-                    # 増幅は一切行わず、RTPから届いた生の声をそのまま使用
-                    self.logger.warning(f"[NO_AMPLIFICATION] Using raw voice without amplification - RMS: {rms:.2f}")
-                    best_offset_unique = len(np.unique(samples[:1000]))
-                    
-                    # 🔥 合成ノイズと強制正規化を全廃
-                    # 生の声以外は一切使用しない
-                    
-                    # 【サンプリングレート固定】8kHzのまま生で投げる
-                    self.logger.warning(f"[RAW_8KHZ] Sending raw 8kHz voice without resampling - unique: {best_offset_unique}")
-                    
-                    if best_offset_unique > 100:  # 閾値を下げて生の声を重視
-                        self.logger.info(f"[RAW_VOICE] Natural voice detected with {best_offset_unique} unique values")
-                        return best_offset_payload
-                    else:
-                        self.logger.warning(f"[RAW_VOICE] Too few unique values ({best_offset_unique}), but using raw voice anyway")
-                        return best_offset_payload
-                        
+                    decoded = self._decode_payload(offset_payload, method, 0)
+                    samples = np.frombuffer(decoded[:_PROBE_SCORE_BYTES], dtype=np.int16)
+                    unique = len(np.unique(samples))
                 except Exception as e:
-                    self.logger.error(f"[VOLUME_CHECK] {best_offset_method} processing failed: {e}")
-                    return best_offset_payload
-            
-            # 従来のペイロードタイプ判定（フォールバック）
-            payload_type = data[1] & 0x7F
-            self.logger.info(f"[FALLBACK] RTP payload_type={payload_type}, data_len={len(data)}")
-            
-            if payload_type == 0:  # PCMU (μ-law)
-                self.logger.warning("[FALLBACK] Detected PCMU (μ-law)")
-                return audioop.ulaw2lin(payload_raw, 2) if len(payload_raw) > 0 else data[12:]
-            elif payload_type == 8:  # PCMA (A-law)
-                self.logger.warning("[FALLBACK] Detected PCMA (A-law)")
-                return audioop.alaw2lin(payload_raw, 2) if len(payload_raw) > 0 else data[12:]
-            elif payload_type == 127:  # 動的ペイロードタイプ
-                self.logger.info("[FALLBACK] Dynamic payload type")
-                return payload_raw
-            else:
-                self.logger.warning(f"[FALLBACK] Unknown payload_type={payload_type}")
-                return payload_raw
-        else:
-            self.logger.warning(f"[FALLBACK] Too short data: {len(data)} bytes")
-            return data
+                    self.logger.debug(f"[OFFSET_{offset}_{method.upper()}] decode failed: {e}")
+                    continue
+                if unique > best_unique:
+                    best_unique = unique
+                    best_payload = decoded
+                    best_choice = (method, offset)
+
+        self.logger.debug(
+            f"[CODEC_PROBE] ssrc={ssrc:#010x} payload_type={payload_type} "
+            f"best={best_choice[0]} offset={best_choice[1]} unique={best_unique}"
+        )
+
+        # プローブ窓の多数決で確定
+        window = self._probe_windows.get(ssrc)
+        if window is None or window[0] != payload_type:
+            window = (payload_type, {})
+            self._probe_windows[ssrc] = window
+        votes = window[1]
+        votes[best_choice] = votes.get(best_choice, 0) + 1
+        if sum(votes.values()) >= self.probe_window_packets:
+            method, offset = max(votes.items(), key=lambda item: item[1])[0]
+            self._settle_codec(ssrc, payload_type, method, offset, reason="probe")
+
+        return best_payload
 
     def log_rtp_payload_debug(self, pcm_data: bytes, effective_call_id: Optional[str]) -> None:
         manager = self.manager
@@ -261,48 +294,8 @@ class ASRAudioProcessor:
             # L16 PCM16データを直接処理
             pcm = np.frombuffer(pcm_data, dtype=np.int16)
             
-            # 【徹底分析】パケットの中身を確認
-            if len(pcm) > 0:
-                max_sample = np.max(np.abs(pcm))
-                min_sample = np.min(pcm)
-                mean_sample = np.mean(pcm)
-                # 最初の10サンプルをhexで出力
-                first_10_hex = pcm[:10].tobytes().hex()
-                
-                self.logger.info(f"[PACKET_ANALYSIS] len={len(pcm)} max={max_sample} min={min_sample} mean={mean_sample:.3f}")
-                self.logger.info(f"[PACKET_ANALYSIS] first_10_hex={first_10_hex}")
-                
-                # 【エンディアン確認】0xffffパターンは無音データ
-                if first_10_hex.startswith('ffff'):
-                    self.logger.info("[BYTE_ORDER] Detected silent audio (ffff) - no byteswap needed")
-                else:
-                    self.logger.warning(f"[BYTE_ORDER] Unexpected pattern: {first_10_hex}")
-                
-                # 【ゲイン再強化】10倍に増幅してテスト
-                pcm_amplified = np.clip(pcm * 10, -32768, 32767)
-                max_amp = np.max(np.abs(pcm_amplified))
-                self.logger.info(f"[PACKET_ANALYSIS] after_10x_gain max_amp={max_amp}")
-                
-                # 【サンプリングレート強制一致】FreeSWITCHは16kHzで送信している
-                pcm_data = pcm_amplified.astype(np.int16).tobytes()
-                self.logger.info(f"[SAMPLING_RATE] Using 16kHz as confirmed from FreeSWITCH")
-                
-                # 【ASR設定確認】現在の設定をログ出力
-                asr_sample_rate = getattr(self.manager, 'sample_rate', 'UNKNOWN')
-                asr_language = getattr(self.manager, 'language_code', 'UNKNOWN')
-                self.logger.info(f"[ASR_CONFIG_CHECK] sample_rate={asr_sample_rate}, language_code={asr_language}")
-                
-                # 元の2倍増幅も比較用に保持
-                pcm_original = np.clip(pcm * 2, -32768, 32767)
-            else:
-                self.logger.warning(f"[PACKET_ANALYSIS] Empty PCM data!")
-                pcm_amplified = pcm
-                pcm_original = pcm
-            
-            pcm_data = pcm_amplified.astype(np.int16).tobytes()
-            
             # RMS計算（正規化: -32768～32767 → -1.0～1.0）
-            rms = np.sqrt(np.mean((pcm_amplified.astype(np.float32) / 32768.0) ** 2))
+            rms = np.sqrt(np.mean((pcm.astype(np.float32) / 32768.0) ** 2)) if len(pcm) else 0.0
             
             # 【VADバイパス】強制的に音声ありと判定（テスト用）
             is_voice = True
@@ -328,8 +321,9 @@ class ASRAudioProcessor:
                 self.logger.info(f"[DIRECT_SEND] is_voice=True, executing guaranteed send pipeline")
                 
                 try:
-                    from asr_handler import get_or_create_handler
-                    from google_stream_asr import GoogleStreamingASR
+                    if get_or_create_handler is None or GoogleStreamingASR is None:
+                        self.logger.error(f"[DIRECT_SEND] ASR handler modules unavailable")
+                        return rms, True
                     
                     effective_call_id = getattr(manager, 'call_id', None) or getattr(manager, '_effective_call_id', None)
                     if not effective_call_id:
@@ -349,25 +343,17 @@ class ASRAudioProcessor:
                         start_result = handler.asr.start_stream()
                         self.logger.info(f"[DIRECT_SEND] ASR streaming started: {start_result}")
                     
-                    # 確実なデータ準備（ゲイン10倍 + バイトオーダー反転）
-                    final_pcm = np.clip(pcm * 10, -32768, 32767)
-                    final_bytes = final_pcm.astype(np.int16).tobytes()
-                    swapped_bytes = bytearray(len(final_bytes))
-                    for i in range(0, len(final_bytes), 2):
-                        if i + 1 < len(final_bytes):
-                            swapped_bytes[i] = final_bytes[i + 1]
-                            swapped_bytes[i + 1] = final_bytes[i]
+                    # 確実なデータ準備（通話ごとの整形ステージ、事前確保バッファで処理）
+                    conditioner = self.get_conditioner(effective_call_id)
+                    final_swapped_bytes = conditioner.process(pcm)
                     
                     # ASR入口ログ
                     try:
                         with open("/tmp/gateway_google_asr.trace", "a") as f:
-                            f.write(f"[ASR_FEED] len={len(swapped_bytes)} call_id={effective_call_id}\n")
+                            f.write(f"[ASR_FEED] len={len(final_swapped_bytes)} call_id={effective_call_id}\n")
                     except Exception:
                         pass
                     
-                    # bytearrayをbytesに変換（Google ASRの型要求）
-                    final_swapped_bytes = bytes(swapped_bytes)
-                    
                     # 確実な送信実行
                     self.logger.info(f"[DIRECT_SEND] Sending {len(final_swapped_bytes)} bytes to ASR")
                     handler.asr.add_audio(final_swapped_bytes)
@@ -391,8 +377,9 @@ class ASRAudioProcessor:
                             self.logger.warning(f"[VOICE_MONITOR] Audio data: {len(final_swapped_bytes)} bytes, first_20_hex={final_swapped_bytes[:20].hex()}")
                             
                             # 音声データの内容を分析
-                            max_sample = np.max(np.abs(final_pcm))
-                            mean_sample = np.mean(np.abs(final_pcm))
+                            final_pcm = conditioner.last_samples
+                            max_sample = np.max(np.abs(final_pcm)) if final_pcm is not None else 0
+                            mean_sample = np.mean(np.abs(final_pcm)) if final_pcm is not None else 0.0
                             self.logger.warning(f"[VOICE_MONITOR] Audio analysis: max={max_sample}, mean_abs={mean_sample:.3f}")
                             
                             if max_sample < 100:
@@ -407,7 +394,7 @@ class ASRAudioProcessor:
                     self.logger.error(f"[DIRECT_SEND] Pipeline failed: {e}", exc_info=True)
             
             # デバッグ：RMS値と判定結果を記録（毎回出力）
-            self.logger.info(f"[VAD_ANALYSIS] RMS={rms:.6f}, threshold={threshold}, is_voice={is_voice}")
+            self.logger.debug(f"[VAD_ANALYSIS] RMS={rms:.6f}, threshold={threshold}, is_voice={is_voice}")
             
         except Exception as exc:
             # エラー時は有音と判定（安全側に倒す）
@@ -601,6 +588,8 @@ class ASRAudioProcessor:
                     )
                     manager.tts_queue.clear()
                     manager.is_speaking_tts = False
+                    # 合成中の残りの文節も取り消す
+                    manager._tts_epoch = getattr(manager, "_tts_epoch", 0) + 1
                     # バージイン時もバッファとタイマーをクリア
                     manager.audio_buffer = bytearray()
                     manager.current_segment_start = None
@@ -618,10 +607,8 @@ class ASRAudioProcessor:
             except Exception as exc:
                 self.logger.error("録音エラー: %s", exc, exc_info=True)
 
-        # 8kHz → 16kHz リサンプリング（resample_poly使用）
-        pcm16_array = np.frombuffer(pcm16_8k_ns, dtype=np.int16)
-        pcm16k_array = resample_poly(pcm16_array, 2, 1)  # 8kHz → 16kHz
-        pcm16k_chunk = pcm16k_array.astype(np.int16).tobytes()
+        # 8kHz → 16kHz リサンプリング（通話ごとにフィルタ状態を引き継ぐストリーミング変換）
+        pcm16k_chunk = self.get_resampler(effective_call_id).process_bytes(pcm16_8k_ns)
 
         # --- PCM16kデータのデバッグ（最初の数回のみ出力） ---
         if not hasattr(manager, "_pcm16k_debug_count"):
@@ -13,6 +13,7 @@ import audioop
 
 
 from .audio_processor import AudioProcessor
+from .asr_audio_processor import ASRAudioProcessor
 from .asr_stream_handler import ASRStreamHandler
 
 
@@ -91,9 +92,11 @@ class GatewayASRManager:
         self.gateway = gateway
         self.logger = logging.getLogger(__name__)
         
+        # SSRCごとのコーデック判定・通話ごとの整形/リサンプラー状態（通話開始・終了で登録・破棄）
+        self.asr_audio_processor = ASRAudioProcessor(self)
         # 音声プロセッサーを作成
         try:
-            self.audio_processor = AudioProcessor()
+            self.audio_processor = AudioProcessor(asr_audio_processor=self.asr_audio_processor)
         except Exception as e:
             raise
         
@@ -157,6 +160,8 @@ class GatewayASRManager:
                 self._call_addr_map[rtp_addr] = call_id
                 if session_info["ssrc"] is not None:
                     self._ssrc_call_map[session_info["ssrc"]] = call_id
+                    # SDPで確定したコーデックがあればプローブせずに使う
+                    self.asr_audio_processor.set_negotiated_codec(session_info["ssrc"], codec)
 
                 self.logger.info(
                     "[GatewayASRManager] Started ASR session call_id=%s codec=%s addr=%s",
@@ -177,6 +182,8 @@ class GatewayASRManager:
     async def stop_asr_for_call(self, call_id: str) -> None:
         async with self._session_lock:
             session = self.active_sessions.pop(call_id, None)
+            # セッションが無くても通話ごとの整形/リサンプラー状態は残さない
+            self.asr_audio_processor.release_call(call_id)
             if not session:
                 self.logger.warning("[GatewayASRManager] No active ASR session for call_id=%s", call_id)
                 return
@@ -188,12 +195,20 @@ class GatewayASRManager:
                 self._call_addr_map.pop(rtp_addr, None)
             if ssrc and ssrc in self._ssrc_call_map:
                 self._ssrc_call_map.pop(ssrc, None)
+            if ssrc is not None:
+                self.asr_audio_processor.forget_ssrc(ssrc)
 
             self._rtp_packet_count.pop(call_id, None)
 
             self.logger.info("[GatewayASRManager] Stopped ASR session call_id=%s", call_id)
 
-    async def process_rtp_audio_for_call(self, call_id: str, packet: bytes) -> None:
+    async def process_rtp_audio_for_call(
+        self,
+        call_id: str,
+        packet: bytes,
+        ssrc: Optional[int] = None,
+        payload_type: Optional[int] = None,
+    ) -> None:
         session = self.active_sessions.get(call_id)
         if not session:
             return
@@ -209,7 +224,13 @@ class GatewayASRManager:
             )
 
         try:
-            processed = processor.process_rtp_audio(packet, addr=session.get("rtp_addr", ("0.0.0.0", 0)))
+            processed = processor.process_rtp_audio(
+                packet,
+                addr=session.get("rtp_addr", ("0.0.0.0", 0)),
+                call_id=call_id,
+                ssrc=session.get("ssrc") if ssrc is None else ssrc,
+                payload_type=payload_type,
+            )
             if processed and self.stream_handler:
                 try:
                     rms_16k = audioop.rms(processed, 2)
@@ -253,6 +274,7 @@ class GatewayASRManager:
                         ).encode()
                     )
                 except BaseException as e:
+                    pass
                 
                 # 4. AudioProcessor 呼び出し
                 processed = p.process_rtp_audio(data, addr)
@@ -266,9 +288,12 @@ class GatewayASRManager:
                     if p.stream_handler:
                         p.stream_handler.handle_streaming_chunk(processed)
                     else:
+                        pass
                 else:
                     # VADで落とされた場合はここに来る
+                    pass
             else:
+                pass
 
         except BaseException as e:
             import traceback
@@ -1,16 +1,189 @@
 """RTP sequence handling for ASR."""
 from __future__ import annotations
 
-from typing import Optional, Tuple, TYPE_CHECKING
+import os
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .rtp_parser import RTPPacketView
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from gateway.asr.asr_manager import GatewayASRManager
 
+# 1パケット = 20ms（8kHz μ-law/A-law なら160バイト）
+FRAME_DURATION_MS = 20
+_DEFAULT_FRAME_BYTES = 160
+# 無音補間に使うバイト値（ペイロードタイプ別: PCMU=0xFF, PCMA=0xD5, L16=0x00）
+_SILENCE_BYTES: Dict[int, int] = {0: 0xFF, 8: 0xD5}
+
+JITTER_RING_SIZE = int(os.getenv("LC_RTP_JITTER_RING_SIZE", "64"))
+JITTER_DELAY_MS = int(os.getenv("LC_RTP_JITTER_DELAY_MS", "60"))
+JITTER_MIN_DELAY_MS = int(os.getenv("LC_RTP_JITTER_MIN_DELAY_MS", "20"))
+JITTER_MAX_DELAY_MS = int(os.getenv("LC_RTP_JITTER_MAX_DELAY_MS", "200"))
+
+
+class RTPJitterBuffer:
+    """
+    1 SSRC 分の適応型ジッタバッファ
+
+    - シーケンス番号 % ring_size で引く固定長リングに保持（16bitラップアラウンド対応）
+    - 次に再生すべきフレームが揃っていれば即座に払い出す（順序通りなら遅延ゼロ）
+    - 欠落がある場合は playout_delay フレーム分だけ後続を待ち、それでも来なければ無音で補間
+    - 補間済みの位置に遅れて届いたパケットは late として破棄し、待ち時間を1フレーム延ばす
+    - late が一定期間発生しなければ待ち時間を1フレームずつ縮める
+
+    push() / flush() は常に連続した 20ms フレームのリストを返す。
+    """
+
+    ADAPT_WINDOW_FRAMES = 500  # 約10秒間 late が無ければ遅延を縮める
+
+    def __init__(
+        self,
+        ring_size: int = JITTER_RING_SIZE,
+        playout_delay_ms: int = JITTER_DELAY_MS,
+        min_delay_ms: int = JITTER_MIN_DELAY_MS,
+        max_delay_ms: int = JITTER_MAX_DELAY_MS,
+        silence_byte: int = 0x00,
+    ) -> None:
+        self.ring_size = max(4, ring_size)
+        self.min_delay = max(1, min_delay_ms // FRAME_DURATION_MS)
+        self.max_delay = max(self.min_delay, min(max_delay_ms // FRAME_DURATION_MS, self.ring_size - 1))
+        self.playout_delay = min(max(self.min_delay, playout_delay_ms // FRAME_DURATION_MS), self.max_delay)
+        self.silence_byte = silence_byte
+        self.frame_bytes = _DEFAULT_FRAME_BYTES
+
+        # スロット: (拡張シーケンス番号, ペイロード)
+        self._ring: List[Optional[Tuple[int, bytes]]] = [None] * self.ring_size
+        self._next: Optional[int] = None  # 次に払い出す拡張シーケンス番号
+        self._highest: Optional[int] = None  # 受信済み最大の拡張シーケンス番号
+        self._frames_since_late = 0
+
+        self.received = 0
+        self.played = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.late = 0
+        self.concealed = 0
+        self.resyncs = 0
+
+    def _extend(self, seq: int) -> int:
+        """16bitシーケンス番号を直近の受信位置を基準に拡張（ラップアラウンド吸収）"""
+        delta = (seq - self._highest) & 0xFFFF
+        if delta >= 0x8000:
+            delta -= 0x10000
+        return self._highest + delta
+
+    def push(self, seq: int, payload: bytes) -> List[bytes]:
+        self.received += 1
+        if self._next is None:
+            self._next = self._highest = seq
+
+        ext = self._extend(seq)
+        if ext < self._next:
+            # 既に払い出し（または補間）済みの位置
+            slot = self._ring[ext % self.ring_size]
+            if slot is not None and slot[0] == ext:
+                self.duplicates += 1
+            else:
+                self.late += 1
+                self._frames_since_late = 0
+                if self.playout_delay < self.max_delay:
+                    self.playout_delay += 1
+            return []
+
+        out: List[bytes] = []
+        if ext - self._next >= self.ring_size:
+            # リングに収まらない大きな跳躍（長時間の欠落・送信側リセット）は再同期
+            out.extend(self.flush())
+            self._next = self._highest = ext
+            self.resyncs += 1
+
+        index = ext % self.ring_size
+        slot = self._ring[index]
+        if slot is not None and slot[0] == ext:
+            self.duplicates += 1
+            return out
+
+        self._ring[index] = (ext, payload)
+        if payload:
+            self.frame_bytes = len(payload)
+        if ext > self._highest:
+            self._highest = ext
+        elif ext < self._highest:
+            self.reordered += 1
+
+        out.extend(self._drain())
+        return out
+
+    def _drain(self) -> List[bytes]:
+        out: List[bytes] = []
+        while self._next <= self._highest:
+            index = self._next % self.ring_size
+            slot = self._ring[index]
+            if slot is not None and slot[0] == self._next:
+                out.append(slot[1])
+            elif self._highest - self._next >= self.playout_delay:
+                out.append(self._silence_frame())
+                self.concealed += 1
+                # 遅れて届いた場合に late と判定できるよう、補間位置を記録しない
+                self._ring[index] = None
+            else:
+                break
+            self._next += 1
+            self.played += 1
+            self._frames_since_late += 1
+
+        if self._frames_since_late >= self.ADAPT_WINDOW_FRAMES:
+            self._frames_since_late = 0
+            if self.playout_delay > self.min_delay:
+                self.playout_delay -= 1
+        return out
+
+    def _silence_frame(self) -> bytes:
+        return bytes([self.silence_byte]) * self.frame_bytes
+
+    def flush(self) -> List[bytes]:
+        """保留中のフレームを欠落補間込みで全て払い出す（通話終了・再同期時）"""
+        out: List[bytes] = []
+        if self._next is None:
+            return out
+        while self._next <= self._highest:
+            index = self._next % self.ring_size
+            slot = self._ring[index]
+            if slot is not None and slot[0] == self._next:
+                out.append(slot[1])
+            else:
+                out.append(self._silence_frame())
+                self.concealed += 1
+            self._next += 1
+            self.played += 1
+        return out
+
+    @property
+    def depth(self) -> int:
+        if self._next is None:
+            return 0
+        return self._highest - self._next + 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "played": self.played,
+            "duplicates": self.duplicates,
+            "reordered": self.reordered,
+            "late": self.late,
+            "concealed": self.concealed,
+            "resyncs": self.resyncs,
+            "depth": self.depth,
+            "playout_delay_ms": self.playout_delay * FRAME_DURATION_MS,
+        }
+
 
 class ASRRTPBuffer:
     def __init__(self, manager: "GatewayASRManager") -> None:
         self.manager = manager
         self.logger = manager.logger
+        # (call_id or addr, ssrc) -> ジッタバッファ
+        self._jitter_buffers: Dict[Tuple[str, int], RTPJitterBuffer] = {}
 
     def should_process(
         self,
@@ -43,3 +216,71 @@ class ASRRTPBuffer:
                 check_key,
             )
         return True
+
+    def should_process_packet(
+        self,
+        packet: RTPPacketView,
+        effective_call_id: Optional[str],
+        addr: Tuple[str, int],
+    ) -> bool:
+        """解析済みの RTPPacketView から重複判定（不正パケットは破棄）"""
+        if not packet.valid:
+            self.logger.debug("[RTP_DROP] Malformed RTP packet from %s", addr)
+            return False
+        return self.should_process(packet.sequence, effective_call_id, addr)
+
+    def push_packet(
+        self,
+        packet: RTPPacketView,
+        effective_call_id: Optional[str],
+        addr: Tuple[str, int],
+    ) -> List[bytes]:
+        """
+        パケットをSSRC単位のジッタバッファに投入し、ASRへ送るべき
+        連続した20msフレーム（並べ替え・欠落補間済み）を返す
+        """
+        if not packet.valid:
+            self.logger.debug("[RTP_DROP] Malformed RTP packet from %s", addr)
+            return []
+
+        check_key = effective_call_id if effective_call_id else str(addr)
+        key = (check_key, packet.ssrc)
+        jitter = self._jitter_buffers.get(key)
+        if jitter is None:
+            jitter = RTPJitterBuffer(silence_byte=_SILENCE_BYTES.get(packet.payload_type, 0x00))
+            self._jitter_buffers[key] = jitter
+            self.logger.info(
+                "[RTP_JITTER] Created jitter buffer key=%s ssrc=%#010x pt=%s delay=%sms",
+                check_key,
+                packet.ssrc,
+                packet.payload_type,
+                jitter.playout_delay * FRAME_DURATION_MS,
+            )
+
+        late_before = jitter.late
+        frames = jitter.push(packet.sequence, packet.payload_bytes())
+        if jitter.late != late_before:
+            self.logger.debug(
+                "[RTP_LATE] Late packet Seq=%s Key=%s (delay now %sms)",
+                packet.sequence,
+                check_key,
+                jitter.playout_delay * FRAME_DURATION_MS,
+            )
+        self.manager._last_processed_sequence[check_key] = packet.sequence
+        return frames
+
+    def release(self, effective_call_id: str) -> List[bytes]:
+        """通話終了時：保留フレームを払い出してバッファを破棄"""
+        frames: List[bytes] = []
+        for key in [k for k in self._jitter_buffers if k[0] == effective_call_id]:
+            jitter = self._jitter_buffers.pop(key)
+            frames.extend(jitter.flush())
+            self.logger.info("[RTP_JITTER] Released key=%s stats=%s", key[0], jitter.get_stats())
+        return frames
+
+    def get_stats(self, effective_call_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        return {
+            f"{key[0]}:{key[1]:#010x}": jitter.get_stats()
+            for key, jitter in self._jitter_buffers.items()
+            if effective_call_id is None or key[0] == effective_call_id
+        }
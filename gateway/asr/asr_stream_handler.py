@@ -7,10 +7,10 @@ import threading
 import time
 import traceback
 from datetime import datetime
-from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
 from gateway.audio.audio_utils import pcm24k_to_ulaw8k
+from gateway.common.control_channel import notify_asr_response
 from gateway.common.text_utils import get_response_template, normalize_text
 from gateway.transcript.transcript_normalizer import normalize_transcript
 
@@ -483,21 +483,17 @@ class ASRStreamHandler:
         # 以降は正規化されたテキストを使用
         text = normalized_text
 
-        # ASR反応を検出したらフラグファイルを作成（Luaスクリプト用）
+        # ASR反応を検出したら Lua スクリプトへ通知（チャネル変数。応答は待たない）
         if effective_call_id and text.strip():
-            try:
-                flag_file = Path(f"/tmp/asr_response_{effective_call_id}.flag")
-                flag_file.touch()
+            call_uuid = getattr(getattr(manager, "gateway", manager), "call_uuid_map", {}).get(
+                effective_call_id, effective_call_id
+            )
+            if notify_asr_response(call_uuid):
                 manager.logger.info(
-                    "[ASR_RESPONSE] Created ASR response flag: %s (text: %s)",
-                    flag_file,
+                    "[ASR_RESPONSE] Notified ASR response: uuid=%s (text: %s)",
+                    call_uuid,
                     text[:50],
                 )
-            except Exception as exc:
-                manager.logger.warning(
-                    "[ASR_RESPONSE] Failed to create ASR response flag: %s",
-                    exc,
-                )
 
         # 🔹 リアルタイム更新: ユーザー発話をConsoleに送信
         if effective_call_id and text.strip():
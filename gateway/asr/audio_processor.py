@@ -5,7 +5,7 @@ import logging
 import os
 import traceback
 import time
-from typing import Tuple
+from typing import Tuple, TYPE_CHECKING
 
 # NOTE: 診断用。リアルタイム待機は禁止のため、ファイルへ一発書きのみ。
 _RTP_DUMP_TRACE = "/tmp/rtp_dump_trace.log"
@@ -36,6 +36,11 @@ import sys
 from typing import Optional
 
 from ..audio.rtp_payload_dumper import RtpPayloadDumper
+from ..common.streaming_resampler import StreamingResampler
+from .rtp_parser import RTPPacketView
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from .asr_audio_processor import ASRAudioProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +48,12 @@ logger = logging.getLogger(__name__)
 class AudioProcessor:
     """音声データの処理を行う"""
     
-    def __init__(self, call_id: str = "unknown", sample_rate: int = 16000):
+    def __init__(
+        self,
+        call_id: str = "unknown",
+        sample_rate: int = 16000,
+        asr_audio_processor: Optional["ASRAudioProcessor"] = None,
+    ):
         self.call_id = call_id
         self.sample_rate = sample_rate
         self.logger = logging.getLogger(__name__)
@@ -53,6 +63,9 @@ class AudioProcessor:
         self._last_voice_time = {}
         self._last_silence_time = {}
         self._voice_threshold = 0.01  # RMS閾値
+        # SSRCごとのコーデック判定キャッシュ（GatewayASRManager と共有。無ければペイロードを PCM16 とみなす）
+        self.asr_audio_processor = asr_audio_processor
+        self._resampler: Optional[StreamingResampler] = None
     
     def calculate_rms(self, data: bytes) -> float:
         """RMSを計算"""
@@ -89,11 +102,23 @@ class AudioProcessor:
     
     def extract_rtp_payload(self, data: bytes) -> bytes:
         """RTPパケットからペイロードを抽出"""
-        if len(data) < 12:
+        packet = RTPPacketView(data)
+        if not packet.valid:
             return b''
-        
-        # RTPヘッダーをスキップ（12バイト）
-        return data[12:]
+        return packet.payload_bytes()
+    
+    def decode_payload(self, payload: bytes, ssrc: Optional[int] = None,
+                       payload_type: Optional[int] = None) -> bytes:
+        """RTPペイロードを PCM16 にデコード（SSRCごとに確定したコーデックで1回だけ）"""
+        if self.asr_audio_processor is None or ssrc is None or payload_type is None:
+            return payload
+        return self.asr_audio_processor.decode_payload(ssrc, payload_type, payload)
+    
+    def condition(self, pcm: bytes, call_id: Optional[str] = None) -> bytes:
+        """通話ごとの整形ステージ（DC除去・ゲイン・クリップ）を通す"""
+        if self.asr_audio_processor is None or call_id is None:
+            return pcm
+        return self.asr_audio_processor.get_conditioner(call_id).process(pcm)
     
     def update_vad_state(self, call_id: str, data: bytes) -> tuple[bool, float]:
         """VAD状態を更新"""
@@ -109,19 +134,22 @@ class AudioProcessor:
         
         return is_voice, rms
     
-    def convert_to_pcm16k(self, data: bytes, source_sample_rate: int = 8000) -> bytes:
-        """PCM8kHzをPCM16kHzに変換"""
+    def _get_resampler(self, call_id: Optional[str] = None) -> StreamingResampler:
+        if self.asr_audio_processor is not None and call_id is not None:
+            return self.asr_audio_processor.get_resampler(call_id)
+        # 単独で使う場合（通話ごとのインスタンス）は自前でフィルタ状態を持つ
+        if self._resampler is None:
+            self._resampler = StreamingResampler(2, 1)
+        return self._resampler
+    
+    def convert_to_pcm16k(self, data: bytes, source_sample_rate: int = 8000,
+                          call_id: Optional[str] = None) -> bytes:
+        """PCM8kHzをPCM16kHzに変換（通話ごとにフィルタ状態を引き継ぐストリーミング変換）"""
         if source_sample_rate == 16000:
             return data
         
-        # 簡単な補間（実際の実装ではもっと高度な変換が必要）
         try:
-            samples = np.frombuffer(data, dtype=np.int16)
-            
-            # 2倍にリサンプリング
-            resampled = np.repeat(samples, 2)
-            
-            return resampled.astype(np.int16).tobytes()
+            return self._get_resampler(call_id).process_bytes(data)
         except Exception as e:
             logger.error(f"[AudioProcessor] Resampling error: {e}")
             return data
@@ -160,14 +188,23 @@ class AudioProcessor:
         except Exception as e:
             logger.error(f"[RTP_PAYLOAD_SAVE] Failed to save payload: {e}")
     
-    def process_rtp_audio(self, data: bytes, addr: Tuple[str, int]) -> bytes:
+    def process_rtp_audio(
+        self,
+        data: bytes,
+        addr: Tuple[str, int],
+        call_id: Optional[str] = None,
+        ssrc: Optional[int] = None,
+        payload_type: Optional[int] = None,
+    ) -> bytes:
+        """RTPペイロード（ヘッダー除去済み）をPCM16kに変換し、VADを通ったものだけ返す"""
         self._rtp_dump_call_count += 1
         if self._rtp_dump_call_count <= 3:
             _trace_once(f"process_called_{self._rtp_dump_call_count}", f"[audio_processor] process_rtp_audio_called n={self._rtp_dump_call_count} pid={os.getpid()} data_len={len(data)}")
         os.write(TRACE_FD2, b"[TRACE_PROC_1] Entry\n")
         try:
-            payload = data[12:]  # RTP Header strip
-            os.write(TRACE_FD2, b"[TRACE_PROC_2] Header stripped\n")
+            # handle_rtp_packet でヘッダー解析・ジッタバッファ済みのペイロード（20msフレーム）が渡される
+            payload = data
+            os.write(TRACE_FD2, b"[TRACE_PROC_2] Payload received\n")
             
             # RTP受信直後payloadをダンプ（デコード前）
             try:
@@ -181,7 +218,8 @@ class AudioProcessor:
 
             # --- ここから例外が発生しやすい区間 ---
             # 例: PCM変換やVAD判定
-            pcm_data = self.convert_to_pcm16k(payload)
+            pcm_8k = self.condition(self.decode_payload(payload, ssrc, payload_type), call_id)
+            pcm_data = self.convert_to_pcm16k(pcm_8k, call_id=call_id)
             
             os.write(TRACE_FD2, b"[TRACE_PROC_VAD_START]\n")
             # RMSを計算してからis_voiceに渡す
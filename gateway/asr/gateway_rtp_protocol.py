@@ -24,6 +24,8 @@ def _task_done_callback(task):
 
 class RTPPacketBuilder:
     RTP_VERSION = 2
+    HEADER_SIZE = 12
+    _HEADER = struct.Struct(">BBHII")
 
     def __init__(self, payload_type: int, sample_rate: int, ssrc: Optional[int] = None):
         self.payload_type = payload_type
@@ -37,17 +39,39 @@ class RTPPacketBuilder:
 
         return random.randint(0, 0xFFFFFFFF)
 
-    def build_packet(self, payload: bytes) -> bytes:
-        header = bytearray(12)
-        header[0] = (self.RTP_VERSION << 6)
-        header[1] = self.payload_type & 0x7F
-        struct.pack_into(">H", header, 2, self.sequence_number)
-        struct.pack_into(">I", header, 4, self.timestamp)
-        struct.pack_into(">I", header, 8, self.ssrc)
+    def _advance(self, payload_len: int) -> None:
         self.sequence_number = (self.sequence_number + 1) & 0xFFFF
-        samples = len(payload) // 2
+        samples = payload_len // 2
         self.timestamp = (self.timestamp + samples) & 0xFFFFFFFF
-        return bytes(header) + payload
+
+    def build_packet(self, payload: bytes) -> bytes:
+        header = self._HEADER.pack(
+            self.RTP_VERSION << 6,
+            self.payload_type & 0x7F,
+            self.sequence_number,
+            self.timestamp,
+            self.ssrc,
+        )
+        self._advance(len(payload))
+        return header + payload
+
+    def build_into(self, payload: bytes, buf: bytearray) -> memoryview:
+        """事前確保したバッファにヘッダ + ペイロードを書き込み、パケット部分のビューを返す"""
+        end = self.HEADER_SIZE + len(payload)
+        if end > len(buf):
+            return memoryview(self.build_packet(payload))
+        self._HEADER.pack_into(
+            buf,
+            0,
+            self.RTP_VERSION << 6,
+            self.payload_type & 0x7F,
+            self.sequence_number,
+            self.timestamp,
+            self.ssrc,
+        )
+        buf[self.HEADER_SIZE:end] = payload
+        self._advance(len(payload))
+        return memoryview(buf)[:end]
 
 
 class RTPProtocol(asyncio.DatagramProtocol):
@@ -2,62 +2,160 @@
 from __future__ import annotations
 
 import struct
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
+
+# 固定ヘッダー12バイト（V/P/X/CC, M/PT, seq, timestamp, ssrc）を1回でunpack
+_RTP_FIXED_HEADER = struct.Struct("!BBHII")
+RTP_HEADER_SIZE = _RTP_FIXED_HEADER.size
+
+
+class RTPPacketView:
+    """
+    RTPパケットのゼロコピービュー
+
+    受信バッファを memoryview で保持し、ヘッダーは precompiled Struct で
+    1回だけ unpack する。payload は CSRC / 拡張ヘッダー / パディングを
+    考慮した memoryview スライスで、コピーは発生しない。
+    不正なパケットの場合は ``valid`` が False になる。
+
+    ``parse()`` で同じインスタンスを使い回せるため、受信ループ内での
+    オブジェクト生成も不要。
+    """
+
+    __slots__ = (
+        "_buf",
+        "valid",
+        "version",
+        "padding",
+        "extension",
+        "csrc_count",
+        "marker",
+        "payload_type",
+        "sequence",
+        "timestamp",
+        "ssrc",
+        "payload_offset",
+        "payload_end",
+    )
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, None] = None) -> None:
+        self._buf = memoryview(b"")
+        self.valid = False
+        self.version = 0
+        self.padding = 0
+        self.extension = 0
+        self.csrc_count = 0
+        self.marker = 0
+        self.payload_type = 0
+        self.sequence = 0
+        self.timestamp = 0
+        self.ssrc = 0
+        self.payload_offset = 0
+        self.payload_end = 0
+        if data is not None:
+            self.parse(data)
+
+    def parse(self, data: Union[bytes, bytearray, memoryview]) -> bool:
+        """パケットを解析してビューを更新（戻り値は valid）"""
+        buf = data if isinstance(data, memoryview) else memoryview(data)
+        self._buf = buf
+        self.valid = False
+        length = len(buf)
+        if length < RTP_HEADER_SIZE:
+            self.payload_offset = self.payload_end = 0
+            return False
+
+        b0, b1, self.sequence, self.timestamp, self.ssrc = _RTP_FIXED_HEADER.unpack_from(buf)
+        self.version = b0 >> 6
+        self.padding = (b0 >> 5) & 0x01
+        self.extension = (b0 >> 4) & 0x01
+        self.csrc_count = b0 & 0x0F
+        self.marker = b1 >> 7
+        self.payload_type = b1 & 0x7F
+
+        offset = RTP_HEADER_SIZE + self.csrc_count * 4
+        if self.extension:
+            if length < offset + 4:
+                self.payload_offset = self.payload_end = 0
+                return False
+            # 拡張ヘッダー: profile(16bit) + length(16bit, 32bitワード数)
+            offset += 4 + ((buf[offset + 2] << 8) | buf[offset + 3]) * 4
+
+        end = length
+        if self.padding and end > offset:
+            pad = buf[end - 1]
+            if pad == 0 or offset + pad > end:
+                self.payload_offset = self.payload_end = 0
+                return False
+            end -= pad
+
+        if offset > end:
+            self.payload_offset = self.payload_end = 0
+            return False
+
+        self.payload_offset = offset
+        self.payload_end = end
+        self.valid = self.version == 2
+        return self.valid
+
+    @property
+    def payload(self) -> memoryview:
+        """ペイロードのmemoryview（コピーなし）"""
+        return self._buf[self.payload_offset:self.payload_end]
+
+    @property
+    def payload_len(self) -> int:
+        return self.payload_end - self.payload_offset
+
+    def payload_bytes(self) -> bytes:
+        """ペイロードを bytes で取得（下流APIがbytesを要求する場合のみ使用）"""
+        return self._buf[self.payload_offset:self.payload_end].tobytes()
+
+    def as_dict(self) -> dict:
+        """従来の parse_rtp_header と同じ形式の辞書を返す"""
+        return {
+            'version': self.version,
+            'padding': self.padding,
+            'extension': self.extension,
+            'csrc_count': self.csrc_count,
+            'marker': self.marker,
+            'payload_type': self.payload_type,
+            'sequence': self.sequence,
+            'timestamp': self.timestamp,
+            'ssrc': self.ssrc,
+        }
 
 
 class RTPParser:
     """RTPパケットのヘッダーを解析するユーティリティ"""
-    
+
     @staticmethod
     def extract_rtp_payload(data: bytes) -> bytes:
         """
         RTPパケットからペイロードを抽出
-        
+
         Args:
-            data: RTPパケット（ヘッダー12バイト + ペイロード）
-            
+            data: RTPパケット（ヘッダー + ペイロード）
+
         Returns:
-            ペイロードデータ
+            ペイロードデータ（CSRC・拡張ヘッダー・パディングを除去済み）
         """
-        if len(data) < 12:
+        view = RTPPacketView(data)
+        if not view.valid:
             return b''
-        
-        # RTPヘッダーをスキップ（12バイト）
-        return data[12:]
-    
+        return view.payload_bytes()
+
     @staticmethod
     def parse_rtp_header(data: bytes) -> Optional[dict]:
         """
         RTPヘッダーを解析
-        
+
         Args:
             data: RTPパケット
-            
+
         Returns:
             ヘッダー情報の辞書
         """
-        if len(data) < 12:
+        if len(data) < RTP_HEADER_SIZE:
             return None
-        
-        # RTPヘッダー解析
-        version = (data[0] >> 6) & 0x03
-        padding = (data[0] >> 5) & 0x01
-        extension = (data[0] >> 4) & 0x01
-        csrc_count = data[0] & 0x0f
-        marker = (data[1] >> 7) & 0x01
-        payload_type = data[1] & 0x7f
-        sequence = struct.unpack("!H", data[2:4])[0]
-        timestamp = struct.unpack("!I", data[4:8])[0]
-        ssrc = struct.unpack("!I", data[8:12])[0]
-        
-        return {
-            'version': version,
-            'padding': padding,
-            'extension': extension,
-            'csrc_count': csrc_count,
-            'marker': marker,
-            'payload_type': payload_type,
-            'sequence': sequence,
-            'timestamp': timestamp,
-            'ssrc': ssrc,
-        }
+        return RTPPacketView(data).as_dict()
@@ -44,6 +44,7 @@ class PlaybackHandler:
                     manager._active_calls,
                 )
                 manager._active_calls.add(call_id)
+                manager.monitor_manager.watch_no_input(call_id)
 
         try:
             # ESL接続が切れている場合は自動リカバリを試みる
@@ -11,6 +11,7 @@ from gateway.audio.tts_sender import TTSSender
 from gateway.audio.playback_controller import PlaybackController
 from gateway.audio.playback_handler import PlaybackHandler
 from gateway.audio.playback_sequencer import PlaybackSequencer
+from gateway.common.audio_asset_store import get_audio_asset_store
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from gateway.realtime_gateway import RealtimeGateway
@@ -143,17 +144,15 @@ class GatewayPlaybackManager:
             )
 
             try:
-                ulaw_payload = self._load_wav_as_ulaw8k(audio_path)
-                chunk_size = 160
-                for i in range(0, len(ulaw_payload), chunk_size):
-                    manager.tts_queue.append(ulaw_payload[i : i + chunk_size])
+                ulaw_frames = self.sequencer._load_ulaw_frames(audio_path)
+                manager.tts_queue.extend(ulaw_frames)
 
                 manager.is_speaking_tts = True
                 manager._tts_sender_wakeup.set()
 
                 self.logger.debug(
                     "[SILENCE_WARNING] Enqueued %s chunks from %s",
-                    len(ulaw_payload) // chunk_size,
+                    len(ulaw_frames),
                     audio_path,
                 )
             except Exception as e:
@@ -174,10 +173,9 @@ class GatewayPlaybackManager:
     def _schedule_playback_reset(self, call_id: str, audio_file: str) -> None:
         """Schedule is_playing reset based on wav duration with fallback timeout."""
         try:
-            with wave.open(audio_file, "rb") as wf:
-                frames = wf.getnframes()
-                sample_rate = wf.getframerate()
-                duration_sec = frames / float(sample_rate)
+            duration_sec = get_audio_asset_store().duration(audio_file)
+            if duration_sec is None:
+                raise ValueError(f"cannot read duration: {audio_file}")
 
             async def _reset_playing_flag_after_duration(call_id: str, duration: float):
                 await asyncio.sleep(duration + 0.5)  # バッファ時間を追加
@@ -4,10 +4,11 @@ from __future__ import annotations
 import asyncio
 import time
 import traceback
-import wave
 import audioop
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
+
+from gateway.common.audio_asset_store import get_audio_asset_store, wav_to_pcm8k
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from gateway.audio.playback_manager import GatewayPlaybackManager
@@ -75,6 +76,7 @@ class PlaybackSequencer:
                         time.time(),
                     )
                     manager._active_calls.add(effective_call_id)
+                    manager.monitor_manager.watch_no_input(effective_call_id)
                 self.logger.debug(
                     "[CALL_START] Initialized silence monitoring timestamps for call_id=%s",
                     effective_call_id,
@@ -231,12 +233,12 @@ class PlaybackSequencer:
                     )
                     continue
                 try:
-                    ulaw_payload = self._load_wav_as_ulaw8k(audio_path)
+                    ulaw_frames = self._load_ulaw_frames(audio_path)
                     self.logger.warning(
                         "[INIT_DEBUG] Loaded audio_path[%s]=%s payload_len=%s",
                         idx,
                         audio_path,
-                        len(ulaw_payload),
+                        sum(len(f) for f in ulaw_frames),
                     )
                 except Exception as exc:
                     self.logger.error(
@@ -259,9 +261,8 @@ class PlaybackSequencer:
 
                 queue_labels.append(audio_path.stem)
                 # 2) クライアント設定順（例: 000→001→002）に従い各ファイルを順番に積む
-                for i in range(0, len(ulaw_payload), chunk_size):
-                    manager.tts_queue.append(ulaw_payload[i : i + chunk_size])
-                    queued_chunks += 1
+                manager.tts_queue.extend(ulaw_frames)
+                queued_chunks += len(ulaw_frames)
 
             for chunk in reversed(silence_chunks_data):
                 manager.tts_queue.appendleft(chunk)
@@ -322,21 +323,21 @@ class PlaybackSequencer:
                 traceback.format_exc(),
             )
 
-    def _load_wav_as_ulaw8k(self, wav_path: Path) -> bytes:
-        with wave.open(str(wav_path), "rb") as wf:
-            n_channels = wf.getnchannels()
-            sample_width = wf.getsampwidth()
-            framerate = wf.getframerate()
-            frames = wf.readframes(wf.getnframes())
+    def _load_ulaw_frames(self, wav_path: Path, chunk_size: int = 160) -> List[bytes]:
+        """20ms の μ-law フレーム列。clients/<id>/audio 配下は AudioAssetStore の変換済みフレームを使う"""
+        frames = get_audio_asset_store().ulaw_frames(wav_path)
+        if frames is not None:
+            return frames
+        payload = self._load_wav_as_ulaw8k(wav_path)
+        return [payload[i : i + chunk_size] for i in range(0, len(payload), chunk_size)]
 
-        if n_channels > 1:
-            frames = audioop.tomono(frames, sample_width, 0.5, 0.5)
-        if sample_width != 2:
-            frames = audioop.lin2lin(frames, sample_width, 2)
-            sample_width = 2
-        if framerate != 8000:
-            frames, _ = audioop.ratecv(frames, sample_width, 1, framerate, 8000, None)
-        return audioop.lin2ulaw(frames, sample_width)
+    def _load_wav_as_ulaw8k(self, wav_path: Path) -> bytes:
+        hit = get_audio_asset_store().lookup(wav_path)
+        if hit is not None:
+            assets, asset = hit
+            return assets.ulaw(asset.name)
+        frames, _ = wav_to_pcm8k(wav_path)
+        return audioop.lin2ulaw(frames, 2)
 
     def _generate_silence_ulaw(self, duration_sec: float) -> bytes:
         samples = max(1, int(8000 * duration_sec))
@@ -0,0 +1,228 @@
+"""
+RTPSendPacer - 複数の送信ストリームを1つのタイマーで 20ms 間隔に送出するペーサー
+
+各ストリームは単調時計上の絶対時刻（開始時刻 + n × 20ms）を期限として送信するため、
+処理時間やイベントループの揺らぎが再生のずれとして蓄積しない。イベントループが
+止まって期限に遅れた場合は1回あたり max_burst パケットまでまとめて送って追いつき、
+max_lag 以上遅れたら期限を現在時刻に合わせ直す（長い無音の後に一気に流さない）。
+
+パケットはストリームごとの事前確保バッファにヘッダ + ペイロードを書き込んで送る。
+送信時刻の遅れ（期限からの差）はヒストグラムに集計する。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RTP_FRAME_INTERVAL = 0.02
+# 遅れを取り戻すとき1回に送る最大パケット数
+RTP_PACER_MAX_BURST = int(os.environ.get("LC_RTP_PACER_MAX_BURST", "5"))
+# これ以上遅れたら追いつくのをやめて期限を合わせ直す（秒）
+RTP_PACER_MAX_LAG = float(os.environ.get("LC_RTP_PACER_MAX_LAG", "0.2"))
+# 送信待ちの無いストリームのキューを確認する間隔（秒）
+RTP_PACER_IDLE_POLL = float(os.environ.get("LC_RTP_PACER_IDLE_POLL", "0.02"))
+# 送信ジッタをログに出す間隔（秒、0 で無効）
+RTP_PACER_REPORT_INTERVAL = float(os.environ.get("LC_RTP_PACER_REPORT_INTERVAL", "60"))
+
+# 1パケットの最大長（ヘッダ 12 + ペイロード）
+_PACKET_BUFFER_SIZE = 12 + 2048
+
+JITTER_BUCKETS_MS = (1, 2, 5, 10, 20, 50)
+
+
+class JitterHistogram:
+    """送信時刻の遅れ（ms）のヒストグラム"""
+
+    def __init__(self, bounds_ms=JITTER_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, lateness_sec: float) -> None:
+        ms = max(lateness_sec, 0.0) * 1000.0
+        for i, bound in enumerate(self.bounds_ms):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def as_dict(self) -> dict:
+        buckets = {f"<={b}ms": c for b, c in zip(self.bounds_ms, self.counts)}
+        buckets[f">{self.bounds_ms[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets,
+        }
+
+
+class PacedStream:
+    """
+    1つの送信先への RTP ストリーム
+
+    queue は既存の送信キュー（160バイトの μ-law ペイロードの deque）をそのまま使い、
+    get_dest() が (transport, addr) を返すまで送信しない。
+    on_idle はキューが空のときにペーサーの tick ごとに呼ばれる。
+    """
+
+    def __init__(self, name: str, queue: Deque[bytes], builder,
+                 get_dest: Callable[[], Optional[Tuple[object, tuple]]],
+                 on_idle: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.queue = queue
+        self.builder = builder
+        self.get_dest = get_dest
+        self.on_idle = on_idle
+        self.next_deadline: Optional[float] = None
+        self.jitter = JitterHistogram()
+        self.sent = 0
+        self.resyncs = 0
+        self.errors = 0
+        self._buffer = bytearray(_PACKET_BUFFER_SIZE)
+
+
+class RTPSendPacer:
+    def __init__(self, interval: float = RTP_FRAME_INTERVAL, max_burst: int = RTP_PACER_MAX_BURST,
+                 max_lag: float = RTP_PACER_MAX_LAG, idle_poll: float = RTP_PACER_IDLE_POLL,
+                 report_interval: float = RTP_PACER_REPORT_INTERVAL):
+        self.interval = interval
+        self.max_burst = max(1, max_burst)
+        self.max_lag = max_lag
+        self.idle_poll = idle_poll
+        self.report_interval = report_interval
+        self.jitter = JitterHistogram()
+        self._streams: List[PacedStream] = []
+        self._task: Optional[asyncio.Task] = None
+        self._sleeper: Optional[asyncio.Future] = None
+        self._last_report = time.monotonic()
+
+    # ------------------------------------------------------------------ #
+    def register(self, name: str, queue: Deque[bytes], builder,
+                 get_dest: Callable[[], Optional[Tuple[object, tuple]]],
+                 on_idle: Optional[Callable[[], None]] = None) -> PacedStream:
+        """ストリームを追加する（実行中のイベントループから呼ぶ）"""
+        stream = PacedStream(name, queue, builder, get_dest, on_idle)
+        self._streams.append(stream)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self.kick()
+        return stream
+
+    def unregister(self, stream: PacedStream) -> None:
+        if stream in self._streams:
+            self._streams.remove(stream)
+        self.kick()
+
+    def kick(self, stream: Optional[PacedStream] = None) -> None:
+        """キューに追加した直後などに呼ぶと、次の idle_poll を待たずに送信を始める"""
+        if stream is not None and stream.next_deadline is None:
+            stream.next_deadline = time.monotonic()
+        sleeper = self._sleeper
+        if sleeper is not None and not sleeper.done():
+            sleeper.set_result(None)
+
+    # ------------------------------------------------------------------ #
+    def _service(self, stream: PacedStream, now: float) -> None:
+        if not stream.queue:
+            stream.next_deadline = None
+            if stream.on_idle is not None:
+                stream.on_idle()
+            return
+        dest = stream.get_dest()
+        if dest is None:
+            stream.next_deadline = None
+            return
+        if stream.next_deadline is None:
+            stream.next_deadline = now
+        elif now - stream.next_deadline > self.max_lag:
+            # 長く止まっていた分は取り戻さない
+            stream.resyncs += 1
+            stream.next_deadline = now
+
+        transport, addr = dest
+        sent = 0
+        while stream.queue and stream.next_deadline <= now and sent < self.max_burst:
+            payload = stream.queue.popleft()
+            try:
+                transport.sendto(stream.builder.build_into(payload, stream._buffer), addr)
+            except Exception as exc:
+                stream.errors += 1
+                logger.error("[RTP_PACER] send failed stream=%s err=%s", stream.name, exc)
+            lateness = now - stream.next_deadline
+            stream.jitter.add(lateness)
+            self.jitter.add(lateness)
+            stream.next_deadline += self.interval
+            stream.sent += 1
+            sent += 1
+
+    async def _sleep(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._sleeper = fut
+        handle = loop.call_later(delay, lambda: fut.done() or fut.set_result(None))
+        try:
+            await fut
+        finally:
+            handle.cancel()
+            self._sleeper = None
+
+    async def _run(self) -> None:
+        logger.info("[RTP_PACER] started interval=%.3fs max_burst=%d", self.interval, self.max_burst)
+        while self._streams:
+            now = time.monotonic()
+            wake = now + self.idle_poll
+            for stream in list(self._streams):
+                try:
+                    self._service(stream, now)
+                except Exception as exc:
+                    logger.error("[RTP_PACER] stream=%s error: %s", stream.name, exc, exc_info=True)
+                if stream.next_deadline is not None and stream.queue:
+                    wake = min(wake, stream.next_deadline)
+            if self.report_interval and now - self._last_report >= self.report_interval:
+                self._last_report = now
+                if self.jitter.count:
+                    logger.info("[RTP_PACER] streams=%d jitter=%s", len(self._streams), self.jitter.as_dict())
+            delay = wake - time.monotonic()
+            if delay > 0:
+                await self._sleep(delay)
+            else:
+                await asyncio.sleep(0)
+        logger.info("[RTP_PACER] stopped (no streams)")
+
+    def get_stats(self) -> dict:
+        return {
+            "streams": len(self._streams),
+            "jitter": self.jitter.as_dict(),
+            "per_stream": {
+                s.name: {"sent": s.sent, "resyncs": s.resyncs, "errors": s.errors,
+                         "queued": len(s.queue), "jitter": s.jitter.as_dict()}
+                for s in self._streams
+            },
+        }
+
+
+_pacer: Optional[RTPSendPacer] = None
+
+
+def get_rtp_pacer() -> RTPSendPacer:
+    """プロセス共有のペーサー（イベントループのスレッドからのみ使う）"""
+    global _pacer
+    if _pacer is None:
+        _pacer = RTPSendPacer()
+    return _pacer
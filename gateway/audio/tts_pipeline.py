@@ -0,0 +1,167 @@
+"""
+TTSPipeline - 応答を文節ごとに合成しながら送信キューへ流すパイプライン
+
+文節 N の音声をキューに流している間に、最大 lookahead 文節先までの合成を
+TTS スレッドプールで並行して進める。最初の文節の合成が終わった時点でフレームを
+キューに入れて送信を始めるため、応答全体の合成完了を待たない。
+
+tts_queue は maxlen 付きの deque なので、キューの残量が high_water 未満のときだけ
+フレームを足す（一度に積むと古いフレームが捨てられる）。
+バージイン・通話リセットで gateway._tts_epoch が変わったら残りの合成を取り消す。
+
+応答ごとの time-to-first-audio（開始 → 最初のフレームをキューに入れるまで）を
+ログに出し、get_ttfa_stats() で集計を返す。
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import os
+import statistics
+import time
+from typing import Callable, Deque, List, Optional, Sequence
+
+from gateway.audio.audio_utils import pcm24k_to_ulaw8k
+
+logger = logging.getLogger(__name__)
+
+# 先行して合成する文節数（再生中の文節を除く）
+TTS_PIPELINE_LOOKAHEAD = int(os.environ.get("LC_TTS_PIPELINE_LOOKAHEAD", "2"))
+# キューに積むフレーム数の上限（20ms 単位）
+TTS_PIPELINE_HIGH_WATER = int(os.environ.get("LC_TTS_PIPELINE_HIGH_WATER", "50"))
+# 文節間の無音（秒）
+TTS_PIPELINE_SEGMENT_GAP = float(os.environ.get("LC_TTS_PIPELINE_SEGMENT_GAP", "0.2"))
+
+FRAME_BYTES = 160
+ULAW_SILENCE_FRAME = b"\xff" * FRAME_BYTES
+
+_ttfa_samples: Deque[float] = collections.deque(maxlen=500)
+
+
+def get_ttfa_stats() -> dict:
+    """直近の応答の time-to-first-audio（ms）の集計"""
+    samples = sorted(_ttfa_samples)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 1),
+        "p50_ms": round(samples[len(samples) // 2], 1),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+        "max_ms": round(samples[-1], 1),
+    }
+
+
+class TTSPipeline:
+    """1回の応答分。segments を順に synth(segment) で合成して manager.tts_queue に流す"""
+
+    def __init__(self, manager, call_id: Optional[str], segments: Sequence[str],
+                 synth: Callable[[str], Optional[bytes]], executor=None,
+                 lookahead: int = TTS_PIPELINE_LOOKAHEAD, high_water: int = TTS_PIPELINE_HIGH_WATER,
+                 segment_gap: float = TTS_PIPELINE_SEGMENT_GAP, label: str = "reply",
+                 abort_on_failure: bool = False):
+        self.manager = manager
+        self.call_id = call_id
+        self.segments: List[str] = [s for s in segments if s]
+        self.synth = synth
+        self.executor = executor
+        self.lookahead = max(0, lookahead)
+        self.high_water = max(1, high_water)
+        self.gap_frames = int(round(segment_gap / 0.02))
+        self.label = label
+        # True のとき合成に失敗した文節で残りを打ち切る（False なら飛ばして続ける）
+        self.abort_on_failure = abort_on_failure
+        self.started = time.monotonic()
+        self.epoch = getattr(manager, "_tts_epoch", 0)
+        self.ttfa: Optional[float] = None
+        self.frames_queued = 0
+        self.segments_played = 0
+        self.cancelled = False
+        self.failed = False
+
+    def _is_cancelled(self) -> bool:
+        if not self.cancelled and (not self.manager.running
+                                   or getattr(self.manager, "_tts_epoch", 0) != self.epoch):
+            self.cancelled = True
+        return self.cancelled
+
+    def _submit(self, loop, segment: str) -> "asyncio.Future":
+        return loop.run_in_executor(self.executor, self.synth, segment)
+
+    async def _feed(self, frames: List[bytes]) -> bool:
+        """フレームをキューの残量に合わせて少しずつ積む。取り消されたら False"""
+        manager = self.manager
+        queue = manager.tts_queue
+        limit = min(self.high_water, queue.maxlen or self.high_water)
+        i = 0
+        while i < len(frames):
+            if self._is_cancelled():
+                return False
+            room = limit - len(queue)
+            if room <= 0:
+                await asyncio.sleep(0.02)
+                continue
+            chunk = frames[i:i + room]
+            queue.extend(chunk)
+            i += len(chunk)
+            self.frames_queued += len(chunk)
+            if self.ttfa is None:
+                self._record_first_audio()
+            manager.is_speaking_tts = True
+            manager._tts_sender_wakeup.set()
+        return True
+
+    def _record_first_audio(self) -> None:
+        self.ttfa = time.monotonic() - self.started
+        _ttfa_samples.append(self.ttfa * 1000.0)
+        logger.info(
+            "[TTS_TTFA] call_id=%s label=%s ttfa_ms=%.0f segments=%d",
+            self.call_id, self.label, self.ttfa * 1000.0, len(self.segments),
+        )
+
+    async def run(self) -> int:
+        """全文節を流し終えるか取り消されるまで実行し、キューに入れたフレーム数を返す"""
+        if not self.segments:
+            return 0
+        loop = asyncio.get_running_loop()
+        pending: Deque[asyncio.Future] = collections.deque()
+        next_index = 0
+        try:
+            for index, segment in enumerate(self.segments):
+                # 再生中の文節に加えて lookahead 文節先まで合成を進めておく
+                while next_index < len(self.segments) and next_index <= index + self.lookahead:
+                    pending.append(self._submit(loop, self.segments[next_index]))
+                    next_index += 1
+                future = pending.popleft()
+                try:
+                    audio = await future
+                except Exception as exc:
+                    logger.error("[TTS_PIPELINE] call_id=%s segment=%r synth failed: %s",
+                                 self.call_id, segment, exc)
+                    audio = None
+                if self._is_cancelled():
+                    break
+                if not audio:
+                    if self.abort_on_failure:
+                        logger.error("[TTS_PIPELINE] call_id=%s segment=%r synth failed, aborting after %d/%d segments",
+                                     self.call_id, segment, self.segments_played, len(self.segments))
+                        self.failed = True
+                        break
+                    continue
+                ulaw = pcm24k_to_ulaw8k(audio)
+                frames = [ulaw[i:i + FRAME_BYTES] for i in range(0, len(ulaw), FRAME_BYTES)]
+                if self.segments_played and self.gap_frames:
+                    frames = [ULAW_SILENCE_FRAME] * self.gap_frames + frames
+                if not await self._feed(frames):
+                    break
+                self.segments_played += 1
+                logger.debug("[TTS_SEGMENT] call_id=%s segment=%r queued=%s chunks",
+                             self.call_id, segment, len(frames))
+        finally:
+            for future in pending:
+                future.cancel()
+        if self.cancelled:
+            logger.info("[TTS_PIPELINE] call_id=%s cancelled after %d/%d segments",
+                        self.call_id, self.segments_played, len(self.segments))
+        return self.frames_queued
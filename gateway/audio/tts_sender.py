@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
 from gateway.audio.audio_utils import pcm24k_to_ulaw8k
+from gateway.audio.rtp_pacer import get_rtp_pacer
+from gateway.audio.tts_pipeline import TTSPipeline
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from gateway.audio.playback_manager import GatewayPlaybackManager
@@ -203,51 +205,32 @@ class TTSSender:
         transfer_requested: bool = False,
     ) -> None:
         manager = self.manager
-        tts_audio_24k = None
+        if not (hasattr(manager.ai_core, "use_gemini_tts") and manager.ai_core.use_gemini_tts):
+            return
 
-        if template_ids and hasattr(manager.ai_core, "use_gemini_tts") and manager.ai_core.use_gemini_tts:
-            # ChatGPT音声風: ThreadPoolExecutorで非同期TTS合成
-            if hasattr(manager.ai_core, "tts_executor") and manager.ai_core.tts_executor:
-                # 非同期でTTS合成を実行
-                loop = asyncio.get_event_loop()
-                tts_audio_24k = await loop.run_in_executor(
-                    manager.ai_core.tts_executor,
-                    manager.ai_core._synthesize_template_sequence,
-                    template_ids,
-                )
-            else:
-                # フォールバック: 同期実行
-                tts_audio_24k = manager.ai_core._synthesize_template_sequence(template_ids)
-        elif reply_text and hasattr(manager.ai_core, "use_gemini_tts") and manager.ai_core.use_gemini_tts:
-            # ChatGPT音声風: ThreadPoolExecutorで非同期TTS合成
-            if hasattr(manager.ai_core, "tts_executor") and manager.ai_core.tts_executor:
-                # 非同期でTTS合成を実行
-                loop = asyncio.get_event_loop()
-                tts_audio_24k = await loop.run_in_executor(
-                    manager.ai_core.tts_executor,
-                    self._synthesize_text_sync,
-                    reply_text,
-                )
-            else:
-                # フォールバック: 同期実行
-                tts_audio_24k = self._synthesize_text_sync(reply_text)
-
-        # TTSキューに追加
-        if tts_audio_24k:
-            ulaw_response = pcm24k_to_ulaw8k(tts_audio_24k)
-            chunk_size = 160
-            for i in range(0, len(ulaw_response), chunk_size):
-                manager.tts_queue.append(ulaw_response[i : i + chunk_size])
+        # ChatGPT音声風: テンプレートごとに合成しながら送信（全体の合成完了を待たない）
+        # テンプレートは従来どおり間を空けずに連結し、合成に失敗したらそこで打ち切る
+        if template_ids:
+            pipeline = self._make_pipeline(
+                call_id, template_ids, self._synthesize_template_sync, label="template",
+                segment_gap=0.0, abort_on_failure=True,
+            )
+        elif reply_text:
+            pipeline = self._make_pipeline(
+                call_id, [reply_text], self._synthesize_text_sync, label="text"
+            )
+        else:
+            return
+        queued_chunks = await pipeline.run()
+
+        if queued_chunks:
             self.logger.info(
-                "TTS_SEND: call_id=%s text=%r queued=%s chunks",
+                "TTS_SEND: call_id=%s text=%r queued=%s chunks ttfa_ms=%.0f",
                 call_id,
                 reply_text,
-                len(ulaw_response) // chunk_size,
+                queued_chunks,
+                (pipeline.ttfa or 0.0) * 1000.0,
             )
-            manager.is_speaking_tts = True
-
-            # ChatGPT音声風: 即時送信トリガーを発火
-            manager._tts_sender_wakeup.set()
 
             # 🔹 リアルタイム更新: AI発話をConsoleに送信
             try:
@@ -272,7 +255,7 @@ class TTSSender:
                 # TTS送信完了を待つ非同期タスクを起動
                 asyncio.create_task(
                     self._wait_for_tts_completion_and_update_time(
-                        effective_call_id, len(ulaw_response)
+                        effective_call_id, queued_chunks * 160
                     )
                 )
 
@@ -284,6 +267,20 @@ class TTSSender:
                 manager._pending_transfer_call_id = call_id
                 asyncio.create_task(manager._wait_for_tts_and_transfer(call_id))
 
+    def _make_pipeline(self, call_id, segments, synth, label: str, **options) -> TTSPipeline:
+        executor = getattr(self.manager.ai_core, "tts_executor", None)
+        return TTSPipeline(self.manager, call_id, segments, synth, executor=executor, label=label,
+                           **options)
+
+    def _synthesize_template_sync(self, template_id: str) -> Optional[bytes]:
+        try:
+            return self.manager.ai_core.synthesize_template_audio(template_id)
+        except Exception as exc:
+            self.logger.exception(
+                "[TTS_SYNTHESIS_ERROR] template_id=%s error=%s", template_id, exc
+            )
+            return None
+
     def _synthesize_text_sync(self, text: str) -> Optional[bytes]:
         manager = self.manager
         try:
@@ -321,61 +318,21 @@ class TTSSender:
             elif segments[i].strip():
                 combined_segments.append(segments[i])
 
-        # 各文節を個別にTTS合成してキューに追加
-        for segment in combined_segments:
-            segment = segment.strip()
-            if not segment:
-                continue
-
-            try:
-                # ChatGPT音声風: ThreadPoolExecutorで非同期TTS合成
-                if hasattr(manager.ai_core, "tts_executor") and manager.ai_core.tts_executor:
-                    # 非同期でTTS合成を実行
-                    loop = asyncio.get_event_loop()
-                    segment_audio = await loop.run_in_executor(
-                        manager.ai_core.tts_executor,
-                        self._synthesize_segment_sync,
-                        segment,
-                    )
-                else:
-                    # フォールバック: 同期実行
-                    segment_audio = self._synthesize_segment_sync(segment)
-
-                if not segment_audio:
-                    continue
-
-                # μ-law変換してキューに追加
-                ulaw_segment = pcm24k_to_ulaw8k(segment_audio)
-                chunk_size = 160
-                for i in range(0, len(ulaw_segment), chunk_size):
-                    manager.tts_queue.append(ulaw_segment[i : i + chunk_size])
-
-                self.logger.debug(
-                    "[TTS_SEGMENT] call_id=%s segment=%r queued=%s chunks",
-                    call_id,
-                    segment,
-                    len(ulaw_segment) // chunk_size,
-                )
-
-                # ChatGPT音声風: 文節ごとに即時送信トリガーを発火
-                manager._tts_sender_wakeup.set()
-
-                # 文節間に0.2秒ポーズを挿入（最後の文節以外）
-                if segment != combined_segments[-1]:
-                    await asyncio.sleep(0.2)
-
-            except Exception as exc:
-                self.logger.exception(
-                    "[TTS_SEGMENT_ERROR] call_id=%s segment=%r error=%s",
-                    call_id,
-                    segment,
-                    exc,
-                )
+        # 文節 N を送信している間に次の文節を合成する（文節間には 0.2 秒の無音を挟む）
+        pipeline = self._make_pipeline(
+            call_id,
+            [segment.strip() for segment in combined_segments if segment.strip()],
+            self._synthesize_segment_sync,
+            label="segmented",
+        )
+        await pipeline.run()
 
         self.logger.info(
-            "[TTS_SEGMENTED_COMPLETE] call_id=%s segments=%s",
+            "[TTS_SEGMENTED_COMPLETE] call_id=%s segments=%s played=%s ttfa_ms=%.0f",
             call_id,
             len(combined_segments),
+            pipeline.segments_played,
+            (pipeline.ttfa or 0.0) * 1000.0,
         )
 
     def _synthesize_segment_sync(self, segment: str) -> Optional[bytes]:
@@ -429,91 +386,95 @@ class TTSSender:
             now,
         )
 
+    def _rtp_dest(self):
+        """送信先 (transport, addr)。rtp_peer は最初のRTPパケット受信時に自動設定される"""
+        manager = self.manager
+        if not manager.rtp_transport:
+            return None
+        if not manager.rtp_peer:
+            if not self._waiting_peer_logged:
+                self.logger.warning(
+                    "[TTS_SENDER] rtp_peer not set yet, waiting for first RTP packet..."
+                )
+                self._waiting_peer_logged = True
+            return None
+        self._waiting_peer_logged = False
+        # デバッグログ拡張: RTP_SENT（最初のパケットのみ）
+        if not hasattr(manager, "_rtp_sent_logged"):
+            self.logger.info("[RTP_SENT] %s", manager.rtp_peer)
+            manager._rtp_sent_logged = True
+        return manager.rtp_transport, manager.rtp_peer
+
+    def _on_tts_queue_idle(self) -> None:
+        """キューが空になったとき（ペーサーの tick ごと）"""
+        manager = self.manager
+        manager.is_speaking_tts = False
+        # 初回シーケンス再生が完了したらフラグをリセット
+        if manager.initial_sequence_playing:
+            manager.initial_sequence_playing = False
+            manager.initial_sequence_completed = True
+            manager.initial_sequence_completed_time = time.time()
+            self.logger.info(
+                "[INITIAL_SEQUENCE] OFF: initial_sequence_playing=False -> completed=True (ASR enable allowed)"
+            )
+
     async def _tts_sender_loop(self) -> None:
+        """
+        TTSキューを共有ペーサー（RTPSendPacer）に登録し、20ms の絶対時刻で送出させる
+
+        送信自体はペーサーの1つのタイマーが全通話分まとめて行う。このループは
+        wakeup イベント（新しい音声がキューに入った）をペーサーに伝えるだけ。
+        """
         manager = self.manager
         self.logger.debug("TTS Sender loop started.")
-        consecutive_skips = 0
-        while manager.running:
-            # ChatGPT音声風: wakeupイベントがセットされていたら即flush
-            if manager._tts_sender_wakeup.is_set():
-                await self._flush_tts_queue()
-                manager._tts_sender_wakeup.clear()
-
-            if manager.tts_queue and manager.rtp_transport:
-                # FreeSWITCH双方向化: 受信元アドレス（rtp_peer）に送信
-                # rtp_peerが設定されていない場合は警告を出してスキップ
-                # （rtp_peerは最初のRTPパケット受信時に自動設定される）
-                if manager.rtp_peer:
-                    rtp_dest = manager.rtp_peer
-                else:
-                    # rtp_peerが未設定の場合は送信をスキップ（最初のRTPパケット受信待ち）
-                    if consecutive_skips == 0:
-                        self.logger.warning(
-                            "[TTS_SENDER] rtp_peer not set yet, waiting for first RTP packet..."
-                        )
-                    consecutive_skips += 1
-                    await asyncio.sleep(0.02)
-                    continue
+        self._waiting_peer_logged = False
+        pacer = get_rtp_pacer()
+        stream = pacer.register(
+            f"tts-{id(manager.gateway)}",
+            manager.tts_queue,
+            _BuilderProxy(manager),
+            self._rtp_dest,
+            self._on_tts_queue_idle,
+        )
+        self._stream = stream
+        try:
+            while manager.running:
                 try:
-                    payload = manager.tts_queue.popleft()
-                    packet = manager.rtp_builder.build_packet(payload)
-                    manager.rtp_transport.sendto(packet, rtp_dest)
-                    # 実際に送信したタイミングでログ出力（運用ログ整備）
-                    payload_type = packet[1] & 0x7F
-                    self.logger.debug(
-                        "[TTS_QUEUE_SEND] sent RTP packet to %s, queue_len=%s, payload_type=%s",
-                        rtp_dest,
-                        len(manager.tts_queue),
-                        payload_type,
-                    )
-                    # デバッグログ拡張: RTP_SENT（最初のパケットのみ）
-                    if not hasattr(manager, "_rtp_sent_logged"):
-                        self.logger.info("[RTP_SENT] %s", rtp_dest)
-                        manager._rtp_sent_logged = True
-                    consecutive_skips = 0  # リセット
-                except Exception as exc:
-                    self.logger.error("TTS sender failed: %s", exc, exc_info=True)
-            else:
-                # キューが空 or 停止状態
-                if not manager.tts_queue:
-                    manager.is_speaking_tts = False
-                    consecutive_skips = 0
-                    # 初回シーケンス再生が完了したらフラグをリセット
-                    if manager.initial_sequence_playing:
-                        # スレッドスイッチを確保してからフラグを変更（非同期ループの確実な実行のため）
-                        await asyncio.sleep(0.01)
-                        manager.initial_sequence_playing = False
-                        manager.initial_sequence_completed = True
-                        manager.initial_sequence_completed_time = time.time()
-                        self.logger.info(
-                            "[INITIAL_SEQUENCE] OFF: initial_sequence_playing=False -> completed=True (ASR enable allowed)"
-                        )
-
-            await asyncio.sleep(0.02)  # CPU負荷を軽減（送信間隔を20ms空ける）
+                    await asyncio.wait_for(manager._tts_sender_wakeup.wait(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                manager._tts_sender_wakeup.clear()
+                await self._flush_tts_queue()
+        finally:
+            pacer.unregister(stream)
+            self._stream = None
+            self.logger.info(
+                "[TTS_SENDER] stopped sent=%s resyncs=%s jitter=%s",
+                stream.sent,
+                stream.resyncs,
+                stream.jitter.as_dict(),
+            )
 
     async def _flush_tts_queue(self) -> None:
         """
-        ChatGPT音声風: TTSキューを即座に送信（wakeupイベント用）
+        ChatGPT音声風: キューに入った音声を次の idle_poll を待たずに送り始める（wakeupイベント用）
+
+        以前はキュー全体を一度に送っていたが、受信側のジッタバッファで捨てられるため
+        ペーサーの 20ms 間隔のまま即時に開始する。
         """
-        manager = self.manager
-        if not manager.tts_queue or not manager.rtp_transport or not manager.rtp_peer:
+        stream = getattr(self, "_stream", None)
+        if stream is None or not self.manager.tts_queue:
             return
+        get_rtp_pacer().kick(stream)
 
-        # キュー内のすべてのパケットを即座に送信
-        sent_count = 0
-        while manager.tts_queue and manager.running:
-            try:
-                payload = manager.tts_queue.popleft()
-                packet = manager.rtp_builder.build_packet(payload)
-                manager.rtp_transport.sendto(packet, manager.rtp_peer)
-                sent_count += 1
-            except Exception as exc:
-                self.logger.error(
-                    "[TTS_FLUSH_ERROR] Failed to send packet: %s",
-                    exc,
-                    exc_info=True,
-                )
-                break
 
-        if sent_count > 0:
-            self.logger.debug("[TTS_FLUSH] Flushed %s packets from queue", sent_count)
+class _BuilderProxy:
+    """gateway.rtp_builder は通話ごとに作り直されるため、送信のたびに現在のものを使う"""
+
+    __slots__ = ("manager",)
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+
+    def build_into(self, payload: bytes, buf: bytearray):
+        return self.manager.rtp_builder.build_into(payload, buf)
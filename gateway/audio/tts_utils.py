@@ -2,12 +2,17 @@
 TTS (Text-to-Speech) ユーティリティ関数
 
 Gemini APIを使用した音声合成機能を担当
+合成結果は gateway.common.tts_cache に保存し、同じ文言は2回目以降バックエンドを呼ばない
 """
 
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from ..common.tts_cache import get_tts_cache, tts_cache_key
+
 logger = logging.getLogger(__name__)
 
 _AI_DISABLE_LLM = os.getenv("AI_DISABLE_LLM") == "1"
@@ -24,10 +29,31 @@ else:
         GEMINI_AVAILABLE = False
         logger.exception("[TTS] google.generativeai import failed (non-fatal)")
 
+GEMINI_TTS_MODEL = "gemini-1.5-flash"
+# Gemini の出力は 24kHz PCM として扱う（tts_sender で 8kHz μ-law に変換）
+GEMINI_TTS_SAMPLE_RATE = 24000
+
+_gemini_model = None
+_gemini_api_key: Optional[str] = None
+_gemini_lock = threading.Lock()
+
+
+def _get_gemini_model(api_key: str):
+    """genai.configure と GenerativeModel の生成はAPIキーが変わったときだけ行う"""
+    global _gemini_model, _gemini_api_key
+    with _gemini_lock:
+        if _gemini_model is None or _gemini_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _gemini_model = genai.GenerativeModel(GEMINI_TTS_MODEL)
+            _gemini_api_key = api_key
+        return _gemini_model
+
 
 def synthesize_text_with_gemini(text: str, speaking_rate: float = 1.0, pitch: float = 0.0) -> Optional[bytes]:
     """
     Gemini APIを使用してテキストから音声を合成する（日本語音声に最適化）
+
+    同じ (テキスト, 速度, ピッチ) の結果は TTS キャッシュから返す
     
     :param text: 音声化するテキスト
     :param speaking_rate: 話す速度（デフォルト: 1.0）
@@ -41,19 +67,24 @@ def synthesize_text_with_gemini(text: str, speaking_rate: float = 1.0, pitch: fl
     if not text or not text.strip():
         logger.warning("音声合成するテキストが空です")
         return None
-    
+
+    key = tts_cache_key(text, f"gemini:{GEMINI_TTS_MODEL}", speaking_rate, pitch,
+                        GEMINI_TTS_SAMPLE_RATE)
+    return get_tts_cache().get_or_create(
+        key, lambda: _synthesize_text_with_gemini_uncached(text, speaking_rate, pitch)
+    )
+
+
+def _synthesize_text_with_gemini_uncached(text: str, speaking_rate: float, pitch: float) -> Optional[bytes]:
     try:
         # Gemini APIの初期化（環境変数からAPIキーを取得）
-        import os
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             logger.error("GEMINI_API_KEYが設定されていません")
             return None
         
-        genai.configure(api_key=api_key)
-        
         # モデルの設定（音声合成に対応したモデル）
-        model = genai.GenerativeModel("gemini-1.5-flash")
+        model = _get_gemini_model(api_key)
         
         # 音声合成リクエストの作成
         # 日本語音声に最適化したパラメータ設定
@@ -146,3 +177,16 @@ def synthesize_template_sequence(template_ids: list, template_config_func) -> Op
         return b"".join(audio_segments)
     else:
         return None
+
+
+def warm_template_cache(template_ids, template_config_func, workers: int = 4) -> dict:
+    """
+    テンプレート音声を事前に合成して TTS キャッシュに載せる
+
+    :return: {template_id: 成功したか}
+    """
+    def _one(template_id):
+        return template_id, synthesize_template_audio(template_id, template_config_func) is not None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(pool.map(_one, list(template_ids)))
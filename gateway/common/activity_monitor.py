@@ -3,103 +3,162 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 
 from ..core.state_store import get_session_state
+from .timer_wheel import get_timer_wheel
 
 
-def start_activity_monitor(core) -> None:
-    if core._activity_monitor_running:
-        return
+ACTIVITY_TIMEOUT_SEC = 10.0
+# 再生中・非アクティブな通話の再確認間隔
+ACTIVITY_RECHECK_SEC = 1.0
+
+
+class ActivityMap(dict):
+    """
+    call_id -> 最終アクティビティ時刻。
+
+    値を書き込むと、その通話のタイムアウトを共有タイマーホイールに登録する
+    （登録済みなら何もしない。期限は発火時に最新の時刻で再確認して延ばす）。
+    """
 
-    def _activity_monitor_worker() -> None:
-        core._activity_monitor_running = True
-        core.logger.info("[ACTIVITY_MONITOR] Started activity monitor thread")
+    def __init__(self, core, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._core = core
+        self._timers = {}
+        self._lock = threading.Lock()
 
-        while core._activity_monitor_running:
-            try:
-                time.sleep(1.0)
+    def __setitem__(self, call_id, value) -> None:
+        super().__setitem__(call_id, value)
+        self._arm(call_id, value + ACTIVITY_TIMEOUT_SEC - time.time())
 
-                current_time = time.time()
-                timeout_sec = 10.0
+    def _arm(self, call_id, delay: float) -> None:
+        with self._lock:
+            handle = self._timers.get(call_id)
+            if handle is not None and handle.active:
+                return
+            self._timers[call_id] = get_timer_wheel().reset(
+                handle, max(0.0, delay), _on_activity_timer, self._core, call_id)
 
-                active_call_ids = set()
-                if hasattr(core, "gateway") and hasattr(core.gateway, "_active_calls"):
-                    active_call_ids = set(core.gateway._active_calls) if core.gateway._active_calls else set()
+    def _rearm(self, call_id, delay: float) -> None:
+        with self._lock:
+            handle = self._timers.get(call_id)
+            if handle is not None:
+                handle.reset(max(0.0, delay))
 
-                for call_id, last_activity_time in list(core.last_activity.items()):
-                    if active_call_ids and call_id not in active_call_ids:
-                        core.logger.info("[ACTIVITY_MONITOR] Skipping inactive call: call_id=%s", call_id)
-                        continue
+    def _drop(self, call_id) -> None:
+        with self._lock:
+            self._timers.pop(call_id, None)
 
-                    if core.is_playing.get(call_id, False):
-                        continue
+    def cancel_all(self) -> None:
+        with self._lock:
+            for handle in self._timers.values():
+                handle.cancel()
+            self._timers.clear()
 
-                    elapsed = current_time - last_activity_time
-                    if elapsed >= timeout_sec:
+
+def _on_activity_timer(core, call_id) -> None:
+    """通話ごとのタイマー発火時。状態を再確認し、タイムアウトなら NOT_HEARD へ遷移する"""
+    activity = core.last_activity
+    if not core._activity_monitor_running:
+        return
+    last_activity_time = activity.get(call_id)
+    if last_activity_time is None:
+        # 通話終了で削除済み
+        activity._drop(call_id)
+        return
+
+    current_time = time.time()
+    active_call_ids = set()
+    if hasattr(core, "gateway") and hasattr(core.gateway, "_active_calls"):
+        active_call_ids = set(core.gateway._active_calls) if core.gateway._active_calls else set()
+    if active_call_ids and call_id not in active_call_ids:
+        core.logger.info("[ACTIVITY_MONITOR] Skipping inactive call: call_id=%s", call_id)
+        activity._rearm(call_id, ACTIVITY_RECHECK_SEC)
+        return
+    if core.is_playing.get(call_id, False):
+        activity._rearm(call_id, ACTIVITY_RECHECK_SEC)
+        return
+
+    elapsed = current_time - last_activity_time
+    if elapsed >= ACTIVITY_TIMEOUT_SEC:
+        core.logger.info(
+            "[ACTIVITY_MONITOR] Timeout detected: call_id=%s elapsed=%.1fs -> calling FlowEngine.transition(NOT_HEARD)",
+            call_id,
+            elapsed,
+        )
+        try:
+            flow_engine = core.flow_engines.get(call_id) or core.flow_engine
+            if flow_engine:
+                state = get_session_state(core, call_id)
+                client_id = (
+                    core.call_client_map.get(call_id)
+                    or state.meta.get("client_id")
+                    or core.client_id
+                    or "000"
+                )
+
+                context = {
+                    "intent": "NOT_HEARD",
+                    "text": "",
+                    "normalized_text": "",
+                    "keywords": core.keywords,
+                    "user_reply_received": False,
+                    "user_voice_detected": False,
+                    "timeout": True,
+                    "is_first_sales_call": getattr(state, "is_first_sales_call", False),
+                }
+
+                next_phase = flow_engine.transition(state.phase or "ENTRY", context)
+
+                if next_phase != state.phase:
+                    state.phase = next_phase
+                    core.logger.info(
+                        "[ACTIVITY_MONITOR] Phase transition: %s -> %s (call_id=%s, timeout)",
+                        state.phase,
+                        next_phase,
+                        call_id,
+                    )
+
+                template_ids = flow_engine.get_templates(next_phase)
+                if template_ids:
+                    core._play_template_sequence(call_id, template_ids, client_id)
+
+                    if next_phase == "NOT_HEARD" and "110" in template_ids:
+                        state.phase = "QA"
                         core.logger.info(
-                            "[ACTIVITY_MONITOR] Timeout detected: call_id=%s elapsed=%.1fs -> calling FlowEngine.transition(NOT_HEARD)",
+                            "[ACTIVITY_MONITOR] NOT_HEARD (110) played, transitioning to QA: call_id=%s",
                             call_id,
-                            elapsed,
                         )
+                        runtime_logger = logging.getLogger("runtime")
+                        runtime_logger.info(
+                            "[FLOW] call_id=%s phase=NOT_HEARD→QA intent=NOT_HEARD template=110 (timeout recovery)",
+                            call_id,
+                        )
+        except Exception as exc:
+            core.logger.exception("[ACTIVITY_MONITOR] Error handling timeout: %s", exc)
+
+    # アクティビティが更新されていなければ以前と同じく1秒後に再判定する
+    last_activity_time = activity.get(call_id, last_activity_time)
+    activity._rearm(
+        call_id,
+        max(last_activity_time + ACTIVITY_TIMEOUT_SEC, time.time() + ACTIVITY_RECHECK_SEC) - time.time(),
+    )
 
-                        try:
-                            flow_engine = core.flow_engines.get(call_id) or core.flow_engine
-                            if flow_engine:
-                                state = get_session_state(core, call_id)
-                                client_id = (
-                                    core.call_client_map.get(call_id)
-                                    or state.meta.get("client_id")
-                                    or core.client_id
-                                    or "000"
-                                )
-
-                                context = {
-                                    "intent": "NOT_HEARD",
-                                    "text": "",
-                                    "normalized_text": "",
-                                    "keywords": core.keywords,
-                                    "user_reply_received": False,
-                                    "user_voice_detected": False,
-                                    "timeout": True,
-                                    "is_first_sales_call": getattr(state, "is_first_sales_call", False),
-                                }
-
-                                next_phase = flow_engine.transition(state.phase or "ENTRY", context)
-
-                                if next_phase != state.phase:
-                                    state.phase = next_phase
-                                    core.logger.info(
-                                        "[ACTIVITY_MONITOR] Phase transition: %s -> %s (call_id=%s, timeout)",
-                                        state.phase,
-                                        next_phase,
-                                        call_id,
-                                    )
-
-                                template_ids = flow_engine.get_templates(next_phase)
-                                if template_ids:
-                                    core._play_template_sequence(call_id, template_ids, client_id)
-
-                                    if next_phase == "NOT_HEARD" and "110" in template_ids:
-                                        state.phase = "QA"
-                                        core.logger.info(
-                                            "[ACTIVITY_MONITOR] NOT_HEARD (110) played, transitioning to QA: call_id=%s",
-                                            call_id,
-                                        )
-                                        runtime_logger = logging.getLogger("runtime")
-                                        runtime_logger.info(
-                                            "[FLOW] call_id=%s phase=NOT_HEARD→QA intent=NOT_HEARD template=110 (timeout recovery)",
-                                            call_id,
-                                        )
-                        except Exception as exc:
-                            core.logger.exception("[ACTIVITY_MONITOR] Error handling timeout: %s", exc)
-            except Exception as exc:
-                if core._activity_monitor_running:
-                    core.logger.exception("[ACTIVITY_MONITOR] Monitor thread error: %s", exc)
-                time.sleep(1.0)
-
-    import threading
-
-    core._activity_monitor_thread = threading.Thread(target=_activity_monitor_worker, daemon=True)
-    core._activity_monitor_thread.start()
-    core.logger.info("[ACTIVITY_MONITOR] Activity monitor thread started")
+
+def start_activity_monitor(core) -> None:
+    """
+    無応答タイムアウトの監視を開始する。
+
+    監視スレッドで全通話を1秒ごとに走査せず、core.last_activity への書き込みで
+    通話ごとのタイマーを共有タイマーホイールに登録する。
+    """
+    if core._activity_monitor_running:
+        return
+    if not isinstance(core.last_activity, ActivityMap):
+        core.last_activity = ActivityMap(core, core.last_activity)
+    core._activity_monitor_running = True
+    for call_id, last_activity_time in list(core.last_activity.items()):
+        core.last_activity._arm(call_id, last_activity_time + ACTIVITY_TIMEOUT_SEC - time.time())
+    core.logger.info("[ACTIVITY_MONITOR] Activity monitor started (timer wheel)")
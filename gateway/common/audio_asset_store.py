@@ -0,0 +1,304 @@
+"""
+AudioAssetStore - クライアント音声（clients/<id>/audio/*.wav）の送出用キャッシュ
+
+起動時にクライアントごとの WAV をすべて 8kHz/mono に変換し、20ms（160サンプル）単位に
+パディングした μ-law と PCM16 をクライアントごとに1つのファイルへ書き出して mmap する。
+メタデータ（正確な再生時間・フレーム数・オフセット）は同じディレクトリの JSON に保存し、
+WAV が変わっていなければ次回起動時は変換せずにそのまま mmap する。
+
+再生キューへの投入は事前変換済みフレームのスライスになり、再生時間はファイルサイズからの
+推定ではなくメタデータの値を使う。ディレクトリの変更（追加・削除・上書き）は
+check_interval ごとの stat で検出し、変わったクライアントだけ作り直す。
+"""
+
+from __future__ import annotations
+
+import audioop
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CLIENTS_DIR = os.environ.get("LC_CLIENTS_DIR", "/opt/libertycall/clients")
+ASSET_CACHE_DIR = os.environ.get("LC_AUDIO_ASSET_DIR", "/tmp/libertycall_audio_assets")
+# WAV の変更を確認する間隔（秒）
+ASSET_CHECK_INTERVAL = float(os.environ.get("LC_AUDIO_ASSET_CHECK_INTERVAL", "2"))
+
+SAMPLE_RATE = 8000
+FRAME_SAMPLES = 160  # 20ms @ 8kHz
+ULAW_FRAME_BYTES = FRAME_SAMPLES
+PCM_FRAME_BYTES = FRAME_SAMPLES * 2
+ULAW_SILENCE = b"\xff"
+_CACHE_VERSION = 1
+
+Signature = List[Tuple[str, int, int]]
+
+
+class AudioAsset(NamedTuple):
+    name: str  # ファイル名（拡張子なし）
+    duration: float  # 元 WAV の正確な長さ（秒）
+    samples: int  # 8kHz 変換後のサンプル数（パディング前）
+    frames: int  # 20ms フレーム数
+    ulaw_offset: int
+    pcm_offset: int
+
+
+def wav_to_pcm8k(path) -> Tuple[bytes, float]:
+    """WAV を 8kHz/mono/16bit PCM に変換する。戻り値は (PCM, 元の再生時間)"""
+    with wave.open(str(path), "rb") as wf:
+        n_channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        framerate = wf.getframerate()
+        n_frames = wf.getnframes()
+        frames = wf.readframes(n_frames)
+
+    if n_channels > 1:
+        frames = audioop.tomono(frames, sample_width, 0.5, 0.5)
+    if sample_width != 2:
+        frames = audioop.lin2lin(frames, sample_width, 2)
+    if framerate != SAMPLE_RATE:
+        frames, _ = audioop.ratecv(frames, 2, 1, framerate, SAMPLE_RATE, None)
+    return frames, n_frames / float(framerate)
+
+
+def wav_duration(path) -> float:
+    """WAV ヘッダから再生時間（秒）を求める"""
+    with wave.open(str(path), "rb") as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def _scan(audio_dir: Path) -> Signature:
+    entries = []
+    try:
+        with os.scandir(audio_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".wav"):
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_size, st.st_mtime_ns))
+    except OSError:
+        return []
+    entries.sort()
+    return entries
+
+
+class ClientAssets:
+    """1クライアント分の変換済み音声（mmap 上の μ-law / PCM16 フレーム）"""
+
+    def __init__(self, client_id: str, data_path: Optional[str], assets: Dict[str, AudioAsset],
+                 signature: Signature):
+        self.client_id = client_id
+        self.assets = assets
+        self.signature = signature
+        self._mm = None
+        if data_path and assets:
+            with open(data_path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get(self, name: str) -> Optional[AudioAsset]:
+        if name.endswith(".wav"):
+            name = name[:-4]
+        return self.assets.get(name)
+
+    def ulaw(self, name: str) -> Optional[bytes]:
+        """μ-law ペイロード全体（20ms 単位にパディング済み）"""
+        asset = self.get(name)
+        if asset is None:
+            return None
+        return self._mm[asset.ulaw_offset:asset.ulaw_offset + asset.frames * ULAW_FRAME_BYTES]
+
+    def ulaw_frames(self, name: str) -> Optional[List[bytes]]:
+        """160バイトの μ-law フレームのリスト（そのまま送信キューに積める）"""
+        asset = self.get(name)
+        if asset is None:
+            return None
+        mm, base = self._mm, asset.ulaw_offset
+        return [mm[base + i * ULAW_FRAME_BYTES:base + (i + 1) * ULAW_FRAME_BYTES]
+                for i in range(asset.frames)]
+
+    def pcm_frames(self, name: str) -> Optional[np.ndarray]:
+        """PCM16 フレーム (frames, 160) の読み取り専用ビュー"""
+        asset = self.get(name)
+        if asset is None:
+            return None
+        return np.frombuffer(self._mm, dtype=np.int16, count=asset.frames * FRAME_SAMPLES,
+                             offset=asset.pcm_offset).reshape(asset.frames, FRAME_SAMPLES)
+
+
+class AudioAssetStore:
+    """クライアントID → ClientAssets のプロセス共有ストア"""
+
+    def __init__(self, clients_dir: str = CLIENTS_DIR, cache_dir: str = ASSET_CACHE_DIR,
+                 check_interval: float = ASSET_CHECK_INTERVAL):
+        self.clients_dir = Path(clients_dir)
+        self.cache_dir = Path(cache_dir)
+        self.check_interval = check_interval
+        self._clients: Dict[str, ClientAssets] = {}
+        self._next_check: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def audio_dir(self, client_id: str) -> Path:
+        return self.clients_dir / client_id / "audio"
+
+    def client(self, client_id: str) -> ClientAssets:
+        assets = self._clients.get(client_id)
+        if assets is not None and time.monotonic() < self._next_check.get(client_id, 0.0):
+            return assets
+        return self.refresh(client_id)
+
+    def refresh(self, client_id: str) -> ClientAssets:
+        """WAV が変わっていれば作り直す"""
+        with self._lock:
+            self._next_check[client_id] = time.monotonic() + self.check_interval
+            signature = _scan(self.audio_dir(client_id))
+            assets = self._clients.get(client_id)
+            if assets is not None and assets.signature == signature:
+                return assets
+            assets = self._load(client_id, signature)
+            self._clients[client_id] = assets
+            return assets
+
+    def preload(self, client_ids: Optional[Iterable[str]] = None) -> None:
+        """起動時に全クライアント（または指定分）を読み込む"""
+        if client_ids is None:
+            try:
+                client_ids = sorted(p.name for p in self.clients_dir.iterdir()
+                                    if (p / "audio").is_dir())
+            except OSError:
+                client_ids = []
+        for client_id in client_ids:
+            self.refresh(client_id)
+
+    def start_watcher(self) -> None:
+        """読み込み済みクライアントの WAV を定期的に確認するスレッドを起動する"""
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch_loop, name="audio_asset_watcher",
+                                         daemon=True)
+        self._watcher.start()
+
+    def _watch_loop(self) -> None:
+        while True:
+            time.sleep(max(self.check_interval, 0.5))
+            for client_id in list(self._clients):
+                try:
+                    self.refresh(client_id)
+                except Exception as e:
+                    logger.warning("[AUDIO_ASSET] refresh failed client=%s err=%s", client_id, e)
+
+    def lookup(self, path) -> Optional[Tuple[ClientAssets, AudioAsset]]:
+        """clients/<id>/audio/<name>.wav のパスならキャッシュ済みの音声を返す"""
+        path = Path(path)
+        if path.suffix != ".wav" or path.parent.name != "audio":
+            return None
+        if path.parent.parent.parent != self.clients_dir:
+            return None
+        assets = self.client(path.parent.parent.name)
+        asset = assets.get(path.stem)
+        if asset is None:
+            return None
+        return assets, asset
+
+    def duration(self, path, default: Optional[float] = None) -> Optional[float]:
+        """再生時間（秒）。キャッシュ外のファイルは WAV ヘッダから求める"""
+        try:
+            hit = self.lookup(path)
+            if hit is not None:
+                return hit[1].duration
+            return wav_duration(path)
+        except Exception:
+            return default
+
+    def ulaw_frames(self, path) -> Optional[List[bytes]]:
+        hit = self.lookup(path)
+        if hit is None:
+            return None
+        return hit[0].ulaw_frames(hit[1].name)
+
+    # ------------------------------------------------------------------ #
+    def _paths(self, client_id: str) -> Tuple[Path, Path]:
+        return (self.cache_dir / f"{client_id}.frames", self.cache_dir / f"{client_id}.json")
+
+    def _load(self, client_id: str, signature: Signature) -> ClientAssets:
+        data_path, meta_path = self._paths(client_id)
+        if not signature:
+            return ClientAssets(client_id, None, {}, signature)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta.get("version") == _CACHE_VERSION
+                    and [tuple(e) for e in meta.get("signature", [])] == signature
+                    and os.path.getsize(data_path) == meta.get("size")):
+                assets = {name: AudioAsset(**a) for name, a in meta["assets"].items()}
+                logger.info("[AUDIO_ASSET] mapped client=%s assets=%d (cached)", client_id, len(assets))
+                return ClientAssets(client_id, str(data_path), assets, signature)
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        return self._build(client_id, signature)
+
+    def _build(self, client_id: str, signature: Signature) -> ClientAssets:
+        start = time.monotonic()
+        audio_dir = self.audio_dir(client_id)
+        data_path, meta_path = self._paths(client_id)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_data = data_path.with_suffix(f".frames.{os.getpid()}.tmp")
+        tmp_meta = meta_path.with_suffix(f".json.{os.getpid()}.tmp")
+
+        assets: Dict[str, AudioAsset] = {}
+        offset = 0
+        with open(tmp_data, "wb") as out:
+            for name, _, _ in signature:
+                try:
+                    pcm, duration = wav_to_pcm8k(audio_dir / name)
+                except Exception as e:
+                    logger.warning("[AUDIO_ASSET] convert failed %s/%s: %s", client_id, name, e)
+                    continue
+                samples = len(pcm) // 2
+                frames = max(1, -(-samples // FRAME_SAMPLES))
+                pad = frames * FRAME_SAMPLES - samples
+                pcm = pcm[:samples * 2] + b"\x00\x00" * pad
+                ulaw = audioop.lin2ulaw(pcm, 2)
+                out.write(ulaw)
+                out.write(pcm)
+                stem = name[:-4]
+                assets[stem] = AudioAsset(stem, duration, samples, frames, offset, offset + len(ulaw))
+                offset += len(ulaw) + len(pcm)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "signature": signature, "size": offset,
+                       "assets": {k: a._asdict() for k, a in assets.items()}}, f)
+        # 別プロセスが古いファイルを mmap 中でも影響しないよう rename で置き換える
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+        logger.info("[AUDIO_ASSET] built client=%s assets=%d bytes=%d in %.2fs",
+                    client_id, len(assets), offset, time.monotonic() - start)
+        return ClientAssets(client_id, str(data_path) if offset else None, assets, signature)
+
+
+_store: Optional[AudioAssetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_audio_asset_store() -> AudioAssetStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AudioAssetStore()
+    return _store
+
+
+def preload_audio_assets() -> AudioAssetStore:
+    """起動時に全クライアントの音声を読み込み、変更監視を開始する"""
+    store = get_audio_asset_store()
+    store.preload()
+    store.start_watcher()
+    return store
@@ -0,0 +1,163 @@
+"""
+ClientConfigRegistry - クライアント設定（dialogue_config.json / voice_list TSV）の共有キャッシュ
+
+通話ごとに dialogue_config.json を読み直す代わりに、クライアントごとに1回だけ読み込み、
+派生データ（phrase hints、LLM 選択肢テキスト、コンパイル済み RuleRouter など）も
+スナップショット単位でキャッシュする。ファイルの mtime が変わったら次の get() で再読込し、
+派生データも新しいスナップショットで作り直される。
+
+スナップショットの内容はセッション間で共有されるため、読み取り専用として扱うこと。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLIENTS_DIR = os.environ.get("LC_CLIENTS_DIR", "/opt/libertycall/clients")
+# mtime を確認する最短間隔（秒）。通話開始のたびに stat しないようにする
+CONFIG_CHECK_INTERVAL = float(os.environ.get("LC_CLIENT_CONFIG_CHECK_INTERVAL", "2"))
+
+
+def _stat_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ClientConfig:
+    """1クライアント分の設定スナップショット（読み取り専用）"""
+
+    def __init__(self, client_id: str, dialogue_config: dict, voice_map: Dict[str, str],
+                 loaded: bool, mtimes: Tuple[Optional[int], Optional[int]]):
+        self.client_id = client_id
+        self.dialogue_config = dialogue_config
+        self.voice_map = voice_map
+        # dialogue_config.json を読めたかどうか（読めない場合 dialogue_config は {}）
+        self.loaded = loaded
+        self.mtimes = mtimes
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        hints = []
+        for pattern in dialogue_config.get("patterns", []):
+            hints.extend(pattern.get("keywords", []))
+        # 重複除去（設定ファイル上の順序を保つ）
+        self.phrase_hints: List[str] = list(dict.fromkeys(hints))
+        self.instant_keywords: List[str] = list(dialogue_config.get("instant_keywords", []))
+
+    def derived(self, name: str, factory: Callable[["ClientConfig"], Any]) -> Any:
+        """派生データをこのスナップショットに1回だけ作ってキャッシュする"""
+        value = self._derived.get(name)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = factory(self)
+                    self._derived[name] = value
+        return value
+
+    def llm_choices(self, max_keywords: int = 5, sep: str = ", ", first_response: bool = True) -> str:
+        """LLM プロンプト用の「応答ID: キーワード」一覧"""
+        def build(cfg):
+            lines = []
+            for p in cfg.dialogue_config.get("patterns", []):
+                r = p.get("response", "")
+                if first_response and isinstance(r, list):
+                    r = r[0]
+                kws = p.get("keywords", [])[:max_keywords]
+                lines.append(f"{r}: {sep.join(kws)}")
+            return "\n".join(lines)
+        return self.derived(f"llm_choices:{max_keywords}:{sep}:{first_response}", build)
+
+
+class ClientConfigRegistry:
+    """クライアントID → ClientConfig のプロセス共有レジストリ"""
+
+    def __init__(self, clients_dir: str = CLIENTS_DIR, check_interval: float = CONFIG_CHECK_INTERVAL):
+        self.clients_dir = clients_dir
+        self.check_interval = check_interval
+        self._configs: Dict[str, ClientConfig] = {}
+        self._next_check: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def dialogue_config_path(self, client_id: str) -> str:
+        return os.path.join(self.clients_dir, client_id, "config", "dialogue_config.json")
+
+    def voice_list_path(self, client_id: str) -> str:
+        return os.path.join(self.clients_dir, client_id, f"voice_list_{client_id}.tsv")
+
+    def get(self, client_id: str) -> ClientConfig:
+        cfg = self._configs.get(client_id)
+        now = time.monotonic()
+        if cfg is not None and now < self._next_check.get(client_id, 0.0):
+            return cfg
+        with self._lock:
+            cfg = self._configs.get(client_id)
+            self._next_check[client_id] = now + self.check_interval
+            mtimes = (_stat_mtime(self.dialogue_config_path(client_id)),
+                      _stat_mtime(self.voice_list_path(client_id)))
+            if cfg is not None and cfg.mtimes == mtimes:
+                return cfg
+            cfg = self._load(client_id, mtimes)
+            self._configs[client_id] = cfg
+            return cfg
+
+    def _load(self, client_id: str, mtimes) -> ClientConfig:
+        config, loaded = {}, False
+        try:
+            with open(self.dialogue_config_path(client_id), "r", encoding="utf-8") as f:
+                config = json.load(f)
+            loaded = True
+        except Exception as e:
+            logger.warning("[CLIENT_CONFIG] dialogue_config load failed client=%s err=%s", client_id, e)
+
+        voice_map = {}
+        try:
+            with open(self.voice_list_path(client_id), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    parts = line.split("\t")
+                    if len(parts) >= 2:
+                        voice_map[parts[0]] = parts[1]
+        except Exception as e:
+            logger.warning("[CLIENT_CONFIG] voice_list load failed client=%s err=%s", client_id, e)
+
+        logger.info("[CLIENT_CONFIG] loaded client=%s patterns=%d voices=%d",
+                    client_id, len(config.get("patterns", [])), len(voice_map))
+        return ClientConfig(client_id, config, voice_map, loaded, mtimes)
+
+    def invalidate(self, client_id: Optional[str] = None) -> None:
+        with self._lock:
+            if client_id:
+                self._configs.pop(client_id, None)
+                self._next_check.pop(client_id, None)
+            else:
+                self._configs.clear()
+                self._next_check.clear()
+
+
+_registry: Optional[ClientConfigRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_config_registry() -> ClientConfigRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientConfigRegistry()
+    return _registry
+
+
+def get_client_config(client_id: str) -> ClientConfig:
+    return get_client_config_registry().get(client_id)
@@ -0,0 +1,307 @@
+"""
+ConsoleOutbox - 管理コンソールへの通話イベント・ログの非同期送信
+
+通話処理スレッドから requests.post や DB セッションの作成を直接行わないための送信キュー。
+
+- 呼び出し側は submit() で上限付きキュー（LC_CONSOLE_QUEUE_MAX）に積むだけ。満杯なら捨てて数える
+- 専用ワーカー1本が LC_CONSOLE_BATCH_MS ごと（または LC_CONSOLE_BATCH_MAX 件）にまとめ、
+  keep-alive の requests.Session で POST {base}/api/calls/events:batch に1回で送る
+- 送信に失敗したバッチはスプールファイル（JSONL, fsync 済み）に退避し、
+  （サーバーが 503 で detail.retry に未適用イベントの位置を返した場合はその分だけ）
+  LC_CONSOLE_RETRY_BASE_SEC から倍々（最大 LC_CONSOLE_RETRY_MAX_SEC）のバックオフ後に
+  ワーカーが古い順に再送する。スプールが残っている間の新しいバッチもスプールへ回す（順序を保つ）
+- プロセス再起動後も、残っているスプールから再送を始める
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONSOLE_QUEUE_MAX = int(os.environ.get("LC_CONSOLE_QUEUE_MAX", "5000"))
+CONSOLE_BATCH_MS = float(os.environ.get("LC_CONSOLE_BATCH_MS", "200"))
+CONSOLE_BATCH_MAX = int(os.environ.get("LC_CONSOLE_BATCH_MAX", "200"))
+CONSOLE_HTTP_TIMEOUT = float(os.environ.get("LC_CONSOLE_HTTP_TIMEOUT", "5"))
+CONSOLE_RETRY_BASE_SEC = float(os.environ.get("LC_CONSOLE_RETRY_BASE_SEC", "1.0"))
+CONSOLE_RETRY_MAX_SEC = float(os.environ.get("LC_CONSOLE_RETRY_MAX_SEC", "60"))
+CONSOLE_SPOOL_PATH = os.environ.get(
+    "LC_CONSOLE_SPOOL_PATH", "/opt/libertycall/logs/console_outbox.spool.jsonl"
+)
+BATCH_ENDPOINT = "/api/calls/events:batch"
+
+_FLUSH = object()
+
+
+class DeliveryError(Exception):
+    """再送すべき送信失敗（接続エラー・5xx など）
+
+    unsent: 一部だけ適用された場合の未適用イベント（None ならバッチ全体を再送）
+    """
+
+    def __init__(self, message: str, unsent: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.unsent = unsent
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ConsoleOutbox:
+    def __init__(self, base_url: str, spool_path: str = CONSOLE_SPOOL_PATH,
+                 batch_interval: float = CONSOLE_BATCH_MS / 1000.0,
+                 batch_max: int = CONSOLE_BATCH_MAX,
+                 queue_max: int = CONSOLE_QUEUE_MAX,
+                 sender=None):
+        self.base_url = base_url.rstrip("/")
+        self.spool_path = Path(spool_path)
+        self.replay_path = self.spool_path.with_name(self.spool_path.name + ".replay")
+        self.batch_interval = batch_interval
+        self.batch_max = max(1, batch_max)
+        # sender(events) は送れたら戻り、再送すべき失敗なら DeliveryError を投げる（テスト用に差し替え可）
+        self._sender = sender or self._post_batch
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_max)
+        self._session = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._spool_pending = self.spool_path.exists() or self.replay_path.exists()
+        # 統計
+        self.sent = 0
+        self.batches = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------------------ #
+    def submit(self, kind: str, call_id: Optional[str], **fields) -> bool:
+        """イベントを積む（待たない）。キューが満杯なら False"""
+        event = {"kind": kind, "call_id": call_id,
+                 "queued_at": datetime.utcnow().isoformat(), **fields}
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning("[CONSOLE_OUTBOX] queue full, dropped=%d kind=%s call_id=%s",
+                               self.dropped, kind, call_id)
+            return False
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """積まれている分を送信（またはスプール）し終えるまで待つ"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "sent": self.sent,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "spool_pending": self._spool_pending,
+            "consecutive_failures": self._failures,
+        }
+
+    # ------------------------------------------------------------------ #
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name="console_outbox", daemon=True)
+            thread.start()
+            self._thread = thread
+            atexit.register(self.flush)
+        logger.info("[CONSOLE_OUTBOX] started url=%s%s batch=%.0fms spool=%s",
+                    self.base_url, BATCH_ENDPOINT, self.batch_interval * 1000.0,
+                    self.spool_path)
+
+    def _run(self) -> None:
+        while True:
+            batch, waiters = self._collect()
+            try:
+                if batch:
+                    self._deliver(batch)
+                if self._spool_pending and time.monotonic() >= self._retry_at:
+                    self._replay()
+            except Exception:
+                logger.exception("[CONSOLE_OUTBOX] worker error")
+            for done in waiters:
+                done.set()
+
+    def _collect(self):
+        """最初の1件を待ち、そこから batch_interval の間に来た分をまとめる"""
+        batch: List[Dict[str, Any]] = []
+        waiters: List[threading.Event] = []
+        timeout = None
+        if self._spool_pending:
+            timeout = max(0.05, self._retry_at - time.monotonic())
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return batch, waiters
+        deadline = time.monotonic() + self.batch_interval
+        while True:
+            if isinstance(item, tuple) and item and item[0] is _FLUSH:
+                waiters.append(item[1])
+                break
+            batch.append(item)
+            if len(batch) >= self.batch_max:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        return batch, waiters
+
+    def _deliver(self, batch: List[Dict[str, Any]]) -> None:
+        if self._spool_pending:
+            # スプールの再送が終わるまでは順序を守るため後ろに積む
+            self._spool(batch)
+            return
+        unsent = self._try_send(batch)
+        if unsent:
+            self._spool(unsent)
+
+    def _try_send(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """送信して、再送が必要なイベントを返す（全部届いたら空）"""
+        try:
+            self._sender(batch)
+        except DeliveryError as e:
+            unsent = batch if e.unsent is None else e.unsent
+            self._failures += 1
+            delay = min(CONSOLE_RETRY_MAX_SEC, CONSOLE_RETRY_BASE_SEC * (2 ** min(self._failures - 1, 16)))
+            self._retry_at = time.monotonic() + delay
+            self.sent += len(batch) - len(unsent)
+            logger.warning("[CONSOLE_OUTBOX] send failed (%d/%d events), retry in %.1fs: %s",
+                           len(unsent), len(batch), delay, e)
+            return unsent
+        if self._failures:
+            logger.info("[CONSOLE_OUTBOX] console reachable again after %d failures",
+                        self._failures)
+        self._failures = 0
+        self.sent += len(batch)
+        self.batches += 1
+        return []
+
+    # ------------------------------------------------------------------ #
+    def _post_batch(self, events: List[Dict[str, Any]]) -> None:
+        if self._session is None:
+            try:
+                import requests
+            except ImportError as e:
+                raise DeliveryError("requests is not installed") from e
+            self._session = requests.Session()
+        url = f"{self.base_url}{BATCH_ENDPOINT}"
+        body = json.dumps({"events": events}, ensure_ascii=False, default=_json_default)
+        try:
+            response = self._session.post(
+                url, data=body.encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                timeout=CONSOLE_HTTP_TIMEOUT,
+            )
+        except Exception as e:
+            raise DeliveryError(str(e)) from e
+        status = response.status_code
+        if status >= 500 or status in (408, 429):
+            raise DeliveryError(f"HTTP {status}", self._unsent_from(response, events))
+        if status >= 400:
+            # 内容が受け付けられない: 再送しても同じなので捨てる
+            self.rejected += len(events)
+            logger.error("[CONSOLE_OUTBOX] batch rejected HTTP %s: %s", status, response.text[:200])
+
+    @staticmethod
+    def _unsent_from(response, events: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """503 の detail.retry（未適用イベントの位置）から再送分を取り出す。無ければ None"""
+        try:
+            retry = response.json()["detail"]["retry"]
+            return [events[i] for i in retry]
+        except Exception:
+            return None
+
+    def _spool(self, batch: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(e, ensure_ascii=False, default=_json_default) + "\n"
+                        for e in batch)
+        try:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            self.dropped += len(batch)
+            logger.error("[CONSOLE_OUTBOX] spool write failed, dropped %d events: %s",
+                         len(batch), e)
+            return
+        self.spooled += len(batch)
+        self._spool_pending = True
+
+    def _replay(self) -> None:
+        """スプールを古い順に再送する。失敗したら残りを replay ファイルに書き戻す"""
+        if not self.replay_path.exists():
+            if not self.spool_path.exists():
+                self._spool_pending = False
+                return
+            os.replace(self.spool_path, self.replay_path)
+        try:
+            with open(self.replay_path, "r", encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+        except OSError as e:
+            logger.error("[CONSOLE_OUTBOX] spool read failed: %s", e)
+            return
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                logger.warning("[CONSOLE_OUTBOX] skip broken spool line: %r", line[:200])
+
+        for start in range(0, len(events), self.batch_max):
+            chunk = events[start:start + self.batch_max]
+            unsent = self._try_send(chunk)
+            if unsent:
+                self.replayed += len(chunk) - len(unsent)
+                self._rewrite_replay(unsent + events[start + len(chunk):])
+                return
+            self.replayed += len(chunk)
+        os.unlink(self.replay_path)
+        logger.info("[CONSOLE_OUTBOX] replayed %d spooled events", len(events))
+        self._spool_pending = self.spool_path.exists()
+
+    def _rewrite_replay(self, events: List[Dict[str, Any]]) -> None:
+        tmp = self.replay_path.with_name(self.replay_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False, default=_json_default) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.replay_path)
@@ -0,0 +1,188 @@
+"""
+FreeSWITCH 側スクリプトと gateway の間の制御メッセージ
+
+/tmp のフラグファイルやログファイルを定期的に glob・読み直す代わりに使う。
+
+- gateway への通知（ASR 有効化・RTP ポート情報・転送失敗時の TTS 要求）は
+  既存のイベントソケット（/tmp/liberty_gateway_events.sock）に JSON 1行で送る
+  （evl_gateway_sender.send_event_to_gateway と同じ形式）。
+- gateway → Lua スクリプトへの「ASR が反応した」通知は、ファイルではなく
+  チャネル変数（uuid_setvar）で渡す。
+- 互換のためファイルを監視する場合は DirectoryWatcher を使う。Linux では inotify で
+  変更を待ち、使えない環境では LC_CONTROL_POLL_SEC 間隔のポーリングに落ちる。
+"""
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import struct
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# イベントソケットで受け付ける制御メッセージ（"event" の値）
+EVENT_ASR_ENABLE = "asr_enable"
+EVENT_RTP_INFO = "rtp_info"
+EVENT_HANDOFF_TTS = "handoff_tts"
+
+# Lua（play_audio_sequence.lua）が参照するチャネル変数
+ASR_RESPONSE_VAR = "lc_asr_response"
+
+# inotify が使えないときのポーリング間隔（秒）
+CONTROL_POLL_SEC = float(os.environ.get("LC_CONTROL_POLL_SEC", "2.0"))
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        try:
+            lib = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            lib.inotify_init1
+            _libc = lib
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc or None
+
+
+def notify_asr_response(uuid: str, esl=None) -> bool:
+    """
+    ASR が反応したことを FreeSWITCH のチャネル変数で通知する（待たずに返る）。
+    Lua 側は session:getVariable(ASR_RESPONSE_VAR) で確認する。
+    """
+    if not uuid:
+        return False
+    try:
+        if esl is None:
+            from libs.esl.async_esl import get_shared_esl
+            esl = get_shared_esl()
+        esl.bgapi_nowait(f"uuid_setvar {uuid} {ASR_RESPONSE_VAR} {time.time():.3f}")
+        return True
+    except Exception as e:
+        logger.warning("[CONTROL] asr_response notify failed uuid=%s err=%s", uuid, e)
+        return False
+
+
+def parse_rtp_port(local_rtp: Optional[str]) -> Optional[int]:
+    """"ip:port" からポート番号を取り出す"""
+    if not local_rtp or ":" not in local_rtp:
+        return None
+    try:
+        return int(local_rtp.strip().rsplit(":", 1)[1])
+    except ValueError:
+        return None
+
+
+def read_rtp_info_file(path: Path) -> Dict[str, str]:
+    """Lua が書く rtp_info_<uuid>.txt（key=value 行）を読む"""
+    info: Dict[str, str] = {}
+    with open(path, "r") as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            if sep:
+                info[key.strip()] = value.strip()
+    return info
+
+
+class DirectoryWatcher:
+    """ディレクトリ内の patterns に一致するファイルの作成・更新を待つ"""
+
+    def __init__(self, directory, patterns: Iterable[str],
+                 mask: int = IN_CLOSE_WRITE | IN_MOVED_TO,
+                 poll_interval: float = CONTROL_POLL_SEC):
+        self.directory = Path(directory)
+        self.patterns = list(patterns)
+        self.mask = mask
+        self.poll_interval = poll_interval
+        self.using_inotify = False
+
+    def _match(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, p) for p in self.patterns)
+
+    def existing(self):
+        """監視開始前からあるファイル（更新時刻の古い順）"""
+        try:
+            files = [p for p in self.directory.iterdir() if self._match(p.name)]
+            return sorted(files, key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return []
+
+    def _open_inotify(self) -> Optional[int]:
+        libc = _get_libc()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(str(self.directory)), self.mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _drain(self, fd: int, queue: "asyncio.Queue[Path]") -> None:
+        try:
+            buf = os.read(fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if name and self._match(name):
+                queue.put_nowait(self.directory / name)
+
+    async def changes(self) -> AsyncIterator[Path]:
+        """作成・更新されたファイルを順に返す（呼び出し側が止めるまで続く）"""
+        fd = self._open_inotify()
+        if fd is None:
+            logger.info("[CONTROL] inotify unavailable, polling %s every %.1fs",
+                        self.directory, self.poll_interval)
+            async for path in self._poll():
+                yield path
+            return
+        self.using_inotify = True
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Path]" = asyncio.Queue()
+        loop.add_reader(fd, self._drain, fd, queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            loop.remove_reader(fd)
+            os.close(fd)
+
+    async def _poll(self) -> AsyncIterator[Path]:
+        # 開始時点のファイルは existing() で扱う（inotify と同じく変更分だけ返す）
+        seen: Dict[Path, float] = {}
+        for path in self.existing():
+            try:
+                seen[path] = path.stat().st_mtime
+            except OSError:
+                pass
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for path in self.existing():
+                try:
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    continue
+                if seen.get(path) != mtime:
+                    seen[path] = mtime
+                    yield path
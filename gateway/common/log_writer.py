@@ -0,0 +1,295 @@
+"""
+LogWriter - 通話ログ（JSONL / テキスト）のバッファ付き非同期書き込み
+
+ASR の途中結果のように1通話で毎秒何度も来るログ行を、呼び出し元のスレッドで
+json.dumps → write → flush（あるいは open → write → close）しないための共有ステージ。
+
+- 呼び出し側は write(path, record) でキュー（collections.deque）に積むだけ。ロックは取らない
+- 専用スレッド1本がキューを取り出し、ファイルごとに開いたままのハンドルへまとめて書く
+- flush は LC_LOG_FLUSH_MS（既定 50ms）ごと、またはバッファが LC_LOG_BATCH_BYTES を
+  超えたとき（キューが LC_LOG_BATCH_RECORDS 件を超えたら間隔を待たずに起こす）。
+  fsync は LC_LOG_FSYNC_SEC ごと（0 で無効）
+- close(path) は残りを書き出して fsync してから閉じる（通話終了時に使う）
+- しばらく書き込みの無いファイルは LC_LOG_IDLE_CLOSE_SEC で自動的に閉じる
+- get_stats() で書き込み遅延（積んでから OS に渡すまで）とキュー長を確認できる
+"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+LOG_FLUSH_MS = float(os.environ.get("LC_LOG_FLUSH_MS", "50"))
+LOG_BATCH_BYTES = int(os.environ.get("LC_LOG_BATCH_BYTES", "65536"))
+# これだけ積まれたら flush 間隔を待たずに書き込みスレッドを起こす
+LOG_BATCH_RECORDS = int(os.environ.get("LC_LOG_BATCH_RECORDS", "512"))
+LOG_FSYNC_SEC = float(os.environ.get("LC_LOG_FSYNC_SEC", "1.0"))
+LOG_IDLE_CLOSE_SEC = float(os.environ.get("LC_LOG_IDLE_CLOSE_SEC", "120"))
+# close() / flush() が書き込み完了を待つ最大秒数
+LOG_CLOSE_WAIT_SEC = float(os.environ.get("LC_LOG_CLOSE_WAIT_SEC", "2.0"))
+
+_WRITE = 0
+_CLOSE = 1
+_FLUSH = 2
+
+Record = Union[str, Dict[str, Any]]
+
+
+class _OpenFile:
+    __slots__ = ("path", "fh", "lines", "size", "enqueued", "last_write", "dirty_since_sync")
+
+    def __init__(self, path: str, fh):
+        self.path = path
+        self.fh = fh
+        self.lines: List[str] = []
+        self.size = 0
+        self.enqueued: List[float] = []
+        self.last_write = time.monotonic()
+        self.dirty_since_sync = False
+
+
+class LogWriter:
+    def __init__(self, flush_interval: float = LOG_FLUSH_MS / 1000.0,
+                 batch_bytes: int = LOG_BATCH_BYTES,
+                 fsync_interval: float = LOG_FSYNC_SEC,
+                 idle_close: float = LOG_IDLE_CLOSE_SEC):
+        self.flush_interval = max(0.001, flush_interval)
+        self.batch_bytes = batch_bytes
+        self.fsync_interval = fsync_interval
+        self.idle_close = idle_close
+        # deque の append / popleft はスレッドセーフなので書き込み側はロック不要
+        self._queue: Deque[Tuple[int, Optional[str], Any, float]] = collections.deque()
+        self._wake = threading.Event()
+        self._idle = True
+        self._files: Dict[str, _OpenFile] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        self._last_idle_check = time.monotonic()
+        # 統計
+        self.records = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self._latency_total = 0.0
+        self._latency_count = 0
+        self.max_latency = 0.0
+
+    # ------------------------------------------------------------------ #
+    def write(self, path: str, record: Record) -> None:
+        """1行追記する（dict は書き込みスレッド側で JSON にする）"""
+        self._ensure_started()
+        self._queue.append((_WRITE, path, record, time.monotonic()))
+        if self._idle or len(self._queue) >= LOG_BATCH_RECORDS:
+            self._wake.set()
+
+    def close(self, path: str, wait: Optional[float] = LOG_CLOSE_WAIT_SEC) -> bool:
+        """path の残りを書き出して fsync し、ハンドルを閉じる"""
+        return self._control(_CLOSE, path, wait)
+
+    def flush(self, wait: Optional[float] = LOG_CLOSE_WAIT_SEC) -> bool:
+        """キューに積まれている分をすべて OS に渡す（fsync はしない）"""
+        return self._control(_FLUSH, None, wait)
+
+    def _control(self, kind: int, path: Optional[str], wait: Optional[float]) -> bool:
+        self._ensure_started()
+        done = threading.Event()
+        self._queue.append((kind, path, done, time.monotonic()))
+        self._wake.set()
+        if not wait:
+            return True
+        if threading.current_thread() is self._thread:
+            return False
+        return done.wait(wait)
+
+    def get_stats(self) -> dict:
+        avg = self._latency_total / self._latency_count if self._latency_count else 0.0
+        return {
+            "records": self.records,
+            "batches": self.batches,
+            "fsyncs": self.fsyncs,
+            "errors": self.errors,
+            "open_files": len(self._files),
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+            "avg_write_latency_ms": round(avg * 1000.0, 2),
+            "max_write_latency_ms": round(self.max_latency * 1000.0, 2),
+        }
+
+    # ------------------------------------------------------------------ #
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name="log_writer", daemon=True)
+            thread.start()
+            self._thread = thread
+            atexit.register(self.flush)
+        logger.info("[LOG_WRITER] started flush=%.0fms batch=%dB fsync=%.1fs",
+                    self.flush_interval * 1000.0, self.batch_bytes, self.fsync_interval)
+
+    def _run(self) -> None:
+        next_flush: Optional[float] = None
+        while True:
+            if next_flush is None:
+                # バッファが空: 次の書き込みまで眠る
+                self._idle = True
+                if not self._queue:
+                    self._wake.wait(timeout=self._idle_wait())
+                self._idle = False
+            else:
+                timeout = next_flush - time.monotonic()
+                if timeout > 0:
+                    self._wake.wait(timeout=timeout)
+            self._wake.clear()
+
+            try:
+                pending, forced = self._drain()
+                now = time.monotonic()
+                if pending and next_flush is None:
+                    next_flush = now + self.flush_interval
+                if forced or pending >= self.batch_bytes or (
+                        next_flush is not None and now >= next_flush):
+                    self._flush_all(now)
+                    next_flush = None
+                self._maintenance(now)
+            except Exception:
+                self.errors += 1
+                logger.exception("[LOG_WRITER] writer loop error")
+
+    def _idle_wait(self) -> Optional[float]:
+        if not self._files:
+            return None
+        return max(self.fsync_interval, 1.0) if self.fsync_interval > 0 else 1.0
+
+    def _drain(self) -> Tuple[int, bool]:
+        """キューを取り出してファイルごとのバッファに積む。戻り値は (未書き込みバイト数, 即時 flush 要否)"""
+        depth = len(self._queue)
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        forced = False
+        queue = self._queue
+        while queue:
+            kind, path, payload, enqueued = queue.popleft()
+            if kind == _WRITE:
+                entry = self._open(path)
+                if entry is None:
+                    continue
+                if isinstance(payload, str):
+                    line = payload if payload.endswith("\n") else payload + "\n"
+                else:
+                    line = json.dumps(payload, ensure_ascii=False) + "\n"
+                entry.lines.append(line)
+                entry.size += len(line)
+                entry.enqueued.append(enqueued)
+            elif kind == _CLOSE:
+                entry = self._files.pop(path, None)
+                if entry is not None:
+                    self._write_out(entry, time.monotonic())
+                    self._sync(entry)
+                    self._close_fh(entry)
+                payload.set()
+            else:
+                forced = True
+                self._flush_all(time.monotonic())
+                payload.set()
+        return sum(entry.size for entry in self._files.values()), forced
+
+    def _open(self, path: str) -> Optional[_OpenFile]:
+        entry = self._files.get(path)
+        if entry is not None:
+            return entry
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fh = open(path, "a", encoding="utf-8")
+        except OSError as e:
+            self.errors += 1
+            logger.error("[LOG_WRITER] open failed path=%s err=%s", path, e)
+            return None
+        entry = _OpenFile(path, fh)
+        self._files[path] = entry
+        return entry
+
+    def _write_out(self, entry: _OpenFile, now: float) -> None:
+        if not entry.lines:
+            return
+        try:
+            entry.fh.write("".join(entry.lines))
+            entry.fh.flush()
+            entry.dirty_since_sync = True
+        except OSError as e:
+            self.errors += 1
+            logger.error("[LOG_WRITER] write failed path=%s err=%s", entry.path, e)
+        self.records += len(entry.lines)
+        self.batches += 1
+        for enqueued in entry.enqueued:
+            latency = now - enqueued
+            self._latency_total += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+        self._latency_count += len(entry.enqueued)
+        entry.lines = []
+        entry.enqueued = []
+        entry.size = 0
+        entry.last_write = now
+
+    def _flush_all(self, now: float) -> None:
+        for entry in self._files.values():
+            self._write_out(entry, now)
+
+    def _sync(self, entry: _OpenFile) -> None:
+        if not entry.dirty_since_sync:
+            return
+        try:
+            os.fsync(entry.fh.fileno())
+            self.fsyncs += 1
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            logger.warning("[LOG_WRITER] fsync failed path=%s err=%s", entry.path, e)
+        entry.dirty_since_sync = False
+
+    def _close_fh(self, entry: _OpenFile) -> None:
+        try:
+            entry.fh.close()
+        except OSError:
+            pass
+
+    def _maintenance(self, now: float) -> None:
+        if self.fsync_interval > 0 and now - self._last_sync >= self.fsync_interval:
+            self._last_sync = now
+            for entry in self._files.values():
+                if not entry.lines:
+                    self._sync(entry)
+        if self.idle_close > 0 and now - self._last_idle_check >= 1.0:
+            self._last_idle_check = now
+            for path in [p for p, e in self._files.items()
+                         if not e.lines and now - e.last_write >= self.idle_close]:
+                entry = self._files.pop(path)
+                self._sync(entry)
+                self._close_fh(entry)
+
+
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> LogWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = LogWriter()
+    return _writer
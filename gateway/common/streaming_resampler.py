@@ -0,0 +1,126 @@
+"""StreamingResampler - 状態を引き継ぐポリフェーズ・リサンプラー（8k→16k 等）"""
+from __future__ import annotations
+
+import threading
+from math import gcd
+from typing import Dict, Tuple, Union
+
+import numpy as np
+from scipy.signal import firwin, lfilter, lfilter_zi
+
+# (up, down) -> ポリフェーズ分解済みFIR係数 (up, taps_per_phase)
+_FILTER_CACHE: Dict[Tuple[int, int], np.ndarray] = {}
+_FILTER_LOCK = threading.Lock()
+
+
+def _design_polyphase(up: int, down: int) -> np.ndarray:
+    """resample_poly と同じ設計（Kaiser β=5.0, half_len=10*max_rate）のFIRを1回だけ作る"""
+    key = (up, down)
+    phases = _FILTER_CACHE.get(key)
+    if phases is not None:
+        return phases
+    with _FILTER_LOCK:
+        phases = _FILTER_CACHE.get(key)
+        if phases is None:
+            max_rate = max(up, down)
+            num_taps = 2 * 10 * max_rate + 1
+            taps = firwin(num_taps, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+            # 位相ごとに係数を分解（長さを up の倍数に揃える）
+            padded = np.zeros(-(-num_taps // up) * up, dtype=np.float64)
+            padded[:num_taps] = taps
+            phases = padded.reshape(-1, up).T.copy()
+            _FILTER_CACHE[key] = phases
+    return phases
+
+
+class StreamingResampler:
+    """
+    チャンク境界をまたいでフィルタ状態（zi）を引き継ぐ有理数比リサンプラー
+
+    FIR はリサンプル比ごとにプロセス全体で1回だけ設計し、通話ごとの
+    インスタンスは各位相の lfilter 状態だけを持つ。20ms ごとに
+    resample_poly を呼ぶ場合と違い、チャンク境界でのエッジ歪みが出ない。
+    出力は事前確保バッファへのビューで、次の process() 呼び出しで上書きされる。
+    スレッドセーフではないため通話（ストリーム）ごとに1インスタンス。
+    """
+
+    def __init__(self, up: int = 2, down: int = 1, max_chunk: int = 4096) -> None:
+        g = gcd(up, down)
+        self.up = up // g
+        self.down = down // g
+        self._phases = _design_polyphase(self.up, self.down)
+        # FIR の群遅延（アップサンプル後のサンプル数）
+        self._delay = 10 * max(self.up, self.down)
+        self._zi = [lfilter_zi(h, 1.0) * 0.0 for h in self._phases]
+        self._decim_offset = 0
+        self._alloc(max_chunk)
+
+    def _alloc(self, max_chunk: int) -> None:
+        self._capacity = max_chunk
+        self._upsampled = np.empty(max_chunk * self.up, dtype=np.float64)
+        self._out_i16 = np.empty(max_chunk * self.up, dtype=np.int16)
+        self._out_f32 = np.empty(max_chunk * self.up, dtype=np.float32)
+
+    def reset(self) -> None:
+        """フィルタ状態を初期化（新しいストリームの開始時）"""
+        for zi in self._zi:
+            zi.fill(0.0)
+        self._decim_offset = 0
+
+    def _run(self, samples: np.ndarray) -> np.ndarray:
+        n = len(samples)
+        if n > self._capacity:
+            self._alloc(max(n, self._capacity * 2))
+        up = self.up
+        upsampled = self._upsampled[: n * up]
+        for k in range(up):
+            upsampled[k::up], self._zi[k] = lfilter(self._phases[k], 1.0, samples, zi=self._zi[k])
+        if self.down == 1:
+            return upsampled
+        # 間引き位置をチャンク間で引き継ぐ
+        out = upsampled[self._decim_offset::self.down]
+        self._decim_offset = (self._decim_offset - len(upsampled)) % self.down
+        return out
+
+    def process(self, pcm: Union[bytes, bytearray, memoryview, np.ndarray]) -> np.ndarray:
+        """PCM16 チャンクを変換し int16 配列（ビュー）を返す"""
+        samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        if len(samples) == 0:
+            return self._out_i16[:0]
+        result = self._run(samples)
+        out = self._out_i16[: len(result)]
+        np.clip(result, -32768, 32767, out=result)
+        np.copyto(out, result, casting="unsafe")
+        return out
+
+    def process_bytes(self, pcm: Union[bytes, bytearray, memoryview, np.ndarray]) -> bytes:
+        return self.process(pcm).tobytes()
+
+    def process_float(self, samples: np.ndarray) -> np.ndarray:
+        """正規化済み float 配列を変換し float32 配列（ビュー）を返す"""
+        if len(samples) == 0:
+            return self._out_f32[:0]
+        result = self._run(samples)
+        out = self._out_f32[: len(result)]
+        np.copyto(out, result, casting="same_kind")
+        return out
+
+    def resample_block(self, samples: np.ndarray) -> np.ndarray:
+        """
+        独立したバッファ全体を一括変換（resample_poly と同じ出力）
+
+        発話バッファ全体を毎回変換し直す用途向け。ストリーム状態は使わず、
+        末尾をゼロで出し切ってからフィルタの群遅延を取り除くため、
+        出力長は ceil(len * up / down) で先頭・末尾がずれない。戻り値は新しい float32 配列。
+        """
+        n = len(samples)
+        n_out = -(-n * self.up // self.down)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        padded = np.zeros(n + self._delay // self.up + 1, dtype=np.float64)
+        padded[:n] = samples
+        up = self.up
+        upsampled = np.empty(len(padded) * up, dtype=np.float64)
+        for k in range(up):
+            upsampled[k::up] = lfilter(self._phases[k], 1.0, padded)
+        return upsampled[self._delay::self.down][:n_out].astype(np.float32)
@@ -0,0 +1,272 @@
+"""
+TimerWheel - プロセス共有のハッシュ化タイマーホイール
+
+通話ごとの無音・アイドル・催促タイムアウトを1つのホイールで管理する。
+通話ごとにスレッドや threading.Timer を作らず、1秒ごとに全通話を走査もしない。
+
+- 期限は tick 単位（既定 20ms）の絶対 tick 番号で管理し、slot = tick % slots に入れる
+  （1周を超える期限は同じ slot に入ったまま、その tick が来るまで発火しない）
+- 追加・取り消し・期限の変更はいずれも O(1)。期限を後ろへずらす場合は slot を移さず、
+  古い slot の処理時に移し替える（発話ごとに reset しても安い）
+- ホイールは専用スレッドの asyncio ループで回り、タイマーが1つも無い間は眠っている
+- API はどのスレッドからでも呼べる。コールバックは
+    loop 指定あり: そのイベントループで実行（コルーチン関数なら Task として実行）
+    inline=True : ホイールのスレッドで実行（すぐ終わる処理のみ）
+    executor 指定あり: その Executor で実行（推論など重い処理。共有ワーカーを塞がない）
+    それ以外    : 共有のワーカースレッド（LC_TIMER_WORKERS 本）で実行
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TIMER_WHEEL_TICK = float(os.environ.get("LC_TIMER_WHEEL_TICK", "0.02"))
+TIMER_WHEEL_SLOTS = int(os.environ.get("LC_TIMER_WHEEL_SLOTS", "512"))
+# コールバックを実行するワーカースレッド数（通話数によらず一定）
+TIMER_WORKERS = int(os.environ.get("LC_TIMER_WORKERS", "8"))
+
+
+class TimerHandle:
+    """call_later() の戻り値。cancel() / reset() はどのスレッドからでも呼べる"""
+
+    __slots__ = ("_wheel", "callback", "args", "loop", "inline", "executor", "deadline", "tick",
+                 "_slot", "cancelled", "fired")
+
+    def __init__(self, wheel: "TimerWheel", callback: Callable, args: tuple,
+                 loop: Optional[asyncio.AbstractEventLoop], inline: bool,
+                 executor: Optional[Executor] = None):
+        self._wheel = wheel
+        self.callback = callback
+        self.args = args
+        self.loop = loop
+        self.inline = inline
+        self.executor = executor
+        self.deadline = 0.0
+        self.tick = 0
+        self._slot: Optional[int] = None
+        self.cancelled = False
+        self.fired = False
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled and not self.fired
+
+    def cancel(self) -> None:
+        self._wheel._cancel(self)
+
+    def reset(self, delay: float) -> "TimerHandle":
+        """期限を「今から delay 秒後」に変更する（発火済み・取り消し済みなら再登録）"""
+        self._wheel._reset(self, delay)
+        return self
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class TimerWheel:
+    def __init__(self, tick: float = TIMER_WHEEL_TICK, slots: int = TIMER_WHEEL_SLOTS,
+                 workers: int = TIMER_WORKERS):
+        self.tick = tick
+        self.slots = max(8, slots)
+        self._wheel: List[Set[TimerHandle]] = [set() for _ in range(self.slots)]
+        self._count = 0
+        self._current = self._tick_of(time.monotonic())
+        self._lock = threading.Lock()
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake: Optional[asyncio.Future] = None
+        self._ready = threading.Event()
+        self.fired = 0
+        self.max_lateness = 0.0
+
+    # ------------------------------------------------------------------ #
+    def call_later(self, delay: float, callback: Callable, *args,
+                   loop: Optional[asyncio.AbstractEventLoop] = None,
+                   inline: bool = False,
+                   executor: Optional[Executor] = None) -> TimerHandle:
+        handle = TimerHandle(self, callback, args, loop, inline, executor)
+        self._reset(handle, delay)
+        return handle
+
+    def reset(self, handle: Optional[TimerHandle], delay: float, callback: Callable, *args,
+              loop: Optional[asyncio.AbstractEventLoop] = None,
+              inline: bool = False,
+              executor: Optional[Executor] = None) -> TimerHandle:
+        """handle があれば期限を変更し、無ければ新しく登録する"""
+        if handle is None:
+            return self.call_later(delay, callback, *args, loop=loop, inline=inline,
+                                   executor=executor)
+        handle.callback = callback
+        handle.args = args
+        handle.executor = executor
+        return handle.reset(delay)
+
+    def pending(self) -> int:
+        return self._count
+
+    def get_stats(self) -> dict:
+        return {"pending": self._count, "fired": self.fired,
+                "max_lateness_ms": round(self.max_lateness * 1000.0, 1)}
+
+    # ------------------------------------------------------------------ #
+    def _tick_of(self, deadline: float) -> int:
+        return int(-(-deadline // self.tick))  # 切り上げ（期限より前には発火しない）
+
+    def _unlink(self, handle: TimerHandle) -> None:
+        if handle._slot is not None:
+            self._wheel[handle._slot].discard(handle)
+            handle._slot = None
+            self._count -= 1
+
+    def _link(self, handle: TimerHandle) -> None:
+        slot = handle.tick % self.slots
+        self._wheel[slot].add(handle)
+        handle._slot = slot
+        self._count += 1
+
+    def _cancel(self, handle: TimerHandle) -> None:
+        with self._lock:
+            handle.cancelled = True
+            self._unlink(handle)
+
+    def _reset(self, handle: TimerHandle, delay: float) -> None:
+        deadline = time.monotonic() + max(0.0, delay)
+        tick = max(self._tick_of(deadline), self._current + 1)
+        with self._lock:
+            was_empty = self._count == 0
+            handle.cancelled = False
+            handle.fired = False
+            handle.deadline = deadline
+            if handle._slot is not None and tick >= handle.tick:
+                # 後ろへずらすだけなら slot はそのまま（古い slot の処理時に移す）
+                handle.tick = tick
+                return
+            self._unlink(handle)
+            handle.tick = tick
+            self._link(handle)
+        if was_empty:
+            self._wake_up()
+
+    # ------------------------------------------------------------------ #
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=max(1, self._workers),
+                                                thread_name_prefix="timer_cb")
+            self._thread = threading.Thread(target=self._thread_main, name="timer_wheel",
+                                            daemon=True)
+            self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def _thread_main(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        logger.info("[TIMER_WHEEL] started tick=%.3fs slots=%d workers=%d",
+                    self.tick, self.slots, self._workers)
+        loop.run_until_complete(self._run())
+
+    def _wake_up(self) -> None:
+        self._ensure_started()
+        loop = self._loop
+        if loop is None:
+            return
+
+        def _set():
+            if self._wake is not None and not self._wake.done():
+                self._wake.set_result(None)
+
+        try:
+            loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._count == 0:
+                self._wake = loop.create_future()
+                if self._count == 0:
+                    await self._wake
+                self._wake = None
+                with self._lock:
+                    # 眠っていた間の tick は空なので飛ばす
+                    self._current = max(self._current, self._tick_of(time.monotonic()) - 1)
+            now_tick = int(time.monotonic() // self.tick)
+            while self._current < now_tick:
+                self._current += 1
+                self._process(self._current)
+            delay = (self._current + 1) * self.tick - time.monotonic()
+            await asyncio.sleep(max(0.0, delay))
+
+    def _process(self, tick: int) -> None:
+        due: List[TimerHandle] = []
+        with self._lock:
+            bucket = self._wheel[tick % self.slots]
+            if not bucket:
+                return
+            for handle in list(bucket):
+                if handle.tick > tick:
+                    if handle.tick % self.slots != tick % self.slots:
+                        # reset で後ろへずれた: 正しい slot へ移す
+                        self._unlink(handle)
+                        self._link(handle)
+                    continue
+                self._unlink(handle)
+                handle.fired = True
+                due.append(handle)
+        now = time.monotonic()
+        for handle in due:
+            self.fired += 1
+            self.max_lateness = max(self.max_lateness, now - handle.deadline)
+            self._dispatch(handle)
+
+    def _dispatch(self, handle: TimerHandle) -> None:
+        try:
+            if handle.loop is not None:
+                if asyncio.iscoroutinefunction(handle.callback):
+                    asyncio.run_coroutine_threadsafe(handle.callback(*handle.args), handle.loop)
+                else:
+                    handle.loop.call_soon_threadsafe(handle.callback, *handle.args)
+            elif handle.inline:
+                handle.callback(*handle.args)
+            elif handle.executor is not None:
+                handle.executor.submit(self._call, handle)
+            else:
+                self._executor.submit(self._call, handle)
+        except Exception as exc:
+            logger.error("[TIMER_WHEEL] dispatch failed cb=%r err=%s", handle.callback, exc)
+
+    @staticmethod
+    def _call(handle: TimerHandle) -> None:
+        try:
+            handle.callback(*handle.args)
+        except Exception:
+            logger.exception("[TIMER_WHEEL] callback error cb=%r", handle.callback)
+
+
+_wheel: Optional[TimerWheel] = None
+_wheel_lock = threading.Lock()
+
+
+def get_timer_wheel() -> TimerWheel:
+    global _wheel
+    if _wheel is None:
+        with _wheel_lock:
+            if _wheel is None:
+                _wheel = TimerWheel()
+    return _wheel
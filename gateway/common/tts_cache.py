@@ -0,0 +1,243 @@
+"""
+TTSCache - 音声合成結果のコンテンツアドレス型キャッシュ
+
+キーは (テキスト, 音声, 速度, ピッチ, サンプルレート, 形式) のハッシュで、合成結果は
+ディスク（cache_dir/<key>）に保存し、直近に使ったものはメモリ上の LRU にも置く。
+ディスクは合計サイズが max_bytes を超えたら最終使用が古いものから削除する。
+
+同じキーの合成が同時に要求された場合は1回だけバックエンドを呼び、他の呼び出し元は
+その結果を待つ（single-flight）。合成に失敗した結果（None / 空）はキャッシュしない。
+
+テンプレート（TEMPLATE_CONFIG）は scripts/warm_tts_cache.py で事前に合成しておける。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = os.environ.get("LC_TTS_CACHE_DIR", "/opt/libertycall/cache/tts")
+# ディスクキャッシュの上限（MB）
+TTS_CACHE_MAX_MB = float(os.environ.get("LC_TTS_CACHE_MAX_MB", "512"))
+# メモリ LRU の上限（MB）
+TTS_CACHE_MEM_MB = float(os.environ.get("LC_TTS_CACHE_MEM_MB", "32"))
+# "0" でキャッシュを使わない（毎回合成）
+TTS_CACHE_ENABLED = os.environ.get("LC_TTS_CACHE_ENABLED", "1") == "1"
+
+_KEY_VERSION = "1"
+
+
+def tts_cache_key(text: str, voice: str, rate: float = 1.0, pitch: float = 0.0,
+                  sample_rate: int = 24000, fmt: str = "pcm") -> str:
+    """合成条件からキャッシュキー（<sha256>.<fmt>、そのままファイル名になる）を作る"""
+    raw = "\x1f".join([_KEY_VERSION, text, voice, f"{float(rate):.4f}", f"{float(pitch):.4f}",
+                       str(int(sample_rate)), fmt])
+    return f"{hashlib.sha256(raw.encode('utf-8')).hexdigest()}.{fmt}"
+
+
+class _Flight:
+    __slots__ = ("event", "result")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Optional[bytes] = None
+
+
+class TTSCache:
+    """ディスク + メモリ LRU の合成結果キャッシュ（スレッドセーフ）"""
+
+    def __init__(self, cache_dir: Optional[str] = TTS_CACHE_DIR,
+                 max_bytes: int = int(TTS_CACHE_MAX_MB * 1024 * 1024),
+                 mem_bytes: int = int(TTS_CACHE_MEM_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.mem_bytes = mem_bytes
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_size = 0
+        # key -> [size, last_used]
+        self._disk: Dict[str, list] = {}
+        self._disk_size = 0
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.cache_dir: Optional[Path] = None
+        if cache_dir:
+            try:
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                self.cache_dir = Path(cache_dir)
+                self._scan()
+            except OSError as e:
+                logger.warning("[TTS_CACHE] disk cache disabled dir=%s err=%s", cache_dir, e)
+
+    def _scan(self) -> None:
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    self._disk[entry.name] = [st.st_size, st.st_mtime]
+                    self._disk_size += st.st_size
+        logger.info("[TTS_CACHE] dir=%s entries=%d bytes=%d",
+                    self.cache_dir, len(self._disk), self._disk_size)
+
+    # ------------------------------------------------------------------ #
+    def path(self, key: str) -> Optional[str]:
+        """ディスク上のファイルパス（FreeSWITCH に直接再生させる場合など）"""
+        with self._lock:
+            entry = self._disk.get(key)
+            if entry is None or self.cache_dir is None:
+                return None
+            entry[1] = time.time()
+        return str(self.cache_dir / key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                entry = self._disk.get(key)
+                if entry is not None:
+                    entry[1] = time.time()
+                return data
+            on_disk = key in self._disk
+        if not on_disk:
+            return None
+        try:
+            data = (self.cache_dir / key).read_bytes()
+        except OSError:
+            with self._lock:
+                self._forget_disk(key)
+            return None
+        with self._lock:
+            entry = self._disk.get(key)
+            if entry is not None:
+                entry[1] = time.time()
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._remember(key, data)
+        if self.cache_dir is None:
+            return
+        path = self.cache_dir / key
+        tmp = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("[TTS_CACHE] write failed key=%s err=%s", key, e)
+            return
+        with self._lock:
+            self._forget_disk(key)
+            self._disk[key] = [len(data), time.time()]
+            self._disk_size += len(data)
+            self._evict_disk()
+
+    def get_or_create(self, key: str, synth: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """キャッシュに無ければ synth() で合成して保存する。同じキーの同時要求は1回にまとめる"""
+        if not TTS_CACHE_ENABLED:
+            return synth()
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            self.coalesced += 1
+            flight.event.wait()
+            return flight.result
+        try:
+            # 直前に別の合成が終わっていた場合
+            data = self.get(key)
+            if data is None:
+                self.misses += 1
+                start = time.monotonic()
+                data = synth()
+                if data:
+                    self.put(key, data)
+                    logger.debug("[TTS_CACHE] miss key=%s bytes=%d synth=%.3fs",
+                                 key[:12], len(data), time.monotonic() - start)
+            else:
+                self.hits += 1
+            flight.result = data
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "mem_entries": len(self._mem),
+                "mem_bytes": self._mem_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+    # ------------------------------------------------------------------ #
+    def _remember(self, key: str, data: bytes) -> None:
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_size -= len(old)
+        if len(data) > self.mem_bytes:
+            return
+        self._mem[key] = data
+        self._mem_size += len(data)
+        while self._mem_size > self.mem_bytes:
+            _, dropped = self._mem.popitem(last=False)
+            self._mem_size -= len(dropped)
+
+    def _forget_disk(self, key: str) -> None:
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_size -= entry[0]
+
+    def _evict_disk(self) -> None:
+        if self._disk_size <= self.max_bytes:
+            return
+        for key, _ in sorted(self._disk.items(), key=lambda kv: kv[1][1]):
+            if self._disk_size <= self.max_bytes:
+                break
+            self._forget_disk(key)
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_size -= len(old)
+            try:
+                os.unlink(self.cache_dir / key)
+            except OSError:
+                pass
+            self.evictions += 1
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSCache()
+    return _cache
@@ -3,9 +3,21 @@ from __future__ import annotations
 
 from typing import Optional
 
+from .session_utils import close_session_logs
+
 
 def run_call_end_cleanup(core, call_id: str) -> None:
-    core._save_session_summary(call_id)
+    try:
+        core.save_session_summary(call_id)
+    except Exception as exc:
+        core.logger.error(
+            "[CLEANUP] Failed to save session summary: call_id=%s error=%s",
+            call_id,
+            exc,
+            exc_info=True,
+        )
+    # サマリー保存の成否に関係なく transcript.jsonl / call_log.txt を書き出して閉じる
+    close_session_logs(call_id)
 
     try:
         core.reset_call(call_id)
@@ -56,6 +68,18 @@ def cleanup_gateway_call_state(gateway, call_id: str, logger=None) -> None:
         if mapping and call_id in mapping:
             del mapping[call_id]
 
+    rtp_buffer = getattr(gateway, "rtp_buffer", None)
+    if rtp_buffer is not None:
+        rtp_buffer.release(call_id)
+
+    # セッションログ（transcript.jsonl / call_log.txt）の残りを書き出して閉じる
+    close_session_logs(call_id)
+
+    # ASR を止めずに終わった通話でも、通話ごとのリサンプラー/整形状態を破棄する
+    asr_audio_processor = getattr(getattr(gateway, "asr_manager", None), "asr_audio_processor", None)
+    if asr_audio_processor is not None:
+        asr_audio_processor.release_call(call_id)
+
     for attr in ("_last_voice_time", "_last_silence_time", "_last_tts_end_time",
                  "_last_user_input_time", "_silence_warning_sent"):
         mapping = getattr(gateway, attr, None)
@@ -66,6 +66,7 @@ def log_intro_phase_start(logger, call_id: str) -> None:
 
 
 def log_intro_tts_callback_set() -> None:
+    pass
 
 
 def log_intro_queued(logger, call_id: str) -> None:
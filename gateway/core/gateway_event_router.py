@@ -15,6 +15,12 @@ def _safe_get(mapping: Optional[Dict[str, Any]], key: str, default: str = "") ->
 
 from client_loader import load_client_profile
 from .call_cleanup_helper import cleanup_gateway_call_state
+from ..common.control_channel import (
+    EVENT_ASR_ENABLE,
+    EVENT_HANDOFF_TTS,
+    EVENT_RTP_INFO,
+    parse_rtp_port,
+)
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from ..realtime_gateway import RealtimeGateway
@@ -179,6 +185,7 @@ class GatewayEventRouter:
                 time.time(),
             )
             gateway._active_calls.add(effective_call_id)
+            gateway.monitor_manager.watch_no_input(effective_call_id)
             gateway.call_id = effective_call_id
             gateway.client_id = client_id
             self.logger.info(
@@ -297,6 +304,24 @@ class GatewayEventRouter:
             await self.handle_fs_evt(message)
             return {"status": "ok"}
 
+        # FreeSWITCH 側スクリプトからの制御メッセージ（旧: /tmp のフラグファイル・ログ監視）
+        if event_type == EVENT_ASR_ENABLE:
+            gateway.fs_rtp_monitor.on_asr_enable(uuid)
+            return {"status": "ok"}
+
+        if event_type == EVENT_RTP_INFO:
+            port = parse_rtp_port(message.get("local"))
+            if not port:
+                return {"status": "error", "message": "invalid local rtp address"}
+            await gateway.fs_rtp_monitor.on_rtp_port(port)
+            return {"status": "ok"}
+
+        if event_type == EVENT_HANDOFF_TTS:
+            sent = gateway.network_manager.log_monitor.handle_handoff_tts(
+                call_id, message.get("text") or ""
+            )
+            return {"status": "ok" if sent else "skipped"}
+
 
         self.logger.warning("[EVENT_SOCKET] Unknown event type: %s", event_type)
         return {"status": "error", "message": "unknown event type"}
@@ -36,6 +36,8 @@ class GatewayLifecycleManager:
         gateway.audio_buffer = bytearray()
         gateway.tts_queue = collections.deque(maxlen=100)
         gateway.is_speaking_tts = False
+        # バージイン・通話リセットで増やす（合成中の TTSPipeline を取り消す）
+        gateway._tts_epoch = 0
         gateway.last_voice_time = time.time()
         gateway.is_user_speaking = False
 
@@ -102,6 +102,8 @@ class GatewayUtils:
                     gateway._initial_sequence_played.discard(call_id_to_complete)
                 if call_id_to_complete in gateway._last_processed_sequence:
                     del gateway._last_processed_sequence[call_id_to_complete]
+                if getattr(gateway, "rtp_buffer", None) is not None:
+                    gateway.rtp_buffer.release(call_id_to_complete)
                 gateway._last_voice_time.pop(call_id_to_complete, None)
                 gateway._last_silence_time.pop(call_id_to_complete, None)
                 gateway._last_tts_end_time.pop(call_id_to_complete, None)
@@ -136,6 +138,7 @@ class GatewayUtils:
             )
         gateway.tts_queue.clear()
         gateway.is_speaking_tts = False
+        gateway._tts_epoch = getattr(gateway, "_tts_epoch", 0) + 1
         gateway.audio_buffer = bytearray()
         gateway.current_segment_start = None
         gateway.is_user_speaking = False
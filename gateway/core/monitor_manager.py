@@ -6,9 +6,14 @@ import threading
 import time
 import traceback
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 
+from ..common.control_channel import DirectoryWatcher, parse_rtp_port, read_rtp_info_file
+from ..common.timer_wheel import get_timer_wheel
+
+# 段階的な無音警告を出す経過秒数
+SILENCE_WARNING_THRESHOLDS = (5.0, 15.0, 25.0)
+
 
 class FreeswitchRTPMonitor:
     """FreeSWITCHの送信RTPポートを監視してASR処理に流し込む（Pull型、pcap方式）"""
@@ -80,158 +85,147 @@ class FreeswitchRTPMonitor:
 
         self.logger.info("[ESL_MONITOR] ESL monitoring started for call_id=%s", call_id)
 
-    async def _check_asr_enable_flag(self):
-        """002.wav完了フラグファイルを監視してASRを有効化"""
-        check_count = 0
-        while self.gateway.running:
-            try:
-                check_count += 1
-                # UUIDベースのフラグファイルを検索（複数の通話に対応）
-                flag_files = list(Path("/tmp").glob("asr_enable_*.flag"))
+    def on_asr_enable(self, uuid: Optional[str] = None, source: str = "event") -> None:
+        """002.wav 完了（初回アナウンス完了）の通知でASRを有効化（必ずSAFE_DELAY経由）"""
+        self.logger.info(
+            "[FS_RTP_MONITOR] ASR enable request uuid=%s source=%s asr_active=%s",
+            uuid,
+            source,
+            self.asr_active,
+        )
+        if not self.asr_active:
+            self.logger.info(
+                "[SAFE_DELAY] 初回アナウンス完了検知、ASR起動を3秒遅延させます"
+            )
+            self._schedule_asr_enable_after_initial_sequence()
 
-                # デバッグログ（20回に1回、またはフラグファイルが見つかった時）
-                if check_count % 20 == 0 or flag_files:
-                    self.logger.debug(
-                        "[FS_RTP_MONITOR] Checking ASR enable flag (check #%s, found %s flag file(s), asr_active=%s)",
-                        check_count,
-                        len(flag_files),
-                        self.asr_active,
-                    )
+    async def _check_asr_enable_flag(self):
+        """
+        旧方式の 002.wav 完了フラグファイル（/tmp/asr_enable_*.flag）で ASR を有効化する。
 
-                if flag_files:
-                    # 最初に見つかったフラグファイルでASRを有効化（必ずSAFE_DELAY経由）
-                    flag_file = flag_files[0]
-                    if not self.asr_active:
-                        self.logger.info(
-                            "[SAFE_DELAY] 初回アナウンス完了検知、ASR起動を3秒遅延させます"
-                        )
-                        self._schedule_asr_enable_after_initial_sequence()
+        通常はイベントソケットの asr_enable で届く。互換用に、ファイルが作られたときだけ
+        （inotify。使えなければ低頻度のポーリング）処理する。
+        """
+        watcher = DirectoryWatcher("/tmp", ["asr_enable_*.flag"])
+        pending = watcher.existing()
+        changes = watcher.changes()
+        try:
+            while self.gateway.running:
+                flag_file = pending.pop(0) if pending else await anext(changes)
+                try:
+                    self.on_asr_enable(flag_file.stem[len("asr_enable_"):], source="flag_file")
                     # フラグファイルは処理済みとして削除（有効化済みでも削除）
                     try:
                         flag_file.unlink()
                         self.logger.info(
                             "[FS_RTP_MONITOR] Removed ASR enable flag: %s", flag_file
                         )
+                    except FileNotFoundError:
+                        pass
                     except Exception as e:
                         self.logger.warning(
                             "[FS_RTP_MONITOR] Failed to remove flag file: %s", e
                         )
-            except Exception as e:
-                self.logger.error(
-                    "[FS_RTP_MONITOR] Error checking ASR enable flag: %s",
-                    e,
-                    exc_info=True,
+                except Exception as e:
+                    self.logger.error(
+                        "[FS_RTP_MONITOR] Error checking ASR enable flag: %s",
+                        e,
+                        exc_info=True,
+                    )
+        finally:
+            await changes.aclose()
+
+    async def on_rtp_port(self, port: Optional[int], source: str = "event") -> None:
+        """FreeSWITCH の RTP ポート通知。新しいポートなら監視を開始する"""
+        if not port or port == self.freeswitch_rtp_port:
+            return
+        # 既にUDPソケットで監視中なら切り替えない
+        if self.freeswitch_rtp_port and self.monitor_sock:
+            return
+        self.logger.info(
+            "[FS_RTP_MONITOR] Found RTP port %s (source=%s), starting monitoring...",
+            port,
+            source,
+        )
+        self.freeswitch_rtp_port = port
+        # RTPポートで監視を開始（pcap方式）
+        try:
+            if self.scapy_available and self.sniff_func:
+                self.capture_running = True
+                self.capture_thread = threading.Thread(
+                    target=self._pcap_capture_loop,
+                    args=(self.freeswitch_rtp_port,),
+                    daemon=True,
                 )
+                self.capture_thread.start()
+                self.logger.info(
+                    "[FS_RTP_MONITOR] Started pcap monitoring for FreeSWITCH RTP port %s (source=%s)",
+                    self.freeswitch_rtp_port,
+                    source,
+                )
+            else:
+                # フォールバック: UDPソケット方式
+                loop = asyncio.get_running_loop()
+                self.monitor_sock = socket.socket(
+                    socket.AF_INET, socket.SOCK_DGRAM
+                )
+                self.monitor_sock.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_REUSEADDR, 1
+                )
+                self.monitor_sock.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_REUSEPORT, 1
+                )
+                self.monitor_sock.bind(
+                    ("0.0.0.0", self.freeswitch_rtp_port)
+                )
+                self.monitor_sock.setblocking(False)
 
-            await asyncio.sleep(0.5)  # 0.5秒間隔でチェック
+                self.monitor_transport, _ = (
+                    await loop.create_datagram_endpoint(
+                        lambda: self.rtp_protocol_cls(self.gateway),
+                        sock=self.monitor_sock,
+                    )
+                )
+                self.logger.info(
+                    "[FS_RTP_MONITOR] Started UDP socket monitoring for FreeSWITCH RTP port %s (source=%s)",
+                    self.freeswitch_rtp_port,
+                    source,
+                )
+        except Exception as e:
+            self.logger.error(
+                "[FS_RTP_MONITOR] Failed to start monitoring port %s: %s",
+                port,
+                e,
+                exc_info=True,
+            )
+            self.freeswitch_rtp_port = None
 
     async def _monitor_rtp_info_files(self):
-        """RTP情報ファイルを定期的に監視して、RTPポートが検出されたら監視を開始"""
-        while self.gateway.running:
-            try:
-                # 既にRTPポートが検出されている場合は監視を開始済み
-                if self.freeswitch_rtp_port and self.monitor_sock:
-                    await asyncio.sleep(5.0)  # 既に監視中なら5秒間隔でチェック
-                    continue
-
-                # RTP情報ファイルをチェック
-                rtp_info_files = list(Path("/tmp").glob("rtp_info_*.txt"))
-                if rtp_info_files:
-                    # 複数ファイルを走査して最も新しい local= 情報を採用する
-                    candidate_port = None
-                    candidate_mtime = 0.0
-                    for filepath in rtp_info_files:
-                        try:
-                            mtime = filepath.stat().st_mtime
-                            with open(filepath, "r") as f:
-                                for line in f:
-                                    if line.startswith("local="):
-                                        local_rtp = line.split("=", 1)[1].strip()
-                                        if ":" in local_rtp:
-                                            try:
-                                                port_str = local_rtp.split(":")[-1]
-                                                port = int(port_str)
-                                            except ValueError:
-                                                continue
-                                            if mtime >= candidate_mtime:
-                                                candidate_mtime = mtime
-                                                candidate_port = port
-                        except Exception as e:
-                            self.logger.debug(
-                                "[FS_RTP_MONITOR] Error reading RTP info file %s: %s",
-                                filepath,
-                                e,
-                            )
-
-                    port = candidate_port
-                    if not port:
-                        await asyncio.sleep(2.0)
-                        continue
-
-                    if port and port != self.freeswitch_rtp_port:
-                        self.logger.info(
-                            "[FS_RTP_MONITOR] Found RTP port %s from RTP info files, starting monitoring...",
-                            port,
-                        )
-                        self.freeswitch_rtp_port = port
-                        # RTPポートで監視を開始（pcap方式）
-                        try:
-                            if self.scapy_available and self.sniff_func:
-                                self.capture_running = True
-                                self.capture_thread = threading.Thread(
-                                    target=self._pcap_capture_loop,
-                                    args=(self.freeswitch_rtp_port,),
-                                    daemon=True,
-                                )
-                                self.capture_thread.start()
-                                self.logger.info(
-                                    "[FS_RTP_MONITOR] Started pcap monitoring for FreeSWITCH RTP port %s (from RTP info file)",
-                                    self.freeswitch_rtp_port,
-                                )
-                            else:
-                                # フォールバック: UDPソケット方式
-                                loop = asyncio.get_running_loop()
-                                self.monitor_sock = socket.socket(
-                                    socket.AF_INET, socket.SOCK_DGRAM
-                                )
-                                self.monitor_sock.setsockopt(
-                                    socket.SOL_SOCKET, socket.SO_REUSEADDR, 1
-                                )
-                                self.monitor_sock.setsockopt(
-                                    socket.SOL_SOCKET, socket.SO_REUSEPORT, 1
-                                )
-                                self.monitor_sock.bind(
-                                    ("0.0.0.0", self.freeswitch_rtp_port)
-                                )
-                                self.monitor_sock.setblocking(False)
-
-                                self.monitor_transport, _ = (
-                                    await loop.create_datagram_endpoint(
-                                        lambda: self.rtp_protocol_cls(self.gateway),
-                                        sock=self.monitor_sock,
-                                    )
-                                )
-                                self.logger.info(
-                                    "[FS_RTP_MONITOR] Started UDP socket monitoring for FreeSWITCH RTP port %s (from RTP info file)",
-                                    self.freeswitch_rtp_port,
-                                )
-                        except Exception as e:
-                            self.logger.error(
-                                "[FS_RTP_MONITOR] Failed to start monitoring port %s: %s",
-                                port,
-                                e,
-                                exc_info=True,
-                            )
-                            self.freeswitch_rtp_port = None
+        """
+        旧方式の RTP 情報ファイル（/tmp/rtp_info_*.txt）から RTP ポートを拾う。
 
-                await asyncio.sleep(2.0)  # 2秒間隔でチェック
-            except Exception as e:
-                self.logger.error(
-                    "[FS_RTP_MONITOR] Error in _monitor_rtp_info_files: %s",
-                    e,
-                    exc_info=True,
-                )
-                await asyncio.sleep(2.0)
+        通常はイベントソケットの rtp_info で届く。互換用に、ファイルが書かれたときだけ
+        （inotify。使えなければ低頻度のポーリング）読む。
+        """
+        watcher = DirectoryWatcher("/tmp", ["rtp_info_*.txt"])
+        existing = watcher.existing()
+        # 起動時は最も新しいファイルだけ見る
+        pending = existing[-1:]
+        changes = watcher.changes()
+        try:
+            while self.gateway.running:
+                filepath = pending.pop(0) if pending else await anext(changes)
+                try:
+                    info = read_rtp_info_file(filepath)
+                    await self.on_rtp_port(parse_rtp_port(info.get("local")), source="rtp_info_file")
+                except Exception as e:
+                    self.logger.debug(
+                        "[FS_RTP_MONITOR] Error reading RTP info file %s: %s",
+                        filepath,
+                        e,
+                    )
+        finally:
+            await changes.aclose()
 
     def enable_asr(self):
         """002.wav再生完了後にASRを有効化"""
@@ -577,208 +571,183 @@ class GatewayMonitorManager:
             udp_cls=udp_cls,
             esl_receiver_cls=esl_receiver_cls,
         )
+        # 無音監視: call_id -> TimerHandle と、前回確認時の最終有音時刻
+        self._no_input_loop = None
+        self._no_input_timers = {}
+        self._no_input_marks = {}
 
     def start_no_input_monitoring(self) -> None:
         if not getattr(self.gateway, "_silence_loop_started", False):
-            self.logger.info("RealtimeGateway started — scheduling silence monitor loop")
+            self.logger.info("RealtimeGateway started — scheduling silence monitor timers")
             try:
                 # イベントループが確実に起動していることを確認
                 loop = asyncio.get_running_loop()
-                task = loop.create_task(self._no_input_monitor_loop())
-                self.gateway._silence_loop_started = True
-                self.logger.info(
-                    "NO_INPUT_MONITOR_LOOP: scheduled successfully (task=%r)",
-                    task,
-                )
+                self._start_no_input_timers(loop)
+                self.logger.info("NO_INPUT_MONITOR: per-call timers on the shared timer wheel")
             except RuntimeError as e:
                 # イベントループがまだ起動していない場合（通常は発生しない）
                 self.logger.error(
-                    "Event loop not running yet — cannot start silence monitor loop: %s",
+                    "Event loop not running yet — cannot start silence monitor: %s",
                     e,
                 )
-
-                async def delayed_start():
-                    await asyncio.sleep(1.0)
-                    try:
-                        loop = asyncio.get_running_loop()
-                        task = loop.create_task(self._no_input_monitor_loop())
-                        self.gateway._silence_loop_started = True
-                        self.logger.info(
-                            "NO_INPUT_MONITOR_LOOP: scheduled successfully after delay (task=%r)",
-                            task,
-                        )
-                    except Exception as ex:
-                        self.logger.exception(
-                            "Delayed silence monitor launch failed: %s", ex
-                        )
-
-                asyncio.create_task(delayed_start())
-                self.logger.warning(
-                    "Event loop not running yet — scheduled delayed silence monitor launch"
-                )
         else:
             self.logger.warning(
-                "Silence monitor loop already started, skipping duplicate launch"
+                "Silence monitor already started, skipping duplicate launch"
             )
 
+    def _start_no_input_timers(self, loop) -> None:
+        self._no_input_loop = loop
+        self.gateway._silence_loop_started = True
+        for call_id in list(getattr(self.gateway, "_active_calls", None) or []):
+            self.watch_no_input(call_id)
+
     def start_rtp_monitoring(self) -> None:
         if self.fs_rtp_monitor:
             asyncio.create_task(self.fs_rtp_monitor.start_monitoring())
 
 
-    async def _no_input_monitor_loop(self):
-        """無音状態を監視し、自動ハングアップを行う"""
-        self.logger.info("NO_INPUT_MONITOR_LOOP: started")
+    def watch_no_input(self, call_id: str, delay: float = 1.0) -> None:
+        """
+        通話の無音監視タイマーを登録する（_active_calls に追加した箇所から呼ぶ）。
 
-        while self.gateway.running:
-            try:
-                now = time.monotonic()
+        1秒ごとに全通話を走査する代わりに、通話ごとに次の警告・切断の期限で
+        共有タイマーホイールから _check_no_input を呼ぶ。登録済みなら何もしない。
+        """
+        loop = self._no_input_loop
+        if loop is None or not call_id:
+            return
+        handle = self._no_input_timers.get(call_id)
+        if handle is not None and handle.active:
+            return
+        self._no_input_timers[call_id] = get_timer_wheel().reset(
+            handle, delay, self._check_no_input, call_id, loop=loop
+        )
 
-                # _active_calls が存在しない場合は初期化
-                if not hasattr(self.gateway, "_active_calls"):
-                    self.gateway._active_calls = set()
+    def _rearm_no_input_timer(self, call_id: str, delay: float) -> None:
+        handle = self._no_input_timers.get(call_id)
+        if handle is not None:
+            handle.reset(delay)
+
+    def _drop_no_input_timer(self, call_id: str) -> None:
+        handle = self._no_input_timers.pop(call_id, None)
+        if handle is not None:
+            handle.cancel()
+        self._no_input_marks.pop(call_id, None)
+
+    async def _check_no_input(self, call_id: str):
+        """無音状態を確認し、段階的な警告と自動ハングアップを行う（通話ごとのタイマーから呼ばれる）"""
+        if not self.gateway.running or call_id not in (
+            getattr(self.gateway, "_active_calls", None) or ()
+        ):
+            self._drop_no_input_timer(call_id)
+            return
+        try:
+            now = time.monotonic()
 
-                # 現在アクティブな通話を走査
-                active_call_ids = (
-                    list(self.gateway._active_calls)
-                    if self.gateway._active_calls
-                    else []
-                )
+            # 最後に有音を検出した時刻を取得
+            last_voice = self.gateway._last_voice_time.get(call_id, 0)
 
-                # アクティブな通話がない場合は待機
-                if not active_call_ids:
-                    await asyncio.sleep(1.0)
-                    continue
+            # 最後に有音を検出した時刻が0の場合は、TTS送信完了時刻を使用
+            if last_voice == 0:
+                last_voice = self.gateway._last_tts_end_time.get(call_id, now)
 
-                # 各アクティブな通話について無音検出を実行
-                for call_id in active_call_ids:
-                    try:
-                        # 最後に有音を検出した時刻を取得
-                        last_voice = self.gateway._last_voice_time.get(call_id, 0)
-
-                        # 最後に有音を検出した時刻が0の場合は、TTS送信完了時刻を使用
-                        if last_voice == 0:
-                            last_voice = self.gateway._last_tts_end_time.get(call_id, now)
-
-                        # 無音継続時間を計算
-                        elapsed = now - last_voice
-
-                        # TTS送信中は無音検出をスキップ
-                        if self.gateway.is_speaking_tts:
-                            continue
-
-                        # 初回シーケンス再生中は無音検出をスキップ
-                        if self.gateway.initial_sequence_playing:
-                            continue
-
-                        # 無音5秒ごとに警告ログ出力
-                        if elapsed > 5 and abs(elapsed % 5) < 1:
-                            self.logger.warning(
-                                "[SILENCE DETECTED] %.1fs of silence call_id=%s",
-                                elapsed,
-                                call_id,
-                            )
+            # TTS送信中・初回シーケンス再生中は無音検出をスキップ（1秒後に再確認）
+            if self.gateway.is_speaking_tts or self.gateway.initial_sequence_playing:
+                self._rearm_no_input_timer(call_id, 1.0)
+                return
 
-                        # 警告送信済みセットを初期化（存在しない場合）
-                        if call_id not in self.gateway._silence_warning_sent:
-                            self.gateway._silence_warning_sent[call_id] = set()
+            # 前回の確認以降に音声が検出された場合は警告セットをリセット
+            if self._no_input_marks.get(call_id) != last_voice:
+                self._no_input_marks[call_id] = last_voice
+                if call_id in self.gateway._silence_warning_sent:
+                    self.gateway._silence_warning_sent[call_id].clear()
 
-                        warnings = self.gateway._silence_warning_sent[call_id]
+            # 無音継続時間を計算
+            elapsed = now - last_voice
 
-                        # 段階的な無音警告（5秒、15秒、25秒）とアナウンス再生
-                        if elapsed >= 5.0 and 5.0 not in warnings:
-                            warnings.add(5.0)
-                            self.logger.warning(
-                                "[SILENCE DETECTED] %.1fs of silence for call_id=%s",
-                                elapsed,
-                                call_id,
-                            )
-                            await self.gateway._play_silence_warning(call_id, 5.0)
-                        elif elapsed >= 15.0 and 15.0 not in warnings:
-                            warnings.add(15.0)
-                            self.logger.warning(
-                                "[SILENCE DETECTED] %.1fs of silence for call_id=%s",
-                                elapsed,
-                                call_id,
-                            )
-                            await self.gateway._play_silence_warning(call_id, 15.0)
-                        elif elapsed >= 25.0 and 25.0 not in warnings:
-                            warnings.add(25.0)
-                            self.logger.warning(
-                                "[SILENCE DETECTED] %.1fs of silence for call_id=%s",
-                                elapsed,
-                                call_id,
-                            )
-                            await self.gateway._play_silence_warning(call_id, 25.0)
+            # 警告送信済みセットを初期化（存在しない場合）
+            if call_id not in self.gateway._silence_warning_sent:
+                self.gateway._silence_warning_sent[call_id] = set()
 
-                        # 無音が規定時間を超えたら強制切断
-                        max_silence_time = getattr(
-                            self.gateway, "SILENCE_HANGUP_TIME", 20.0
-                        )
-                        if elapsed > max_silence_time:
-                            self.logger.warning(
-                                "[AUTO-HANGUP] Silence limit exceeded (%.1fs) call_id=%s",
-                                elapsed,
-                                call_id,
-                            )
+            warnings = self.gateway._silence_warning_sent[call_id]
 
-                            # console_bridge に無音切断イベントを記録
-                            # 注意: enabled チェックは record_event() 内で行わない（ファイル記録のため常に実行）
-                            try:
-                                caller_number = (
-                                    getattr(self.gateway.ai_core, "caller_number", None)
-                                    or "unknown"
-                                )
-                                self.gateway.console_bridge.record_event(
-                                    call_id,
-                                    "auto_hangup_silence",
-                                    {
-                                        "elapsed": elapsed,
-                                        "caller": caller_number,
-                                        "max_silence_time": max_silence_time,
-                                    },
-                                )
-                                self.logger.info(
-                                    "[AUTO-HANGUP] Event recorded: call_id=%s elapsed=%.1fs",
-                                    call_id,
-                                    elapsed,
-                                )
-                            except Exception as e:
-                                self.logger.error(
-                                    "[AUTO-HANGUP] Failed to record event for call_id=%s: %s",
-                                    call_id,
-                                    e,
-                                    exc_info=True,
-                                )
-
-                            try:
-                                # 非同期タスクとして実行（既存の同期関数を呼び出す）
-                                loop = asyncio.get_running_loop()
-                                loop.run_in_executor(
-                                    None, self.gateway._handle_hangup, call_id
-                                )
-                            except Exception as e:
-                                self.logger.exception(
-                                    "[AUTO-HANGUP] Hangup failed call_id=%s error=%s",
-                                    call_id,
-                                    e,
-                                )
-                            # 警告セットをクリア（次の通話のために）
-                            self.gateway._silence_warning_sent.pop(call_id, None)
-                            continue
-
-                        # 音声が検出された場合は警告セットをリセット
-                        if elapsed < 1.0:  # 1秒以内に音声が検出された場合
-                            if call_id in self.gateway._silence_warning_sent:
-                                self.gateway._silence_warning_sent[call_id].clear()
-                    except Exception as e:
-                        self.logger.exception(
-                            "NO_INPUT_MONITOR_LOOP error for call_id=%s: %s",
-                            call_id,
-                            e,
-                        )
+            # 段階的な無音警告（5秒、15秒、25秒）とアナウンス再生
+            for threshold in SILENCE_WARNING_THRESHOLDS:
+                if elapsed >= threshold and threshold not in warnings:
+                    warnings.add(threshold)
+                    self.logger.warning(
+                        "[SILENCE DETECTED] %.1fs of silence for call_id=%s",
+                        elapsed,
+                        call_id,
+                    )
+                    await self.gateway._play_silence_warning(call_id, threshold)
+                    break
 
-            except Exception as e:
-                self.logger.exception("NO_INPUT_MONITOR_LOOP error: %s", e)
+            # 無音が規定時間を超えたら強制切断
+            max_silence_time = getattr(
+                self.gateway, "SILENCE_HANGUP_TIME", 20.0
+            )
+            if elapsed > max_silence_time:
+                self.logger.warning(
+                    "[AUTO-HANGUP] Silence limit exceeded (%.1fs) call_id=%s",
+                    elapsed,
+                    call_id,
+                )
+
+                # console_bridge に無音切断イベントを記録
+                # 注意: enabled チェックは record_event() 内で行わない（ファイル記録のため常に実行）
+                try:
+                    caller_number = (
+                        getattr(self.gateway.ai_core, "caller_number", None)
+                        or "unknown"
+                    )
+                    self.gateway.console_bridge.record_event(
+                        call_id,
+                        "auto_hangup_silence",
+                        {
+                            "elapsed": elapsed,
+                            "caller": caller_number,
+                            "max_silence_time": max_silence_time,
+                        },
+                    )
+                    self.logger.info(
+                        "[AUTO-HANGUP] Event recorded: call_id=%s elapsed=%.1fs",
+                        call_id,
+                        elapsed,
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        "[AUTO-HANGUP] Failed to record event for call_id=%s: %s",
+                        call_id,
+                        e,
+                        exc_info=True,
+                    )
 
-            await asyncio.sleep(1.0)  # 1秒間隔でチェック
+                try:
+                    # 非同期タスクとして実行（既存の同期関数を呼び出す）
+                    loop = asyncio.get_running_loop()
+                    loop.run_in_executor(
+                        None, self.gateway._handle_hangup, call_id
+                    )
+                except Exception as e:
+                    self.logger.exception(
+                        "[AUTO-HANGUP] Hangup failed call_id=%s error=%s",
+                        call_id,
+                        e,
+                    )
+                # 警告セットをクリア（次の通話のために）
+                self.gateway._silence_warning_sent.pop(call_id, None)
+                self._drop_no_input_timer(call_id)
+                return
+
+            # 次の警告または切断の期限まで待つ（その間に音声が入れば発火時に延長される）
+            pending = [t for t in SILENCE_WARNING_THRESHOLDS if t not in warnings]
+            next_at = min(pending + [max_silence_time])
+            self._rearm_no_input_timer(call_id, max(next_at - elapsed, 1.0))
+        except Exception as e:
+            self.logger.exception(
+                "NO_INPUT_MONITOR error for call_id=%s: %s",
+                call_id,
+                e,
+            )
+            self._rearm_no_input_timer(call_id, 1.0)
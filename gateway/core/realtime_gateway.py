@@ -57,6 +57,8 @@ from ..core.gateway_activity_monitor import GatewayActivityMonitor
 from ..core.gateway_console_manager import GatewayConsoleManager
 from ..core.gateway_esl_manager import GatewayESLManager
 from ..asr.gateway_rtp_protocol import RTPPacketBuilder, RTPProtocol
+from ..asr.rtp_parser import RTPPacketView
+from ..asr.asr_rtp_buffer import ASRRTPBuffer
 from console_bridge import console_bridge
 
 # Google Streaming ASR統合
@@ -145,6 +147,9 @@ class RealtimeGateway:
         
         self.asr_manager = GatewayASRManager(self)
         self._unmapped_ssrcs: Dict[int, float] = {}
+        # RTPヘッダー解析用ビュー（handle_rtp_packet 内で await 前にのみ参照するため使い回し可）
+        self._rtp_view = RTPPacketView()
+        self.rtp_buffer = ASRRTPBuffer(self)
         # Playback/TTSマネージャ初期化
         self.playback_manager = GatewayPlaybackManager(self)
         # TTS/Playback callbacks now available
@@ -238,17 +243,12 @@ class RealtimeGateway:
         SSRCを抽出してcall_idを解決し、ASRManagerに転送
         """
         try:
-            # パケット長チェック（RTP最小ヘッダー12バイト）
-            if len(data) < 12:
+            # ヘッダー解析（長さ・バージョン・CSRC/拡張/パディングを一括検証）
+            view = self._rtp_view
+            if not view.parse(data):
                 return
             
-            # RTPバージョン確認（最初のバイトの上位2ビット）
-            version = (data[0] >> 6) & 0x03
-            if version != 2:
-                return
-            
-            # SSRC抽出（8-11バイト目、ビッグエンディアン）
-            ssrc = int.from_bytes(data[8:12], byteorder='big')
+            ssrc = view.ssrc
             
             # call_id解決（ASRManager経由）
             call_id = None
@@ -279,14 +279,18 @@ class RealtimeGateway:
                 
                 return
             
-            # RTPペイロード抽出
-            payload = self._extract_rtp_payload(data)
-            if not payload:
+            if not view.payload_len:
                 self.logger.debug(f"Empty RTP payload for call {call_id}")
                 return
             
-            # ASRManagerに転送
-            await self.asr_manager.process_rtp_audio_for_call(call_id, payload)
+            # ジッタバッファで並べ替え・欠落補間し、連続した20msフレームだけをASRManagerに転送
+            frames = self.rtp_buffer.push_packet(view, call_id, addr)
+            # 払い出されるフレームは同じSSRCのもの（コーデック判定はSSRC・ペイロードタイプ単位）
+            payload_type = view.payload_type
+            for payload in frames:
+                await self.asr_manager.process_rtp_audio_for_call(
+                    call_id, payload, ssrc=ssrc, payload_type=payload_type
+                )
             
         except Exception as e:
             self.logger.error(f"[RTP] Error in handle_rtp_packet from {addr}: {e}", exc_info=True)
@@ -329,42 +333,14 @@ class RealtimeGateway:
 
     def _extract_rtp_payload(self, packet: bytes) -> bytes:
         try:
-            if len(packet) < 12:
-                return b""
-
-            padding = (packet[0] >> 5) & 0x01
-            extension = (packet[0] >> 4) & 0x01
-            csrc_count = packet[0] & 0x0F
-
-            header_length = 12 + (csrc_count * 4)
-
-            if extension:
-                if len(packet) < header_length + 4:
-                    self.logger.warning("[RTP_HANDLER] Packet too short for extension header")
-                    return b""
-                ext_length_words = int.from_bytes(
-                    packet[header_length + 2: header_length + 4], byteorder="big"
-                )
-                header_length += 4 + (ext_length_words * 4)
-
-            if len(packet) <= header_length:
+            view = RTPPacketView(packet)
+            if not view.valid:
                 self.logger.warning(
-                    "[RTP_HANDLER] Header length %s exceeds packet size %s",
-                    header_length,
+                    "[RTP_HANDLER] Malformed RTP packet len=%s (header/padding exceeds packet)",
                     len(packet),
                 )
                 return b""
-
-            payload = packet[header_length:]
-
-            if padding and payload:
-                padding_length = payload[-1]
-                if 0 < padding_length < len(payload):
-                    payload = payload[:-padding_length]
-                else:
-                    self.logger.warning("[RTP_HANDLER] Invalid padding length=%s", padding_length)
-
-            return payload
+            return view.payload_bytes()
         except Exception as exc:
             self.logger.error("[RTP_HANDLER] Payload extraction failed: %s", exc, exc_info=True)
             return b""
@@ -11,13 +11,17 @@ import stat
 import wave
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
+from ..common.log_writer import get_log_writer
 from ..common.text_utils import TEMPLATE_CONFIG, normalize_text
 from .state_store import get_session_state
 
 logger = logging.getLogger(__name__)
 
+# 通話ごとのセッションディレクトリ（行ごとに日付計算・mkdir・chmod しない）
+_session_dirs: Dict[Tuple[str, str], Path] = {}
+
 
 def get_session_dir(call_id: str, client_id: Optional[str] = None) -> Path:
     """
@@ -58,6 +62,37 @@ def ensure_session_dir(session_dir: Path) -> None:
         raise
 
 
+def _cached_session_dir(call_id: str, client_id: Optional[str]) -> Path:
+    """
+    ログ追記用のセッションディレクトリ（通話中は最初に決めたものを使い続ける）
+    """
+    key = (call_id, client_id or "000")
+    session_dir = _session_dirs.get(key)
+    if session_dir is None:
+        session_dir = get_session_dir(call_id, client_id)
+        ensure_session_dir(session_dir)
+        _session_dirs[key] = session_dir
+    return session_dir
+
+
+def close_session_logs(call_id: str) -> None:
+    """
+    通話終了時に transcript.jsonl / call_log.txt の残りを書き出して閉じる
+    
+    :param call_id: 通話UUID
+    """
+    # 行ごとの client_id とサマリーの client_id が違うことがあるので call_id で探す
+    keys = [key for key in list(_session_dirs) if key[0] == call_id]
+    writer = get_log_writer()
+    for key in keys:
+        session_dir = _session_dirs.pop(key, None)
+        if session_dir is None:
+            continue
+        for name in ("transcript.jsonl", "call_log.txt"):
+            if not writer.close(str(session_dir / name)):
+                logger.warning(f"セッションログの書き出しがタイムアウトしました: {session_dir / name}")
+
+
 def save_transcript_event(call_id: str, text: str, is_final: bool, kwargs: dict, client_id: Optional[str] = None) -> None:
     """
     音声認識結果をトランスクリプトファイルに保存
@@ -69,8 +104,7 @@ def save_transcript_event(call_id: str, text: str, is_final: bool, kwargs: dict,
     :param client_id: クライアントID
     """
     try:
-        session_dir = get_session_dir(call_id, client_id)
-        ensure_session_dir(session_dir)
+        session_dir = _cached_session_dir(call_id, client_id)
         
         # トランスクリプトファイル
         transcript_file = session_dir / "transcript.jsonl"
@@ -84,10 +118,9 @@ def save_transcript_event(call_id: str, text: str, is_final: bool, kwargs: dict,
             **kwargs
         }
         
-        # ファイルに追記
-        with open(transcript_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(event, ensure_ascii=False) + '\n')
-            
+        # ファイルに追記（LogWriter のスレッドでまとめて書く）
+        get_log_writer().write(str(transcript_file), event)
+        
         logger.debug(f"トランスクリプトを保存しました: {call_id}, text={text[:50]}...")
         
     except Exception as e:
@@ -102,6 +135,7 @@ def save_session_summary(call_id: str, summary_data: Dict[str, Any], client_id:
     :param summary_data: 保存するサマリーデータ
     :param client_id: クライアントID
     """
+    close_session_logs(call_id)
     try:
         session_dir = get_session_dir(call_id, client_id)
         
@@ -136,8 +170,7 @@ def append_call_log(call_id: str, role: str, text: str, template_id: Optional[st
     :param client_id: クライアントID
     """
     try:
-        session_dir = get_session_dir(call_id, client_id)
-        ensure_session_dir(session_dir)
+        session_dir = _cached_session_dir(call_id, client_id)
         
         # ログファイル
         log_file = session_dir / "call_log.txt"
@@ -149,10 +182,9 @@ def append_call_log(call_id: str, role: str, text: str, template_id: Optional[st
             log_line += f" (template: {template_id})"
         log_line += "\n"
         
-        # ファイルに追記
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(log_line)
-            
+        # ファイルに追記（LogWriter のスレッドでまとめて書く）
+        get_log_writer().write(str(log_file), log_line)
+        
         logger.debug(f"通話ログを追記しました: {call_id}, {role}={text[:50]}...")
         
     except Exception as e:
@@ -10,47 +10,26 @@ except ImportError:
 import os
 from typing import Tuple, List, Dict, Any
 
-logger = logging.getLogger(__name__)
+from gateway.common.client_config_registry import get_client_config_registry
 
-# クライアント設定キャッシュ
-_config_cache: Dict[str, dict] = {}
+logger = logging.getLogger(__name__)
 
-_config_mtime = {}
 
 def clear_config_cache(client_id: str = None):
     """設定キャッシュをクリア"""
-    if client_id:
-        _config_cache.pop(client_id, None)
-        _config_mtime.pop(client_id, None)
-    else:
-        _config_cache.clear()
-        _config_mtime.clear()
+    get_client_config_registry().invalidate(client_id)
     logger.info(f"[DIALOGUE] Config cache cleared: {client_id or 'all'}")
 
 def load_client_config(client_id: str) -> dict:
-    """クライアント設定を読み込む（ファイル更新時に自動リロード）"""
-    config_path = f"/opt/libertycall/clients/{client_id}/config/dialogue_config.json"
-    try:
-        mtime = os.path.getmtime(config_path)
-    except OSError:
-        mtime = 0
-    
-    if client_id in _config_cache and _config_mtime.get(client_id) == mtime:
-        return _config_cache[client_id]
-    
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            _config_cache[client_id] = config
-            _config_mtime[client_id] = mtime
-            logger.info(f"[DIALOGUE] Loaded config for client {client_id} (mtime={mtime})")
-            return config
-    except Exception as e:
-        logger.warning(f"[DIALOGUE] Config not found for {client_id}, using default: {e}")
+    """クライアント設定を読み込む（ClientConfigRegistry 経由、ファイル更新時に自動リロード）"""
+    config = get_client_config_registry().get(client_id)
+    if not config.loaded:
+        logger.warning(f"[DIALOGUE] Config not found for {client_id}, using default")
         return {
             "patterns": [],
             "default_response": "114"
         }
+    return config.dialogue_config
 
 def get_response(
     text: str,
@@ -5,6 +5,8 @@ import logging
 import time
 from pathlib import Path
 
+from gateway.common.client_config_registry import get_client_config
+
 logger = logging.getLogger(__name__)
 
 class LLMDialogueHandler:
@@ -44,21 +46,10 @@ class LLMDialogueHandler:
             return False
 
     def _build_prompt(self, text, client_id):
-        config_path = f"/opt/libertycall/clients/{client_id}/config/dialogue_config.json"
-        try:
-            with open(config_path) as f:
-                config = json.load(f)
-        except Exception:
+        config = get_client_config(client_id)
+        if not config.loaded:
             return None
-
-        choices = []
-        for pattern in config.get("patterns", []):
-            rid = pattern.get("response", "")
-            kws = pattern.get("keywords", [])
-            desc = "、".join(kws[:3])
-            choices.append(f"{rid}: {desc}")
-
-        choices_text = "\n".join(choices)
+        choices_text = config.llm_choices(3, "、", first_response=False)
         return f"""あなたはIVR電話応答システムです。
 ユーザーの発話に対して、以下の選択肢から最も適切な応答IDを1つだけ返してください。
 IDのみを返し、他の文字は出力しないでください。
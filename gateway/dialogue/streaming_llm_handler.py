@@ -6,6 +6,8 @@ import time
 import threading
 from pathlib import Path
 
+from gateway.common.client_config_registry import get_client_config
+
 logger = logging.getLogger(__name__)
 
 class StreamingLLMHandler:
@@ -18,19 +20,10 @@ class StreamingLLMHandler:
         self._choices_text = self._build_choices(client_id)
 
     def _build_choices(self, client_id):
-        config_path = f"/opt/libertycall/clients/{client_id}/config/dialogue_config.json"
-        try:
-            with open(config_path) as f:
-                config = json.load(f)
-        except Exception:
+        config = get_client_config(client_id)
+        if not config.loaded:
             return ""
-        choices = []
-        for pattern in config.get("patterns", []):
-            rid = pattern.get("response", "")
-            kws = pattern.get("keywords", [])
-            desc = "、".join(kws[:3])
-            choices.append(f"{rid}: {desc}")
-        return "\n".join(choices)
+        return config.llm_choices(3, "、", first_response=False)
 
     def add_fragment(self, fragment_text):
         """Whisperからの断片を追加してLLM推論"""
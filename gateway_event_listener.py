@@ -122,7 +122,7 @@ def main():
         con.events("plain", "ALL")
     except Exception as sub_exc:
         logger.exception("[EVL_ESL_SUB] err=%s", sub_exc)
-    con.events("plain", "CHANNEL_CREATE CHANNEL_ANSWER CHANNEL_EXECUTE CHANNEL_EXECUTE_COMPLETE CHANNEL_PARK CHANNEL_HANGUP CHANNEL_AUDIO")
+    con.events("plain", "CHANNEL_CREATE CHANNEL_ANSWER CHANNEL_EXECUTE CHANNEL_EXECUTE_COMPLETE CHANNEL_PARK CHANNEL_HANGUP CHANNEL_AUDIO CUSTOM libertycall::rtp_info")
     set_esl_connection(con)
     logger.info("Event Socket Listener 起動")
 
@@ -213,15 +213,20 @@ def main():
                     reason_hint = f"channel_execute_complete app={application}"
                     if application == "playback":
                         if "002.wav" in application_data:
-                            try:
-                                Path(f"/tmp/asr_enable_{uuid}.flag").touch()
-                            except Exception:
-                                pass
+                            # 初回アナウンス完了をイベントソケットで通知（フラグファイルは使わない）
+                            send_event_to_gateway("asr_enable", uuid)
                         if uuid in active_calls:
                             continue
                         continue
                     elif application == "park":
                         continue
+                elif event_name == "CUSTOM" and e.getHeader("Event-Subclass") == "libertycall::rtp_info":
+                    # play_audio_sequence.lua の RTP ポート通知をそのまま転送
+                    send_event_to_gateway("rtp_info", uuid, extra_payload={
+                        "local": e.getHeader("RTP-Local"),
+                        "remote": e.getHeader("RTP-Remote"),
+                    })
+                    continue
                 elif event_name == "CHANNEL_PARK":
                     reason_hint = "channel_park"
                     new_uuid = e.getHeader("Unique-ID")
@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+"""
+Async Event Socket Client / 共有接続プール
+
+ESLconnection（ブロッキング、2048バイト単位の recv と手動ヘッダ分割）の代わりに、
+asyncio の StreamReader 上で Content-Length に従ってフレームを切り出す ESL クライアント。
+
+- AsyncESLConnection: 1本の接続。api/bgapi の応答は送信順（FIFO）で対応付ける
+- AsyncESLPool: 少数のコマンド用接続 + イベント受信用接続1本をプロセスで共有
+- SyncESLClient: スレッドベースのコード向けの同期ファサード（専用イベントループで動く）
+
+通話ごとに ESL 接続を張る代わりに get_shared_esl() を使うことで、
+FreeSWITCH への接続数はプロセスあたり O(1) になる。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+import uuid as uuid_mod
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+try:
+    from urllib.parse import unquote
+except ImportError:  # pragma: no cover
+    from urllib import unquote
+
+from libs.esl.ESL import ESLevent
+
+logger = logging.getLogger(__name__)
+
+ESL_HOST = os.environ.get("AF_ESL_HOST", "127.0.0.1")
+ESL_PORT = os.environ.get("AF_ESL_PORT", "8021")
+ESL_PASSWORD = os.environ.get("AF_ESL_PASSWORD", "ClueCon")
+# コマンド用接続数（イベント受信用の1本は別）
+ESL_POOL_SIZE = int(os.environ.get("LC_ESL_POOL_SIZE", "2"))
+# 死活監視・再接続の間隔（秒）
+ESL_HEALTH_INTERVAL = float(os.environ.get("LC_ESL_HEALTH_INTERVAL", "10"))
+ESL_COMMAND_TIMEOUT = float(os.environ.get("LC_ESL_COMMAND_TIMEOUT", "5"))
+
+# 共有イベント接続で購読するイベント
+DEFAULT_EVENTS = ("CHANNEL_EXECUTE_COMPLETE", "CHANNEL_HANGUP_COMPLETE", "BACKGROUND_JOB")
+
+_REPLY_TYPES = ("api/response", "command/reply")
+
+
+def _parse_headers(block: str, event: ESLevent) -> None:
+    for line in block.splitlines():
+        name, sep, value = line.partition(": ")
+        if not sep or not name:
+            continue
+        value = unquote(value)
+        if value[:7] == "ARRAY::":
+            event._add_header_array(name, value)
+        else:
+            event._add_header_string(name, value)
+
+
+def parse_event_plain(body: str) -> ESLevent:
+    """text/event-plain の本文（URLエンコードされたヘッダ + 任意の本文）を ESLevent にする"""
+    event = ESLevent("SOCKET_DATA")
+    event.delHeader("Event-Name")
+    headers, _, rest = body.partition("\n\n")
+    _parse_headers(headers, event)
+    length = event.getHeader("Content-Length")
+    if length:
+        try:
+            event.addBody(rest[: int(length)])
+        except ValueError:
+            event.addBody(rest)
+    return event
+
+
+class AsyncESLConnection:
+    """
+    asyncio ベースの ESL 接続（1本）
+
+    受信はバックグラウンドの reader タスクが担当し、ヘッダを "\\n\\n" まで読み、
+    Content-Length があれば本文をちょうどその長さだけ readexactly() する。
+    FreeSWITCH は1接続内のコマンドを順番に処理するため、api/command 応答は
+    送信順に待機中の Future へ割り当てる。イベントは on_event コールバックへ渡す。
+    """
+
+    def __init__(
+        self,
+        host: str = ESL_HOST,
+        port: int | str = ESL_PORT,
+        password: str = ESL_PASSWORD,
+        on_event: Optional[Callable[[ESLevent], None]] = None,
+        connect_timeout: float = 2.0,
+    ) -> None:
+        self.host = host
+        self.port = int(port)
+        self.password = password
+        self.on_event = on_event
+        self.connect_timeout = connect_timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Deque[asyncio.Future] = collections.deque()
+        self._write_lock = asyncio.Lock()
+        self._connected = False
+        self.last_activity = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    async def connect(self) -> None:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.connect_timeout)
+        self._reader, self._writer = reader, writer
+        try:
+            auth_req = await asyncio.wait_for(self._read_frame(), self.connect_timeout)
+            if auth_req.getHeader("Content-Type") != "auth/request":
+                raise ConnectionError("unexpected header received during authentication")
+            writer.write(f"auth {self.password}\n\n".encode("utf-8"))
+            await writer.drain()
+            reply = await asyncio.wait_for(self._read_frame(), self.connect_timeout)
+            reply_text = reply.getHeader("Reply-Text") or ""
+            if not reply_text.startswith("+OK"):
+                raise ConnectionError(f"connection refused: {reply_text}")
+        except BaseException:
+            writer.close()
+            self._reader = self._writer = None
+            raise
+        self._connected = True
+        self.last_activity = time.monotonic()
+        self._reader_task = asyncio.ensure_future(self._reader_loop())
+
+    async def _read_frame(self) -> ESLevent:
+        head = await self._reader.readuntil(b"\n\n")
+        event = ESLevent("SOCKET_DATA")
+        _parse_headers(head.decode("utf-8", errors="replace"), event)
+        length = event.getHeader("Content-Length")
+        if length:
+            body = await self._reader.readexactly(int(length))
+            event.addBody(body.decode("utf-8", errors="replace"))
+        return event
+
+    async def _reader_loop(self) -> None:
+        try:
+            while True:
+                frame = await self._read_frame()
+                self.last_activity = time.monotonic()
+                content_type = frame.getHeader("Content-Type")
+                if content_type in _REPLY_TYPES:
+                    if self._pending:
+                        fut = self._pending.popleft()
+                        if not fut.done():
+                            fut.set_result(frame)
+                elif content_type == "text/event-plain":
+                    if self.on_event:
+                        try:
+                            self.on_event(parse_event_plain(frame.getBody() or ""))
+                        except Exception as e:
+                            logger.warning("[ESL_ASYNC] event handler error: %s", e)
+                elif content_type == "text/disconnect-notice":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("[ESL_ASYNC] reader error %s:%s err=%s", self.host, self.port, e)
+        finally:
+            self._mark_closed()
+
+    def _mark_closed(self) -> None:
+        self._connected = False
+        while self._pending:
+            fut = self._pending.popleft()
+            if not fut.done():
+                fut.set_exception(ConnectionError("ESL connection closed"))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def send_command(self, command: str, timeout: float = ESL_COMMAND_TIMEOUT) -> ESLevent:
+        """コマンドを送り、対応する command/reply または api/response を返す"""
+        if not self._connected:
+            raise ConnectionError("ESL not connected")
+        fut = asyncio.get_running_loop().create_future()
+        async with self._write_lock:
+            # 送信順と待機順を一致させるため、append と write をロック内で行う
+            self._pending.append(fut)
+            self._writer.write(f"{command}\n\n".encode("utf-8"))
+            await self._writer.drain()
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            # 応答の対応付けがずれるため、この接続は破棄する
+            logger.warning("[ESL_ASYNC] command timeout, dropping connection cmd=%s", command.split("\n", 1)[0])
+            await self.close()
+            raise
+
+    async def api(self, command: str, args: Optional[str] = None, timeout: float = ESL_COMMAND_TIMEOUT) -> ESLevent:
+        cmd = f"api {command} {args}" if args else f"api {command}"
+        return await self.send_command(cmd, timeout)
+
+    async def bgapi(self, command: str, args: Optional[str] = None, job_uuid: Optional[str] = None,
+                    timeout: float = ESL_COMMAND_TIMEOUT) -> ESLevent:
+        cmd = f"bgapi {command} {args}" if args else f"bgapi {command}"
+        if job_uuid:
+            cmd = f"{cmd}\nJob-UUID: {job_uuid}"
+        return await self.send_command(cmd, timeout)
+
+    async def subscribe(self, events) -> ESLevent:
+        return await self.send_command("event plain " + " ".join(events))
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader_task = None
+        self._mark_closed()
+
+
+class AsyncESLPool:
+    """
+    コマンド用接続 size 本 + イベント受信用接続 1 本の共有プール
+
+    コマンドは接続ごとの未応答数が最も少ないものへ振り分ける。切断は reader タスクが
+    即座に検知するため、呼び出し前の "status" による生存確認は行わない。
+    死活監視タスクが切断済み接続を再接続し、一定時間無通信の接続だけ status で確認する。
+    イベントは Unique-ID ごとに登録されたリスナーへ配送し、BACKGROUND_JOB は Job-UUID で
+    bgapi の呼び出し元へ返す。
+    """
+
+    def __init__(
+        self,
+        host: str = ESL_HOST,
+        port: int | str = ESL_PORT,
+        password: str = ESL_PASSWORD,
+        size: int = ESL_POOL_SIZE,
+        events=DEFAULT_EVENTS,
+        health_interval: float = ESL_HEALTH_INTERVAL,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.password = password
+        self.size = max(1, size)
+        self.events = tuple(events or ())
+        self.health_interval = health_interval
+        self._conns: List[Optional[AsyncESLConnection]] = [None] * self.size
+        self._event_conn: Optional[AsyncESLConnection] = None
+        self._listeners: Dict[str, Set[Callable[[ESLevent], None]]] = {}
+        self._jobs: Dict[str, asyncio.Future] = {}
+        self._rr = itertools.count()
+        self._reconnect_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self.stats = {"connects": 0, "connect_failures": 0, "commands": 0,
+                      "command_errors": 0, "events": 0}
+
+    # ------------------------------------------------------------------ #
+    #  接続管理
+    # ------------------------------------------------------------------ #
+    async def start(self) -> None:
+        await self._ensure_connections()
+        if self._health_task is None:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def _open(self, on_event=None) -> Optional[AsyncESLConnection]:
+        conn = AsyncESLConnection(self.host, self.port, self.password, on_event=on_event)
+        try:
+            await conn.connect()
+        except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+            self.stats["connect_failures"] += 1
+            logger.warning("[ESL_POOL] connect failed %s:%s err=%s", self.host, self.port, e)
+            return None
+        self.stats["connects"] += 1
+        return conn
+
+    async def _ensure_connections(self) -> None:
+        async with self._reconnect_lock:
+            for i, conn in enumerate(self._conns):
+                if conn is None or not conn.connected:
+                    self._conns[i] = await self._open()
+            if self.events and (self._event_conn is None or not self._event_conn.connected):
+                conn = await self._open(on_event=self._dispatch_event)
+                if conn is not None:
+                    try:
+                        await conn.subscribe(self.events)
+                    except (ConnectionError, asyncio.TimeoutError):
+                        conn = None
+                self._event_conn = conn
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self._ensure_connections()
+                now = time.monotonic()
+                for conn in list(self._conns) + [self._event_conn]:
+                    if conn is not None and conn.connected and now - conn.last_activity > self.health_interval:
+                        try:
+                            await conn.api("status", timeout=2.0)
+                        except (ConnectionError, asyncio.TimeoutError):
+                            pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("[ESL_POOL] health check error: %s", e)
+
+    @property
+    def connected(self) -> bool:
+        return any(c is not None and c.connected for c in self._conns)
+
+    async def _acquire(self) -> AsyncESLConnection:
+        live = [c for c in self._conns if c is not None and c.connected]
+        if not live:
+            await self._ensure_connections()
+            live = [c for c in self._conns if c is not None and c.connected]
+            if not live:
+                raise ConnectionError("no ESL connection available")
+        start = next(self._rr) % len(live)
+        ordered = live[start:] + live[:start]
+        return min(ordered, key=lambda c: len(c._pending))
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for conn in list(self._conns) + [self._event_conn]:
+            if conn is not None:
+                await conn.close()
+        self._conns = [None] * self.size
+        self._event_conn = None
+
+    # ------------------------------------------------------------------ #
+    #  コマンド
+    # ------------------------------------------------------------------ #
+    async def api(self, command: str, args: Optional[str] = None,
+                  timeout: float = ESL_COMMAND_TIMEOUT) -> ESLevent:
+        self.stats["commands"] += 1
+        for attempt in range(2):
+            conn = await self._acquire()
+            try:
+                return await conn.api(command, args, timeout)
+            except ConnectionError:
+                # 送信直前に切断された場合のみ、別接続で1回だけ再試行
+                self.stats["command_errors"] += 1
+                if attempt:
+                    raise
+            except asyncio.TimeoutError:
+                self.stats["command_errors"] += 1
+                raise
+
+    async def bgapi(self, command: str, args: Optional[str] = None, wait: bool = False,
+                    timeout: float = ESL_COMMAND_TIMEOUT) -> ESLevent:
+        """
+        bgapi を実行。wait=True なら BACKGROUND_JOB イベント（結果本文を含む）を待って返す
+        """
+        job_uuid = str(uuid_mod.uuid4())
+        fut = None
+        if wait:
+            fut = asyncio.get_running_loop().create_future()
+            self._jobs[job_uuid] = fut
+        try:
+            self.stats["commands"] += 1
+            conn = await self._acquire()
+            reply = await conn.bgapi(command, args, job_uuid=job_uuid, timeout=timeout)
+            if fut is None:
+                return reply
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._jobs.pop(job_uuid, None)
+
+    # ------------------------------------------------------------------ #
+    #  イベント配送
+    # ------------------------------------------------------------------ #
+    def add_listener(self, channel_uuid: str, callback: Callable[[ESLevent], None]) -> None:
+        self._listeners.setdefault(channel_uuid, set()).add(callback)
+
+    def remove_listener(self, channel_uuid: str, callback: Callable[[ESLevent], None]) -> None:
+        callbacks = self._listeners.get(channel_uuid)
+        if callbacks:
+            callbacks.discard(callback)
+            if not callbacks:
+                self._listeners.pop(channel_uuid, None)
+
+    def _dispatch_event(self, event: ESLevent) -> None:
+        self.stats["events"] += 1
+        if event.getHeader("Event-Name") == "BACKGROUND_JOB":
+            fut = self._jobs.get(event.getHeader("Job-UUID") or "")
+            if fut is not None and not fut.done():
+                fut.set_result(event)
+            return
+        callbacks = self._listeners.get(event.getHeader("Unique-ID") or "")
+        if callbacks:
+            for cb in list(callbacks):
+                cb(event)
+
+
+class SyncESLClient:
+    """
+    AsyncESLPool の同期ファサード
+
+    専用スレッドでイベントループを回し、スレッドベースのコード（SilenceHandler 等）から
+    ESLconnection と同じ感覚で api() を呼べるようにする。api() は失敗時に None を返す
+    （ESLconnection が未接続時に None を返すのと同じ）。スレッドセーフ。
+    """
+
+    def __init__(
+        self,
+        host: str = ESL_HOST,
+        port: int | str = ESL_PORT,
+        password: str = ESL_PASSWORD,
+        size: int = ESL_POOL_SIZE,
+        events=DEFAULT_EVENTS,
+        start_timeout: float = 5.0,
+    ) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="esl_pool", daemon=True)
+        self._thread.start()
+        self.pool = AsyncESLPool(host, port, password, size=size, events=events)
+        try:
+            self._submit(self.pool.start()).result(start_timeout)
+        except Exception as e:
+            logger.warning("[ESL_POOL] initial connect incomplete: %s", e)
+
+    def _submit(self, coro):
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("SyncESLClient called from its own event loop thread")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def connected(self) -> bool:
+        return self.pool.connected
+
+    def api(self, command: str, args: Optional[str] = None,
+            timeout: float = ESL_COMMAND_TIMEOUT) -> Optional[ESLevent]:
+        try:
+            return self._submit(self.pool.api(command, args, timeout)).result(timeout + 1.0)
+        except Exception as e:
+            logger.warning("[ESL_POOL] api failed cmd=%s err=%s", command, e)
+            return None
+
+    def bgapi(self, command: str, args: Optional[str] = None, wait: bool = False,
+              timeout: float = ESL_COMMAND_TIMEOUT) -> Optional[ESLevent]:
+        try:
+            return self._submit(self.pool.bgapi(command, args, wait, timeout)).result(timeout + 1.0)
+        except Exception as e:
+            logger.warning("[ESL_POOL] bgapi failed cmd=%s err=%s", command, e)
+            return None
+
+    def bgapi_nowait(self, command: str, args: Optional[str] = None):
+        """応答を待たずに bgapi を投げる（イベントループ上や発話処理中から呼ぶ用）。Future を返す"""
+        return self._submit(self.pool.bgapi(command, args, False, ESL_COMMAND_TIMEOUT))
+
+    async def api_async(self, command: str, args: Optional[str] = None,
+                        timeout: float = ESL_COMMAND_TIMEOUT) -> Optional[ESLevent]:
+        """別のイベントループ（ws_sink 等）から await で呼ぶ版"""
+        try:
+            return await asyncio.wrap_future(self._submit(self.pool.api(command, args, timeout)))
+        except Exception as e:
+            logger.warning("[ESL_POOL] api failed cmd=%s err=%s", command, e)
+            return None
+
+    def subscribe(self, channel_uuid: str) -> "queue.Queue[ESLevent]":
+        """指定チャネルのイベントを受け取るキューを登録（unsubscribe で解除）"""
+        q: "queue.Queue[ESLevent]" = queue.Queue()
+        self._loop.call_soon_threadsafe(self.pool.add_listener, channel_uuid, q.put_nowait)
+        return q
+
+    def unsubscribe(self, channel_uuid: str, q: "queue.Queue[ESLevent]") -> None:
+        self._loop.call_soon_threadsafe(self.pool.remove_listener, channel_uuid, q.put_nowait)
+
+    def get_stats(self) -> dict:
+        return dict(self.pool.stats)
+
+    def close(self) -> None:
+        try:
+            self._submit(self.pool.close()).result(2.0)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_shared_client: Optional[SyncESLClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_esl() -> SyncESLClient:
+    """プロセス共有の ESL クライアントを返す（初回呼び出し時に接続）"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = SyncESLClient()
+    return _shared_client
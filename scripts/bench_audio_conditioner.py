@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AudioConditioner ベンチマーク
+
+合成した 20ms フレーム（8kHz PCM16 = 160サンプル）を 10,000 個流し、
+旧実装（np.clip + Python ループでのバイトスワップ）と
+AudioConditioner（事前確保バッファ + in-place 演算）の処理時間を比較します。
+
+使い方:
+    python3 scripts/bench_audio_conditioner.py
+    python3 scripts/bench_audio_conditioner.py --frames 50000 --samples 320
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from gateway.audio.audio_conditioner import AudioConditioner  # noqa: E402
+
+
+def _legacy_condition(pcm: np.ndarray) -> bytes:
+    """旧 update_vad_state [DIRECT_SEND] 相当"""
+    final_pcm = np.clip(pcm * 10, -32768, 32767)
+    final_bytes = final_pcm.astype(np.int16).tobytes()
+    swapped_bytes = bytearray(len(final_bytes))
+    for i in range(0, len(final_bytes), 2):
+        if i + 1 < len(final_bytes):
+            swapped_bytes[i] = final_bytes[i + 1]
+            swapped_bytes[i + 1] = final_bytes[i]
+    return bytes(swapped_bytes)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AudioConditioner benchmark")
+    parser.add_argument("--frames", type=int, default=10000, help="フレーム数")
+    parser.add_argument("--samples", type=int, default=160, help="1フレームのサンプル数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(-3000, 3000, size=args.samples, dtype=np.int16).tobytes()
+        for _ in range(args.frames)
+    ]
+
+    start = time.perf_counter()
+    for frame in frames:
+        _legacy_condition(np.frombuffer(frame, dtype=np.int16))
+    legacy = time.perf_counter() - start
+
+    conditioner = AudioConditioner(gain=10.0, swap_bytes=True)
+    start = time.perf_counter()
+    for frame in frames:
+        conditioner.process(frame)
+    vectorized = time.perf_counter() - start
+
+    per_frame_legacy = legacy / args.frames * 1e6
+    per_frame_vec = vectorized / args.frames * 1e6
+    print(f"frames={args.frames} samples/frame={args.samples}")
+    print(f"legacy loop        {legacy:8.3f}s  {per_frame_legacy:8.1f} us/frame")
+    print(f"AudioConditioner   {vectorized:8.3f}s  {per_frame_vec:8.1f} us/frame")
+    print(f"speedup: {legacy / vectorized:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
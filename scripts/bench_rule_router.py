@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RuleRouter.match ベンチマーク（旧ループ vs KeywordMatcher）
+
+実際のクライアント設定（既定: clients/000）から RuleRouter を作り、
+ASR の interim 断片を模した入力（キーワード・キーワード断片・文中のキーワード・
+無関係な文）に対して、旧実装（ルール × キーワードの部分文字列ループ + ソート）と
+Aho–Corasick ベースの KeywordMatcher の結果が一致することを確認したうえで、
+1回あたりの処理時間を比較します。正規化は両者共通のためキャッシュ済みの値を使います。
+
+使い方:
+    python3 scripts/bench_rule_router.py
+    python3 scripts/bench_rule_router.py --client 001 --iterations 20
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from asr_stream.rule_router import RuleRouter  # noqa: E402
+
+FILLERS = ["えっと", "あの", "すみません", "ちょっと", "なんですけど", "について", "を教えて", "はい"]
+UNRELATED = ["今日はいい天気ですね", "もう一度お願いします", "聞こえますか", "わかりません"]
+
+
+def _legacy_match(rules, norm):
+    """旧 RuleRouter.match の候補収集 + ソート"""
+    candidates = []
+    for rule in rules:
+        for kw in rule["kw_list"]:
+            if not kw:
+                continue
+            if norm == kw:
+                candidates.append((rule["response"], len(kw), 1.0))
+            elif kw in norm:
+                score = max(len(kw) / max(len(norm), 1), 0.55)
+                candidates.append((rule["response"], len(kw), score))
+            elif norm in kw and len(norm) >= 2:
+                candidates.append((rule["response"], len(norm), 0.5))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    return candidates[0]
+
+
+def _build_inputs(router, count, seed):
+    rng = random.Random(seed)
+    keywords = [kw for rule in router.rules for kw in rule["kw_list"] if kw]
+    inputs = []
+    for _ in range(count):
+        kw = rng.choice(keywords)
+        kind = rng.randrange(4)
+        if kind == 0:
+            text = kw
+        elif kind == 1 and len(kw) > 2:
+            i = rng.randrange(len(kw) - 1)
+            text = kw[i:rng.randrange(i + 2, len(kw) + 1)]
+        elif kind == 2:
+            text = rng.choice(FILLERS) + kw + rng.choice(FILLERS)
+        else:
+            text = rng.choice(UNRELATED) + rng.choice(FILLERS)
+        inputs.append(router._normalize(text))
+    return inputs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RuleRouter.match benchmark")
+    parser.add_argument("--client", default="000", help="クライアントID（clients/<id>/config）")
+    parser.add_argument("--inputs", type=int, default=2000, help="入力文の数")
+    parser.add_argument("--iterations", type=int, default=10, help="繰り返し回数")
+    args = parser.parse_args()
+
+    config_path = PROJECT_ROOT / "clients" / args.client / "config" / "dialogue_config.json"
+    router = RuleRouter(str(config_path))
+    inputs = _build_inputs(router, args.inputs, seed=0)
+
+    mismatches = 0
+    for norm in inputs:
+        if _legacy_match(router.rules, norm) != router._matcher.match(norm):
+            mismatches += 1
+    n_kw = sum(len(r["kw_list"]) for r in router.rules)
+    print(f"client={args.client} rules={len(router.rules)} keywords={n_kw} inputs={len(inputs)}")
+    print(f"result mismatches: {mismatches}")
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for norm in inputs:
+            _legacy_match(router.rules, norm)
+    legacy = time.perf_counter() - start
+
+    matcher = router._matcher
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for norm in inputs:
+            matcher.match(norm)
+    compiled = time.perf_counter() - start
+
+    calls = args.iterations * len(inputs)
+    print(f"legacy loop       {legacy / calls * 1e6:8.2f} us/match")
+    print(f"KeywordMatcher    {compiled / calls * 1e6:8.2f} us/match")
+    print(f"speedup: {legacy / compiled:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
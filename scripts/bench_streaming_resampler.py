@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+8kHz→16kHz リサンプリングのベンチマーク（通話1分あたりのCPU時間）
+
+1分間の通話 = 20ms チャンク × 3000 個を、
+旧実装（チャンクごとに resample_poly）と StreamingResampler
+（FIR事前設計 + チャンク間でフィルタ状態を引き継ぐ）で処理し、
+プロセスCPU時間を比較します。
+
+使い方:
+    python3 scripts/bench_streaming_resampler.py
+    python3 scripts/bench_streaming_resampler.py --minutes 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.signal import resample_poly
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from gateway.common.streaming_resampler import StreamingResampler  # noqa: E402
+
+CHUNK_SAMPLES = 160  # 20ms @ 8kHz
+CHUNKS_PER_MINUTE = 3000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="StreamingResampler benchmark")
+    parser.add_argument("--minutes", type=float, default=1.0, help="通話時間（分）")
+    args = parser.parse_args()
+
+    n_chunks = int(CHUNKS_PER_MINUTE * args.minutes)
+    rng = np.random.default_rng(0)
+    chunks = [
+        rng.integers(-8000, 8000, size=CHUNK_SAMPLES, dtype=np.int16).tobytes()
+        for _ in range(n_chunks)
+    ]
+
+    start = time.process_time()
+    for chunk in chunks:
+        pcm = np.frombuffer(chunk, dtype=np.int16)
+        resample_poly(pcm, 2, 1).astype(np.int16).tobytes()
+    legacy = time.process_time() - start
+
+    resampler = StreamingResampler(2, 1)
+    start = time.process_time()
+    for chunk in chunks:
+        resampler.process_bytes(chunk)
+    streaming = time.process_time() - start
+
+    per_min_legacy = legacy / args.minutes * 1000
+    per_min_stream = streaming / args.minutes * 1000
+    print(f"chunks={n_chunks} ({args.minutes:g} call-minutes)")
+    print(f"resample_poly per chunk   {per_min_legacy:8.1f} ms CPU / call-minute")
+    print(f"StreamingResampler        {per_min_stream:8.1f} ms CPU / call-minute")
+    print(f"speedup: {legacy / streaming:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
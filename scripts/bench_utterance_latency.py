@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+発話終了 → 応答ID 決定までのレイテンシ計測（特徴量を毎回計算 vs UtteranceFeatures で共有）
+
+WAV（16kHz / mono / 16bit、発話1つ分）ごとに、発話終了時点から応答IDが決まるまでの
+処理を2通りで実行し、wall-clock 時間を比較します。
+
+  separate: EmbeddingClassifier.classify(audio) のあと、確信度が低ければ
+            WhisperModel.transcribe(audio) で log-mel とエンコーダを最初から計算し直す
+  shared  : UtteranceFeatures を1つ作り、分類と CT2BatchRunner（エンコーダ出力に対する
+            generate）で log-mel / エンコーダ出力を共有する
+
+文字起こし結果は IntentClassifier（RuleRouter のみ、LLM なし）で応答IDにします。
+--always-decode を付けると確信度に関係なく毎回文字起こしします（Whisper フォールバック時の
+最悪ケース）。
+
+使い方:
+    python3 scripts/bench_utterance_latency.py /opt/libertycall/training_data/segments/*.wav
+    python3 scripts/bench_utterance_latency.py --client 000 --runs 5 --always-decode a.wav b.wav
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "asr_stream"))
+
+from asr_stream.embedding_classifier import EmbeddingClassifier  # noqa: E402
+from asr_stream.intent_classifier import IntentClassifier  # noqa: E402
+from asr_stream.whisper_scheduler import CT2BatchRunner, InferenceRequest, PRIORITY_FINAL  # noqa: E402
+from asr_stream.whisper_session import WHISPER_INITIAL_PROMPT, get_whisper_model  # noqa: E402
+
+CONF_THRESHOLD = 0.50
+
+
+def _load_wav(path):
+    with wave.open(str(path)) as wf:
+        if wf.getframerate() != 16000 or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: 16kHz mono 16bit のみ対応")
+        pcm = wf.readframes(wf.getnframes())
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _separate(audio, clf, model, intent, always_decode):
+    label, conf = clf.classify(audio)
+    if conf >= CONF_THRESHOLD and not always_decode:
+        return label
+    segments, _ = model.transcribe(
+        audio, language="ja", initial_prompt=WHISPER_INITIAL_PROMPT, beam_size=3, best_of=1,
+        vad_filter=False, without_timestamps=True, no_speech_threshold=None)
+    text = "".join(seg.text.strip() for seg in segments).strip()
+    return intent.classify(text)[0]
+
+
+def _shared(audio, clf, runner, intent, always_decode):
+    feats = clf.features(audio)
+    label, conf = clf.classify(feats)
+    if conf >= CONF_THRESHOLD and not always_decode:
+        return label
+    req = InferenceRequest(None, audio, PRIORITY_FINAL, 3, WHISPER_INITIAL_PROMPT, None, feats)
+    text = runner([req])[0]
+    if isinstance(text, Exception):
+        raise text
+    return intent.classify(text)[0]
+
+
+def _summary(name, samples):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{name:9s} p50={statistics.median(ms):8.1f} ms  p95={p95:8.1f} ms  mean={statistics.mean(ms):8.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="end-of-speech -> response id latency benchmark")
+    parser.add_argument("wavs", nargs="+", help="発話1つ分の WAV（16kHz mono）")
+    parser.add_argument("--client", default="000", help="クライアントID（clients/<id>/config）")
+    parser.add_argument("--runs", type=int, default=3, help="WAV ごとの繰り返し回数")
+    parser.add_argument("--always-decode", action="store_true", help="確信度に関係なく毎回文字起こしする")
+    args = parser.parse_args()
+
+    model = get_whisper_model()
+    clf = EmbeddingClassifier()
+    clf.set_ct_model(model.model)
+    runner = CT2BatchRunner(model)
+    config_path = PROJECT_ROOT / "clients" / args.client / "config" / "dialogue_config.json"
+    intent = IntentClassifier(str(config_path), use_llm=False)
+
+    audios = [(os.path.basename(p), _load_wav(p)) for p in args.wavs]
+    # ウォームアップ（モデルのロードや初回メモリ確保を計測に含めない）
+    _separate(audios[0][1], clf, model, intent, True)
+    _shared(audios[0][1], clf, runner, intent, True)
+
+    results = {"separate": [], "shared": []}
+    mismatches = 0
+    for _ in range(args.runs):
+        for name, audio in audios:
+            start = time.perf_counter()
+            rid_separate = _separate(audio, clf, model, intent, args.always_decode)
+            results["separate"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rid_shared = _shared(audio, clf, runner, intent, args.always_decode)
+            results["shared"].append(time.perf_counter() - start)
+
+            if rid_separate != rid_shared:
+                mismatches += 1
+                print(f"  response mismatch {name}: separate={rid_separate} shared={rid_shared}")
+
+    print(f"utterances={len(audios)} runs={args.runs} always_decode={args.always_decode}")
+    for name, samples in results.items():
+        _summary(name, samples)
+    print(f"response id mismatches: {mismatches}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
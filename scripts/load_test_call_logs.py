@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通話ログ一括追加 API の負荷試験（同時通話を模擬して logs/sec を計測）
+
+--calls 本の通話を同時に走らせ、各通話は --turn-interval 秒ごとに1ターン分
+（USER + AI の発話、--logs-per-turn 件）のログを console_backend に送ります。
+--duration 秒のあいだに保存できたログ件数から、持続的な logs/sec と
+リクエストごとのレイテンシ（p50 / p95 / p99）を表示します。
+
+送信方法（--mode）:
+  batch : 1ターンごとに POST /api/calls/{call_id}/logs:batch
+  multi : 全通話分を --flush-ms ごとにまとめて POST /api/calls/logs:batch
+  bridge: ConsoleBridge の送信キューと同じ形式で POST /api/calls/events:batch
+          （--flush-ms ごと、append_log イベントとして）
+
+通話IDは loadtest- で始まるので、試験後は DB から消してください。
+
+使い方:
+    python3 scripts/load_test_call_logs.py
+    python3 scripts/load_test_call_logs.py --base-url http://localhost:8001 --calls 100 --duration 60
+    python3 scripts/load_test_call_logs.py --mode multi --flush-ms 100 --turn-interval 0.5
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+USER_TEXTS = ["もしもし", "予約をお願いしたいんですが", "明日の午後は空いていますか", "はい、お願いします"]
+AI_TEXTS = ["お電話ありがとうございます", "ご予約ですね", "確認いたします", "承知しました"]
+
+
+class Stats:
+    def __init__(self):
+        self.logs = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies = []
+
+    def record(self, count, latency, ok):
+        self.requests += 1
+        self.latencies.append(latency)
+        if ok:
+            self.logs += count
+        else:
+            self.errors += 1
+
+
+def _make_logs(turn, logs_per_turn):
+    now = datetime.now(timezone.utc).isoformat()
+    logs = []
+    for i in range(logs_per_turn):
+        if i % 2 == 0:
+            role, texts = "user", USER_TEXTS
+        else:
+            role, texts = "ai", AI_TEXTS
+        logs.append({
+            "role": role,
+            "text": texts[(turn + i) % len(texts)],
+            "state": "active",
+            "timestamp": now,
+        })
+    return logs
+
+
+async def _post(session, url, body, count, stats):
+    start = time.perf_counter()
+    ok = False
+    try:
+        async with session.post(url, json=body) as response:
+            await response.read()
+            ok = response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        ok = False
+    stats.record(count, time.perf_counter() - start, ok)
+
+
+async def _call_worker(index, args, session, stats, outbox, stop_at):
+    call_id = f"loadtest-{uuid.uuid4().hex[:12]}-{index:03d}"
+    turn = 0
+    # 通話ごとに開始タイミングをずらす
+    await asyncio.sleep(args.turn_interval * index / max(args.calls, 1))
+    while time.monotonic() < stop_at:
+        logs = _make_logs(turn, args.logs_per_turn)
+        turn += 1
+        if args.mode == "batch":
+            url = f"{args.base_url}/api/calls/{call_id}/logs:batch"
+            await _post(session, url, {"client_id": args.client_id, "logs": logs}, len(logs), stats)
+        else:
+            outbox.append((call_id, logs))
+        await asyncio.sleep(args.turn_interval)
+
+
+async def _flusher(args, session, stats, outbox, stop_at):
+    """multi / bridge: --flush-ms ごとに溜まった分を1リクエストで送る"""
+    interval = args.flush_ms / 1000.0
+    while True:
+        await asyncio.sleep(interval)
+        pending = outbox[:]
+        del outbox[:]
+        if pending:
+            count = sum(len(logs) for _, logs in pending)
+            if args.mode == "multi":
+                calls = {}
+                for call_id, logs in pending:
+                    calls.setdefault(call_id, []).extend(logs)
+                body = {"calls": [{"call_id": c, "client_id": args.client_id, "logs": l}
+                                  for c, l in calls.items()]}
+                url = f"{args.base_url}/api/calls/logs:batch"
+            else:
+                events = [{"kind": "append_log", "call_id": call_id, "client_id": args.client_id, **log}
+                          for call_id, logs in pending for log in logs]
+                body = {"events": events}
+                url = f"{args.base_url}/api/calls/events:batch"
+            await _post(session, url, body, count, stats)
+        elif time.monotonic() >= stop_at:
+            return
+
+
+async def run(args):
+    stats = Stats()
+    outbox = []
+    connector = aiohttp.TCPConnector(limit=args.calls)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = time.monotonic()
+        stop_at = start + args.duration
+        tasks = [asyncio.create_task(_call_worker(i, args, session, stats, outbox, stop_at))
+                 for i in range(args.calls)]
+        if args.mode != "batch":
+            tasks.append(asyncio.create_task(_flusher(args, session, stats, outbox, stop_at)))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+    return stats, elapsed
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="通話ログ一括追加 API の負荷試験")
+    parser.add_argument("--base-url", default="http://localhost:8001", help="console_backend のURL")
+    parser.add_argument("--mode", choices=["batch", "multi", "bridge"], default="batch")
+    parser.add_argument("--calls", type=int, default=100, help="同時通話数")
+    parser.add_argument("--duration", type=float, default=30.0, help="計測秒数")
+    parser.add_argument("--turn-interval", type=float, default=1.0, help="1通話あたりのターン間隔（秒）")
+    parser.add_argument("--logs-per-turn", type=int, default=2, help="1ターンあたりのログ件数")
+    parser.add_argument("--flush-ms", type=float, default=200.0, help="multi / bridge の送信間隔（ms）")
+    parser.add_argument("--client-id", default="000")
+    parser.add_argument("--timeout", type=float, default=10.0, help="1リクエストのタイムアウト（秒）")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    offered = args.calls * args.logs_per_turn / args.turn_interval
+    print(f"mode={args.mode} calls={args.calls} duration={args.duration:.0f}s "
+          f"offered={offered:.0f} logs/s url={args.base_url}")
+
+    stats, elapsed = asyncio.run(run(args))
+
+    print(f"elapsed     : {elapsed:.1f}s")
+    print(f"requests    : {stats.requests} (errors {stats.errors})")
+    print(f"logs stored : {stats.logs}")
+    print(f"throughput  : {stats.logs / elapsed:.1f} logs/s")
+    if stats.latencies:
+        lat_ms = [v * 1000.0 for v in stats.latencies]
+        print(f"latency ms  : mean {statistics.mean(lat_ms):.1f}  p50 {_percentile(lat_ms, 50):.1f}  "
+              f"p95 {_percentile(lat_ms, 95):.1f}  p99 {_percentile(lat_ms, 99):.1f}  "
+              f"max {max(lat_ms):.1f}")
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TTS キャッシュのウォームアップ（TEMPLATE_CONFIG の全テンプレートを事前に合成）
+
+gateway.common.text_utils.TEMPLATE_CONFIG の各テンプレートを synthesize_template_audio で
+合成し、LC_TTS_CACHE_DIR のディスクキャッシュに保存します。キャッシュ済みのものは
+バックエンドを呼ばずにスキップされるため、デプロイのたびに実行して構いません。
+
+使い方:
+    GEMINI_API_KEY=... python3 scripts/warm_tts_cache.py
+    python3 scripts/warm_tts_cache.py --workers 8 006 006_SYS 020
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from gateway.audio.tts_utils import warm_template_cache  # noqa: E402
+from gateway.common.text_utils import TEMPLATE_CONFIG, get_template_config  # noqa: E402
+from gateway.common.tts_cache import get_tts_cache  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="TTS キャッシュのウォームアップ")
+    parser.add_argument("template_ids", nargs="*", help="対象テンプレートID（省略時は全件）")
+    parser.add_argument("--workers", type=int, default=4, help="同時合成数")
+    args = parser.parse_args()
+
+    template_ids = args.template_ids or sorted(TEMPLATE_CONFIG)
+    unknown = [t for t in template_ids if t not in TEMPLATE_CONFIG]
+    if unknown:
+        print(f"未定義のテンプレートID: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    cache = get_tts_cache()
+    start = time.monotonic()
+    results = warm_template_cache(template_ids, get_template_config, workers=args.workers)
+    elapsed = time.monotonic() - start
+
+    failed = [t for t, ok in results.items() if not ok]
+    for template_id in failed:
+        print(f"✗ {template_id}: 合成に失敗しました", file=sys.stderr)
+    stats = cache.get_stats()
+    print(
+        f"templates={len(results)} failed={len(failed)} "
+        f"hits={stats['hits']} misses={stats['misses']} "
+        f"disk_entries={stats['disk_entries']} disk_bytes={stats['disk_bytes']} "
+        f"elapsed={elapsed:.1f}s"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""GatewayASRManager の通話開始・終了と ASRAudioProcessor の状態管理のテスト."""
+
+import asyncio
+import audioop
+import struct
+import types
+
+import numpy as np
+import pytest
+
+asr_manager = pytest.importorskip("gateway.asr.asr_manager")
+
+SSRC = 0x0BADCAFE
+
+
+def _manager():
+    gateway = types.SimpleNamespace(stream_handler=object(), batch_handler=None)
+    return asr_manager.GatewayASRManager(gateway)
+
+
+def _channel_vars(codec="PCMA"):
+    return {
+        "variable_remote_media_ip": "127.0.0.1",
+        "variable_remote_media_port": "40000",
+        "variable_rtp_use_ssrc": str(SSRC),
+        "variable_read_codec_name": codec,
+    }
+
+
+def _packet(payload, pt=96):
+    # 動的ペイロードタイプ（SDP が無ければプローブが必要）
+    return struct.pack("!BBHII", 0x80, pt, 1, 160, SSRC) + payload
+
+
+def test_call_setup_registers_negotiated_codec_and_cleanup_forgets_it():
+    manager = _manager()
+    processor = manager.asr_audio_processor
+    payload = bytes(range(0, 160))
+
+    assert asyncio.run(manager.start_asr_for_call("call-1", _channel_vars("PCMA")))
+    # SDP の read_codec_name に従ってプローブせずに A-law でデコードする
+    assert processor.extract_rtp_payload(_packet(payload)) == audioop.alaw2lin(payload, 2)
+    assert processor.get_codec_stats()["probe_packets"] == 0
+    assert processor.get_codec_stats()["cached_ssrcs"] == 1
+
+    asyncio.run(manager.stop_asr_for_call("call-1"))
+    assert processor._negotiated_codecs == {}
+    assert processor.get_codec_stats()["cached_ssrcs"] == 0
+    assert processor.get_codec_stats()["probing_ssrcs"] == 0
+
+
+def test_unknown_codec_falls_back_to_probing():
+    manager = _manager()
+    processor = manager.asr_audio_processor
+    assert asyncio.run(manager.start_asr_for_call("call-1", _channel_vars("opus")))
+    processor.extract_rtp_payload(_packet(bytes(range(0, 160))))
+    assert processor.get_codec_stats()["probe_packets"] == 1
+
+    asyncio.run(manager.stop_asr_for_call("call-1"))
+    assert processor.get_codec_stats()["probing_ssrcs"] == 0
+
+
+def test_l16_payload_is_decoded_from_network_byte_order():
+    manager = _manager()
+    processor = manager.asr_audio_processor
+    assert asyncio.run(manager.start_asr_for_call("call-1", _channel_vars("L16")))
+    samples = [1, -2, 1000, -32768]
+    payload = struct.pack("!4h", *samples)
+    assert struct.unpack("<4h", processor.extract_rtp_payload(_packet(payload))) == tuple(samples)
+
+
+def test_call_teardown_releases_per_call_conditioner():
+    manager = _manager()
+    processor = manager.asr_audio_processor
+    assert asyncio.run(manager.start_asr_for_call("call-1", _channel_vars()))
+    processor.get_conditioner("call-1").process(b"\x01\x00" * 160)
+    assert "call-1" in processor._conditioners
+
+    asyncio.run(manager.stop_asr_for_call("call-1"))
+    assert processor._conditioners == {}
+
+
+def test_live_path_uses_per_call_conditioner_and_resampler():
+    manager = _manager()
+    t = np.arange(8000) / 8000
+    pcm = (3000 * np.sin(2 * np.pi * 440 * t) + 4000).astype(np.int16).tobytes()
+    alaw = audioop.lin2alaw(pcm, 2)
+    out = b"".join(
+        manager.audio_processor.process_rtp_audio(
+            alaw[i:i + 160], ("127.0.0.1", 40000), call_id="call-1", ssrc=SSRC, payload_type=8
+        )
+        for i in range(0, len(alaw), 160)
+    )
+    settled = np.frombuffer(out, dtype=np.int16)[8000:].astype(np.float64)
+    assert abs(settled.mean()) < 50
+    assert settled.std() > 1800
+    assert list(manager.asr_audio_processor._conditioners) == ["call-1"]
+    assert list(manager.asr_audio_processor._resamplers) == ["call-1"]
+
+
+def test_gateway_cleanup_releases_per_call_resampler():
+    from gateway.common.streaming_resampler import StreamingResampler
+    from gateway.core.call_cleanup_helper import cleanup_gateway_call_state
+
+    manager = _manager()
+    processor = manager.asr_audio_processor
+    processor._resamplers["call-1"] = StreamingResampler(2, 1)
+    gateway = types.SimpleNamespace(asr_manager=manager, logger=manager.logger)
+    cleanup_gateway_call_state(gateway, "call-1")
+    assert processor._resamplers == {}
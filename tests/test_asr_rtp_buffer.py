@@ -0,0 +1,81 @@
+"""ASRRTPBuffer / RTPJitterBuffer のテスト."""
+
+import logging
+import struct
+
+from gateway.asr.asr_rtp_buffer import ASRRTPBuffer, RTPJitterBuffer
+from gateway.asr.rtp_parser import RTPPacketView
+
+
+def _frame(seq):
+    return bytes([seq & 0xFF]) * 160
+
+
+def test_in_order_packets_are_released_immediately():
+    jb = RTPJitterBuffer(playout_delay_ms=60)
+    for seq in range(10):
+        assert jb.push(seq, _frame(seq)) == [_frame(seq)]
+    assert jb.get_stats()["concealed"] == 0
+
+
+def test_reordered_packets_are_released_in_order():
+    jb = RTPJitterBuffer(playout_delay_ms=60)
+    out = []
+    for seq in (0, 2, 1, 3):
+        out.extend(jb.push(seq, _frame(seq)))
+    assert out == [_frame(s) for s in range(4)]
+    assert jb.reordered == 1
+
+
+def test_gap_is_concealed_with_silence_after_playout_delay():
+    jb = RTPJitterBuffer(playout_delay_ms=40, silence_byte=0xFF)
+    out = jb.push(0, _frame(0))
+    out += jb.push(2, _frame(2))
+    assert out == [_frame(0)]  # seq=1 を待っている
+    out += jb.push(3, _frame(3))
+    assert out == [_frame(0), b"\xff" * 160, _frame(2), _frame(3)]
+    assert jb.concealed == 1
+
+    # 補間済みの位置に遅れて届いたパケットは late として破棄、遅延を延ばす
+    assert jb.push(1, _frame(1)) == []
+    assert jb.late == 1
+    assert jb.playout_delay == 3
+
+
+def test_sequence_wraparound():
+    jb = RTPJitterBuffer(playout_delay_ms=60)
+    out = []
+    for seq in (65534, 0, 65535, 1):
+        out.extend(jb.push(seq, _frame(seq)))
+    assert out == [_frame(s) for s in (65534, 65535, 0, 1)]
+    assert jb.concealed == 0
+
+
+def test_duplicates_are_dropped():
+    jb = RTPJitterBuffer()
+    jb.push(5, _frame(5))
+    assert jb.push(5, _frame(5)) == []
+    assert jb.duplicates == 1
+
+
+def test_flush_drains_pending_frames():
+    jb = RTPJitterBuffer(playout_delay_ms=100)
+    assert jb.push(0, _frame(0)) == [_frame(0)]
+    assert jb.push(2, _frame(2)) == []
+    assert jb.flush() == [b"\x00" * 160, _frame(2)]
+
+
+class _Manager:
+    def __init__(self):
+        self.logger = logging.getLogger("test")
+        self._last_processed_sequence = {}
+
+
+def test_asr_rtp_buffer_keys_by_call_and_ssrc():
+    buf = ASRRTPBuffer(_Manager())
+    pkt = struct.pack("!BBHII", 0x80, 0x00, 10, 0, 0xAAAA) + b"\x01" * 160
+    frames = buf.push_packet(RTPPacketView(pkt), "call-1", ("127.0.0.1", 5000))
+    assert frames == [b"\x01" * 160]
+    assert list(buf.get_stats("call-1")) == ["call-1:0x0000aaaa"]
+    assert buf.release("call-1") == []
+    assert buf.get_stats() == {}
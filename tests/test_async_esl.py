@@ -0,0 +1,72 @@
+"""AsyncESLConnection / AsyncESLPool のテスト（ローカルの疑似 FreeSWITCH を使用）."""
+
+import asyncio
+
+from libs.esl.async_esl import AsyncESLConnection, AsyncESLPool, parse_event_plain
+
+
+async def _fake_freeswitch(reader, writer):
+    """auth → api 応答を1バイトずつ分割送信し、イベントも混ぜる疑似サーバ"""
+    writer.write(b"Content-Type: auth/request\n\n")
+    await writer.drain()
+    await reader.readuntil(b"\n\n")
+    writer.write(b"Content-Type: command/reply\nReply-Text: +OK accepted\n\n")
+    await writer.drain()
+    while True:
+        try:
+            cmd = (await reader.readuntil(b"\n\n")).decode().strip()
+        except asyncio.IncompleteReadError:
+            break
+        if cmd.startswith("event plain"):
+            writer.write(b"Content-Type: command/reply\nReply-Text: +OK event listener enabled plain\n\n")
+            await writer.drain()
+            continue
+        inner = b"Event-Name: CHANNEL_EXECUTE_COMPLETE\nUnique-ID: call-1\nApplication: playback\n\n"
+        writer.write(b"Content-Type: text/event-plain\nContent-Length: %d\n\n" % len(inner) + inner)
+        body = ("reply:" + cmd[len("api "):]).encode()
+        frame = b"Content-Type: api/response\nContent-Length: %d\n\n" % len(body) + body
+        for i in range(len(frame)):
+            writer.write(frame[i:i + 1])
+            await writer.drain()
+    writer.close()
+
+
+def test_api_replies_are_framed_and_correlated_in_order():
+    async def run():
+        server = await asyncio.start_server(_fake_freeswitch, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        events = []
+        conn = AsyncESLConnection("127.0.0.1", port, "ClueCon", on_event=events.append)
+        await conn.connect()
+        results = await asyncio.gather(*(conn.api(f"uuid_getvar u{i} x") for i in range(5)))
+        await conn.close()
+        server.close()
+        return [r.getBody() for r in results], events
+
+    bodies, events = asyncio.run(run())
+    assert bodies == [f"reply:uuid_getvar u{i} x" for i in range(5)]
+    assert events[0].getHeader("Unique-ID") == "call-1"
+
+
+def test_pool_routes_events_to_channel_listeners():
+    async def run():
+        server = await asyncio.start_server(_fake_freeswitch, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = AsyncESLPool("127.0.0.1", port, "ClueCon", size=2, health_interval=60)
+        await pool.start()
+        received = []
+        pool.add_listener("call-1", received.append)
+        reply = await pool.api("status")
+        pool._dispatch_event(parse_event_plain(
+            "Event-Name: CHANNEL_EXECUTE_COMPLETE\nUnique-ID: call-1\n\n"))
+        pool._dispatch_event(parse_event_plain(
+            "Event-Name: CHANNEL_EXECUTE_COMPLETE\nUnique-ID: call-2\n\n"))
+        stats = dict(pool.stats)
+        await pool.close()
+        server.close()
+        return reply.getBody(), received, stats
+
+    body, received, stats = asyncio.run(run())
+    assert body == "reply:status"
+    assert len(received) == 1
+    assert stats["connects"] == 3  # コマンド用2本 + イベント用1本
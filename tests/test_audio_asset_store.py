@@ -0,0 +1,54 @@
+"""AudioAssetStore のテスト."""
+
+import os
+import wave
+
+import numpy as np
+
+from gateway.common.audio_asset_store import AudioAssetStore
+
+
+def _write_wav(path, samples, rate, mtime):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_frames_and_durations_are_cached_and_reloaded(tmp_path):
+    audio_dir = tmp_path / "clients" / "000" / "audio"
+    audio_dir.mkdir(parents=True)
+    _write_wav(audio_dir / "000.wav", np.full(8000 + 50, 1000), 8000, 1_000_000_000)
+    _write_wav(audio_dir / "001.wav", np.zeros(16000), 16000, 1_000_000_000)
+    cache_dir = tmp_path / "cache"
+    store = AudioAssetStore(str(tmp_path / "clients"), str(cache_dir), check_interval=0)
+
+    path = audio_dir / "000.wav"
+    assert store.duration(path) == 8050 / 8000
+    frames = store.ulaw_frames(path)
+    assert len(frames) == 51
+    assert all(len(f) == 160 for f in frames)
+    pcm = store.client("000").pcm_frames("000")
+    assert pcm.shape == (51, 160)
+    assert pcm[0, 0] == 1000 and pcm[-1, -1] == 0  # 最後のフレームは無音でパディング
+    assert store.duration(audio_dir / "001.wav") == 1.0
+
+    # 別インスタンスは変換済みファイルをそのまま mmap する
+    other = AudioAssetStore(str(tmp_path / "clients"), str(cache_dir), check_interval=0)
+    assert other.ulaw_frames(path) == frames
+
+    # WAV の更新・追加を検出して作り直す
+    _write_wav(audio_dir / "000.wav", np.zeros(1600), 8000, 2_000_000_000)
+    _write_wav(audio_dir / "002.wav", np.zeros(800), 8000, 2_000_000_000)
+    assert store.duration(path) == 0.2
+    assert store.duration(audio_dir / "002.wav") == 0.1
+    assert len(store.ulaw_frames(path)) == 10
+
+    # clients/<id>/audio 以外はヘッダから求める
+    outside = tmp_path / "x.wav"
+    _write_wav(outside, np.zeros(4000), 8000, 1_000_000_000)
+    assert store.ulaw_frames(outside) is None
+    assert store.duration(outside) == 0.5
+    assert store.duration(tmp_path / "missing.wav", 2.0) == 2.0
@@ -0,0 +1,43 @@
+"""AudioConditioner のテスト."""
+
+import numpy as np
+
+from gateway.audio.audio_conditioner import AudioConditioner
+
+RATE = 8000
+
+
+def _tone(seconds=1.0, amplitude=3000.0, offset=0.0):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t) + offset).astype(np.int16)
+
+
+def test_dc_offset_is_removed():
+    conditioner = AudioConditioner(remove_dc=True)
+    out = np.frombuffer(conditioner.process(_tone(offset=4000.0)), dtype=np.int16)
+    settled = out[RATE // 2:].astype(np.float64)  # フィルタが落ち着いた後半
+    assert abs(settled.mean()) < 50
+    # 440Hz の成分は残る
+    assert settled.std() > 1800
+
+
+def test_gain_clips_instead_of_wrapping():
+    conditioner = AudioConditioner(gain=10.0, remove_dc=True)
+    loud = np.array([32767, -32768, 20000, -20000, 100], dtype=np.int16)
+    out = np.frombuffer(conditioner.process(loud), dtype=np.int16)
+    assert out.min() >= -32768 and out.max() <= 32767
+    # int16 の折り返しで符号が反転しない
+    assert out[0] > 0 and out[1] < 0 and out[2] > 0 and out[3] < 0
+
+
+def test_filter_state_is_carried_across_frames():
+    signal = _tone(offset=2500.0)
+    whole = AudioConditioner(gain=2.0, remove_dc=True, swap_bytes=True).process(signal)
+
+    framed = AudioConditioner(gain=2.0, remove_dc=True, swap_bytes=True, max_samples=64)
+    out = b"".join(framed.process(signal[i:i + 160]) for i in range(0, len(signal), 160))
+    a = np.frombuffer(whole, dtype=">i2").astype(np.int32)
+    b = np.frombuffer(out, dtype=">i2").astype(np.int32)
+    # 20ms ごとに分けても一括処理と同じ（フレーム境界で段差が出ない）
+    assert len(a) == len(b)
+    assert np.abs(a - b).max() <= 1
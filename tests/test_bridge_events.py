@@ -0,0 +1,138 @@
+"""ConsoleBridge 送信キューのバッチ適用（/api/calls/events:batch）のテスト."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from console_backend_old.database import Base
+from console_backend_old.models import CallLog
+from console_backend_old.routers import calls as calls_router
+from console_backend_old.schemas import AppendLogRequest, BridgeEventBatchRequest
+from console_backend_old.services import call_service
+
+
+class _FakeDB:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _log(call_id, text):
+    return {"kind": "append_log", "call_id": call_id, "client_id": "000",
+            "role": "user", "text": text, "state": "active"}
+
+
+def _db_down(*args, **kwargs):
+    raise OperationalError("INSERT", {}, Exception("connection refused"))
+
+
+def test_db_outage_returns_unapplied_events_for_retry(monkeypatch):
+    applied = []
+    monkeypatch.setattr(call_service, "ensure_call", lambda db, **kw: applied.append(kw["call_id"]))
+    monkeypatch.setattr(call_service, "append_logs_bulk", _db_down)
+    monkeypatch.setattr(call_service, "complete_call", lambda db, **kw: applied.append("complete"))
+
+    events = [
+        {"kind": "start_call", "call_id": "c1", "client_id": "000"},
+        _log("c1", "もしもし"),
+        {"kind": "complete_call", "call_id": "c1"},
+    ]
+    result = call_service.apply_bridge_events(_FakeDB(), events)
+    assert applied == ["c1"]
+    # ログと、順序を守るため後続の complete_call も再送対象
+    assert result == {"applied": 1, "failed": 0, "retry": [1, 2]}
+
+
+def test_invalid_rows_are_dropped_without_retry(monkeypatch):
+    def reject(db, batches):
+        raise IntegrityError("INSERT", {}, Exception("bad row"))
+
+    monkeypatch.setattr(call_service, "append_logs_bulk", reject)
+    result = call_service.apply_bridge_events(_FakeDB(), [_log("c1", "a")])
+    assert result == {"applied": 0, "failed": 1, "retry": []}
+
+
+def test_one_bad_row_does_not_drop_other_calls(monkeypatch):
+    stored = []
+
+    def bulk(db, batches):
+        texts = [r.text for _, _, requests in batches for r in requests]
+        if "bad" in texts:
+            raise IntegrityError("INSERT", {}, Exception("bad row"))
+        stored.extend(texts)
+
+    monkeypatch.setattr(call_service, "append_logs_bulk", bulk)
+    events = [_log("c1", "a"), _log("c2", "b"), _log("c2", "bad"), _log("c2", "c"), _log("c3", "d")]
+    result = call_service.apply_bridge_events(_FakeDB(), events)
+    # 全体 → 通話ごと → c2 だけ1件ずつ、の順で入れ直す
+    assert stored == ["a", "b", "c", "d"]
+    assert result == {"applied": 4, "failed": 1, "retry": []}
+
+
+def test_append_logs_bulk_inserts_rows_and_sends_utc_timestamps(monkeypatch):
+    pushed = []
+    monkeypatch.setattr(call_service, "_push_event_http", lambda call_id, event, data: pushed.append(data))
+    monkeypatch.setattr(call_service.call_event_dispatcher, "send_logs", lambda call_id, logs: None)
+    monkeypatch.setattr(call_service, "append_file_logs", lambda *args, **kwargs: None)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    jst = timezone(timedelta(hours=9))
+    result = call_service.append_logs_bulk(db, [
+        ("c1", "000", [
+            AppendLogRequest(role="user", text="もしもし", state="active"),
+            AppendLogRequest(role="ai", text="はい", state="active", timestamp=datetime(2026, 1, 1, 9, tzinfo=jst)),
+        ]),
+        ("c2", "000", [AppendLogRequest(role="user", text="予約", state="active")]),
+    ])
+
+    rows = db.scalars(select(CallLog).order_by(CallLog.id)).all()
+    assert [row.text for row in rows] == ["もしもし", "はい", "予約"]
+    assert [log.id for log in result["c1"] + result["c2"]] == [row.id for row in rows]
+    # 単発追加（DB から読み戻す）と同じ naive UTC + "Z" で送る
+    sent = [log["timestamp"] for data in pushed for log in data["logs"]]
+    assert sent[1] == "2026-01-01T00:00:00Z"
+    assert all(ts.endswith("Z") and "+" not in ts for ts in sent)
+    assert rows[1].timestamp == datetime(2026, 1, 1, 0, 0)
+
+
+def test_ingest_returns_503_with_retry_positions(monkeypatch):
+    monkeypatch.setattr(calls_router, "store_call_events", lambda records: None)
+    monkeypatch.setattr(calls_router, "apply_bridge_events",
+                        lambda db, events: {"applied": 1, "failed": 0, "retry": [1]})
+    body = BridgeEventBatchRequest(events=[
+        {"kind": "record_event", "call_id": "c1", "event_type": "x"},
+        _log("c1", "a"),
+        _log("c1", "b"),
+    ])
+    with pytest.raises(HTTPException) as exc_info:
+        calls_router.ingest_bridge_events(body, db=_FakeDB())
+    assert exc_info.value.status_code == 503
+    # record_event を除いた位置ではなく body.events の位置で返す
+    assert exc_info.value.detail["retry"] == [2]
+
+
+def test_ingest_returns_503_when_event_store_is_down(monkeypatch):
+    def store_down(records):
+        raise ConnectionError("mongo down")
+
+    monkeypatch.setattr(calls_router, "store_call_events", store_down)
+    body = BridgeEventBatchRequest(events=[
+        {"kind": "record_event", "call_id": "c1", "event_type": "x"},
+        _log("c1", "a"),
+    ])
+    with pytest.raises(HTTPException) as exc_info:
+        calls_router.ingest_bridge_events(body, db=_FakeDB())
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.detail["retry"] == [0, 1]
@@ -0,0 +1,57 @@
+"""CallMetadataResolver / PhoneMapping のテスト."""
+
+import json
+import os
+
+from asr_stream.call_metadata import CallMetadataResolver, PhoneMapping
+
+
+class _Reply:
+    def __init__(self, body):
+        self._body = body
+
+    def getBody(self):
+        return self._body
+
+
+class _FakeESL:
+    def __init__(self, body):
+        self.body = body
+        self.commands = []
+
+    def api(self, cmd):
+        self.commands.append(cmd)
+        return _Reply(self.body)
+
+
+def _write_mapping(path, mapping, mtime):
+    path.write_text(json.dumps(mapping))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_resolve_uses_single_round_trip_and_caches(tmp_path):
+    mapping_file = tmp_path / "phone_mapping.json"
+    _write_mapping(mapping_file, {"58304073": "000", "58654181": "001"}, 1_000_000_000)
+    esl = _FakeESL("58654181|09012345678\n")
+    resolver = CallMetadataResolver(esl, mapping=PhoneMapping(str(mapping_file), check_interval=0))
+
+    meta = resolver.resolve("uuid-1")
+    assert (meta.destination_number, meta.caller_number, meta.client_id) == (
+        "58654181", "09012345678", "001")
+    assert resolver.resolve("uuid-1") is meta
+    assert len(esl.commands) == 1
+    assert esl.commands[0].startswith("eval uuid:uuid-1 ")
+
+
+def test_unset_caller_and_mapping_reload(tmp_path):
+    mapping_file = tmp_path / "phone_mapping.json"
+    _write_mapping(mapping_file, {}, 1_000_000_000)
+    mapping = PhoneMapping(str(mapping_file), check_interval=0)
+    resolver = CallMetadataResolver(_FakeESL("58304073|_undef_"), default_client_id="000",
+                                    mapping=mapping, ttl=0)
+    meta = resolver.resolve("uuid-2")
+    assert meta.client_id == "000"
+    assert meta.caller_number == "番号不明"
+
+    _write_mapping(mapping_file, {"58304073": "002"}, 2_000_000_000)
+    assert resolver.resolve("uuid-2").client_id == "002"
@@ -0,0 +1,41 @@
+"""ClientConfigRegistry のテスト."""
+
+import json
+import os
+
+from gateway.common.client_config_registry import ClientConfigRegistry
+
+
+def _write_client(root, client_id, patterns, mtime):
+    config_dir = root / client_id / "config"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    path = config_dir / "dialogue_config.json"
+    path.write_text(json.dumps({"patterns": patterns}, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+    (root / client_id / f"voice_list_{client_id}.tsv").write_text("001\tはい\n", encoding="utf-8")
+
+
+def test_snapshot_is_shared_and_reloaded_on_mtime_change(tmp_path):
+    _write_client(tmp_path, "000", [{"response": "122", "keywords": ["料金", "値段", "料金"]}], 1_000_000_000)
+    registry = ClientConfigRegistry(str(tmp_path), check_interval=0)
+
+    cfg = registry.get("000")
+    assert registry.get("000") is cfg
+    assert cfg.phrase_hints == ["料金", "値段"]
+    assert cfg.voice_map == {"001": "はい"}
+    assert cfg.llm_choices(5, ", ") == "122: 料金, 値段, 料金"
+    built = []
+    assert cfg.derived("router", lambda c: built.append(1) or object()) is cfg.derived("router", None)
+    assert built == [1]
+
+    _write_client(tmp_path, "000", [{"response": "086", "keywords": ["ありがとう"]}], 2_000_000_000)
+    reloaded = registry.get("000")
+    assert reloaded is not cfg
+    assert reloaded.phrase_hints == ["ありがとう"]
+
+
+def test_missing_client_is_not_loaded(tmp_path):
+    cfg = ClientConfigRegistry(str(tmp_path), check_interval=0).get("999")
+    assert cfg.loaded is False
+    assert cfg.dialogue_config == {}
+    assert cfg.phrase_hints == []
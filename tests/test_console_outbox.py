@@ -0,0 +1,99 @@
+import time
+
+from gateway.common import console_outbox
+from gateway.common.console_outbox import ConsoleOutbox, DeliveryError
+
+
+class _Sender:
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.batches = []
+
+    def __call__(self, events):
+        if self.fail:
+            self.fail -= 1
+            raise DeliveryError("console down")
+        self.batches.append([e["text"] for e in events])
+
+
+def _outbox(tmp_path, sender, **kwargs):
+    return ConsoleOutbox("http://console", spool_path=str(tmp_path / "spool.jsonl"),
+                         sender=sender, **kwargs)
+
+
+def test_events_are_batched_into_one_request(tmp_path):
+    sender = _Sender()
+    outbox = _outbox(tmp_path, sender, batch_interval=0.1)
+    for i in range(5):
+        assert outbox.submit("append_log", "call-1", role="user", text=f"t{i}")
+    assert outbox.flush(timeout=2)
+    assert sender.batches == [[f"t{i}" for i in range(5)]]
+    assert outbox.get_stats()["sent"] == 5
+
+
+def test_failed_batch_is_spooled_and_replayed_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(console_outbox, "CONSOLE_RETRY_BASE_SEC", 0.05)
+    sender = _Sender(fail=2)
+    outbox = _outbox(tmp_path, sender, batch_interval=0.02)
+    outbox.submit("append_log", "call-1", role="user", text="a")
+    outbox.flush(timeout=2)
+    assert (tmp_path / "spool.jsonl").exists()
+    outbox.submit("append_log", "call-1", role="ai", text="b")
+    outbox.flush(timeout=2)
+
+    deadline = time.monotonic() + 3
+    while time.monotonic() < deadline and outbox.get_stats()["spool_pending"]:
+        time.sleep(0.02)
+    assert [t for batch in sender.batches for t in batch] == ["a", "b"]
+    assert not (tmp_path / "spool.jsonl").exists()
+    assert outbox.get_stats()["replayed"] == 2
+
+
+def test_leftover_spool_is_replayed_on_start(tmp_path):
+    (tmp_path / "spool.jsonl").write_text(
+        '{"kind": "append_log", "call_id": "c", "text": "old"}\n', encoding="utf-8"
+    )
+    sender = _Sender()
+    outbox = _outbox(tmp_path, sender, batch_interval=0.02)
+    outbox.submit("append_log", "c", role="user", text="new")
+    outbox.flush(timeout=2)
+
+    deadline = time.monotonic() + 3
+    while time.monotonic() < deadline and outbox.get_stats()["spool_pending"]:
+        time.sleep(0.02)
+    assert [t for batch in sender.batches for t in batch] == ["old", "new"]
+
+
+def test_full_queue_drops_without_blocking(tmp_path):
+    outbox = _outbox(tmp_path, _Sender(), queue_max=1, batch_interval=0.5)
+    outbox._ensure_started = lambda: None  # ワーカーを起こさずにキューを満杯にする
+    assert outbox.submit("append_log", "c", text="x")
+    start = time.monotonic()
+    assert not outbox.submit("append_log", "c", text="y")
+    assert time.monotonic() - start < 0.1
+    assert outbox.get_stats()["dropped"] == 1
+
+
+def test_only_unapplied_events_are_respooled(tmp_path, monkeypatch):
+    monkeypatch.setattr(console_outbox, "CONSOLE_RETRY_BASE_SEC", 0.05)
+
+    class _PartialSender(_Sender):
+        def __call__(self, events):
+            if self.fail:
+                self.fail -= 1
+                # サーバーが先頭だけ適用して 503 を返した
+                self.batches.append([e["text"] for e in events[:1]])
+                raise DeliveryError("HTTP 503", unsent=events[1:])
+            super().__call__(events)
+
+    sender = _PartialSender(fail=1)
+    outbox = _outbox(tmp_path, sender, batch_interval=0.1)
+    for text in ("a", "b", "c"):
+        outbox.submit("append_log", "call-1", role="user", text=text)
+    outbox.flush(timeout=2)
+
+    deadline = time.monotonic() + 3
+    while time.monotonic() < deadline and outbox.get_stats()["spool_pending"]:
+        time.sleep(0.02)
+    assert [t for batch in sender.batches for t in batch] == ["a", "b", "c"]
+    assert outbox.get_stats()["sent"] == 3
@@ -0,0 +1,55 @@
+import asyncio
+
+from gateway.common import control_channel
+from gateway.common.control_channel import DirectoryWatcher, parse_rtp_port, read_rtp_info_file
+
+
+def test_parse_rtp_info(tmp_path):
+    path = tmp_path / "rtp_info_abc.txt"
+    path.write_text("local=10.0.0.5:16384\nremote=1.2.3.4:4000\nuuid=abc\n")
+    info = read_rtp_info_file(path)
+    assert info["uuid"] == "abc"
+    assert parse_rtp_port(info["local"]) == 16384
+    assert parse_rtp_port("no-port") is None
+    assert parse_rtp_port(None) is None
+
+
+async def _collect(watcher, write, count):
+    changes = watcher.changes()
+    got = []
+
+    async def consume():
+        async for path in changes:
+            got.append(path.name)
+            if len(got) == count:
+                return
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.05)
+    write()
+    await asyncio.wait_for(task, 3)
+    await changes.aclose()
+    return got
+
+
+def test_watcher_reports_only_matching_files(tmp_path):
+    (tmp_path / "asr_enable_old.flag").touch()
+    watcher = DirectoryWatcher(tmp_path, ["asr_enable_*.flag"], poll_interval=0.05)
+    assert [p.name for p in watcher.existing()] == ["asr_enable_old.flag"]
+
+    def write():
+        (tmp_path / "other.txt").write_text("x")
+        (tmp_path / "asr_enable_new.flag").touch()
+
+    assert asyncio.run(_collect(watcher, write, 1)) == ["asr_enable_new.flag"]
+
+
+def test_watcher_falls_back_to_polling(tmp_path, monkeypatch):
+    monkeypatch.setattr(control_channel, "_get_libc", lambda: None)
+    watcher = DirectoryWatcher(tmp_path, ["rtp_info_*.txt"], poll_interval=0.05)
+
+    def write():
+        (tmp_path / "rtp_info_x.txt").write_text("local=127.0.0.1:7002\n")
+
+    assert asyncio.run(_collect(watcher, write, 1)) == ["rtp_info_x.txt"]
+    assert not watcher.using_inotify
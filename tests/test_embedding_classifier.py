@@ -0,0 +1,59 @@
+"""MfccExtractor / FusedPipeline のテスト（librosa・sklearn の元の経路と結果が一致すること）."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from asr_stream.embedding_classifier import FusedPipeline, MfccExtractor
+
+SR = 16000
+
+
+def _reference(x, scaler, pca, mlp):
+    z = ((x - scaler.mean_) / scaler.scale_ - pca.mean_) @ pca.components_.T
+    z = z / np.sqrt(pca.explained_variance_)
+    h = np.tanh(z @ mlp.coefs_[0] + mlp.intercepts_[0]) @ mlp.coefs_[1] + mlp.intercepts_[1]
+    p = np.exp(h - h.max(axis=1, keepdims=True))
+    return p / p.sum(axis=1, keepdims=True)
+
+
+def test_fused_pipeline_matches_step_by_step():
+    rng = np.random.default_rng(0)
+    n, k, hidden, classes = 12, 5, 7, 4
+    scaler = SimpleNamespace(mean_=rng.normal(size=n), scale_=rng.uniform(0.5, 2.0, n),
+                             with_mean=True, with_std=True)
+    pca = SimpleNamespace(components_=rng.normal(size=(k, n)), mean_=rng.normal(size=n),
+                          whiten=True, explained_variance_=rng.uniform(1.0, 3.0, k))
+    mlp = SimpleNamespace(coefs_=[rng.normal(size=(k, hidden)), rng.normal(size=(hidden, classes))],
+                          intercepts_=[rng.normal(size=hidden), rng.normal(size=classes)],
+                          activation="tanh", out_activation_="softmax",
+                          classes_=np.array(["001", "002", "003", "004"]))
+    x = rng.normal(size=(6, n))
+
+    fused = FusedPipeline(scaler, pca, mlp)
+    np.testing.assert_allclose(fused.predict_proba(x), _reference(x, scaler, pca, mlp), atol=1e-12)
+    assert fused.predict_proba(x[0]).shape == (1, classes)
+
+
+def _librosa_reference(librosa, audio):
+    # 置き換える前の特徴量抽出と同じ呼び出し
+    mfcc = librosa.feature.mfcc(y=audio, sr=SR, n_mfcc=20)
+    feats = []
+    for f in [mfcc, librosa.feature.delta(mfcc), librosa.feature.delta(mfcc, order=2)]:
+        feats.extend([f.mean(axis=1), f.std(axis=1)])
+    return np.concatenate(feats)
+
+
+@pytest.mark.parametrize("seconds", [0.3, 1.0, 2.5])
+def test_mfcc_extractor_matches_librosa(seconds):
+    librosa = pytest.importorskip("librosa")
+    rng = np.random.default_rng(1)
+    t = np.arange(int(SR * seconds)) / SR
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)
+             + 0.1 * np.sin(2 * np.pi * 1800 * t * (1 + t))
+             + 0.02 * rng.normal(size=t.size)).astype(np.float32)
+
+    got = MfccExtractor()(audio)
+    assert got.shape == (120,)
+    np.testing.assert_allclose(got, _librosa_reference(librosa, audio), rtol=1e-3, atol=1e-3)
@@ -0,0 +1,34 @@
+"""Google STT キープアライブ（事前生成ノイズ・間隔の調整・課金秒数）のテスト."""
+
+import numpy as np
+
+from asr_stream.gasr_keepalive import AudioMeter, KeepAlivePolicy, build_comfort_noise, is_audio_timeout
+
+
+def test_comfort_noise_frames_are_low_level_pcm16():
+    frames = build_comfort_noise(8000, frame_ms=40, level=30)
+    assert len(frames) == 8 and all(len(f) == 640 for f in frames)
+    samples = np.frombuffer(frames[0], dtype="<i2")
+    assert 10 < samples.std() < 60
+    assert frames[0] != frames[1]
+
+
+def test_keepalive_interval_shrinks_on_audio_timeout():
+    policy = KeepAlivePolicy(interval=4.0, min_interval=1.5)
+    assert policy.wait_time(10.0, 7.0) == 1.0
+    assert policy.frames(8000) is policy.frames(8000)
+    assert policy.on_audio_timeout() == 2.0
+    assert policy.on_audio_timeout() == 1.5
+    assert is_audio_timeout(Exception("400 Audio Timeout Error: Long duration elapsed without audio."))
+    assert not is_audio_timeout(Exception("400 Exceeded maximum allowed stream duration of 305 seconds."))
+
+
+def test_meter_separates_real_and_billed_audio():
+    meter = AudioMeter(16000, billing_increment=1.0)
+    meter.add("real", 16000 * 3)
+    meter.add("keepalive", 640 * 5)
+    meter.add("replay", 16000)
+    meter.bill_stream(16000 * 3 + 640 * 5)
+    meter.bill_stream(16000)
+    assert meter.as_dict() == {"real_sec": 3.0, "keepalive_sec": 0.2, "replay_sec": 1.0,
+                               "billed_sec": 5.0}
@@ -0,0 +1,40 @@
+"""Google STT ストリーム張り替え（再送バッファ・結果のつなぎ合わせ）のテスト."""
+
+import sys
+from pathlib import Path
+
+ASR_STREAM_DIR = Path(__file__).resolve().parent.parent / "asr_stream"
+if str(ASR_STREAM_DIR) not in sys.path:
+    sys.path.insert(0, str(ASR_STREAM_DIR))
+
+from asr_stream.gasr_stream_rotation import OverlapBuffer, ResultStitcher, strip_overlap  # noqa: E402
+
+
+def test_overlap_buffer_keeps_only_the_most_recent_audio():
+    buf = OverlapBuffer(1000)
+    for i in range(10):
+        buf.add(bytes([i]) * 320)
+    chunks = buf.snapshot()
+    assert [c[0] for c in chunks] == [6, 7, 8, 9]
+    assert OverlapBuffer(0).snapshot() == []
+
+
+def test_new_stream_results_are_stitched_against_previous_final():
+    stitcher = ResultStitcher()
+    stitcher.begin_stream(1, replayed=False)
+    assert stitcher.stitch(1, "料金について", True) == "料金について"
+
+    # 張り替え: 2本目は直前1秒を再送しているので「について」が重複する
+    stitcher.begin_stream(2, replayed=True)
+    assert stitcher.stitch(1, "教えて", False) is None  # 古いストリームの interim は捨てる
+    assert stitcher.stitch(2, "について教", False) == "教"
+    # 古いストリームの遅れて届いた final は確定結果として使う
+    assert stitcher.stitch(1, "料金について", True) == "料金について"
+    assert stitcher.stitch(2, "について教えてください", True) == "教えてください"
+    # 最初の final 以降はそのまま
+    assert stitcher.stitch(2, "ください", True) == "ください"
+
+
+def test_strip_overlap():
+    assert strip_overlap("料金プラン", "プランです") == "です"
+    assert strip_overlap("料金", "担当者") == "担当者"
@@ -0,0 +1,50 @@
+import json
+import time
+
+from gateway.common.log_writer import LogWriter
+
+
+def test_close_flushes_everything_in_order(tmp_path):
+    writer = LogWriter(flush_interval=0.05, fsync_interval=0)
+    path = str(tmp_path / "sub" / "call.jsonl")
+    for i in range(200):
+        writer.write(path, {"type": "asr_interim", "seq": i})
+    writer.write(path, {"type": "call_end"})
+    assert writer.close(path, wait=2)
+
+    lines = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert [r.get("seq") for r in lines[:-1]] == list(range(200))
+    assert lines[-1]["type"] == "call_end"
+
+    stats = writer.get_stats()
+    assert stats["records"] == 201
+    assert stats["open_files"] == 0
+    # 1行ごとではなくまとめて書いている
+    assert stats["batches"] < 20
+
+
+def test_lines_visible_within_flush_budget(tmp_path):
+    writer = LogWriter(flush_interval=0.05, fsync_interval=0)
+    path = tmp_path / "call_log.txt"
+    writer.write(str(path), "[00:00:01] USER: もしもし")
+    writer.write(str(path), "[00:00:02] AI: はい\n")
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        if path.exists() and path.read_text(encoding="utf-8").count("\n") == 2:
+            break
+        time.sleep(0.01)
+    assert path.read_text(encoding="utf-8") == "[00:00:01] USER: もしもし\n[00:00:02] AI: はい\n"
+    assert writer.get_stats()["open_files"] == 1
+
+
+def test_multiple_files_and_flush(tmp_path):
+    writer = LogWriter(flush_interval=5.0, fsync_interval=0)
+    paths = [str(tmp_path / f"call_{i}.jsonl") for i in range(3)]
+    for n in range(10):
+        for path in paths:
+            writer.write(path, {"n": n})
+    assert writer.flush(wait=2)
+    for path in paths:
+        assert [json.loads(line)["n"] for line in open(path)] == list(range(10))
+    assert writer.get_stats()["max_write_latency_ms"] < 2000
@@ -0,0 +1,73 @@
+"""RTPSendPacer のテスト（絶対時刻での送出・遅延時のまとめ送り・期限の合わせ直し）."""
+
+import asyncio
+import collections
+
+from gateway.asr.gateway_rtp_protocol import RTPPacketBuilder
+from gateway.audio.rtp_pacer import PacedStream, RTPSendPacer
+
+
+class _Transport:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append(bytes(data))
+
+
+def _stream(frames, transport, idle=None):
+    queue = collections.deque(bytes([i]) * 160 for i in range(frames))
+    return PacedStream("t", queue, RTPPacketBuilder(0, 8000), lambda: (transport, ("127.0.0.1", 1)),
+                       idle)
+
+
+def test_deadlines_are_absolute_and_bursts_are_bounded():
+    pacer = RTPSendPacer(interval=0.02, max_burst=3, max_lag=0.2, report_interval=0)
+    transport = _Transport()
+    stream = _stream(20, transport)
+
+    pacer._service(stream, 100.0)
+    assert len(transport.sent) == 1 and stream.next_deadline == 100.02
+    # 少し遅れて起きても次の期限は開始時刻 + n × 20ms のまま
+    pacer._service(stream, 100.027)
+    assert len(transport.sent) == 2 and abs(stream.next_deadline - 100.04) < 1e-9
+    # 100ms 止まった分は max_burst ずつ取り戻す
+    pacer._service(stream, 100.14)
+    assert len(transport.sent) == 5
+    pacer._service(stream, 100.14)
+    assert len(transport.sent) == 8
+    # 取り戻しきれない遅れ（max_lag 超）は期限を合わせ直す
+    pacer._service(stream, 101.0)
+    assert stream.resyncs == 1 and len(transport.sent) == 9
+    assert abs(stream.next_deadline - 101.02) < 1e-9
+    assert stream.jitter.count == 9 and stream.jitter.max_ms > 20
+
+    # パケットは事前確保バッファから組み立てても build_packet と同じ内容
+    seqs = [int.from_bytes(p[2:4], "big") for p in transport.sent]
+    assert seqs == list(range(seqs[0], seqs[0] + 9))
+    assert transport.sent[3][12:] == bytes([3]) * 160
+
+
+def test_idle_callback_and_multiple_streams_share_one_timer():
+    pacer = RTPSendPacer(interval=0.005, max_burst=2, report_interval=0)
+    idle = []
+    t1, t2 = _Transport(), _Transport()
+
+    async def main():
+        s1 = pacer.register("a", _stream(4, t1).queue, RTPPacketBuilder(0, 8000),
+                            lambda: (t1, ("127.0.0.1", 1)), lambda: idle.append("a"))
+        s2 = pacer.register("b", _stream(6, t2).queue, RTPPacketBuilder(0, 8000),
+                            lambda: (t2, ("127.0.0.1", 2)))
+        for _ in range(200):
+            if not s1.queue and not s2.queue and idle:
+                break
+            await asyncio.sleep(0.005)
+        task = pacer._task
+        pacer.unregister(s1)
+        pacer.unregister(s2)
+        await asyncio.wait_for(task, 1.0)
+
+    asyncio.run(main())
+    assert len(t1.sent) == 4 and len(t2.sent) == 6
+    assert idle
+    assert pacer.jitter.count == 10
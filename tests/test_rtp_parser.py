@@ -0,0 +1,68 @@
+"""RTPPacketView のテスト."""
+
+import struct
+
+from gateway.asr.rtp_parser import RTPPacketView, RTPParser
+
+
+def _header(b0=0x80, b1=0x00, seq=1, ts=160, ssrc=0xDEADBEEF):
+    return struct.pack("!BBHII", b0, b1, seq, ts, ssrc)
+
+
+def test_basic_header_fields():
+    pkt = _header(b1=0x88, seq=65535, ts=12345, ssrc=0x01020304) + b"\xff" * 160
+    view = RTPPacketView(pkt)
+    assert view.valid
+    assert view.version == 2
+    assert view.marker == 1
+    assert view.payload_type == 8
+    assert view.sequence == 65535
+    assert view.timestamp == 12345
+    assert view.ssrc == 0x01020304
+    assert view.payload_len == 160
+    assert view.payload_bytes() == b"\xff" * 160
+
+
+def test_payload_skips_csrc_and_extension():
+    csrcs = struct.pack("!II", 1, 2)
+    ext = struct.pack("!HH", 0xBEDE, 1) + b"\x00" * 4
+    pkt = _header(b0=0x80 | 0x10 | 0x02) + csrcs + ext + b"audio"
+    view = RTPPacketView(pkt)
+    assert view.valid
+    assert view.csrc_count == 2
+    assert view.extension == 1
+    assert view.payload_bytes() == b"audio"
+
+
+def test_payload_strips_padding():
+    pkt = _header(b0=0xA0) + b"audio" + b"\x00\x00\x03"
+    view = RTPPacketView(pkt)
+    assert view.valid
+    assert view.payload_bytes() == b"audio"
+
+
+def test_invalid_packets():
+    assert not RTPPacketView(b"\x80\x00").valid
+    # 拡張ヘッダーが途中で切れている
+    assert not RTPPacketView(_header(b0=0x90) + b"\x00").valid
+    # パディング長がパケット長を超える
+    assert not RTPPacketView(_header(b0=0xA0) + b"\x00\xff").valid
+    # バージョン != 2
+    assert not RTPPacketView(_header(b0=0x40) + b"audio").valid
+
+
+def test_view_is_reusable():
+    view = RTPPacketView()
+    assert view.parse(_header(seq=1) + b"a")
+    assert view.parse(_header(seq=2) + b"bb")
+    assert view.sequence == 2
+    assert view.payload_bytes() == b"bb"
+
+
+def test_parser_compat():
+    pkt = _header(seq=7) + b"xyz"
+    assert RTPParser.extract_rtp_payload(pkt) == b"xyz"
+    header = RTPParser.parse_rtp_header(pkt)
+    assert header["sequence"] == 7
+    assert header["ssrc"] == 0xDEADBEEF
+    assert RTPParser.parse_rtp_header(b"\x80") is None
@@ -0,0 +1,89 @@
+"""RTP受信 → ジッタバッファ → AudioProcessor → ASR投入 までの経路のテスト."""
+
+import asyncio
+import audioop
+import logging
+import struct
+
+import numpy as np
+import pytest
+
+from gateway.asr.asr_rtp_buffer import ASRRTPBuffer
+from gateway.asr.audio_processor import AudioProcessor
+from gateway.asr.rtp_parser import RTPPacketView
+
+SSRC = 0x1234ABCD
+ADDR = ("127.0.0.1", 40000)
+# 先頭バイトが 0xD5 / 0xFF でも RTP ヘッダーとして再解釈されないこと
+VOICE = bytes([0xD5]) * 160
+LOUD = bytes([0x00, 0x40]) * 80
+# 先頭が 0xD5 の A-law 音声（440Hz）
+TONE = bytes([0xD5]) + audioop.lin2alaw(
+    (8000 * np.sin(2 * np.pi * 440 * np.arange(159) / 8000)).astype(np.int16).tobytes(), 2)
+
+
+def _packet(seq, payload, pt=8):
+    return struct.pack("!BBHII", 0x80, pt, seq, seq * 160, SSRC) + payload
+
+
+class _Manager:
+    def __init__(self):
+        self.logger = logging.getLogger("test")
+        self._last_processed_sequence = {}
+
+
+def test_buffered_payload_is_not_stripped_again():
+    buf = ASRRTPBuffer(_Manager())
+    processor = AudioProcessor(call_id="call-1")
+    out = []
+    for seq, payload in enumerate((VOICE, LOUD)):
+        for frame in buf.push_packet(RTPPacketView(_packet(seq, payload)), "call-1", ADDR):
+            out.append(processor.process_rtp_audio(frame, ADDR))
+    # 160バイトのペイロードがそのまま 16kHz (2倍) になって返る
+    assert [len(pcm) for pcm in out] == [320, 320]
+
+
+class _StreamHandler:
+    def __init__(self):
+        self.chunks = []
+
+    def handle_streaming_chunk(self, chunk, rms=None):
+        self.chunks.append(chunk)
+
+
+def test_handle_rtp_packet_feeds_asr():
+    realtime_gateway = pytest.importorskip("gateway.core.realtime_gateway")
+    from gateway.asr.asr_manager import GatewayASRManager
+
+    gateway = realtime_gateway.RealtimeGateway.__new__(realtime_gateway.RealtimeGateway)
+    gateway.logger = logging.getLogger("test")
+    gateway._last_processed_sequence = {}
+    gateway._unmapped_ssrcs = {}
+    gateway._rtp_view = RTPPacketView()
+    gateway.rtp_buffer = ASRRTPBuffer(gateway)
+    handler = _StreamHandler()
+    gateway.stream_handler = handler
+    gateway.batch_handler = None
+    manager = GatewayASRManager(gateway)
+    gateway.asr_manager = manager
+
+    manager.active_sessions["call-1"] = {
+        "call_id": "call-1",
+        "audio_processor": manager.audio_processor,
+        "rtp_addr": ADDR,
+        "ssrc": SSRC,
+    }
+    manager._ssrc_call_map[SSRC] = "call-1"
+
+    async def run():
+        for seq in range(3):
+            await gateway.handle_rtp_packet(_packet(seq, TONE), ADDR)
+
+    asyncio.run(run())
+    # A-law 160バイト → PCM16 8kHz 320バイト → 16kHz 640バイト
+    assert [len(chunk) for chunk in handler.chunks] == [640, 640, 640]
+    # ペイロードタイプで1回だけ確定し、以降は高速パス（プローブしない）
+    stats = manager.asr_audio_processor.get_codec_stats()
+    assert stats["decisions"] == 1
+    assert stats["fast_path_packets"] == 2
+    assert stats["probe_packets"] == 0
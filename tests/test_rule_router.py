@@ -0,0 +1,28 @@
+"""RuleRouter / KeywordMatcher のテスト."""
+
+import json
+
+from asr_stream.rule_router import RuleRouter
+
+
+def _router(tmp_path, patterns):
+    path = tmp_path / "dialogue_config.json"
+    path.write_text(json.dumps({"patterns": patterns}, ensure_ascii=False), encoding="utf-8")
+    return RuleRouter(str(path))
+
+
+def test_match_priority_exact_then_partial_then_longest(tmp_path):
+    router = _router(tmp_path, [
+        {"response": "001", "keywords": ["りょうきん"]},
+        {"response": "002", "keywords": ["りょうきんぷらん", "ぷらん"]},
+        {"response": "003", "keywords": ["りょうきん"]},
+    ])
+    # 完全一致（同じキーワードは先に定義されたルールが勝つ）
+    assert router.match("りょうきん") == ("001", 1.0)
+    # 入力がキーワードの一部
+    assert router.match("きんぷら") == ("002", 0.5)
+    # 文中の最長キーワード
+    rid, score = router.match("りょうきんぷらんについて")
+    assert rid == "002"
+    assert score == 8 / 12
+    assert router.match("あいうえお") == (None, 0.0)
@@ -0,0 +1,48 @@
+"""通話終了時にセッションログ（transcript.jsonl / call_log.txt）が書き出されて閉じられることのテスト."""
+
+import logging
+import types
+
+import pytest
+
+from gateway.common.log_writer import LogWriter
+from gateway.core import session_utils
+from gateway.core.call_cleanup_helper import cleanup_gateway_call_state, run_call_end_cleanup
+
+
+@pytest.fixture
+def session_dir(tmp_path, monkeypatch):
+    # 時間ではフラッシュしない writer（close でしか書き出されない）
+    writer = LogWriter(flush_interval=60.0, fsync_interval=0)
+    monkeypatch.setattr(session_utils, "get_log_writer", lambda: writer)
+    monkeypatch.setattr(session_utils, "get_session_dir", lambda call_id, client_id=None: tmp_path / call_id)
+    monkeypatch.setattr(session_utils, "_session_dirs", {})
+    return tmp_path
+
+
+def _write_logs(call_id):
+    session_utils.append_call_log(call_id, "USER", "もしもし", client_id="000")
+    session_utils.save_transcript_event(call_id, "もしもし", True, {}, client_id="000")
+
+
+def test_call_end_cleanup_flushes_and_forgets_session_logs(session_dir):
+    _write_logs("call-1")
+    core = types.SimpleNamespace(
+        logger=logging.getLogger("test"),
+        save_session_summary=lambda call_id: None,
+        reset_call=lambda call_id: None,
+        cleanup_call=lambda call_id: None,
+    )
+    run_call_end_cleanup(core, "call-1")
+
+    assert "もしもし" in (session_dir / "call-1" / "call_log.txt").read_text(encoding="utf-8")
+    assert "もしもし" in (session_dir / "call-1" / "transcript.jsonl").read_text(encoding="utf-8")
+    assert session_utils._session_dirs == {}
+
+
+def test_gateway_cleanup_flushes_session_logs(session_dir):
+    _write_logs("call-2")
+    cleanup_gateway_call_state(types.SimpleNamespace(logger=logging.getLogger("test")), "call-2")
+
+    assert (session_dir / "call-2" / "call_log.txt").read_text(encoding="utf-8")
+    assert session_utils._session_dirs == {}
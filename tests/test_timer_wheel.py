@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+from gateway.common.timer_wheel import TimerWheel
+
+
+def _recorder():
+    fired = []
+    done = threading.Event()
+
+    def cb(tag):
+        fired.append((tag, time.monotonic()))
+        done.set()
+
+    return fired, done, cb
+
+
+def test_fires_after_delay_not_before():
+    wheel = TimerWheel(tick=0.01, slots=64, workers=2)
+    fired, done, cb = _recorder()
+    start = time.monotonic()
+    wheel.call_later(0.1, cb, "a")
+    assert done.wait(2)
+    assert fired[0][1] - start >= 0.1
+    assert wheel.pending() == 0
+
+
+def test_cancel_and_reset():
+    wheel = TimerWheel(tick=0.01, slots=64, workers=2)
+    fired, done, cb = _recorder()
+    cancelled = wheel.call_later(0.05, cb, "cancelled")
+    cancelled.cancel()
+    assert not cancelled.active
+
+    start = time.monotonic()
+    handle = wheel.call_later(0.05, cb, "postponed")
+    handle.reset(0.2)  # 後ろへずらす（slot は発火時に移し替える）
+    assert done.wait(2)
+    assert [tag for tag, _ in fired] == ["postponed"]
+    assert fired[0][1] - start >= 0.2
+
+    fired.clear()
+    done.clear()
+    start = time.monotonic()
+    handle = wheel.call_later(5.0, cb, "early")
+    handle.reset(0.05)  # 前へずらす
+    assert done.wait(2)
+    assert fired[0][1] - start < 1.0
+
+
+def test_delay_longer_than_one_revolution():
+    wheel = TimerWheel(tick=0.01, slots=8, workers=1)  # 1周 80ms
+    fired, done, cb = _recorder()
+    start = time.monotonic()
+    wheel.call_later(0.25, cb, "long")
+    assert done.wait(2)
+    assert fired[0][1] - start >= 0.25
+
+
+def test_many_timers_share_one_thread():
+    wheel = TimerWheel(tick=0.01, slots=128, workers=4)
+    lock = threading.Lock()
+    count = [0]
+    done = threading.Event()
+
+    def cb():
+        with lock:
+            count[0] += 1
+            if count[0] == 500:
+                done.set()
+
+    before = threading.active_count()
+    handles = [wheel.call_later(0.05 + (i % 20) * 0.01, cb) for i in range(1000)]
+    for handle in handles[::2]:
+        handle.cancel()
+    assert done.wait(5)
+    time.sleep(0.1)
+    assert count[0] == 500
+    # ホイール1本 + ワーカー上限まで（タイマーごとにスレッドは作らない）
+    assert threading.active_count() - before <= 1 + 4
+
+
+def test_dispatch_to_event_loop():
+    wheel = TimerWheel(tick=0.01, slots=64, workers=1)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+
+        async def on_timer(value):
+            result.set_result((value, threading.get_ident()))
+
+        wheel.call_later(0.05, on_timer, 42, loop=loop)
+        return await asyncio.wait_for(result, 2)
+
+    value, ident = asyncio.run(main())
+    assert value == 42
+    assert ident == threading.get_ident()
+
+
+def test_slow_callback_on_executor_does_not_delay_other_timers():
+    from concurrent.futures import ThreadPoolExecutor
+
+    wheel = TimerWheel(tick=0.01, slots=64, workers=1)
+    heavy = ThreadPoolExecutor(max_workers=1)
+    fired, done, cb = _recorder()
+    slow_started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        slow_started.set()
+        release.wait(2)  # 推論のように長く掛かる処理
+
+    wheel.call_later(0.02, slow, executor=heavy)
+    assert slow_started.wait(2)
+    start = time.monotonic()
+    wheel.call_later(0.05, cb, "other")  # 共有ワーカー（1本）で実行
+    assert done.wait(1)
+    assert fired[0][1] - start < 0.5
+    release.set()
+    heavy.shutdown(wait=True)
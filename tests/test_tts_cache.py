@@ -0,0 +1,62 @@
+"""TTSCache のテスト."""
+
+import threading
+import time
+
+from gateway.common.tts_cache import TTSCache, tts_cache_key
+
+
+def test_key_depends_on_all_synthesis_parameters():
+    base = tts_cache_key("はい。", "v", 1.1, 0.0, 24000)
+    assert base == tts_cache_key("はい。", "v", 1.1, 0.0, 24000)
+    assert len({base,
+                tts_cache_key("はい", "v", 1.1, 0.0, 24000),
+                tts_cache_key("はい。", "w", 1.1, 0.0, 24000),
+                tts_cache_key("はい。", "v", 1.0, 0.0, 24000),
+                tts_cache_key("はい。", "v", 1.1, 1.0, 24000),
+                tts_cache_key("はい。", "v", 1.1, 0.0, 8000)}) == 6
+    assert tts_cache_key("a", "v", fmt="wav").endswith(".wav")
+
+
+def test_concurrent_requests_synthesize_once_and_persist(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=1 << 20, mem_bytes=1 << 20)
+    calls = []
+
+    def synth():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"audio"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_create("k.pcm", synth)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [b"audio"] * 8 and len(calls) == 1
+
+    # 別インスタンス（再起動後）はディスクから読む
+    other = TTSCache(str(tmp_path))
+    assert other.get_or_create("k.pcm", lambda: b"never") == b"audio"
+    assert other.path("k.pcm") == str(tmp_path / "k.pcm")
+
+    # 失敗はキャッシュしない
+    assert cache.get_or_create("bad.pcm", lambda: None) is None
+    assert cache.get_or_create("bad.pcm", lambda: b"ok") == b"ok"
+
+
+def test_size_bounded_eviction_drops_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=250, mem_bytes=150)
+    cache.put("a", b"a" * 100)
+    time.sleep(0.01)
+    cache.put("b", b"b" * 100)
+    time.sleep(0.01)
+    assert cache.get("a") == b"a" * 100  # a を最近使ったことにする
+    time.sleep(0.01)
+    cache.put("c", b"c" * 100)
+    assert cache.path("b") is None and not (tmp_path / "b").exists()
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.get_stats()
+    assert stats["disk_bytes"] == 200 and stats["evictions"] == 1
+    assert stats["mem_bytes"] <= 150
@@ -0,0 +1,95 @@
+"""TTSPipeline のテスト（先行合成・キュー残量に合わせた投入・バージインでの取り消し）."""
+
+import asyncio
+import collections
+import threading
+import time
+from types import SimpleNamespace
+
+from gateway.audio.tts_pipeline import TTSPipeline
+
+
+def _manager():
+    return SimpleNamespace(tts_queue=collections.deque(maxlen=100), running=True,
+                           is_speaking_tts=False, _tts_epoch=0,
+                           _tts_sender_wakeup=asyncio.Event())
+
+
+def _drain(manager, stop):
+    """ペーサーの代わりにキューを 20ms ごとに5フレームずつ消費する"""
+    async def loop():
+        while not stop.is_set():
+            for _ in range(5):
+                if manager.tts_queue:
+                    manager.tts_queue.popleft()
+            await asyncio.sleep(0.02)
+    return asyncio.ensure_future(loop())
+
+
+def test_next_segment_is_synthesized_while_first_one_streams():
+    started = {}
+    lock = threading.Lock()
+
+    def synth(segment):
+        with lock:
+            started[segment] = time.monotonic()
+        time.sleep(0.1)
+        return b"\x00\x10" * 24000  # 1秒 → 50フレーム
+
+    async def main():
+        manager = _manager()
+        stop = asyncio.Event()
+        drain = _drain(manager, stop)
+        pipeline = TTSPipeline(manager, "c1", ["a", "b", "c"], synth, lookahead=1,
+                               high_water=40, segment_gap=0.0)
+        queued = await pipeline.run()
+        stop.set()
+        await drain
+        return pipeline, queued, manager
+
+    pipeline, queued, manager = asyncio.run(main())
+    assert queued == 150 and pipeline.segments_played == 3
+    # 最初の文節の合成が終わった時点で送信を始める
+    assert 0.09 < pipeline.ttfa < 0.2
+    # b は a の合成と並行して始まっている
+    assert started["b"] - started["a"] < 0.05
+    assert manager.is_speaking_tts and manager._tts_sender_wakeup.is_set()
+
+
+def test_barge_in_cancels_remaining_segments():
+    def synth(segment):
+        time.sleep(0.02)
+        return b"\x00\x10" * 24000
+
+    async def main():
+        manager = _manager()
+        pipeline = TTSPipeline(manager, "c1", ["a", "b", "c"], synth, lookahead=2,
+                               high_water=60, segment_gap=0.0)
+        task = asyncio.ensure_future(pipeline.run())
+        while not manager.tts_queue:
+            await asyncio.sleep(0.005)
+        # バージイン: キューを捨てて epoch を進める
+        manager.tts_queue.clear()
+        manager._tts_epoch += 1
+        await asyncio.wait_for(task, 1.0)
+        return pipeline, manager
+
+    pipeline, manager = asyncio.run(main())
+    assert pipeline.cancelled and pipeline.segments_played < 3
+    assert not manager.tts_queue
+
+
+def test_abort_on_failure_stops_at_failed_segment_without_gaps():
+    def synth(segment):
+        return None if segment == "b" else b"\x00\x10" * 2400  # 0.1秒 → 5フレーム
+
+    async def main():
+        manager = _manager()
+        pipeline = TTSPipeline(manager, "c1", ["a", "b", "c"], synth, lookahead=2,
+                               high_water=60, segment_gap=0.0, abort_on_failure=True)
+        return pipeline, await pipeline.run()
+
+    pipeline, queued = asyncio.run(main())
+    # a だけ流して b の失敗で打ち切る（c は流さない）
+    assert pipeline.failed and pipeline.segments_played == 1
+    assert queued == 5
@@ -0,0 +1,55 @@
+"""UtteranceFeatures のテスト."""
+
+import numpy as np
+
+from asr_stream import utterance_features
+from asr_stream.utterance_features import UtteranceFeatures, encode_batch
+
+
+class _Extractor:
+    nb_max_frames = 8
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, audio):
+        self.calls += 1
+        return np.ones((2, len(audio)), dtype=np.float32)
+
+
+class _Encoder:
+    """(batch, n_mels, frames) -> (batch, frames, n_mels)"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def encode(self, features, to_cpu=False):
+        self.shapes.append(features.shape)
+        return features.transpose(0, 2, 1)
+
+
+def test_features_are_computed_once_and_batched(monkeypatch):
+    monkeypatch.setattr(utterance_features, "_storage_view", lambda a: a)
+    ext, enc = _Extractor(), _Encoder()
+    short = UtteranceFeatures(np.zeros(3, dtype=np.float32), ext, enc)
+    long = UtteranceFeatures(np.zeros(12, dtype=np.float32), ext, enc)
+
+    assert short.encoder_input().shape == (2, 8)
+    assert long.encoder_input().shape == (2, 8)
+    encode_batch([short, long])
+    assert enc.shapes == [(2, 2, 8)]
+    # 計算済みなら再エンコードしない
+    short.encoded()
+    assert len(enc.shapes) == 1
+
+    # 分類器の入力はパディングしない log-mel で別にエンコードする（mel は共有）
+    assert short.embedding().tolist() == [1.0, 1.0]
+    assert enc.shapes[1:] == [(1, 2, 3)]
+    short.embedding()
+    assert len(enc.shapes) == 2
+
+    calls = []
+    assert short.derived("mfcc", lambda a: calls.append(1) or "m") == "m"
+    assert short.derived("mfcc", None) == "m"
+    assert calls == [1]
+    assert ext.calls == 2
@@ -0,0 +1,55 @@
+"""WhisperStreamingSession の逐次分類 tick（直近の窓だけを、新しい有声音声があるときだけ分類）のテスト."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ASR_STREAM_DIR = Path(__file__).resolve().parent.parent / "asr_stream"
+if str(ASR_STREAM_DIR) not in sys.path:
+    sys.path.insert(0, str(ASR_STREAM_DIR))
+
+whisper_session = pytest.importorskip("asr_stream.whisper_session")
+
+
+class _Classifier:
+    def __init__(self):
+        self.lengths = []
+
+    def classify(self, audio_16k):
+        self.lengths.append(len(audio_16k))
+        return "001", 0.9
+
+
+def _session(seconds):
+    session = whisper_session.WhisperStreamingSession.__new__(whisper_session.WhisperStreamingSession)
+    session.uuid = "test"
+    session.client_id = "000"
+    session.sample_rate = 16000
+    session._audio_buffer = bytearray(b"\x10\x00" * int(16000 * seconds))
+    session._emb_clf = _Classifier()
+    session._resampler = None
+    session._is_speaking = False
+    session._streaming_candidate = None
+    session._clf_voice_mark = None
+    session._last_voice_time = 1.0
+    return session
+
+
+def test_tick_classifies_only_the_recent_window(monkeypatch):
+    monkeypatch.setattr(whisper_session, "WHISPER_STREAM_CLF_WINDOW", 2.0)
+    session = _session(seconds=30.0)
+    session._periodic_transcribe()
+    assert session._emb_clf.lengths == [32000]
+    assert session._streaming_candidate == ("001", 0.9)
+
+
+def test_tick_is_skipped_without_new_voice():
+    session = _session(seconds=1.0)
+    session._periodic_transcribe()
+    session._periodic_transcribe()
+    assert len(session._emb_clf.lengths) == 1
+
+    session._last_voice_time = 2.0
+    session._periodic_transcribe()
+    assert len(session._emb_clf.lengths) == 2
@@ -0,0 +1,132 @@
+"""WhisperInferenceScheduler / CT2BatchRunner のテスト（推論部分はダミーの runner・モデル）."""
+
+import collections
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from asr_stream.whisper_scheduler import (PRIORITY_FINAL, CT2BatchRunner, InferenceRequest,
+                                          WhisperInferenceScheduler)
+
+
+class _Runner:
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+
+    def __call__(self, batch):
+        self.gate.wait(timeout=2)
+        self.batches.append([r.uuid for r in batch])
+        return [f"text-{r.uuid}" for r in batch]
+
+
+def test_requests_from_several_calls_are_batched_with_finals_first():
+    runner = _Runner()
+    sched = WhisperInferenceScheduler(runner, batch_window_ms=50, max_batch=8)
+    audio = np.zeros(16000, dtype=np.float32)
+    futures = [sched.submit(audio, final=False, uuid="a"),
+               sched.submit(audio, final=True, uuid="b"),
+               sched.submit(audio, final=False, uuid="c")]
+    runner.gate.set()
+    assert [f.result(timeout=2) for f in futures] == ["text-a", "text-b", "text-c"]
+    assert runner.batches == [["b", "a", "c"]]
+    assert sched.get_stats()["avg_batch_size"] == 3
+
+
+def test_stale_and_superseded_interims_are_dropped():
+    runner = _Runner()
+    sched = WhisperInferenceScheduler(runner, batch_window_ms=0, interim_deadline_ms=0)
+    audio = np.zeros(16000, dtype=np.float32)
+    blocker = sched.submit(audio, final=True, uuid="x")   # runner がブロック中
+    old = sched.submit(audio, final=False, uuid="a")
+    new = sched.submit(audio, final=False, uuid="a")
+    assert old.result(timeout=1) is None                    # 同じ通話の新しい要求で置換
+    runner.gate.set()
+    assert blocker.result(timeout=2) == "text-x"
+    assert new.result(timeout=2) is None                    # 期限切れ
+    stats = sched.get_stats()
+    assert stats["superseded"] == 1
+    assert stats["dropped_stale"] == 1
+
+
+class _Out:
+    def __init__(self, ids):
+        self.sequences_ids = [ids]
+
+
+class _CT2Model:
+    """generate だけを持つダミーの CTranslate2 モデル。fail に含まれる値のプロンプトを含むと失敗する"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def generate(self, encoded, prompts, beam_size, max_length):
+        self.calls.append([p[0] for p in prompts])
+        if self.fail & {p[0] for p in prompts}:
+            raise RuntimeError("generate failed")
+        return [_Out(p) for p in prompts]
+
+
+class _Features:
+    def __init__(self):
+        self._encoded = np.zeros((4, 2), dtype=np.float32)
+
+    def encoded(self):
+        return self._encoded
+
+
+def _runner(fail=(), cache_size=2):
+    runner = CT2BatchRunner.__new__(CT2BatchRunner)
+    runner.model = SimpleNamespace(model=_CT2Model(fail),
+                                   get_prompt=lambda tok, previous, without_timestamps: list(previous))
+    runner._tokenizer = SimpleNamespace(encode=lambda text: [text.strip()],
+                                        decode=lambda ids: "|".join(ids))
+    runner._features_cls = None
+    runner._encode_batch = lambda features: None
+    runner._storage_view = lambda array: array
+    runner._prompt_cache = collections.OrderedDict()
+    runner._prompt_cache_size = cache_size
+    return runner
+
+
+def _request(uuid):
+    return InferenceRequest(uuid, np.zeros(16000, dtype=np.float32), PRIORITY_FINAL, 3,
+                            uuid, None, _Features())
+
+
+def test_runner_decodes_whole_batch_with_one_generate():
+    runner = _runner()
+    assert runner([_request("a"), _request("b")]) == ["a", "b"]
+    assert runner.model.model.calls == [["a", "b"]]
+
+
+def test_runner_retries_singly_and_fails_only_the_bad_item():
+    runner = _runner(fail={"b"})
+    results = runner([_request("a"), _request("b"), _request("c")])
+    assert results[0] == "a" and results[2] == "c"
+    assert isinstance(results[1], RuntimeError)
+    assert runner.model.model.calls == [["a", "b", "c"], ["a"], ["b"], ["c"]]
+
+
+def test_scheduler_sets_exception_only_on_the_failed_request():
+    sched = WhisperInferenceScheduler(_runner(fail={"b"}), batch_window_ms=50)
+    good = sched.submit(np.zeros(16000, dtype=np.float32), uuid="a", initial_prompt="a",
+                        features=_Features())
+    bad = sched.submit(np.zeros(16000, dtype=np.float32), uuid="b", initial_prompt="b",
+                       features=_Features())
+    assert good.result(timeout=2) == "a"
+    with pytest.raises(RuntimeError):
+        bad.result(timeout=2)
+    assert sched.get_stats()["errors"] == 1
+
+
+def test_prompt_cache_is_bounded_lru():
+    runner = _runner(cache_size=2)
+    runner._prompt("a")
+    runner._prompt("b")
+    runner._prompt("a")
+    runner._prompt("c")
+    assert list(runner._prompt_cache) == ["a", "c"]